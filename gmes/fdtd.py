@@ -13,23 +13,42 @@ except ImportError:
     pass
 
 from copy import deepcopy
-from math import sqrt
+from math import sqrt, ceil
 from cmath import exp as cexp
 from numpy import ndindex, arange, inf, array
 from datetime import datetime, timedelta
+from multiprocessing.pool import ThreadPool
 
 import numpy as np
 
 # GMES modules
-from geometry import GeomBoxTree, in_range, DefaultMedium
+from geometry import GeomBoxTree, in_range, DefaultMedium, padded_storage
 from file_io import Probe
 #from file_io import write_hdf5, snapshot
 from show import ShowLine, ShowPlane, Snapshot
-from material import Dummy
+from material import Dummy, Const, Dielectric, Cpml, Dm2
+from pw_material import set_num_threads, get_num_threads, pw_type
+from pw_material import PwMaterialReal, PwMaterialCmplx
+from pw_material import PwMaterialRealSingle, PwMaterialCmplxSingle
 from pygeom import GeomBox
 from constant import *
 
 
+# component numbers of the compiled driver
+_driver_compnt = {Ex: 0, Ey: 1, Ez: 2, Hx: 3, Hy: 4, Hz: 5}
+
+# axes along which each component is exchanged by talk_with_*_neighbors
+_halo_axes = {Ex: (1, 2), Ey: (2, 0), Ez: (0, 1),
+              Hx: (1, 2), Hy: (2, 0), Hz: (0, 1)}
+
+# number of time steps which the compiled driver advances at once
+_driver_chunk = 1024
+
+# width in cells along the x and y axes of the tiles of the temporal
+# blocking
+_blocking_tile = 16
+
+
 class TimeStep(object):
     """Store the current time-step and time.
     
@@ -60,17 +79,65 @@ class TimeStep(object):
         self.t = self.n * self.dt
 
 
+class _PlanarField(object):
+    """Complex field stored as separate real and imaginary arrays.
+
+    Indexing gets and sets complex values, so that the sources, the 
+    probes, and the neighbor exchanges see a complex array, while the 
+    compiled kernels update real and imag as real fields.
+
+    """
+    def __init__(self, real, imag):
+        self.real = real
+        self.imag = imag
+        self.shape = real.shape
+        self.dtype = np.result_type(real.dtype, np.complex64)
+
+    def __getitem__(self, key):
+        return self.real[key] + 1j * self.imag[key]
+
+    def __setitem__(self, key, value):
+        self.real[key] = np.real(value)
+        self.imag[key] = np.imag(value)
+
+    def __array__(self, dtype=None):
+        field = np.empty(self.shape, self.dtype)
+        field.real = self.real
+        field.imag = self.imag
+        if dtype is None:
+            return field
+        else:
+            return field.astype(dtype)
+
+
 class FDTD(object):
     """three dimensional finite-difference time-domain class
     
     Attributes:
     space -- geometry.Cartesian instance
     cmplx -- Boolean of whether field is complex. Determined by the 
-        space.period.
+        Bloch wave vector unless given.
+    planar -- whether the complex fields are stored as separate real 
+        and imaginary arrays
+    aligned -- whether the field rows are padded and aligned for the 
+        compiled kernels
     dr -- space differentials: dx, dy, dz
     dt -- time-step size
     courant_ratio -- the ratio of dt to Courant stability bound
     bloch -- Bloch wave vector
+    bulk -- whether the dielectric cells are updated as index ranges and
+        the CPML cells as slabs
+    engine -- update engine of the non-dispersive dielectrics
+    num_threads -- number of threads of the compiled update loops
+    order -- memory order of the pointwise material points
+    precision -- floating-point precision of the fields
+    single -- whether the fields are in single precision
+    concurrent -- whether the components of a half step are updated 
+        concurrently
+    blocking -- number of time steps which run() advances at a time in
+        the interior of the fused dielectric grids
+    active_region -- whether the dielectric grids are swept only in the
+        box which the fields can have reached
     e_field_component
     h_field_component -- component list of the
     time_step -- an instance of the TimeStep class
@@ -81,7 +148,11 @@ class FDTD(object):
 
     """
     def __init__(self, space=None, geom_list=None, src_list=None,
-                 courant_ratio=.99, dt=None, bloch=None, verbose=True):
+                 courant_ratio=.99, dt=None, bloch=None, bulk=True, 
+                 engine='pointwise', num_threads=None, order='linear',
+                 precision='double', concurrent=False, blocking=1, 
+                 active_region=False, cmplx=None, planar=False, 
+                 aligned=False, verbose=True):
         """Constructor.
         
         Keyword arguments:
@@ -95,7 +166,67 @@ class FDTD(object):
             (default 0.99)
         dt -- time-step size. If None is given, dt is calculated using space 
             differentials and courant_ratio. (default None)
-        bloch -- Bloch wave vector (default None)
+        bloch -- Bloch wave vector. The boundaries are periodic 
+            either way, and a zero vector is the same as None unless 
+            cmplx is set. (default None)
+        bulk -- whether runs of the identical dielectric cells are updated
+            as index ranges, joined into boxes, instead of points, and 
+            the CPML cells as slabs
+            which keep psi only for the graded directions (default True)
+        engine -- update engine of the non-dispersive dielectrics. 
+            'pointwise' updates them through the pointwise material 
+            lists. 'grid' compiles them into dense coefficient arrays 
+            which are swept at once, and only the other materials are
+            updated pointwise. 'fused' is 'grid' whose three electric 
+            (and magnetic) components are swept together in 3-D, so 
+            that the shared input field values are read once. 
+            (default 'pointwise')
+        num_threads -- number of threads of the compiled update loops. 
+            If None is given, the OpenMP default is used, which honors 
+            OMP_NUM_THREADS. (default None)
+        order -- order in which the pointwise materials visit their 
+            points. 'linear' follows the array layout, 'blocked' visits 
+            the points tile by tile, and 'morton' follows the Z-order 
+            curve. (default 'linear')
+        precision -- floating-point precision of the fields, either 
+            'double' or 'single'. 'single' stores the fields as float32 or
+            complex64, which halves the memory and the bandwidth. The 
+            material coefficients and the time step stay in double 
+            precision. (default 'double')
+        concurrent -- whether the updates of the field components in a 
+            half step run concurrently on a thread pool. The compiled 
+            kernels release the GIL, so the components are updated on 
+            separate cores. Each kernel still runs its own OpenMP team, 
+            so num_threads may need to be lowered. (default False)
+        blocking -- number of time steps which run() advances at a time
+            in the interior box of the 'fused' engine which no other 
+            materials, sources, probes, or periodic boundaries touch. 
+            The box is swept tile by tile, several half steps per tile,
+            while the cells outside it are stepped as usual. The fields 
+            are the same as those of the plain steps. 1 disables the 
+            temporal blocking. (default 1)
+        active_region -- whether the dielectric grids are swept only in
+            the box of the cells which the fields can have reached. The
+            box starts from the nonzero fields and the source points at
+            the first step, grows by a cell per half step, and spans a
+            periodic axis once it reaches an end of the axis. The sweeps
+            cover the whole grids once the box does. The fields should 
+            not be changed by hand after the first step. 
+            (default False)
+        cmplx -- whether the fields are complex. If None is given, they
+            are complex only for a nonzero Bloch wave vector, since the
+            periodic boundaries without phase shifts need only the real 
+            arithmetic. (default None)
+        planar -- whether the complex fields are stored as separate 
+            real and imaginary arrays, which are updated by the real 
+            kernels with a copy of the materials each. The Bloch phase 
+            couples them only at the periodic boundaries. It has no 
+            effect on the real fields, and the runs go through step().
+            The nonlinear Dm2 is not supported. (default False)
+        aligned -- whether the rows of the field arrays start on 64-byte
+            boundaries, padded to a whole number of vectors. ex, ey, ...
+            are then views of the padded arrays, which the compiled 
+            kernels take instead. (default False)
         verbose -- whether it prints the details (default True)
 
         """
@@ -117,6 +248,39 @@ class FDTD(object):
 
         self.verbose = bool(verbose)
 
+        self.bulk = bool(bulk)
+
+        if engine not in ('pointwise', 'grid', 'fused'):
+            raise ValueError("engine should be 'pointwise', 'grid', or 'fused'.")
+        self.engine = engine
+
+        if num_threads is not None:
+            set_num_threads(int(num_threads))
+        self.num_threads = get_num_threads()
+
+        if order not in ('linear', 'blocked', 'morton'):
+            raise ValueError("order should be 'linear', 'blocked', or 'morton'.")
+        self.order = order
+
+        if precision not in ('double', 'single'):
+            raise ValueError("precision should be either 'double' or 'single'.")
+        self.precision = precision
+        self.single = precision == 'single'
+
+        self.concurrent = bool(concurrent)
+        if self.concurrent:
+            self._pool = ThreadPool(3)
+        else:
+            self._pool = None
+
+        if int(blocking) < 1:
+            raise ValueError("blocking should be a positive integer.")
+        self.blocking = int(blocking)
+
+        self.active_region = bool(active_region)
+        self._active = None
+        self._seeded = not self.active_region
+
         self.space = space
                 
         self._fig_id = int(self.space.my_id)
@@ -147,6 +311,11 @@ class FDTD(object):
         if self.verbose:
             print 'dt:', time_step_size
             print 'courant ratio:', self.courant_ratio
+            print 'number of threads:', self.num_threads
+            print 'precision:', self.precision
+            print 'concurrent updates:', self.concurrent
+            print 'temporal blocking:', self.blocking
+            print 'active region tracking:', self.active_region
             
         if self.verbose:
             print 'Initializing the geometry list...',
@@ -172,11 +341,8 @@ class FDTD(object):
             self.geom_tree.display_info()
                 
         if bloch is None:
-            self.cmplx = False
             self.bloch = None
         else:
-            self.cmplx = True
-
             self.bloch = np.array(bloch, np.double)
 
             if self.verbose:
@@ -198,13 +364,36 @@ class FDTD(object):
 
             if self.verbose:
                 print 'numerical Bloch wave vector is', numeric_bloch
+
+        if cmplx is None:
+            self.cmplx = self.bloch is not None and bool(self.bloch.any())
+        else:
+            self.cmplx = bool(cmplx)
+
+        if self.cmplx and self.bloch is None:
+            self.bloch = np.zeros(3)
+
+        self.planar = bool(planar) and self.cmplx
+        if (self.planar and 
+            any(isinstance(go.material, Dm2) for go in self.geom_list)):
+            # The real and imaginary parts are not independent in the
+            # two-level atoms.
+            raise ValueError("planar storage does not support Dm2.")
+        # whether the pointwise objects update complex fields
+        self._pw_cmplx = self.cmplx and not self.planar
+        self.aligned = bool(aligned)
+
+        if self.verbose:
+            print 'complex field:', self.cmplx
+            print 'planar storage:', self.planar
+            print 'aligned storage:', self.aligned
             
         if self.verbose:
             print 'Initializing source...',
             
         self.src_list = src_list
         for so in self.src_list:
-            so.init(self.geom_tree, self.space, self.cmplx)
+            so.init(self.geom_tree, self.space, self.cmplx, self.single)
             
         if self.verbose:
             print 'done.'
@@ -226,12 +415,18 @@ class FDTD(object):
             print 'Allocating memory for the electromagnetic fields...',
             
         # storage for the electromagnetic field 
-        self.ex = self.space.get_ex_storage(self.e_field_compnt, self.cmplx)
-        self.ey = self.space.get_ey_storage(self.e_field_compnt, self.cmplx)
-        self.ez = self.space.get_ez_storage(self.e_field_compnt, self.cmplx)
-        self.hx = self.space.get_hx_storage(self.h_field_compnt, self.cmplx)
-        self.hy = self.space.get_hy_storage(self.h_field_compnt, self.cmplx)
-        self.hz = self.space.get_hz_storage(self.h_field_compnt, self.cmplx)
+        self.ex = self._get_storage(self.space.get_ex_storage, 
+                                    self.e_field_compnt)
+        self.ey = self._get_storage(self.space.get_ey_storage, 
+                                    self.e_field_compnt)
+        self.ez = self._get_storage(self.space.get_ez_storage, 
+                                    self.e_field_compnt)
+        self.hx = self._get_storage(self.space.get_hx_storage, 
+                                    self.h_field_compnt)
+        self.hy = self._get_storage(self.space.get_hy_storage, 
+                                    self.h_field_compnt)
+        self.hz = self._get_storage(self.space.get_hz_storage, 
+                                    self.h_field_compnt)
         
         self.field = {Ex: self.ex, Ey: self.ey, Ez: self.ez,
                       Hx: self.hx, Hy: self.hy, Hz: self.hz}
@@ -248,6 +443,17 @@ class FDTD(object):
             print 'This will take some times...'
 
         self.init_material()
+
+        if self.planar:
+            if self.verbose:
+                print 'Mapping the materials of the imaginary part...'
+
+            pw_material, pw_fused = self.pw_material, self.pw_fused
+            self.pw_material = {}
+            self.init_material()
+            self.pw_material_im = self.pw_material
+            self.pw_fused_im = self.pw_fused
+            self.pw_material, self.pw_fused = pw_material, pw_fused
         
         if self.verbose:
             print 'Mapping the pointwise source...',
@@ -259,6 +465,35 @@ class FDTD(object):
         et = datetime.now()
         print 'Elapsed time:', (et - st)
         
+    def _get_storage(self, get_storage, field_compnt):
+        """Return a field array allocated by get_storage.
+
+        """
+        if self.planar:
+            return _PlanarField(get_storage(field_compnt, False, self.single,
+                                            self.aligned),
+                                get_storage(field_compnt, False, self.single,
+                                            self.aligned))
+        else:
+            return get_storage(field_compnt, self.cmplx, self.single, 
+                               self.aligned)
+
+    def _planes(self):
+        """Return the parts of the fields which the materials update.
+
+        Each part is a tuple of a function which picks the part out of
+        a field, the pointwise materials, and the fused engines. The 
+        part of an aligned field is its padded array.
+
+        """
+        if self.planar:
+            return ((lambda field: padded_storage(field.real), 
+                     self.pw_material, self.pw_fused),
+                    (lambda field: padded_storage(field.imag), 
+                     self.pw_material_im, self.pw_fused_im))
+        else:
+            return ((padded_storage, self.pw_material, self.pw_fused),)
+
     def _print_pw_obj(self, pw_obj):
         """Print information of the piecewise material and source.
 
@@ -321,6 +556,17 @@ class FDTD(object):
                                  courant_ratio=self.courant_ratio, 
                                  dt=self.time_step.dt, 
                                  wavevector=self.wavevector, 
+                                 bulk=self.bulk,
+                                 engine=self.engine,
+                                 num_threads=self.num_threads,
+                                 order=self.order,
+                                 precision=self.precision,
+                                 concurrent=self.concurrent,
+                                 blocking=self.blocking,
+                                 active_region=self.active_region,
+                                 cmplx=self.cmplx,
+                                 planar=self.planar,
+                                 aligned=self.aligned,
                                  verbose=self.verbose)
 
         newcopy.ex = np.array(self.ex)
@@ -333,6 +579,145 @@ class FDTD(object):
         newcopy.time_step = deepcopy(self.time_step)
         return newcopy
     	
+    def _in_bulk(self, mat_obj):
+        """Return whether mat_obj is mapped as index ranges.
+
+        """
+        if type(mat_obj) in (Cpml, Const):
+            return self.bulk
+        return ((self.bulk or self.engine != 'pointwise') and 
+                type(mat_obj) is Dielectric)
+
+    def _same_run(self, run_mat, run_spc, mat_obj, spc):
+        """Return whether the cell of mat_obj at spc can continue the 
+        run of run_mat whose last cell is at run_spc.
+
+        """
+        if type(run_mat) is not type(mat_obj):
+            return False
+        if type(mat_obj) is Cpml:
+            # The cells of a CPML slab share the grading along the 
+            # last axis.
+            return (run_mat is mat_obj and 
+                    mat_obj.graded(run_spc[2], 2) == mat_obj.graded(spc[2], 2))
+        if type(mat_obj) is Const and run_mat.value != mat_obj.value:
+            return False
+        return (run_mat.eps_inf == mat_obj.eps_inf and 
+                run_mat.mu_inf == mat_obj.mu_inf)
+
+    def _extend_run(self, comp, run, idx, spc, mat_obj, underneath):
+        """Extend the run of bulk cells along the last axis.
+
+        Return the extended run, or flush the given run and start a
+        new one at idx if idx does not continue it.
+        
+        """
+        if run is not None:
+            low, high, coords, run_mat, run_underneath = run
+            if (idx[:2] == low[:2] and idx[2] == high[2] + 1 and 
+                self._same_run(run_mat, coords[-1], mat_obj, spc) and
+                run_underneath is underneath):
+                coords.append(spc)
+                return low, idx, coords, run_mat, run_underneath
+            self._flush_run(comp, run)
+
+        return idx, idx, [spc], mat_obj, underneath
+
+    def _flush_run(self, comp, run):
+        """Register the run of bulk cells as an index range.
+
+        """
+        if run is None:
+            return
+        
+        low, high, coords, mat_obj, underneath = run
+        get_pw_material_range = {Ex: mat_obj.get_pw_material_ex_range,
+                                 Ey: mat_obj.get_pw_material_ey_range,
+                                 Ez: mat_obj.get_pw_material_ez_range,
+                                 Hx: mat_obj.get_pw_material_hx_range,
+                                 Hy: mat_obj.get_pw_material_hy_range,
+                                 Hz: mat_obj.get_pw_material_hz_range}
+        if type(mat_obj) is Cpml:
+            pw_obj = get_pw_material_range[comp](low, high, coords, 
+                                                 underneath, self._pw_cmplx,
+                                                 self.single)
+        elif type(mat_obj) is Dielectric:
+            pw_obj = get_pw_material_range[comp](low, high, underneath, 
+                                                 self._pw_cmplx, 
+                                                 self.engine != 'pointwise',
+                                                 self.single)
+        else:
+            pw_obj = get_pw_material_range[comp](low, high, underneath, 
+                                                 self._pw_cmplx, self.single)
+        
+        if self.pw_material[comp].has_key(type(pw_obj)):
+            self.pw_material[comp][type(pw_obj)].merge(pw_obj)
+        else:
+            self.pw_material[comp][type(pw_obj)] = pw_obj
+        
+    def _map_dummy(self, comp, shape, planes):
+        """Register the boundary planes of comp as Dummy index ranges.
+
+        planes is a sequence of (axis, index) pairs. Each plane is 
+        walked row by row, and a row is cut only where the medium 
+        changes, so no Dummy object is made per cell. The cells shared
+        with a preceding plane are skipped.
+        
+        """
+        index_to_space = {Ex: self.space.ex_index_to_space,
+                          Ey: self.space.ey_index_to_space,
+                          Ez: self.space.ez_index_to_space,
+                          Hx: self.space.hx_index_to_space,
+                          Hy: self.space.hy_index_to_space,
+                          Hz: self.space.hz_index_to_space}[comp]
+        bounds = [[0, n - 1] for n in shape]
+        for axis, index in planes:
+            outer, inner = [a for a in xrange(3) if a != axis]
+            idx = [index] * 3
+            for idx[outer] in xrange(bounds[outer][0], bounds[outer][1] + 1):
+                run = None
+                for idx[inner] in xrange(bounds[inner][0], 
+                                         bounds[inner][1] + 1):
+                    spc = index_to_space(*idx)
+                    mat_obj, underneath = self.geom_tree.material_of_point(spc)
+                    if underneath is not None:
+                        mat_obj = underneath
+                    medium = (mat_obj.eps_inf, mat_obj.mu_inf)
+                    if run is not None and run[2] == medium:
+                        run[1] = tuple(idx)
+                    else:
+                        self._flush_dummy(comp, run)
+                        run = [tuple(idx), tuple(idx), medium]
+                self._flush_dummy(comp, run)
+
+            if index == bounds[axis][0]:
+                bounds[axis][0] += 1
+            else:
+                bounds[axis][1] -= 1
+
+    def _flush_dummy(self, comp, run):
+        """Register the run of Dummy cells as an index range.
+
+        """
+        if run is None:
+            return
+
+        low, high, medium = run
+        dummy = Dummy(*medium)
+        get_pw_material_range = {Ex: dummy.get_pw_material_ex_range,
+                                 Ey: dummy.get_pw_material_ey_range,
+                                 Ez: dummy.get_pw_material_ez_range,
+                                 Hx: dummy.get_pw_material_hx_range,
+                                 Hy: dummy.get_pw_material_hy_range,
+                                 Hz: dummy.get_pw_material_hz_range}
+        pw_obj = get_pw_material_range[comp](low, high, None, 
+                                             self._pw_cmplx, self.single)
+
+        if self.pw_material[comp].has_key(type(pw_obj)):
+            self.pw_material[comp][type(pw_obj)].merge(pw_obj)
+        else:
+            self.pw_material[comp][type(pw_obj)] = pw_obj
+
     def init_material_ex(self):
         """Set up the update mechanism for Ex field.
         
@@ -342,18 +727,27 @@ class FDTD(object):
         """
         self.pw_material[Ex] = {}
         shape = self.ex.shape
+        run = None
         for idx in ndindex(shape):
+            if idx[1] == shape[1] - 1 or idx[2] == shape[2] - 1:
+                continue
             spc = self.space.ex_index_to_space(*idx)
             mat_obj, underneath = self.geom_tree.material_of_point(spc)
-            if idx[1] == shape[1] - 1 or idx[2] == shape[2] - 1:
-                mat_obj = Dummy(mat_obj.eps_inf, mat_obj.mu_inf)
-            pw_obj = mat_obj.get_pw_material_ex(idx, spc, underneath, self.cmplx)
+            if self._in_bulk(mat_obj):
+                run = self._extend_run(Ex, run, idx, spc, mat_obj, underneath)
+                continue
+
+            pw_obj = mat_obj.get_pw_material_ex(idx, spc, underneath, 
+                                                self._pw_cmplx, self.single)
             
             if self.pw_material[Ex].has_key(type(pw_obj)):
                 self.pw_material[Ex][type(pw_obj)].merge(pw_obj)
             else:
                 self.pw_material[Ex][type(pw_obj)] = pw_obj
 
+        self._flush_run(Ex, run)
+        self._map_dummy(Ex, shape, ((1, shape[1] - 1), (2, shape[2] - 1)))
+
     def init_material_ey(self):
         """Set up the update mechanism for Ey field.
         
@@ -363,18 +757,27 @@ class FDTD(object):
         """
         self.pw_material[Ey] = {}
         shape = self.ey.shape
+        run = None
         for idx in ndindex(shape):
+            if idx[2] == shape[2] - 1 or idx[0] == shape[0] - 1:
+                continue
             spc = self.space.ey_index_to_space(*idx)
             mat_obj, underneath = self.geom_tree.material_of_point(spc)
-            if idx[2] == shape[2] - 1 or idx[0] == shape[0] - 1:
-                mat_obj = Dummy(mat_obj.eps_inf, mat_obj.mu_inf)
-            pw_obj = mat_obj.get_pw_material_ey(idx, spc, underneath, self.cmplx)
+            if self._in_bulk(mat_obj):
+                run = self._extend_run(Ey, run, idx, spc, mat_obj, underneath)
+                continue
+
+            pw_obj = mat_obj.get_pw_material_ey(idx, spc, underneath, 
+                                                self._pw_cmplx, self.single)
 
             if self.pw_material[Ey].has_key(type(pw_obj)):
                 self.pw_material[Ey][type(pw_obj)].merge(pw_obj)
             else:
                 self.pw_material[Ey][type(pw_obj)] = pw_obj
 
+        self._flush_run(Ey, run)
+        self._map_dummy(Ey, shape, ((2, shape[2] - 1), (0, shape[0] - 1)))
+
     def init_material_ez(self):
         """Set up the update mechanism for Ez field.
         
@@ -384,18 +787,27 @@ class FDTD(object):
         """
         self.pw_material[Ez] = {}
         shape = self.ez.shape
+        run = None
         for idx in ndindex(shape):
+            if idx[0] == shape[0] - 1 or idx[1] == shape[1] - 1:
+                continue
             spc = self.space.ez_index_to_space(*idx)
             mat_obj, underneath = self.geom_tree.material_of_point(spc)
-            if idx[0] == shape[0] - 1 or idx[1] == shape[1] - 1:
-                mat_obj = Dummy(mat_obj.eps_inf, mat_obj.mu_inf)
-            pw_obj = mat_obj.get_pw_material_ez(idx, spc, underneath, self.cmplx)
+            if self._in_bulk(mat_obj):
+                run = self._extend_run(Ez, run, idx, spc, mat_obj, underneath)
+                continue
+
+            pw_obj = mat_obj.get_pw_material_ez(idx, spc, underneath, 
+                                                self._pw_cmplx, self.single)
 
             if self.pw_material[Ez].has_key(type(pw_obj)):
                 self.pw_material[Ez][type(pw_obj)].merge(pw_obj)
             else:
                 self.pw_material[Ez][type(pw_obj)] = pw_obj
 
+        self._flush_run(Ez, run)
+        self._map_dummy(Ez, shape, ((0, shape[0] - 1), (1, shape[1] - 1)))
+
     def init_material_hx(self):
         """Set up the update mechanism for Hx field.
         
@@ -405,18 +817,27 @@ class FDTD(object):
         """
         self.pw_material[Hx] = {}
         shape = self.hx.shape
+        run = None
         for idx in ndindex(shape):
+            if idx[1] == 0 or idx[2] == 0:
+                continue
             spc = self.space.hx_index_to_space(*idx)
             mat_obj, underneath = self.geom_tree.material_of_point(spc)
-            if idx[1] == 0 or idx[2] == 0:
-                mat_obj = Dummy(mat_obj.eps_inf, mat_obj.mu_inf)
-            pw_obj = mat_obj.get_pw_material_hx(idx, spc, underneath, self.cmplx)
+            if self._in_bulk(mat_obj):
+                run = self._extend_run(Hx, run, idx, spc, mat_obj, underneath)
+                continue
+
+            pw_obj = mat_obj.get_pw_material_hx(idx, spc, underneath, 
+                                                self._pw_cmplx, self.single)
 
             if self.pw_material[Hx].has_key(type(pw_obj)):
                 self.pw_material[Hx][type(pw_obj)].merge(pw_obj)
             else:
                 self.pw_material[Hx][type(pw_obj)] = pw_obj
 
+        self._flush_run(Hx, run)
+        self._map_dummy(Hx, shape, ((1, 0), (2, 0)))
+
     def init_material_hy(self):
         """Set up the update mechanism for Hy field.
         
@@ -426,18 +847,27 @@ class FDTD(object):
         """
         self.pw_material[Hy] = {}
         shape = self.hy.shape
+        run = None
         for idx in ndindex(shape):
+            if idx[2] == 0 or idx[0] == 0:
+                continue
             spc = self.space.hy_index_to_space(*idx)
             mat_obj, underneath = self.geom_tree.material_of_point(spc)
-            if idx[2] == 0 or idx[0] == 0:
-                mat_obj = Dummy(mat_obj.eps_inf, mat_obj.mu_inf)
-            pw_obj = mat_obj.get_pw_material_hy(idx, spc, underneath, self.cmplx)
+            if self._in_bulk(mat_obj):
+                run = self._extend_run(Hy, run, idx, spc, mat_obj, underneath)
+                continue
+
+            pw_obj = mat_obj.get_pw_material_hy(idx, spc, underneath, 
+                                                self._pw_cmplx, self.single)
 
             if self.pw_material[Hy].has_key(type(pw_obj)):
                 self.pw_material[Hy][type(pw_obj)].merge(pw_obj)
             else:
                 self.pw_material[Hy][type(pw_obj)] = pw_obj
 
+        self._flush_run(Hy, run)
+        self._map_dummy(Hy, shape, ((2, 0), (0, 0)))
+
     def init_material_hz(self):
         """Set up the update mechanism for Hz field.
         
@@ -447,18 +877,35 @@ class FDTD(object):
         """
         self.pw_material[Hz] = {}
         shape = self.hz.shape
+        run = None
         for idx in ndindex(shape):
+            if idx[0] == 0 or idx[1] == 0:
+                continue
             spc = self.space.hz_index_to_space(*idx)
             mat_obj, underneath = self.geom_tree.material_of_point(spc)
-            if idx[0] == 0 or idx[1] == 0:
-                mat_obj = Dummy(mat_obj.eps_inf, mat_obj.mu_inf)
-            pw_obj = mat_obj.get_pw_material_hz(idx, spc, underneath, self.cmplx)
+            if self._in_bulk(mat_obj):
+                run = self._extend_run(Hz, run, idx, spc, mat_obj, underneath)
+                continue
+
+            pw_obj = mat_obj.get_pw_material_hz(idx, spc, underneath, 
+                                                self._pw_cmplx, self.single)
 
             if self.pw_material[Hz].has_key(type(pw_obj)):
                 self.pw_material[Hz][type(pw_obj)].merge(pw_obj)
             else:
                 self.pw_material[Hz][type(pw_obj)] = pw_obj
 
+        self._flush_run(Hz, run)
+        self._map_dummy(Hz, shape, ((0, 0), (1, 0)))
+
+    def _finalize_material(self, comp):
+        """Sort the points of the pointwise materials of comp into the 
+        memory order.
+
+        """
+        for pw_obj in self.pw_material[comp].itervalues():
+            pw_obj.finalize(self.order)
+
     def init_material(self):
         init_mat_func = {Ex: self.init_material_ex,
                          Ey: self.init_material_ey,
@@ -471,6 +918,7 @@ class FDTD(object):
             if self.verbose:
                 print 'Mapping materials for', comp.__name__, 'field'
             init_mat_func[comp]()
+            self._finalize_material(comp)
             
             if self.verbose:
                 self._print_pw_obj(self.pw_material[comp])
@@ -479,10 +927,46 @@ class FDTD(object):
             if self.verbose:
                 print 'Mapping materials for', comp.__name__, 'field'
             init_mat_func[comp]()
+            self._finalize_material(comp)
 
             if self.verbose:
                 self._print_pw_obj(self.pw_material[comp])
 
+        self.pw_fused = {Electric: [], Magnetic: []}
+        if self.engine == 'fused':
+            self._init_fused()
+
+    def _init_fused(self):
+        """Fuse the coefficient grids of the three electric (and 
+        magnetic) components into self.pw_fused.
+
+        The grids stay in self.pw_material, but their update_all does 
+        nothing once fused.
+        
+        """
+        if (set(self.e_field_compnt) != set((Ex, Ey, Ez)) or 
+            set(self.h_field_compnt) != set((Hx, Hy, Hz))):
+            return
+
+        grid = {}
+        for comp in self.e_field_compnt + self.h_field_compnt:
+            for pw_obj in self.pw_material[comp].itervalues():
+                if pw_obj.name() in ('DielectricGridElectric', 
+                                     'DielectricGridMagnetic'):
+                    grid[comp] = pw_obj
+
+        if all(comp in grid for comp in (Ex, Ey, Ez)):
+            fused_type = pw_type('DielectricFusedElectric', 
+                                  self._pw_cmplx, self.single)
+            self.pw_fused[Electric].append(fused_type(grid[Ex], grid[Ey], 
+                                                      grid[Ez]))
+
+        if all(comp in grid for comp in (Hx, Hy, Hz)):
+            fused_type = pw_type('DielectricFusedMagnetic', 
+                                  self._pw_cmplx, self.single)
+            self.pw_fused[Magnetic].append(fused_type(grid[Hx], grid[Hy], 
+                                                      grid[Hz]))
+
     def init_source_ex(self):
         self.pw_source[Ex] = {}
         for so in self.src_list:
@@ -644,55 +1128,85 @@ class FDTD(object):
                 recorder.write_header(loc, self.time_step.dt)
                 self.h_recorder.append(recorder)
 
+    def update_fused_e(self):
+        for part, pw_material, pw_fused in self._planes():
+            for pw_obj in pw_fused[Electric]:
+                pw_obj.update_all(part(self.ex), part(self.ey), 
+                                  part(self.ez), part(self.hx), 
+                                  part(self.hy), part(self.hz),
+                                  self.dx, self.dy, self.dz,
+                                  self.time_step.dt, self.time_step.n)
+
+    def update_fused_h(self):
+        for part, pw_material, pw_fused in self._planes():
+            for pw_obj in pw_fused[Magnetic]:
+                pw_obj.update_all(part(self.hx), part(self.hy), 
+                                  part(self.hz), part(self.ex), 
+                                  part(self.ey), part(self.ez),
+                                  self.dx, self.dy, self.dz,
+                                  self.time_step.dt, self.time_step.n)
+
     def update_ex(self):
-        for pw_obj in self.pw_material[Ex].itervalues():
-            pw_obj.update_all(self.ex, self.hz, self.hy, self.dy, self.dz, 
-                              self.time_step.dt, self.time_step.n)
+        for part, pw_material, pw_fused in self._planes():
+            for pw_obj in pw_material[Ex].itervalues():
+                pw_obj.update_all(part(self.ex), part(self.hz), part(self.hy), 
+                                  self.dy, self.dz, 
+                                  self.time_step.dt, self.time_step.n)
 
         for pw_obj in self.pw_source[Ex].itervalues():
             pw_obj.update_all(self.ex, self.hz, self.hy, self.dy, self.dz, 
                               self.time_step.dt, self.time_step.n)
         
     def update_ey(self):
-        for pw_obj in self.pw_material[Ey].itervalues():
-            pw_obj.update_all(self.ey, self.hx, self.hz, self.dz, self.dx,
-                              self.time_step.dt, self.time_step.n)
+        for part, pw_material, pw_fused in self._planes():
+            for pw_obj in pw_material[Ey].itervalues():
+                pw_obj.update_all(part(self.ey), part(self.hx), part(self.hz), 
+                                  self.dz, self.dx, 
+                                  self.time_step.dt, self.time_step.n)
 		
         for pw_obj in self.pw_source[Ey].itervalues():
             pw_obj.update_all(self.ey, self.hx, self.hz, self.dz, self.dx,
                               self.time_step.dt, self.time_step.n)
 
     def update_ez(self):
-        for pw_obj in self.pw_material[Ez].itervalues():
-            pw_obj.update_all(self.ez, self.hy, self.hx, self.dx, self.dy,
-                              self.time_step.dt, self.time_step.n)
+        for part, pw_material, pw_fused in self._planes():
+            for pw_obj in pw_material[Ez].itervalues():
+                pw_obj.update_all(part(self.ez), part(self.hy), part(self.hx), 
+                                  self.dx, self.dy, 
+                                  self.time_step.dt, self.time_step.n)
 
         for pw_obj in self.pw_source[Ez].itervalues():
             pw_obj.update_all(self.ez, self.hy, self.hx, self.dx, self.dy,
                               self.time_step.dt, self.time_step.n)
         
     def update_hx(self):
-        for pw_obj in self.pw_material[Hx].itervalues():
-            pw_obj.update_all(self.hx, self.ez, self.ey, self.dy, self.dz, 
-                              self.time_step.dt, self.time_step.n)
+        for part, pw_material, pw_fused in self._planes():
+            for pw_obj in pw_material[Hx].itervalues():
+                pw_obj.update_all(part(self.hx), part(self.ez), part(self.ey), 
+                                  self.dy, self.dz, 
+                                  self.time_step.dt, self.time_step.n)
 
         for pw_obj in self.pw_source[Hx].itervalues():
             pw_obj.update_all(self.hx, self.ez, self.ey, self.dy, self.dz, 
                               self.time_step.dt, self.time_step.n)
 		
     def update_hy(self):
-        for pw_obj in self.pw_material[Hy].itervalues():
-            pw_obj.update_all(self.hy, self.ex, self.ez, self.dz, self.dx,
-                              self.time_step.dt, self.time_step.n)
+        for part, pw_material, pw_fused in self._planes():
+            for pw_obj in pw_material[Hy].itervalues():
+                pw_obj.update_all(part(self.hy), part(self.ex), part(self.ez), 
+                                  self.dz, self.dx, 
+                                  self.time_step.dt, self.time_step.n)
 
         for pw_obj in self.pw_source[Hy].itervalues():
             pw_obj.update_all(self.hy, self.ex, self.ez, self.dz, self.dx,
                               self.time_step.dt, self.time_step.n)
 		
     def update_hz(self):
-        for pw_obj in self.pw_material[Hz].itervalues():
-            pw_obj.update_all(self.hz, self.ey, self.ex, self.dx, self.dy, 
-                              self.time_step.dt, self.time_step.n)
+        for part, pw_material, pw_fused in self._planes():
+            for pw_obj in pw_material[Hz].itervalues():
+                pw_obj.update_all(part(self.hz), part(self.ey), part(self.ex), 
+                                  self.dx, self.dy, 
+                                  self.time_step.dt, self.time_step.n)
 
         for pw_obj in self.pw_source[Hz].itervalues():
             pw_obj.update_all(self.hz, self.ey, self.ex, self.dx, self.dy, 
@@ -974,14 +1488,32 @@ class FDTD(object):
         self.space.cart_comm.sendrecv(self.hz[:, -1, :], dest, Hz.tag,
                                       None, src, Hz.tag)
         
+    def _update(self, field_compnt):
+        """Update the field components of a half step.
+
+        The components are independent of each other, so that they
+        are dispatched to the thread pool if the concurrent updates are
+        enabled.
+
+        """
+        if self._pool is None:
+            for comp in field_compnt:
+                self._updater[comp]()
+        else:
+            self._pool.map(lambda comp: self._updater[comp](), field_compnt)
+
     def step(self):
+        if not self._seeded:
+            self._seed_active()
+
         self.time_step.half_step_up()
 
         for comp in self.h_field_compnt:
             self._chatter[comp]()
             
-        for comp in self.e_field_compnt:
-            self._updater[comp]()
+        self._grow_active()
+        self.update_fused_e()
+        self._update(self.e_field_compnt)
 
         for probe in self.e_recorder:
             probe.write(self.time_step.n)
@@ -993,12 +1525,298 @@ class FDTD(object):
         for comp in self.e_field_compnt:
             self._chatter[comp]()
         
-        for comp in self.h_field_compnt:
-            self._updater[comp]()
+        self._grow_active()
+        self.update_fused_h()
+        self._update(self.h_field_compnt)
 
         for probe in self.h_recorder:
             probe.write(self.time_step.n)
 
+    def _native(self):
+        """Return whether the compiled driver can advance this FDTD.
+
+        The driver runs the compiled pointwise objects, the kernels of
+        the pointwise sources, the 1-D FDTDs of the incident waves, and
+        the periodic boundaries of a single process. The Python 
+        pointwise sources, the other auxiliary FDTDs, the MPI exchanges,
+        the concurrent updates, and the planar storage need step().
+
+        """
+        if self._pool is not None or self.space.cart_comm.Get_size() != 1:
+            return False
+
+        if self.planar:
+            return False
+
+        for so in self.src_list:
+            if hasattr(so, 'aux_fdtd'):
+                if not hasattr(so.aux_fdtd, 'engine'):
+                    return False
+                if so.aux_fdtd.ex.dtype != self.ex.dtype:
+                    return False
+
+        compiled = (PwMaterialReal, PwMaterialCmplx, 
+                    PwMaterialRealSingle, PwMaterialCmplxSingle)
+        for comp in self.pw_source:
+            dtype = self.field[comp].dtype
+            for pw_obj in self.pw_source[comp].itervalues():
+                if isinstance(pw_obj, compiled):
+                    continue
+                if not (hasattr(pw_obj, 'compiled') and 
+                        pw_obj.compiled(dtype)):
+                    return False
+
+        return True
+
+    def _halo(self, comp):
+        """Return the exchanges of comp done by talk_with_*_neighbors.
+
+        Each exchange is a tuple of the axis, the source and the
+        destination planes, and the phase shift. The electric 
+        components copy their first planes into the last ones, and the
+        magnetic components the other way around. It assumes a single
+        process.
+
+        """
+        idx2spc = {Ex: self.space.ex_index_to_space,
+                   Ey: self.space.ey_index_to_space,
+                   Ez: self.space.ez_index_to_space,
+                   Hx: self.space.hx_index_to_space,
+                   Hy: self.space.hy_index_to_space,
+                   Hz: self.space.hz_index_to_space}
+
+        if comp in (Ex, Ey, Ez):
+            disp, src_plane, dest_plane = -1, 0, -1
+        else:
+            disp, src_plane, dest_plane = 1, -1, 0
+
+        halo = []
+        for axis in _halo_axes[comp]:
+            src, dest = self.space.cart_comm.Shift(axis, disp)
+            if dest == -1 or src == -1:
+                break
+
+            if self.cmplx:
+                last = [0, 0, 0]
+                last[axis] = self.field[comp].shape[axis] - 1
+                if disp == -1:
+                    dest_idx, src_idx = last, (0, 0, 0)
+                else:
+                    dest_idx, src_idx = (0, 0, 0), last
+                dest_spc = idx2spc[comp](*dest_idx)[axis]
+                src_spc = idx2spc[comp](*src_idx)[axis]
+                phase_shift = cexp(1j * self.bloch[axis] * (dest_spc - src_spc))
+            else:
+                phase_shift = 1
+
+            halo.append((axis, src_plane, dest_plane, phase_shift))
+
+        return halo
+
+    def _seed_active(self):
+        """Start the tracking of the active region.
+
+        The region starts as the box of the cells where the fields are 
+        nonzero or the sources are attached. No tracking is done for 
+        more than one process, or for a source which does not list its
+        points.
+
+        """
+        self._seeded = True
+        if self.space.cart_comm.Get_size() != 1:
+            return
+
+        first = [inf] * 3
+        last = [-inf] * 3
+        for comp in self.e_field_compnt + self.h_field_compnt:
+            field = np.asarray(self.field[comp])
+            for axis in xrange(3):
+                others = tuple(a for a in xrange(3) if a != axis)
+                nonzero = np.flatnonzero(np.any(field != 0, axis=others))
+                if nonzero.size:
+                    first[axis] = min(first[axis], nonzero[0])
+                    last[axis] = max(last[axis], nonzero[-1])
+
+            for pw_obj in self.pw_source[comp].itervalues():
+                if not hasattr(pw_obj, 'idx_list'):
+                    return
+                for idx in pw_obj.idx_list():
+                    for axis in xrange(3):
+                        first[axis] = min(first[axis], idx[axis])
+                        last[axis] = max(last[axis], idx[axis])
+
+        if inf in first:
+            first, last = [1, 1, 1], [0, 0, 0]
+        self._active = [int(i) for i in first], [int(i) for i in last]
+
+        self._active_end = [max(f.shape[axis] 
+                                for f in self.field.itervalues()) - 1
+                            for axis in xrange(3)]
+        self._active_wrap = set()
+        for comp in self.e_field_compnt + self.h_field_compnt:
+            for axis, src, dest, phase_shift in self._halo(comp):
+                self._active_wrap.add(axis)
+
+    def _grow_active(self, half_steps=1):
+        """Grow the active region by the given half steps, and clip the
+        sweeps of the materials to it.
+
+        The tracking stops once the region covers the grid.
+
+        """
+        if self._active is None:
+            return
+
+        first, last = self._active
+        empty = any(first[axis] > last[axis] for axis in xrange(3))
+        full = True
+        for axis in xrange(3):
+            end = self._active_end[axis]
+            if not empty:
+                first[axis] = max(first[axis] - half_steps, 0)
+                last[axis] = min(last[axis] + half_steps, end)
+                if axis in self._active_wrap and \
+                        (first[axis] == 0 or last[axis] == end):
+                    first[axis], last[axis] = 0, end
+            full = full and first[axis] == 0 and last[axis] == end
+
+        if full:
+            self._active = None
+
+        for part, pw_material, pw_fused in self._planes():
+            for comp in self.e_field_compnt + self.h_field_compnt:
+                for pw_obj in pw_material[comp].itervalues():
+                    if full:
+                        pw_obj.clear_clip()
+                    else:
+                        pw_obj.set_clip(*(first + last))
+
+    def _get_driver(self, record_size):
+        """Return a compiled driver of this FDTD and the probe records.
+
+        The records of e_recorder come first, and then those of 
+        h_recorder.
+
+        """
+        driver = pw_type('Driver', self.cmplx, self.single)()
+        driver.set_ex(padded_storage(self.ex))
+        driver.set_ey(padded_storage(self.ey))
+        driver.set_ez(padded_storage(self.ez))
+        driver.set_hx(padded_storage(self.hx))
+        driver.set_hy(padded_storage(self.hy))
+        driver.set_hz(padded_storage(self.hz))
+        for comp in self.e_field_compnt + self.h_field_compnt:
+            driver.set_extent(_driver_compnt[comp], *self.field[comp].shape)
+        driver.set_differential(self.dx, self.dy, self.dz)
+        driver.set_time_step(self.time_step.dt, self.time_step.n)
+        driver.set_blocking(self.blocking, _blocking_tile)
+
+        for pw_obj in self.pw_fused[Electric] + self.pw_fused[Magnetic]:
+            driver.add_fused(pw_obj)
+
+        for comp in self.e_field_compnt + self.h_field_compnt:
+            for pw_obj in self.pw_material[comp].itervalues():
+                driver.add_update(_driver_compnt[comp], pw_obj)
+            for pw_obj in self.pw_source[comp].itervalues():
+                if hasattr(pw_obj, 'kernels'):
+                    dtype = self.field[comp].dtype
+                    for item in pw_obj.kernels(dtype):
+                        driver.add_update(_driver_compnt[comp], item[-1])
+                else:
+                    driver.add_update(_driver_compnt[comp], pw_obj)
+            for axis, src, dest, phase_shift in self._halo(comp):
+                driver.add_halo(_driver_compnt[comp], axis, src, dest, 
+                                phase_shift)
+
+        for so in self.src_list:
+            if hasattr(so, 'aux_fdtd'):
+                driver.add_incident(so.aux_fdtd.engine)
+
+        records = []
+        for probe in self.e_recorder + self.h_recorder:
+            comp = (c for c in self.field if self.field[c] is probe.field).next()
+            record = np.empty(record_size, probe.field.dtype)
+            driver.add_probe(_driver_compnt[comp], 
+                             probe.idx[0], probe.idx[1], probe.idx[2], record)
+            records.append(record)
+
+        return driver, records
+
+    def _load_waveform(self, n, steps):
+        """Tabulate the sources for the driver steps from n.
+
+        The electric components are updated at the half steps 
+        n + 0.5, n + 1.5, ..., and the magnetic components at n + 1, 
+        n + 2, ... The 1-D FDTDs of the incident waves count their own
+        steps.
+
+        """
+        for so in self.src_list:
+            if hasattr(so, 'aux_fdtd'):
+                so.aux_fdtd.load_waveform(steps)
+
+        for comps, n0 in ((self.e_field_compnt, n + 0.5), 
+                          (self.h_field_compnt, n + 1)):
+            for comp in comps:
+                for pw_obj in self.pw_source[comp].itervalues():
+                    if hasattr(pw_obj, 'load_waveform'):
+                        pw_obj.load_waveform(self.field[comp].dtype, 
+                                             self.time_step.dt, n0, steps)
+
+    def run(self, steps):
+        """Advance the given number of time steps.
+
+        If the compiled driver can advance this FDTD, the steps run 
+        without returning to Python, and the probes are written in
+        batches. Otherwise, step() is called repeatedly.
+
+        """
+        steps = int(steps)
+        if steps <= 0:
+            return
+
+        if not self._native():
+            for i in xrange(steps):
+                self.step()
+            return
+
+        if not self._seeded:
+            self._seed_active()
+
+        driver, records = self._get_driver(min(steps, _driver_chunk))
+        if self._active is not None:
+            driver.set_active(*(self._active[0] + self._active[1]))
+        e_records = records[:len(self.e_recorder)]
+        h_records = records[len(self.e_recorder):]
+
+        while steps > 0:
+            chunk = min(steps, _driver_chunk)
+            n = self.time_step.n
+
+            self._load_waveform(n, chunk)
+            driver.run(chunk)
+            self._grow_active(2 * chunk)
+            self.time_step.n = driver.get_n()
+            self.time_step.t = self.time_step.n * self.time_step.dt
+
+            for probe, record in zip(self.e_recorder, e_records):
+                for i in xrange(chunk):
+                    probe.write(n + i + 0.5, record[i])
+            for probe, record in zip(self.h_recorder, h_records):
+                for i in xrange(chunk):
+                    probe.write(n + i + 1, record[i])
+
+            steps -= chunk
+
+    def _steps_to_print(self, modulus):
+        """Return the number of steps until n is a multiple of modulus.
+        
+        """
+        if modulus == inf:
+            return inf
+        else:
+            return max(1, int(ceil(modulus - self.time_step.n % modulus)))
+
     def step_while_zero(self, component, point, modulus=inf):
         """Run self.step() while the field value at the given point is 0.
         
@@ -1036,13 +1854,15 @@ class FDTD(object):
             flag = self.space.cart_comm.bcast(flag, hot_node)
 
     def step_until_n(self, n=0, modulus=inf):
-        """Run self.step() until time step reaches n.
+        """Run the time steps until time step reaches n.
+
+        The steps between the prints of n and t are advanced by run().
 
         """
         st = datetime.now()
 
         if self.time_step.n < n:
-            self.step()
+            self.run(1)
             if self.time_step.n % modulus == 0:
                 print 'n:', self.time_step.n, 't:', self.time_step.t
                 
@@ -1051,7 +1871,8 @@ class FDTD(object):
             print 'Estimated time of completion:', timedelta(seconds=estimated_t)
         
         while self.time_step.n < n:
-            self.step()
+            steps = int(ceil(n - self.time_step.n))
+            self.run(min(steps, self._steps_to_print(modulus)))
             if self.time_step.n % modulus == 0:
                 print 'n:', self.time_step.n, 't:', self.time_step.t
 
@@ -1059,14 +1880,16 @@ class FDTD(object):
         print 'Elapsed time:', (et - st)
 
     def step_until_t(self, t=0, modulus=inf):
-        """Run self.step() until time reaches t.
+        """Run the time steps until time reaches t.
+
+        The steps between the prints of n and t are advanced by run().
 
         """
         st = datetime.now()
         sn = self.time_step.n
 
         if self.time_step.t < t:
-            self.step()
+            self.run(1)
             if self.time_step.n % modulus == 0:
                 print 'n:', self.time_step.n, 't:', self.time_step.t
 
@@ -1076,7 +1899,10 @@ class FDTD(object):
             print 'Estimated time of completion:', timedelta(seconds=estimated_t)
         
         while self.time_step.t < t:
-            self.step()
+            # One step less than the estimate for the rounding of t. 
+            # The remaining steps are taken one at a time.
+            steps = int(ceil((t - self.time_step.t) / self.time_step.dt)) - 1
+            self.run(min(max(steps, 1), self._steps_to_print(modulus)))
             if self.time_step.n % modulus == 0:
                 print 'n:', self.time_step.n, 't:', self.time_step.t
                 
@@ -58,8 +58,17 @@ class Probe(object):
         self.f.write('# location=' + str(p) + '\n')
         self.f.write('# dt=' + str(dt) + '\n')
 
-    def write(self, n):
-        self.f.write(str(n) + ' ' + str(self.field[self.idx]) + '\n')
+    def write(self, n, value=None):
+        """Write the field value at time-step n.
+
+        n: time-step. type: float
+        value: recorded field value. If None, the current value is 
+            written. (default None)
+
+        """
+        if value is None:
+            value = self.field[self.idx]
+        self.f.write(str(n) + ' ' + str(value) + '\n')
        
 def write_hdf5(data, name, low_index, high_index):
     h5file = openFile(name + '.h5', mode='w')
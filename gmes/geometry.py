@@ -16,6 +16,7 @@ from copy import deepcopy
 
 import numpy as np
 from numpy import empty, zeros, inf, dot, array
+from numpy.lib.stride_tricks import as_strided
 
 # GMES modules
 import constant as const
@@ -267,13 +268,30 @@ class Cartesian(object):
         
         return cpu_load + net_load
 
-    def _get_em_field_storage(self, shape, cmplx):
+    def _get_em_field_storage(self, shape, cmplx, single=False, 
+                              aligned=False):
+        """Return a zero array of shape. If aligned, the rows are padded
+        and start on 64-byte boundaries. See aligned_zeros.
+
+        """
         if cmplx:
-            return zeros(shape, complex)
+            if single:
+                dtype = np.complex64
+            else:
+                dtype = complex
         else:
-            return zeros(shape, np.double)
+            if single:
+                dtype = np.float32
+            else:
+                dtype = np.double
 
-    def get_ex_storage(self, field_compnt, cmplx=False):
+        if aligned:
+            return aligned_zeros(shape, dtype)
+        else:
+            return zeros(shape, dtype)
+
+    def get_ex_storage(self, field_compnt, cmplx=False, single=False,
+                       aligned=False):
         """Return an initialized array for Ex field component.
         
         """
@@ -283,9 +301,10 @@ class Cartesian(object):
         else:
             shape = (1, 1, 1)
         
-        return self._get_em_field_storage(shape, cmplx)
+        return self._get_em_field_storage(shape, cmplx, single, aligned)
         
-    def get_ey_storage(self, field_compnt, cmplx=False):
+    def get_ey_storage(self, field_compnt, cmplx=False, single=False,
+                       aligned=False):
         """Return an initialized array for Ey field component.
         
         """
@@ -295,9 +314,10 @@ class Cartesian(object):
         else:
             shape = (1, 1, 1)
         
-        return self._get_em_field_storage(shape, cmplx)
+        return self._get_em_field_storage(shape, cmplx, single, aligned)
 
-    def get_ez_storage(self, field_compnt, cmplx=False):
+    def get_ez_storage(self, field_compnt, cmplx=False, single=False,
+                       aligned=False):
         """Return an initialized array for Ez field component.
         
         """
@@ -307,9 +327,10 @@ class Cartesian(object):
         else:
             shape = (1, 1, 1)
 
-        return self._get_em_field_storage(shape, cmplx)
+        return self._get_em_field_storage(shape, cmplx, single, aligned)
         
-    def get_hx_storage(self, field_compnt, cmplx=False):
+    def get_hx_storage(self, field_compnt, cmplx=False, single=False,
+                       aligned=False):
         """Return an initialized array for Hx field component.
         
         """
@@ -319,9 +340,10 @@ class Cartesian(object):
         else:
             shape = (1, 1, 1)
 
-        return self._get_em_field_storage(shape, cmplx)
+        return self._get_em_field_storage(shape, cmplx, single, aligned)
         
-    def get_hy_storage(self, field_compnt, cmplx=False):  
+    def get_hy_storage(self, field_compnt, cmplx=False, single=False,
+                       aligned=False):  
         """Return an initialized array for Hy field component.
         
         """
@@ -331,9 +353,10 @@ class Cartesian(object):
         else:
             shape = (1, 1, 1)
         
-        return self._get_em_field_storage(shape, cmplx)
+        return self._get_em_field_storage(shape, cmplx, single, aligned)
         
-    def get_hz_storage(self, field_compnt, cmplx=False):
+    def get_hz_storage(self, field_compnt, cmplx=False, single=False,
+                       aligned=False):
         """Return an initialized array for Hz field component.
         
         """
@@ -343,7 +366,7 @@ class Cartesian(object):
         else:
             shape = (1, 1, 1)
         
-        return self._get_em_field_storage(shape, cmplx)
+        return self._get_em_field_storage(shape, cmplx, single, aligned)
 
     def ex_index_to_space(self, i, j, k):
         """Return space coordinate of the given index.
@@ -817,6 +840,47 @@ class Cartesian(object):
         print "number of participating nodes:", self.numprocs
 
 
+def aligned_zeros(shape, dtype, alignment=64):
+    """Return a zero array whose rows start on alignment-byte boundaries.
+
+    The last axis is padded to a multiple of alignment bytes, plus an
+    extra alignment when a row would span whole pages, and the array 
+    is the view of the first shape[-1] cells of each row. The compiled
+    kernels take padded_storage of it. A last axis of size 1 is not 
+    padded, since the kernels take such a size for an absent field.
+
+    """
+    dtype = np.dtype(dtype)
+    shape = tuple(shape)
+    row = shape[-1]
+    if row > 1:
+        step = max(alignment // dtype.itemsize, 1)
+        row = -(-row // step) * step
+        if row * dtype.itemsize % 4096 == 0:
+            row += step
+
+    padded_shape = shape[:-1] + (row,)
+    nbytes = int(np.prod(padded_shape)) * dtype.itemsize
+    buf = zeros(nbytes + alignment, np.uint8)
+    offset = -buf.ctypes.data % alignment
+    padded = buf[offset:offset + nbytes].view(dtype).reshape(padded_shape)
+    return padded[..., :shape[-1]]
+
+
+def padded_storage(field):
+    """Return the contiguous array behind a field of aligned_zeros.
+
+    The kernels index it with the padded size of the last axis, and
+    only touch the cells of the field. Other fields are returned as is.
+
+    """
+    if field.flags.c_contiguous:
+        return field
+    
+    padded_shape = field.shape[:-1] + (field.strides[-2] // field.itemsize,)
+    return as_strided(field, padded_shape, 
+                      field.strides[:-1] + (field.itemsize,))
+
 def in_range(idx, shape, component):
     """Perform bounds checking.
     
@@ -16,7 +16,43 @@ import numpy as np
 from numpy import inf
 
 # GMES modules
+from pw_material import pw_type
 import constant as const
+from geometry import padded_storage
+
+
+def _dtype(cmplx=False, single=False):
+    """Return the array type of the given field type."""
+    if cmplx:
+        return np.complex64 if single else complex
+    else:
+        return np.float32 if single else np.double
+
+
+def _parts(field):
+    """Return the arrays of field with the functions taking the 
+    corresponding parts of a value.
+
+    A planar field keeps the real and the imaginary parts in separate
+    arrays.
+
+    """
+    if isinstance(field, np.ndarray):
+        return ((field, lambda value: value),)
+    else:
+        return ((field.real, np.real), (field.imag, np.imag))
+
+
+def _incident(aux_fdtd, name):
+    """Return the field component name of aux_fdtd as an array.
+
+    The auxiliary FDTD of a Gaussian beam is ramped up by its envelope.
+
+    """
+    if hasattr(aux_fdtd, 'envelope'):
+        return aux_fdtd.envelope() * getattr(aux_fdtd.aux_fdtd, name)
+    else:
+        return np.asarray(getattr(aux_fdtd, name))
 
 
 class PwSourceParam(object):
@@ -42,6 +78,9 @@ class PwSource(object):
     def idx_size(self):
         return len(self._param)
 
+    def idx_list(self):
+        return self._param.keys()
+
     def update_all(self, inplace_field, in_field1, in_field2, d1, d2, dt, n):
         for idx, param in self._param.iteritems():
             self._update(inplace_field, in_field1, in_field2, d1, d2, dt, n,
@@ -65,61 +104,164 @@ class PointSourceParam(PwSourceParam):
             self.f = open(filename, 'w')
 
 
-class PointSourceElectric(PwSource):
-    def name(self):
-        return 'PointSourceElectric'
+class _CompiledSource(PwSource):
+    """Pointwise source updated by the compiled kernels of pw_material.
+
+    The kernels are built from the attached parameters at the first use
+    for each field type.
+
+    """
+    def __init__(self):
+        PwSource.__init__(self)
+        self._kernels = {}
+
+    def attach(self, idx, parameter):
+        PwSource.attach(self, idx, parameter)
+        self._kernels.clear()
+
+    def merge(self, ps):
+        PwSource.merge(self, ps)
+        self._kernels.clear()
+
+    def kernels(self, dtype):
+        """Return the compiled kernels for the fields of dtype."""
+        dtype = np.dtype(dtype)
+        if not self._kernels.has_key(dtype):
+            cmplx = dtype.kind == 'c'
+            single = dtype in (np.float32, np.complex64)
+            self._kernels[dtype] = self._get_kernels(cmplx, single)
+        return self._kernels[dtype]
+
+    def compiled(self, dtype):
+        """Return whether the kernels for dtype run without Python."""
+        return True
+
+    def _get_kernels(self, cmplx, single):
+        raise NotImplementedError
+
+
+class _PointSource(_CompiledSource):
+    """Point sources updated by the compiled kernels of pw_material.
+
+    The points are grouped by their time dependence, which is evaluated 
+    once per group and time step rather than once per point.
+
+    """
+    # Subclasses set the compiled class names, the field components of
+    # the hard and the current sources, and the medium attribute.
+    _kernel_name = None
+    _param_name = None
+    _hard = None
+    _current = None
+    _inf = None
+
+    def _get_kernels(self, cmplx, single):
+        """Return a tuple of the time dependence, the amplitude and the
+        file of the source recording, and the kernel for each group.
+
+        """
+        groups = {}
+        for idx, param in self._param.iteritems():
+            groups.setdefault((param.src_time, param.f), []).append((idx, param))
+
+        kernels = []
+        for (src_time, f), points in groups.iteritems():
+            kernel = pw_type(self._kernel_name, cmplx, single)()
+            for idx, param in points:
+                if issubclass(param.comp, self._hard):
+                    hard = True
+                elif issubclass(param.comp, self._current):
+                    hard = False
+                else:
+                    continue
+
+                pw_param = pw_type(self._param_name, cmplx, single)()
+                setattr(pw_param, self._inf, getattr(param, self._inf))
+                pw_param.amp = param.amp
+                pw_param.hard = hard
+                kernel.attach(idx, pw_param)
+
+            # A recorded source is a single point.
+            kernels.append((src_time, points[0][1].amp, f, kernel))
+
+        return kernels
+
+    def load_waveform(self, dtype, dt, n0, size):
+        """Tabulate the time dependence for the compiled driver.
+
+        The kernels for the fields of dtype get the samples at the 
+        half steps n0, n0 + 1, ..., n0 + size - 1.
 
-    def _update(self, e, h1, h2, dr1, dr2, dt, n, idx, param):
         """
-        This _update should be called after that the pw_material._update 
-        is called.
+        for src_time, amp, f, kernel in self.kernels(dtype):
+            waveform = np.array([src_time.oscillator(dt * (n0 + i)) 
+                                 for i in xrange(size)], dtype)
+            if f:
+                for i in xrange(size):
+                    f.write('%f\t%f\n' % (dt * (n0 + i), amp * waveform[i]))
+            kernel.set_waveform(waveform, n0)
 
+    def update_all(self, inplace_field, in_field1, in_field2, d1, d2, dt, n):
         """
-        src_t = param.amp * param.src_time.oscillator(dt * n)
-        if param.f:
-            param.f.write('%f\t%f\n' % (dt * n, src_t))
+        This update_all should be called after that the 
+        pw_material.update_all is called.
+
+        """
+        parts = _parts(inplace_field)
+        for src_time, amp, f, kernel in self.kernels(parts[0][0].dtype):
+            value = src_time.oscillator(dt * n)
+            if f:
+                f.write('%f\t%f\n' % (dt * n, amp * value))
+
+            for field, part in parts:
+                field = padded_storage(field)
+                kernel.set_waveform(np.array([part(value)], field.dtype), n)
+                # The kernel reads no other field.
+                kernel.update_all(field, field, field, d1, d2, dt, n)
+
+
+class PointSourceElectric(_PointSource):
+    _param_name = 'PointSourceElectricParam'
+    _hard = const.Electric
+    _current = const.ElectricCurrent
+    _inf = 'eps_inf'
+
+    def name(self):
+        return 'PointSourceElectric'
 
-        if issubclass(param.comp, const.Electric):
-            e[idx] = src_t
-        elif issubclass(param.comp, const.ElectricCurrent):
-            e[idx] -= dt * src_t / param.eps_inf
 
+class PointSourceEx(PointSourceElectric):
+    _kernel_name = 'PointSourceEx'
 
-class PointSourceEx(PointSourceElectric): pass
 
+class PointSourceEy(PointSourceElectric):
+    _kernel_name = 'PointSourceEy'
 
-class PointSourceEy(PointSourceElectric): pass
 
+class PointSourceEz(PointSourceElectric):
+    _kernel_name = 'PointSourceEz'
 
-class PointSourceEz(PointSourceElectric): pass
 
+class PointSourceMagnetic(_PointSource):
+    _param_name = 'PointSourceMagneticParam'
+    _hard = const.Magnetic
+    _current = const.MagneticCurrent
+    _inf = 'mu_inf'
 
-class PointSourceMagnetic(PwSource):
     def name(self):
         return 'PointSourceMagnetic'
 
-    def _update(self, h, e1, e2, dr1, dr2, dt, n, idx, param):
-        """
-        This _update should be called after that the pw_material._update 
-        is called.
 
-        """
-        src_t = param.amp * param.src_time.oscillator(dt * n)
-        if param.f:
-            param.f.write('%f\t%f\n' % (dt * n, src_t))
-
-        if issubclass(param.comp, const.Magnetic):
-            h[idx] = src_t
-        elif issubclass(param.comp, const.MagneticCurrent):
-            h[idx] -= dt * src_t / param.mu_inf
-        
-class PointSourceHx(PointSourceMagnetic): pass
+class PointSourceHx(PointSourceMagnetic):
+    _kernel_name = 'PointSourceHx'
 
 
-class PointSourceHy(PointSourceMagnetic): pass
+class PointSourceHy(PointSourceMagnetic):
+    _kernel_name = 'PointSourceHy'
 
 
-class PointSourceHz(PointSourceMagnetic): pass
+class PointSourceHz(PointSourceMagnetic):
+    _kernel_name = 'PointSourceHz'
 
 
 class TransparentParam(PwSourceParam):
@@ -160,234 +302,140 @@ class TransparentMagneticParam(TransparentParam):
         self.r0 = {directional: 1 - r1_value}
 
 
-class TransparentElectric(PwSource):
-    def name(self):
-        return 'TransparentElectric'
+class _Transparent(_CompiledSource):
+    """Total-field/scattered-field interfaces updated by the compiled 
+    kernels of pw_material.
 
+    The points are grouped by the auxiliary FDTD and the face. The 
+    kernels read the field of the auxiliary FDTD in place if it is an 
+    array of their type, and otherwise a copy made once per group and 
+    update.
 
-class TransparentEx(TransparentElectric):
-    def __init__(self):
-        PwSource.__init__(self)
-        self._consist_cond = {const.MinusY: self._consistency_minus_y,
-                              const.MinusZ: self._consistency_minus_z,
-                              const.PlusY: self._consistency_plus_y,
-                              const.PlusZ: self._consistency_plus_z}
-        
-    def _update(self, ex, hz, hy, dy, dz, dt, n, idx, param):
-        for face in param.face_list:
-            self._consist_cond[face](ex, hz, hy, dy, dz, dt, face, 
-                                     idx, param)
-        
-    def _consistency_minus_y(self, ex, hz, hy, dy, dz, dt, face, idx, param):
-        incident_hz = (param.r0[face] * param.aux_fdtd.hy[param.samp_idx0[face]] +
-                       param.r1[face] * param.aux_fdtd.hy[param.samp_idx1[face]])
-        
-        ex[idx] -= dt / (param.eps_inf * dy) * param.amp[face] * incident_hz
+    """
+    # Subclasses set the compiled class names, the medium attribute, 
+    # the component of the auxiliary FDTD, and, for each face, whether
+    # the condition is divided by d1 (0) or d2 (1) and its sign.
+    _kernel_name = None
+    _param_name = None
+    _inf = None
+    _incident_name = None
+    _face_sign = None
 
-    def _consistency_plus_y(self, ex, hz, hy, dy, dz, dt, face, idx, param):
-        incident_hz = (param.r0[face] * param.aux_fdtd.hy[param.samp_idx0[face]] + 
-                       param.r1[face] * param.aux_fdtd.hy[param.samp_idx1[face]])
-        
-        ex[idx] += dt / (param.eps_inf * dy) * param.amp[face] * incident_hz
-    
-    def _consistency_minus_z(self, ex, hz, hy, dy, dz, dt, face, idx, param):
-        incident_hy = (param.r0[face] * param.aux_fdtd.hy[param.samp_idx0[face]] + 
-                       param.r1[face] * param.aux_fdtd.hy[param.samp_idx1[face]])
-        
-        ex[idx] += dt / (param.eps_inf * dz) * param.amp[face] * incident_hy
+    def _get_kernels(self, cmplx, single):
+        """Return a tuple of the auxiliary FDTD, the linked field or None, 
+        and the kernel for each group.
 
-    def _consistency_plus_z(self, ex, hz, hy, dy, dz, dt, face, idx, param):
-        incident_hy = (param.r0[face] * param.aux_fdtd.hy[param.samp_idx0[face]] +
-                       param.r1[face] * param.aux_fdtd.hy[param.samp_idx1[face]])
-        
-        ex[idx] -= dt / (param.eps_inf * dz) * param.amp[face] * incident_hy
-        
-        
-class TransparentEy(TransparentElectric):
-    def __init__(self):
-        PwSource.__init__(self)
-        self._consist_cond = {const.MinusZ: self._consistency_minus_z,
-                              const.MinusX: self._consistency_minus_x,
-                              const.PlusZ: self._consistency_plus_z,
-                              const.PlusX: self._consistency_plus_x}
-    
-    def _update(self, ey, hx, hz, dz, dx, dt, n, idx, param):
-        for face in param.face_list:
-            self._consist_cond[face](ey, hx, hz, dz, dx, dt, face, idx, param)
-        
-    def _consistency_minus_z(self, ey, hx, hz, dz, dx, dt, face, idx, param):
-        incident_hx = (param.r0[face] * param.aux_fdtd.hy[param.samp_idx0[face]] + 
-                       param.r1[face] * param.aux_fdtd.hy[param.samp_idx1[face]])
-        
-        ey[idx] -= dt / (param.eps_inf * dz) * param.amp[face] * incident_hx
+        """
+        groups = {}
+        for idx, param in self._param.iteritems():
+            for face in param.face_list:
+                groups.setdefault((param.aux_fdtd, face), []).append((idx, param))
 
-    def _consistency_minus_x(self, ey, hx, hz, dz, dx, dt, face, idx, param):
-        incident_hz = (param.r0[face] * param.aux_fdtd.hy[param.samp_idx0[face]] + 
-                       param.r1[face] * param.aux_fdtd.hy[param.samp_idx1[face]])
-        
-        ey[idx] += dt / (param.eps_inf * dx) * param.amp[face] * incident_hz
-    
-    def _consistency_plus_z(self, ey, hx, hz, dz, dx, dt, face, idx, param):
-        incident_hx = (param.r0[face] * param.aux_fdtd.hy[param.samp_idx0[face]] + 
-                       param.r1[face] * param.aux_fdtd.hy[param.samp_idx1[face]])
-        
-        ey[idx] += dt / (param.eps_inf * dz) * param.amp[face] * incident_hx
+        kernels = []
+        for (aux_fdtd, face), points in groups.iteritems():
+            shape = _incident(aux_fdtd, self._incident_name).shape
+            axis, sign = self._face_sign[face]
 
-    def _consistency_plus_x(self, ey, hx, hz, dz, dx, dt, face, idx, param):
-        incident_hz = (param.r0[face] * param.aux_fdtd.hy[param.samp_idx0[face]] + 
-                       param.r1[face] * param.aux_fdtd.hy[param.samp_idx1[face]])
-        
-        ey[idx] -= dt / (param.eps_inf * dx) * param.amp[face] * incident_hz
-        
+            kernel = pw_type(self._kernel_name, cmplx, single)()
+            for idx, param in points:
+                pw_param = pw_type(self._param_name, cmplx, single)()
+                inf = getattr(param, self._inf)
+                setattr(pw_param, self._inf, inf)
 
-class TransparentEz(TransparentElectric):
-    def __init__(self):
-        PwSource.__init__(self)
-        self._consist_cond = {const.MinusX: self._consistency_minus_x,
-                              const.MinusY: self._consistency_minus_y,
-                              const.PlusX: self._consistency_plus_x,
-                              const.PlusY: self._consistency_plus_y}
-        
-    def _update(self, ez, hy, hx, dx, dy, dt, n, idx, param):
-        for face in param.face_list:
-            self._consist_cond[face](ez, hy, hx, dx, dy, dt, face, idx, param)
+                coef = sign * param.amp[face] / inf
+                pw_param.coef1, pw_param.coef2 = (coef, 0) if axis == 0 else (0, coef)
 
-    def _consistency_minus_x(self, ez, hy, hx, dx, dy, dt, face, idx, param):
-        incident_hy = (param.r0[face] * param.aux_fdtd.hy[param.samp_idx0[face]] + 
-                       param.r1[face] * param.aux_fdtd.hy[param.samp_idx1[face]])
-        
-        ez[idx] -= dt / (param.eps_inf * dx) * param.amp[face] * incident_hy
+                samp_idx0 = tuple(int(i) for i in param.samp_idx0[face])
+                samp_idx1 = tuple(int(i) for i in param.samp_idx1[face])
+                pw_param.samp0 = int(np.ravel_multi_index(samp_idx0, shape))
+                pw_param.samp1 = int(np.ravel_multi_index(samp_idx1, shape))
+                pw_param.r0 = param.r0[face]
+                pw_param.r1 = param.r1[face]
 
-    def _consistency_minus_y(self, ez, hy, hx, dx, dy, dt, face, idx, param):
-        incident_hx = (param.r0[face] * param.aux_fdtd.hy[param.samp_idx0[face]] + 
-                       param.r1[face] * param.aux_fdtd.hy[param.samp_idx1[face]])
-        
-        ez[idx] += dt / (param.eps_inf * dy) * param.amp[face] * incident_hx
+                kernel.attach(idx, pw_param)
 
-    def _consistency_plus_x(self, ez, hy, hx, dx, dy, dt, face, idx, param):
-        incident_hy = (param.r0[face] * param.aux_fdtd.hy[param.samp_idx0[face]] + 
-                       param.r1[face] * param.aux_fdtd.hy[param.samp_idx1[face]])
-        
-        ez[idx] += dt / (param.eps_inf * dx) * param.amp[face] * incident_hy
+            link = getattr(aux_fdtd, self._incident_name)
+            if (isinstance(link, np.ndarray) and link.flags.c_contiguous and
+                link.dtype == np.dtype(_dtype(cmplx, single))):
+                link = link.ravel()
+                kernel.link_incident(link)
+            else:
+                link = None
 
-    def _consistency_plus_y(self, ez, hy, hx, dx, dy, dt, face, idx, param):
-        incident_hx = (param.r0[face] * param.aux_fdtd.hy[param.samp_idx0[face]] + 
-                       param.r1[face] * param.aux_fdtd.hy[param.samp_idx1[face]])
-        
-        ez[idx] -= dt / (param.eps_inf * dy) * param.amp[face] * incident_hx
+            kernels.append((aux_fdtd, link, kernel))
+
+        return kernels
+
+    def compiled(self, dtype):
+        """Return whether the kernels for dtype run without Python."""
+        return all(link is not None for aux_fdtd, link, kernel 
+                   in self.kernels(dtype))
+
+    def update_all(self, inplace_field, in_field1, in_field2, d1, d2, dt, n):
+        parts = _parts(inplace_field)
+        for aux_fdtd, link, kernel in self.kernels(parts[0][0].dtype):
+            # The parts of a planar field take the parts of a copy.
+            copy = link is None or len(parts) > 1
+            if copy:
+                incident = _incident(aux_fdtd, self._incident_name).ravel()
+
+            for field, part in parts:
+                field = padded_storage(field)
+                if copy:
+                    kernel.set_incident(np.asarray(part(incident), field.dtype))
+                # The kernel reads no other field.
+                kernel.update_all(field, field, field, d1, d2, dt, n)
+
+
+class TransparentElectric(_Transparent):
+    _param_name = 'TransparentElectricParam'
+    _inf = 'eps_inf'
+    _incident_name = 'hy'
 
-        
-class TransparentMagnetic(PwSource):
     def name(self):
-        return 'TransparentMagnetic'
+        return 'TransparentElectric'
 
 
-class TransparentHx(TransparentMagnetic):    
-    def __init__(self):
-        PwSource.__init__(self)
-        self._consist_cond = {const.MinusY: self._consistency_minus_y,
-                              const.MinusZ: self._consistency_minus_z,
-                              const.PlusY: self._consistency_plus_y,
-                              const.PlusZ: self._consistency_plus_z}
-    
-    def _update(self, hx, ez, ey, dy, dz, dt, n, idx, param):
-        for face in param.face_list:
-            self._consist_cond[face](hx, ez, ey, dy, dz, dt, face, idx, param)
-        
-    def _consistency_minus_y(self, hx, ez, ey, dy, dz, dt, face, idx, param):
-        incident_ez = (param.r0[face] * param.aux_fdtd.ex[param.samp_idx0[face]] +
-                       param.r1[face] * param.aux_fdtd.ex[param.samp_idx1[face]])
+class TransparentEx(TransparentElectric):
+    _kernel_name = 'TransparentEx'
+    _face_sign = {const.MinusY: (0, -1), const.PlusY: (0, 1),
+                  const.MinusZ: (1, 1), const.PlusZ: (1, -1)}
 
-        hx[idx] += dt / (param.mu_inf * dy) * param.amp[face] * incident_ez
 
-    def _consistency_plus_y(self, hx, ez, ey, dy, dz, dt, face, idx, param):
-        incident_ez = (param.r0[face] * param.aux_fdtd.ex[param.samp_idx0[face]] + 
-                       param.r1[face] * param.aux_fdtd.ex[param.samp_idx1[face]])
+class TransparentEy(TransparentElectric):
+    _kernel_name = 'TransparentEy'
+    _face_sign = {const.MinusZ: (0, -1), const.PlusZ: (0, 1),
+                  const.MinusX: (1, 1), const.PlusX: (1, -1)}
 
-        hx[idx] -= dt / (param.mu_inf * dy) * param.amp[face] * incident_ez
 
-    def _consistency_minus_z(self, hx, ez, ey, dy, dz, dt, face, idx, param):
-        incident_ey = (param.r0[face] * param.aux_fdtd.ex[param.samp_idx0[face]] + 
-                       param.r1[face] * param.aux_fdtd.ex[param.samp_idx1[face]])
-        
-        hx[idx] -= dt / (param.mu_inf * dz) * param.amp[face] * incident_ey
+class TransparentEz(TransparentElectric):
+    _kernel_name = 'TransparentEz'
+    _face_sign = {const.MinusX: (0, -1), const.PlusX: (0, 1),
+                  const.MinusY: (1, 1), const.PlusY: (1, -1)}
 
-    def _consistency_plus_z(self, hx, ez, ey, dy, dz, dt, face, idx, param):
-        incident_ey = (param.r0[face] * param.aux_fdtd.ex[param.samp_idx0[face]] +
-                       param.r1[face] * param.aux_fdtd.ex[param.samp_idx1[face]])
-        
-        hx[idx] += dt / (param.mu_inf * dz) * param.amp[face] * incident_ey
-        
 
-class TransparentHy(TransparentMagnetic):
-    def __init__(self):
-        PwSource.__init__(self)
-        self._consist_cond = {const.MinusZ: self._consistency_minus_z,
-                              const.MinusX: self._consistency_minus_x,
-                              const.PlusZ: self._consistency_plus_z,
-                              const.PlusX: self._consistency_plus_x}
-    
-    def _update(self, hy, ex, ez, dz, dx, dt, n, idx, param):
-        for face in param.face_list:
-            self._consist_cond[face](hy, ex, ez, dz, dx, dt, face, idx, param)
-        
-    def _consistency_minus_z(self, hy, ex, ez, dz, dx, dt, face, idx, param):
-        incident_ex = (param.r0[face] * param.aux_fdtd.ex[param.samp_idx0[face]] + 
-                       param.r1[face] * param.aux_fdtd.ex[param.samp_idx1[face]])
-        
-        hy[idx] += dt / (param.mu_inf * dz) * param.amp[face] * incident_ex
+class TransparentMagnetic(_Transparent):
+    _param_name = 'TransparentMagneticParam'
+    _inf = 'mu_inf'
+    _incident_name = 'ex'
 
-    def _consistency_minus_x(self, hy, ex, ez, dz, dx, dt, face, idx, param):
-        incident_ez = (param.r0[face] * param.aux_fdtd.ex[param.samp_idx0[face]] + 
-                       param.r1[face] * param.aux_fdtd.ex[param.samp_idx1[face]])
-        
-        hy[idx] -= dt / (param.mu_inf * dx) * param.amp[face] * incident_ez
-    
-    def _consistency_plus_z(self, hy, ex, ez, dz, dx, dt, face, idx, param):
-        incident_ex = (param.r0[face] * param.aux_fdtd.ex[param.samp_idx0[face]] + 
-                       param.r1[face] * param.aux_fdtd.ex[param.samp_idx1[face]])
-        
-        hy[idx] -= dt / (param.mu_inf * dz) * param.amp[face] * incident_ex
+    def name(self):
+        return 'TransparentMagnetic'
 
-    def _consistency_plus_x(self, hy, ex, ez, dz, dx, dt, face, idx, param):
-        incident_ez = (param.r0[face] * param.aux_fdtd.ex[param.samp_idx0[face]] + 
-                       param.r1[face] * param.aux_fdtd.ex[param.samp_idx1[face]])
-        
-        hy[idx] += dt / (param.mu_inf * dx) * param.amp[face] * incident_ez
-        
 
-class TransparentHz(TransparentMagnetic):
-    def __init__(self):
-        PwSource.__init__(self)
-        self._consist_cond = {const.MinusX: self._consistency_minus_x,
-                              const.MinusY: self._consistency_minus_y,
-                              const.PlusX: self._consistency_plus_x,
-                              const.PlusY: self._consistency_plus_y}
-    
-    def _update(self, hz, ey, ex, dx, dy, dt, n, idx, param):
-        for face in param.face_list:
-            self._consist_cond[face](hz, ey, ex, dx, dy, dt, face, idx, param)
-        
-    def _consistency_minus_x(self, hz, ey, ex, dx, dy, dt, face, idx, param):
-        incident_ey = (param.r0[face] * param.aux_fdtd.ex[param.samp_idx0[face]] + 
-                       param.r1[face] * param.aux_fdtd.ex[param.samp_idx1[face]])
-    
-        hz[idx] += dt / (param.mu_inf * dx) * param.amp[face] * incident_ey
-
-    def _consistency_minus_y(self, hz, ey, ex, dx, dy, dt, face, idx, param):
-        incident_ex = (param.r0[face] * param.aux_fdtd.ex[param.samp_idx0[face]] + 
-                       param.r1[face] * param.aux_fdtd.ex[param.samp_idx1[face]])
-        
-        hz[idx] -= dt / (param.mu_inf * dy) * param.amp[face] * incident_ex
-    
-    def _consistency_plus_x(self, hz, ey, ex, dx, dy, dt, face, idx, param):
-        incident_ey = (param.r0[face] * param.aux_fdtd.ex[param.samp_idx0[face]] + 
-                       param.r1[face] * param.aux_fdtd.ex[param.samp_idx1[face]])
-        
-        hz[idx] -= dt / (param.mu_inf * dx) * param.amp[face] * incident_ey
+class TransparentHx(TransparentMagnetic):
+    _kernel_name = 'TransparentHx'
+    _face_sign = {const.MinusY: (0, 1), const.PlusY: (0, -1),
+                  const.MinusZ: (1, -1), const.PlusZ: (1, 1)}
 
-    def _consistency_plus_y(self, hz, ey, ex, dx, dy, dt, face, idx, param):
-        incident_ex = (param.r0[face] * param.aux_fdtd.ex[param.samp_idx0[face]] + 
-                       param.r1[face] * param.aux_fdtd.ex[param.samp_idx1[face]])
-        
-        hz[idx] += dt / (param.mu_inf * dy) * param.amp[face] * incident_ex
+
+class TransparentHy(TransparentMagnetic):
+    _kernel_name = 'TransparentHy'
+    _face_sign = {const.MinusZ: (0, 1), const.PlusZ: (0, -1),
+                  const.MinusX: (1, -1), const.PlusX: (1, 1)}
+
+
+class TransparentHz(TransparentMagnetic):
+    _kernel_name = 'TransparentHz'
+    _face_sign = {const.MinusX: (0, 1), const.PlusX: (0, -1),
+                  const.MinusY: (1, -1), const.PlusY: (1, 1)}
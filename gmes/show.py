@@ -16,7 +16,7 @@ except ImportError:
     stderr.write('No module named threading. Using dummy_threading instead.\n')
     from dummy_threading import Thread
 
-from numpy import array, empty, arange, ndindex, linspace
+from numpy import array, empty, arange, linspace
 import numpy as np
 
 from sys import modules
@@ -419,27 +419,22 @@ class Snapshot(Thread):
                          if i != axis_int]
         self.data = empty(data_shape_2d, np.double)
 
-        for idx in ndindex(*data_shape_2d):
-            mat_idx = empty(3, np.double)
-            
-            if axis_int == 0:
-                mat_idx[1] = idx[0] + start_bndry_idx[1]
-                mat_idx[2] = idx[1] + start_bndry_idx[2]
-            elif axis_int == 1:
-                mat_idx[0] = idx[0] + start_bndry_idx[0]
-                mat_idx[2] = idx[1] + start_bndry_idx[2]
-            elif axis_int == 2:
-                mat_idx[0] = idx[0] + start_bndry_idx[0]
-                mat_idx[1] = idx[1] + start_bndry_idx[1]
-            
-            mat_idx[axis_int] = cut_idx[axis_int]
-            for pw_mat in material.itervalues():
-                if issubclass(comp, Electric):
-                    value = pw_mat.get_eps_inf(tuple(mat_idx))
-                elif issubclass(comp, Magnetic): 
-                    value = pw_mat.get_mu_inf(tuple(mat_idx))
-                if value != 0:
-                    self.data[idx] = value
+        # Look up all the indices of the cut at once.
+        mat_idx = empty(data_shape_2d + [3], np.intc)
+        in_plane = [i for i in xrange(3) if i != axis_int]
+        row, col = np.ix_(arange(data_shape_2d[0]), arange(data_shape_2d[1]))
+        mat_idx[..., in_plane[0]] = row + start_bndry_idx[in_plane[0]]
+        mat_idx[..., in_plane[1]] = col + start_bndry_idx[in_plane[1]]
+        mat_idx[..., axis_int] = cut_idx[axis_int]
+        mat_idx = mat_idx.reshape((-1, 3))
+
+        for pw_mat in material.itervalues():
+            if issubclass(comp, Electric):
+                value = pw_mat.get_eps_inf_array(mat_idx, len(mat_idx))
+            elif issubclass(comp, Magnetic):
+                value = pw_mat.get_mu_inf_array(mat_idx, len(mat_idx))
+            value = value.reshape(data_shape_2d)
+            self.data[value != 0] = value[value != 0]
 
         self.window_title = 'GMES' + ' ' + str(fdtd.space.cart_comm.topo[2])
 
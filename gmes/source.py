@@ -11,7 +11,7 @@ except ImportError:
     pass
     
 from copy import deepcopy
-from math import sqrt, pi, sin, cos, exp
+from math import sqrt, pi, sin, cos, exp, ceil
 from cmath import exp as cexp
 
 import numpy as np
@@ -19,10 +19,10 @@ from numpy import inf, cross, dot, ndindex
 from numpy.linalg import norm
 from scipy.optimize import bisect
 
+import pw_material
 import constant as const
-from geometry import Cartesian, DefaultMedium, Shell, in_range
-from fdtd import TEMzFDTD
-from material import Dielectric, Cpml
+from geometry import DefaultMedium, in_range
+from material import Dielectric
 
 # for a point source
 from pw_source import PointSourceParam
@@ -60,7 +60,7 @@ class Src(object):
     def display_info(self, indent=0):
         raise NotImplementedError
     
-    def init(self, geom_tree, space, cmplx):
+    def init(self, geom_tree, space, cmplx, single=False):
         raise NotImplementedError
 
     def step(self):
@@ -226,7 +226,7 @@ class PointSource(Src):
         else:
             self.filename = None
         
-    def init(self, geom_tree, space, cmplx):
+    def init(self, geom_tree, space, cmplx, single=False):
         self.geom_tree = geom_tree
         self.src_time.init(cmplx)
         
@@ -355,7 +355,8 @@ class TotalFieldScatteredField(Src):
     """Set a total and scattered field zone to launch a plane wave.
     
     """
-    def __init__(self, src_time, center, size, direction, polarization, amp=1):
+    def __init__(self, src_time, center, size, direction, polarization, amp=1,
+                 analytic=False):
         """Constructor
         
         Arguments:
@@ -372,6 +373,11 @@ class TotalFieldScatteredField(Src):
            type: a tuple with three real numbers.
         amp -- amplitude of the plane wave. The default is 1.
            type: a real number
+        analytic -- evaluate the incident wave from the source waveform
+                    at the numerical phase velocity of the center 
+                    frequency instead of a 1-D FDTD. The background 
+                    should be a Dielectric. The default is False.
+           type: bool
 
         """
         if isinstance(src_time, SrcTime):
@@ -392,14 +398,15 @@ class TotalFieldScatteredField(Src):
         # maximum amplitude of stimulus
         self.amp = float(amp)
         
+        self.analytic = bool(analytic)
+        
         self.on_axis_k = self._axis_in_k()
         
-    def init(self, geom_tree, space, cmplx):
+    def init(self, geom_tree, space, cmplx, single=False):
         self.geom_tree = geom_tree
         self.src_time.init(cmplx)
         
-        self.aux_fdtd = self._get_aux_fdtd(space, geom_tree, cmplx)
-        self.aux_fdtd.init()
+        self.aux_fdtd = self._get_aux_fdtd(space, geom_tree, cmplx, single)
 
     def step(self):
         self.aux_fdtd.step()
@@ -411,6 +418,7 @@ class TotalFieldScatteredField(Src):
         print " " * indent, "source plane size:", self.size 
         print " " * indent, "polarization direction:", self.e_direction
         print " " * indent, "amplitude:", self.amp
+        print " " * indent, "analytic incident wave:", self.analytic
         
         self.src_time.display_info(4)
         
@@ -527,14 +535,21 @@ class TotalFieldScatteredField(Src):
             rhs = sin(0.5 * k * zeta * ds) / ds
         return lhs - rhs
 
-    def _get_aux_fdtd(self, space, geom_tree, cmplx):
-        """Returns a TEMz FDTD for a reference of a plane wave.
+    def _get_aux_fdtd(self, space, geom_tree, cmplx, single=False):
+        """Returns a 1-D FDTD for a reference of a plane wave.
         
         The space-cell size of the aux_fdtd is calculated using the matched
         numerical dispersion technique. This method assumes that dx=dy=dz.
 
+        For the analytic incident wave, the 1-D FDTD is replaced by a
+        delay line at the numerical phase velocity. Since the velocity 
+        is that of the center frequency, broadband pulses disperse 
+        slightly differently from the main grid.
+
         """
         default_medium = geom_tree.object_of_point((inf, inf, inf))[0]
+        if self.analytic and type(default_medium.material) is not Dielectric:
+            raise ValueError, 'analytic incident wave needs a Dielectric background.'
         eps_inf = default_medium.material.eps_inf
         mu_inf = default_medium.material.mu_inf
         v = 1 / sqrt(eps_inf * mu_inf)
@@ -549,8 +564,6 @@ class TotalFieldScatteredField(Src):
         delta_1d = bisect(self._1d_dispersion_relation, 0, 2 * max(ds),
                           (zeta, v, omega, dt, wave_number))
         
-        pml_thickness = 50 * delta_1d
-        
         # Find the furthest distance, max_dist from the longitudinal
         # axis of the incomming wave
         #
@@ -565,30 +578,14 @@ class TotalFieldScatteredField(Src):
         dist = map(abs, map(self._metric_from_center_along_beam_axis, vertices))
         max_dist = max(dist)
 
-        longitudinal_size = 2 * (max_dist + pml_thickness + 2 * delta_1d)
-        aux_size = (0, 0, longitudinal_size)
-        
-        mat_objs =  self.geom_tree.material_of_point((inf, inf, inf))[0]
-        
-        aux_space = Cartesian(size=aux_size,
-                              resolution=1/delta_1d,
-                              parallel=False)
-        aux_geom_list = (DefaultMedium(material=mat_objs),
-                         Shell(material=Cpml(),
-                               thickness=pml_thickness))
-        src_pnt = (0, 0, -max_dist - delta_1d)
-        aux_src_list = (PointSource(src_time=deepcopy(self.src_time),
-                                    component=const.Ex,
-                                    center=src_pnt),)
-        
-        if cmplx:
-            aux_fdtd = TEMzFDTD(aux_space, aux_geom_list, aux_src_list,
-                                dt=space.dt, bloch=(0,0,0), verbose=False)
+        if self.analytic:
+            phase_velocity = v / zeta
         else:
-            aux_fdtd = TEMzFDTD(aux_space, aux_geom_list, aux_src_list,
-                                dt=space.dt, bloch=None, verbose=False)
-        
-        return aux_fdtd
+            phase_velocity = None
+
+        return _IncidentLine(deepcopy(self.src_time), delta_1d, dt, 
+                             eps_inf, mu_inf, max_dist, cmplx, single,
+                             phase_velocity)
 
     def _get_pw_source(self, space, component, cosine, field,
                        low_idx, high_idx, source, samp_i2s, face):
@@ -1323,22 +1320,17 @@ class GaussianBeam(TotalFieldScatteredField):
         # spot size of Gaussian beam
         self.waist = float(waist)
 
-    def init(self, geom_tree, space, cmplx):
+    def init(self, geom_tree, space, cmplx, single=False):
         self.geom_tree = geom_tree
         self.src_time.init(cmplx)
         
-        aux_fdtd = self._get_aux_fdtd(space, geom_tree, cmplx)
-        aux_fdtd.init()
-        raising = aux_fdtd.src_list[0].src_time.width
-        dist = 2 * aux_fdtd.space.half_size[2]
-        default_medium = (i for i in aux_fdtd.geom_list 
-                            if isinstance(i, DefaultMedium)).next()
-        eps_inf = default_medium.material.eps_inf
-        mu_inf = default_medium.material.mu_inf
-        v_p = 1 / sqrt(eps_inf * mu_inf)
+        aux_fdtd = self._get_aux_fdtd(space, geom_tree, cmplx, single)
+        raising = aux_fdtd.src_time.width
+        dist = aux_fdtd.length
+        v_p = 1 / sqrt(aux_fdtd.eps_inf * aux_fdtd.mu_inf)
         passby = raising + dist / v_p
 
-        aux_fdtd.step_until_t(2 * passby)
+        aux_fdtd.run(int(ceil(2 * passby / aux_fdtd.dt)))
         
         self.aux_fdtd = _GaussianBeamSrcTime(aux_fdtd)
 
@@ -1506,12 +1498,106 @@ class _GaussianBeamSrcTime(object):
     def step(self):
         self.aux_fdtd.step()
         self.n += 1
-        self.t = self.n * self.aux_fdtd.time_step.dt
+        self.t = self.n * self.aux_fdtd.dt
         
     def envelope(self):
-        width = self.aux_fdtd.src_list[0].src_time.width
+        width = self.aux_fdtd.src_time.width
         if self.t < width:
             env = sin(0.5 * pi * self.t / width)**2
         else:
             env = 1
         return env
+
+
+class _LineSpace(object):
+    """Index mapping of the 1-D FDTD of _IncidentLine.
+
+    Ex[0, 0, k] is at z = z0 + k * ds, and Hy[0, 0, k] hy_offset cells 
+    after.
+
+    """
+    def __init__(self, z0, ds, hy_offset=.5):
+        self.z0 = float(z0)
+        self.ds = float(ds)
+        self.hy_offset = float(hy_offset)
+
+    def spc_to_exact_ex_idx(self, x, y, z):
+        return (0, 0, (z - self.z0) / self.ds)
+
+    def spc_to_exact_hy_idx(self, x, y, z):
+        return (0, 0, (z - self.z0) / self.ds - self.hy_offset)
+
+
+class _IncidentLine(object):
+    """1-D FDTD of the incident plane wave along the beam axis.
+
+    The compiled engine updates Ex and Hy in the background medium, 
+    from a hard source a cell before -reach to the graded absorbers 
+    beyond reach. It is stepped by step() or by the compiled driver of
+    the FDTD, in lockstep with the main grid.
+
+    Given the phase_velocity, the line carries the analytic plane wave
+    instead, sampled at every half step of delay from a cell before 
+    -reach to two cells after reach.
+
+    """
+    # cells of the absorbers at the ends
+    absorber = 30
+
+    def __init__(self, src_time, ds, dt, eps_inf, mu_inf, reach, cmplx,
+                 single=False, phase_velocity=None):
+        self.src_time = src_time
+        self.dt = float(dt)
+        self.eps_inf = float(eps_inf)
+        self.mu_inf = float(mu_inf)
+        self.phase_velocity = phase_velocity
+
+        if phase_velocity is None:
+            reach_cells = int(ceil(reach / ds)) + 2
+            half = reach_cells + self.absorber
+            size = 2 * half + 1
+            self.space = _LineSpace(-half * ds, ds)
+        else:
+            spacing = .5 * self.dt * phase_velocity
+            first = int(ceil((reach + ds) / spacing))
+            size = first + int(ceil((reach + 2 * ds) / spacing)) + 1
+            self.space = _LineSpace(-first * spacing, spacing, 0)
+        self.length = (size - 1) * self.space.ds
+
+        # in the precision of the main grid, which links the fields
+        if cmplx:
+            dtype = np.complex64 if single else complex
+        else:
+            dtype = np.float32 if single else np.double
+        engine = pw_material.pw_type('Incident', cmplx, single)
+        self.ex = np.zeros((1, 1, size), dtype)
+        self.hy = np.zeros((1, 1, size), dtype)
+
+        self.engine = engine()
+        self.engine.set_ex(self.ex)
+        self.engine.set_hy(self.hy)
+        if phase_velocity is None:
+            self.engine.set_medium(ds, dt, eps_inf, mu_inf, self.absorber)
+            self.engine.set_source(half - reach_cells + 1)
+        else:
+            self.engine.set_analytic(sqrt(mu_inf / eps_inf))
+
+    def load_waveform(self, steps):
+        """Tabulate the source for the next steps."""
+        n = self.engine.get_n()
+        if self.phase_velocity is None:
+            n0, size, spacing = n + .5, steps, 1
+        else:
+            # every half step from the delay of a half step
+            n0, size, spacing = n, 2 * steps + 1, .5
+        waveform = np.array([self.src_time.oscillator(self.dt * (n0 + spacing * i))
+                             for i in xrange(size)], self.ex.dtype)
+        self.engine.set_waveform(waveform, n0)
+
+    def step(self):
+        self.load_waveform(1)
+        self.engine.step()
+
+    def run(self, steps):
+        self.load_waveform(steps)
+        self.engine.run(steps)
@@ -31,7 +31,8 @@ pw_material = Extension(name = 'gmes._pw_material',
                         include_dirs = [numpy_include],
                         swig_opts = ['-c++', '-outdir', 'gmes'],
                         language = 'c++',
-                        extra_compile_args=['-std=c++0x'])
+                        extra_compile_args=['-std=c++0x', '-fopenmp'],
+                        extra_link_args=['-fopenmp'])
 
 # constant module
 constant = Extension(name = 'gmes._constant',
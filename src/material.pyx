@@ -43,13 +43,10 @@ class Dummy(Material):
         print "frequency independent permittivity:", self.eps_inf,
         print "frequency independent permeability:", self.mu_inf
         
-    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DummyExCmplx()
-            pw_param = DummyElectricParamCmplx()
-        else:
-            pw_obj = DummyExReal()
-            pw_param = DummyElectricParamReal()
+    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DummyEx', cmplx, single)()
+        pw_param = pw_type('DummyElectricParam', cmplx, single)()
 
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -59,13 +56,10 @@ class Dummy(Material):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DummyEyCmplx()
-            pw_param = DummyElectricParamCmplx()
-        else:
-            pw_obj = DummyEyReal()
-            pw_param = DummyElectricParamReal()
+    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DummyEy', cmplx, single)()
+        pw_param = pw_type('DummyElectricParam', cmplx, single)()
 
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -75,13 +69,10 @@ class Dummy(Material):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DummyEzCmplx()
-            pw_param = DummyElectricParamCmplx()
-        else:
-            pw_obj = DummyEzReal()
-            pw_param = DummyElectricParamReal()
+    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DummyEz', cmplx, single)()
+        pw_param = pw_type('DummyElectricParam', cmplx, single)()
 
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -91,13 +82,10 @@ class Dummy(Material):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DummyHxCmplx()
-            pw_param = DummyMagneticParamCmplx()
-        else:
-            pw_obj = DummyHxReal()
-            pw_param = DummyMagneticParamReal()
+    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DummyHx', cmplx, single)()
+        pw_param = pw_type('DummyMagneticParam', cmplx, single)()
 
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -107,13 +95,23 @@ class Dummy(Material):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DummyHyCmplx()
-            pw_param = DummyMagneticParamCmplx()
+    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DummyHy', cmplx, single)()
+        pw_param = pw_type('DummyMagneticParam', cmplx, single)()
+
+        if underneath is None:
+            pw_param.mu_inf = self.mu_inf
         else:
-            pw_obj = DummyHyReal()
-            pw_param = DummyMagneticParamReal()
+            pw_param.mu_inf = underneath.mu_inf
+        
+        pw_obj.attach(idx, pw_param)
+        return pw_obj
+
+    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DummyHz', cmplx, single)()
+        pw_param = pw_type('DummyMagneticParam', cmplx, single)()
 
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -123,20 +121,82 @@ class Dummy(Material):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DummyHzCmplx()
-            pw_param = DummyMagneticParamCmplx()
+    def get_pw_material_ex_range(self, low, high, underneath=None, 
+                                 cmplx=False, single=False):
+        pw_obj = pw_type('DummyEx', cmplx, single)()
+        pw_param = pw_type('DummyElectricParam', cmplx, single)()
+
+        if underneath is None:
+            pw_param.eps_inf = self.eps_inf
+        else:
+            pw_param.eps_inf = underneath.eps_inf
+        
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
+    def get_pw_material_ey_range(self, low, high, underneath=None, 
+                                 cmplx=False, single=False):
+        pw_obj = pw_type('DummyEy', cmplx, single)()
+        pw_param = pw_type('DummyElectricParam', cmplx, single)()
+
+        if underneath is None:
+            pw_param.eps_inf = self.eps_inf
+        else:
+            pw_param.eps_inf = underneath.eps_inf
+        
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
+    def get_pw_material_ez_range(self, low, high, underneath=None, 
+                                 cmplx=False, single=False):
+        pw_obj = pw_type('DummyEz', cmplx, single)()
+        pw_param = pw_type('DummyElectricParam', cmplx, single)()
+
+        if underneath is None:
+            pw_param.eps_inf = self.eps_inf
+        else:
+            pw_param.eps_inf = underneath.eps_inf
+        
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
+    def get_pw_material_hx_range(self, low, high, underneath=None, 
+                                 cmplx=False, single=False):
+        pw_obj = pw_type('DummyHx', cmplx, single)()
+        pw_param = pw_type('DummyMagneticParam', cmplx, single)()
+
+        if underneath is None:
+            pw_param.mu_inf = self.mu_inf
         else:
-            pw_obj = DummyHzReal()
-            pw_param = DummyMagneticParamReal()
+            pw_param.mu_inf = underneath.mu_inf
+        
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
+    def get_pw_material_hy_range(self, low, high, underneath=None, 
+                                 cmplx=False, single=False):
+        pw_obj = pw_type('DummyHy', cmplx, single)()
+        pw_param = pw_type('DummyMagneticParam', cmplx, single)()
 
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
         else:
             pw_param.mu_inf = underneath.mu_inf
         
-        pw_obj.attach(idx, pw_param)
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
+    def get_pw_material_hz_range(self, low, high, underneath=None, 
+                                 cmplx=False, single=False):
+        pw_obj = pw_type('DummyHz', cmplx, single)()
+        pw_param = pw_type('DummyMagneticParam', cmplx, single)()
+
+        if underneath is None:
+            pw_param.mu_inf = self.mu_inf
+        else:
+            pw_param.mu_inf = underneath.mu_inf
+        
+        pw_obj.attach_range(low, high, pw_param)
         return pw_obj
 
 
@@ -180,13 +240,10 @@ class Const(Material):
         print "frequency independent permittivity:", self.eps_inf,
         print "frequency independent permeability:", self.mu_inf
         
-    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = ConstExCmplx()
-            pw_param = ConstElectricParamCmplx()
-        else:
-            pw_obj = ConstExReal()
-            pw_param = ConstElectricParamReal()
+    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('ConstEx', cmplx, single)()
+        pw_param = pw_type('ConstElectricParam', cmplx, single)()
         
         pw_param.value = self.value
         if underneath is None:
@@ -197,13 +254,10 @@ class Const(Material):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = ConstEyCmplx()
-            pw_param = ConstElectricParamCmplx()
-        else:
-            pw_obj = ConstEyReal()
-            pw_param = ConstElectricParamReal()
+    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('ConstEy', cmplx, single)()
+        pw_param = pw_type('ConstElectricParam', cmplx, single)()
         
         pw_param.value = self.value
         if underneath is None:
@@ -214,13 +268,10 @@ class Const(Material):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = ConstEzCmplx()
-            pw_param = ConstElectricParamCmplx()
-        else:
-            pw_obj = ConstEzReal()
-            pw_param = ConstElectricParamReal()
+    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('ConstEz', cmplx, single)()
+        pw_param = pw_type('ConstElectricParam', cmplx, single)()
         
         pw_param.value = self.value
         if underneath is None:
@@ -231,13 +282,10 @@ class Const(Material):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = ConstHxCmplx()
-            pw_param = ConstMagneticParamCmplx()
-        else:
-            pw_obj = ConstHxReal()
-            pw_param = ConstMagneticParamReal()
+    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('ConstHx', cmplx, single)()
+        pw_param = pw_type('ConstMagneticParam', cmplx, single)()
 
         pw_param.value = self.value
         if underneath is None:
@@ -248,13 +296,24 @@ class Const(Material):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = ConstHyCmplx()
-            pw_param = ConstMagneticParamCmplx()
+    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('ConstHy', cmplx, single)()
+        pw_param = pw_type('ConstMagneticParam', cmplx, single)()
+
+        pw_param.value = self.value
+        if underneath is None:
+            pw_param.mu_inf = self.mu_inf
         else:
-            pw_obj = ConstHyReal()
-            pw_param = ConstMagneticParamReal()
+            pw_param.mu_inf = underneath.mu_inf
+        
+        pw_obj.attach(idx, pw_param)
+        return pw_obj
+
+    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('ConstHz', cmplx, single)()
+        pw_param = pw_type('ConstMagneticParam', cmplx, single)()
 
         pw_param.value = self.value
         if underneath is None:
@@ -265,13 +324,66 @@ class Const(Material):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = ConstHzCmplx()
-            pw_param = ConstMagneticParamCmplx()
+    def get_pw_material_ex_range(self, low, high, underneath=None, 
+                                 cmplx=False, single=False):
+        pw_obj = pw_type('ConstEx', cmplx, single)()
+        pw_param = pw_type('ConstElectricParam', cmplx, single)()
+
+        pw_param.value = self.value
+        if underneath is None:
+            pw_param.eps_inf = self.eps_inf
+        else:
+            pw_param.eps_inf = underneath.eps_inf
+        
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
+    def get_pw_material_ey_range(self, low, high, underneath=None, 
+                                 cmplx=False, single=False):
+        pw_obj = pw_type('ConstEy', cmplx, single)()
+        pw_param = pw_type('ConstElectricParam', cmplx, single)()
+
+        pw_param.value = self.value
+        if underneath is None:
+            pw_param.eps_inf = self.eps_inf
+        else:
+            pw_param.eps_inf = underneath.eps_inf
+        
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
+    def get_pw_material_ez_range(self, low, high, underneath=None, 
+                                 cmplx=False, single=False):
+        pw_obj = pw_type('ConstEz', cmplx, single)()
+        pw_param = pw_type('ConstElectricParam', cmplx, single)()
+
+        pw_param.value = self.value
+        if underneath is None:
+            pw_param.eps_inf = self.eps_inf
+        else:
+            pw_param.eps_inf = underneath.eps_inf
+        
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
+    def get_pw_material_hx_range(self, low, high, underneath=None, 
+                                 cmplx=False, single=False):
+        pw_obj = pw_type('ConstHx', cmplx, single)()
+        pw_param = pw_type('ConstMagneticParam', cmplx, single)()
+
+        pw_param.value = self.value
+        if underneath is None:
+            pw_param.mu_inf = self.mu_inf
         else:
-            pw_obj = ConstHzReal()
-            pw_param = ConstMagneticParamReal()
+            pw_param.mu_inf = underneath.mu_inf
+        
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
+    def get_pw_material_hy_range(self, low, high, underneath=None, 
+                                 cmplx=False, single=False):
+        pw_obj = pw_type('ConstHy', cmplx, single)()
+        pw_param = pw_type('ConstMagneticParam', cmplx, single)()
 
         pw_param.value = self.value
         if underneath is None:
@@ -279,7 +391,21 @@ class Const(Material):
         else:
             pw_param.mu_inf = underneath.mu_inf
         
-        pw_obj.attach(idx, pw_param)
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
+    def get_pw_material_hz_range(self, low, high, underneath=None, 
+                                 cmplx=False, single=False):
+        pw_obj = pw_type('ConstHz', cmplx, single)()
+        pw_param = pw_type('ConstMagneticParam', cmplx, single)()
+
+        pw_param.value = self.value
+        if underneath is None:
+            pw_param.mu_inf = self.mu_inf
+        else:
+            pw_param.mu_inf = underneath.mu_inf
+        
+        pw_obj.attach_range(low, high, pw_param)
         return pw_obj
 
 
@@ -307,13 +433,10 @@ class Dielectric(Material):
         print "frequency independent permittivity:", self.eps_inf,
         print "frequency independent permeability:", self.mu_inf
 
-    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DielectricExCmplx()
-            pw_param = DielectricElectricParamCmplx()
-        else:
-            pw_obj = DielectricExReal()
-            pw_param = DielectricElectricParamReal()
+    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DielectricEx', cmplx, single)()
+        pw_param = pw_type('DielectricElectricParam', cmplx, single)()
 
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -323,13 +446,10 @@ class Dielectric(Material):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DielectricEyCmplx()
-            pw_param = DielectricElectricParamCmplx()
-        else:
-            pw_obj = DielectricEyReal()
-            pw_param = DielectricElectricParamReal()
+    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DielectricEy', cmplx, single)()
+        pw_param = pw_type('DielectricElectricParam', cmplx, single)()
 
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -339,13 +459,10 @@ class Dielectric(Material):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DielectricEzCmplx()
-            pw_param = DielectricElectricParamCmplx()
-        else:
-            pw_obj = DielectricEzReal()
-            pw_param = DielectricElectricParamReal()
+    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DielectricEz', cmplx, single)()
+        pw_param = pw_type('DielectricElectricParam', cmplx, single)()
 
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -355,13 +472,10 @@ class Dielectric(Material):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DielectricHxCmplx()
-            pw_param = DielectricMagneticParamCmplx()
-        else:
-            pw_obj = DielectricHxReal()
-            pw_param = DielectricMagneticParamReal()
+    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DielectricHx', cmplx, single)()
+        pw_param = pw_type('DielectricMagneticParam', cmplx, single)()
             
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -371,13 +485,10 @@ class Dielectric(Material):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DielectricHyCmplx()
-            pw_param = DielectricMagneticParamCmplx()
-        else:
-            pw_obj = DielectricHyReal()
-            pw_param = DielectricMagneticParamReal()
+    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DielectricHy', cmplx, single)()
+        pw_param = pw_type('DielectricMagneticParam', cmplx, single)()
             
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -387,13 +498,10 @@ class Dielectric(Material):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DielectricHzCmplx()
-            pw_param = DielectricMagneticParamCmplx()
-        else:
-            pw_obj = DielectricHzReal()
-            pw_param = DielectricMagneticParamReal()
+    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DielectricHz', cmplx, single)()
+        pw_param = pw_type('DielectricMagneticParam', cmplx, single)()
             
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -403,6 +511,102 @@ class Dielectric(Material):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
+    def get_pw_material_ex_range(self, low, high, underneath=None, 
+                                 cmplx=False, grid=False, single=False):
+        if grid:
+            pw_obj = pw_type('DielectricGridEx', cmplx, single)()
+        else:
+            pw_obj = pw_type('DielectricEx', cmplx, single)()
+        pw_param = pw_type('DielectricElectricParam', cmplx, single)()
+
+        if underneath is None:
+            pw_param.eps_inf = self.eps_inf
+        else:
+            pw_param.eps_inf = underneath.eps_inf
+        
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
+    def get_pw_material_ey_range(self, low, high, underneath=None, 
+                                 cmplx=False, grid=False, single=False):
+        if grid:
+            pw_obj = pw_type('DielectricGridEy', cmplx, single)()
+        else:
+            pw_obj = pw_type('DielectricEy', cmplx, single)()
+        pw_param = pw_type('DielectricElectricParam', cmplx, single)()
+
+        if underneath is None:
+            pw_param.eps_inf = self.eps_inf
+        else:
+            pw_param.eps_inf = underneath.eps_inf
+        
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
+    def get_pw_material_ez_range(self, low, high, underneath=None, 
+                                 cmplx=False, grid=False, single=False):
+        if grid:
+            pw_obj = pw_type('DielectricGridEz', cmplx, single)()
+        else:
+            pw_obj = pw_type('DielectricEz', cmplx, single)()
+        pw_param = pw_type('DielectricElectricParam', cmplx, single)()
+
+        if underneath is None:
+            pw_param.eps_inf = self.eps_inf
+        else:
+            pw_param.eps_inf = underneath.eps_inf
+        
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
+    def get_pw_material_hx_range(self, low, high, underneath=None, 
+                                 cmplx=False, grid=False, single=False):
+        if grid:
+            pw_obj = pw_type('DielectricGridHx', cmplx, single)()
+        else:
+            pw_obj = pw_type('DielectricHx', cmplx, single)()
+        pw_param = pw_type('DielectricMagneticParam', cmplx, single)()
+
+        if underneath is None:
+            pw_param.mu_inf = self.mu_inf
+        else:
+            pw_param.mu_inf = underneath.mu_inf
+        
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
+    def get_pw_material_hy_range(self, low, high, underneath=None, 
+                                 cmplx=False, grid=False, single=False):
+        if grid:
+            pw_obj = pw_type('DielectricGridHy', cmplx, single)()
+        else:
+            pw_obj = pw_type('DielectricHy', cmplx, single)()
+        pw_param = pw_type('DielectricMagneticParam', cmplx, single)()
+
+        if underneath is None:
+            pw_param.mu_inf = self.mu_inf
+        else:
+            pw_param.mu_inf = underneath.mu_inf
+        
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
+    def get_pw_material_hz_range(self, low, high, underneath=None, 
+                                 cmplx=False, grid=False, single=False):
+        if grid:
+            pw_obj = pw_type('DielectricGridHz', cmplx, single)()
+        else:
+            pw_obj = pw_type('DielectricHz', cmplx, single)()
+        pw_param = pw_type('DielectricMagneticParam', cmplx, single)()
+
+        if underneath is None:
+            pw_param.mu_inf = self.mu_inf
+        else:
+            pw_param.mu_inf = underneath.mu_inf
+        
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
 
 class Compound(object):
     """Represent the compound material.
@@ -602,13 +806,10 @@ class Upml(Pml):
             - self.sigma(w, component) * self.dt
         return numerator
     
-    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = UpmlExCmplx()
-            pw_param = UpmlElectricParamCmplx()
-        else:
-            pw_obj = UpmlExReal()
-            pw_param = UpmlElectricParamReal()
+    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('UpmlEx', cmplx, single)()
+        pw_param = pw_type('UpmlElectricParam', cmplx, single)()
             
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -625,13 +826,10 @@ class Upml(Pml):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = UpmlEyCmplx()
-            pw_param = UpmlElectricParamCmplx()
-        else:
-            pw_obj = UpmlEyReal()
-            pw_param = UpmlElectricParamReal()
+    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('UpmlEy', cmplx, single)()
+        pw_param = pw_type('UpmlElectricParam', cmplx, single)()
          
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -648,13 +846,10 @@ class Upml(Pml):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = UpmlEzCmplx()
-            pw_param = UpmlElectricParamCmplx()
-        else:
-            pw_obj = UpmlEzReal()
-            pw_param = UpmlElectricParamReal()
+    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('UpmlEz', cmplx, single)()
+        pw_param = pw_type('UpmlElectricParam', cmplx, single)()
 
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -671,13 +866,10 @@ class Upml(Pml):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = UpmlHxCmplx()
-            pw_param = UpmlMagneticParamCmplx()
-        else:
-            pw_obj = UpmlHxReal()
-            pw_param = UpmlMagneticParamReal()
+    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('UpmlHx', cmplx, single)()
+        pw_param = pw_type('UpmlMagneticParam', cmplx, single)()
 
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -694,13 +886,10 @@ class Upml(Pml):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = UpmlHyCmplx()
-            pw_param = UpmlMagneticParamCmplx()
-        else:
-            pw_obj = UpmlHyReal()
-            pw_param = UpmlMagneticParamReal()
+    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('UpmlHy', cmplx, single)()
+        pw_param = pw_type('UpmlMagneticParam', cmplx, single)()
 
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -717,13 +906,10 @@ class Upml(Pml):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = UpmlHzCmplx()
-            pw_param = UpmlMagneticParamCmplx()
-        else:
-            pw_obj = UpmlHzReal()
-            pw_param = UpmlMagneticParamReal()
+    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('UpmlHz', cmplx, single)()
+        pw_param = pw_type('UpmlMagneticParam', cmplx, single)()
 
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -829,13 +1015,38 @@ class Cpml(Pml):
         else:
             return 0
     
-    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = CpmlExCmplx()
-            pw_param = CpmlElectricParamCmplx()
+    def graded(self, w, component):
+        """Return whether the point at w is graded along the component
+        axis, i.e., its psi does not stay zero.
+
+        """
+        return self.c(w, component) != 0 or self.kappa(w, component) != 1
+
+    def profile(self, coords, component):
+        """Return the b, c, and kappa profiles along the component axis.
+
+        The rows of the returned array are b, c, and kappa of the cells
+        at coords, which line up along the last axis. The array has 
+        no columns if the cells are not graded along the component 
+        axis.
+
+        """
+        if component == 2:
+            w = [spc[2] for spc in coords]
         else:
-            pw_obj = CpmlExReal()
-            pw_param = CpmlElectricParamReal()
+            w = [coords[0][component]]
+
+        if not self.graded(w[0], component):
+            return empty((3, 0), np.double)
+
+        return array(([self.b(i, component) for i in w],
+                      [self.c(i, component) for i in w],
+                      [self.kappa(i, component) for i in w]), np.double)
+
+    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('CpmlEx', cmplx, single)()
+        pw_param = pw_type('CpmlElectricParam', cmplx, single)()
 
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -852,13 +1063,10 @@ class Cpml(Pml):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = CpmlEyCmplx()
-            pw_param = CpmlElectricParamCmplx()
-        else:
-            pw_obj = CpmlEyReal()
-            pw_param = CpmlElectricParamReal()
+    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('CpmlEy', cmplx, single)()
+        pw_param = pw_type('CpmlElectricParam', cmplx, single)()
 
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -875,13 +1083,10 @@ class Cpml(Pml):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = CpmlEzCmplx()
-            pw_param = CpmlElectricParamCmplx()
-        else:
-            pw_obj = CpmlEzReal()
-            pw_param = CpmlElectricParamReal()
+    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('CpmlEz', cmplx, single)()
+        pw_param = pw_type('CpmlElectricParam', cmplx, single)()
 
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -897,13 +1102,10 @@ class Cpml(Pml):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = CpmlHxCmplx()
-            pw_param = CpmlMagneticParamCmplx()
-        else:
-            pw_obj = CpmlHxReal()
-            pw_param = CpmlMagneticParamReal()
+    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('CpmlHx', cmplx, single)()
+        pw_param = pw_type('CpmlMagneticParam', cmplx, single)()
 
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -919,13 +1121,10 @@ class Cpml(Pml):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = CpmlHyCmplx()
-            pw_param = CpmlMagneticParamCmplx()
-        else:
-            pw_obj = CpmlHyReal()
-            pw_param = CpmlMagneticParamReal()
+    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('CpmlHy', cmplx, single)()
+        pw_param = pw_type('CpmlMagneticParam', cmplx, single)()
 
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -941,13 +1140,10 @@ class Cpml(Pml):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = CpmlHzCmplx()
-            pw_param = CpmlMagneticParamCmplx()
-        else:
-            pw_obj = CpmlHzReal()
-            pw_param = CpmlMagneticParamReal()
+    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('CpmlHz', cmplx, single)()
+        pw_param = pw_type('CpmlMagneticParam', cmplx, single)()
 
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -962,7 +1158,91 @@ class Cpml(Pml):
         pw_param.kappa2 = self.kappa(coords[1], 1)
         pw_obj.attach(idx, pw_param)
         return pw_obj
-        
+
+    def get_pw_material_ex_range(self, low, high, coords, underneath=None, 
+                                 cmplx=False, single=False):
+        pw_obj = pw_type('CpmlSlabEx', cmplx, single)()
+        pw_param = pw_type('CpmlSlabElectricParam', cmplx, single)()
+
+        if underneath is None:
+            pw_param.eps_inf = self.eps_inf
+        else:
+            pw_param.eps_inf = underneath.eps_inf
+
+        pw_param.set(self.profile(coords, 1), self.profile(coords, 2))
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
+    def get_pw_material_ey_range(self, low, high, coords, underneath=None, 
+                                 cmplx=False, single=False):
+        pw_obj = pw_type('CpmlSlabEy', cmplx, single)()
+        pw_param = pw_type('CpmlSlabElectricParam', cmplx, single)()
+
+        if underneath is None:
+            pw_param.eps_inf = self.eps_inf
+        else:
+            pw_param.eps_inf = underneath.eps_inf
+
+        pw_param.set(self.profile(coords, 2), self.profile(coords, 0))
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
+    def get_pw_material_ez_range(self, low, high, coords, underneath=None, 
+                                 cmplx=False, single=False):
+        pw_obj = pw_type('CpmlSlabEz', cmplx, single)()
+        pw_param = pw_type('CpmlSlabElectricParam', cmplx, single)()
+
+        if underneath is None:
+            pw_param.eps_inf = self.eps_inf
+        else:
+            pw_param.eps_inf = underneath.eps_inf
+
+        pw_param.set(self.profile(coords, 0), self.profile(coords, 1))
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
+    def get_pw_material_hx_range(self, low, high, coords, underneath=None, 
+                                 cmplx=False, single=False):
+        pw_obj = pw_type('CpmlSlabHx', cmplx, single)()
+        pw_param = pw_type('CpmlSlabMagneticParam', cmplx, single)()
+
+        if underneath is None:
+            pw_param.mu_inf = self.mu_inf
+        else:
+            pw_param.mu_inf = underneath.mu_inf
+
+        pw_param.set(self.profile(coords, 1), self.profile(coords, 2))
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
+    def get_pw_material_hy_range(self, low, high, coords, underneath=None, 
+                                 cmplx=False, single=False):
+        pw_obj = pw_type('CpmlSlabHy', cmplx, single)()
+        pw_param = pw_type('CpmlSlabMagneticParam', cmplx, single)()
+
+        if underneath is None:
+            pw_param.mu_inf = self.mu_inf
+        else:
+            pw_param.mu_inf = underneath.mu_inf
+
+        pw_param.set(self.profile(coords, 2), self.profile(coords, 0))
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
+    def get_pw_material_hz_range(self, low, high, coords, underneath=None, 
+                                 cmplx=False, single=False):
+        pw_obj = pw_type('CpmlSlabHz', cmplx, single)()
+        pw_param = pw_type('CpmlSlabMagneticParam', cmplx, single)()
+
+        if underneath is None:
+            pw_param.mu_inf = self.mu_inf
+        else:
+            pw_param.mu_inf = underneath.mu_inf
+
+        pw_param.set(self.profile(coords, 0), self.profile(coords, 1))
+        pw_obj.attach_range(low, high, pw_param)
+        return pw_obj
+
 
 class DrudePole(object):
     def __init__(self, omega, gamma):
@@ -1131,13 +1411,10 @@ class DcpAde(Dielectric):
         for i in self.cps:
             i.display_info(indent+4)
         
-    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DcpAdeExCmplx()
-            pw_param = DcpAdeElectricParamCmplx()
-        else:
-            pw_obj = DcpAdeExReal()
-            pw_param = DcpAdeElectricParamReal()
+    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DcpAdeEx', cmplx, single)()
+        pw_param = pw_type('DcpAdeElectricParam', cmplx, single)()
                 
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -1149,13 +1426,10 @@ class DcpAde(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DcpAdeEyCmplx()
-            pw_param = DcpAdeElectricParamCmplx()
-        else:
-            pw_obj = DcpAdeEyReal()
-            pw_param = DcpAdeElectricParamReal()
+    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DcpAdeEy', cmplx, single)()
+        pw_param = pw_type('DcpAdeElectricParam', cmplx, single)()
                 
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -1167,13 +1441,10 @@ class DcpAde(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DcpAdeEzCmplx()
-            pw_param = DcpAdeElectricParamCmplx()
-        else:
-            pw_obj = DcpAdeEzReal()
-            pw_param = DcpAdeElectricParamReal()
+    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DcpAdeEz', cmplx, single)()
+        pw_param = pw_type('DcpAdeElectricParam', cmplx, single)()
                 
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -1185,13 +1456,10 @@ class DcpAde(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DcpAdeHxCmplx()
-            pw_param = DcpAdeMagneticParamCmplx()
-        else:
-            pw_obj = DcpAdeHxReal()
-            pw_param = DcpAdeMagneticParamReal()
+    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DcpAdeHx', cmplx, single)()
+        pw_param = pw_type('DcpAdeMagneticParam', cmplx, single)()
             
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -1201,13 +1469,10 @@ class DcpAde(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DcpAdeHyCmplx()
-            pw_param = DcpAdeMagneticParamCmplx()
-        else:
-            pw_obj = DcpAdeHyReal()
-            pw_param = DcpAdeMagneticParamReal()
+    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DcpAdeHy', cmplx, single)()
+        pw_param = pw_type('DcpAdeMagneticParam', cmplx, single)()
             
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -1217,13 +1482,10 @@ class DcpAde(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DcpAdeHzCmplx()
-            pw_param = DcpAdeMagneticParamCmplx()
-        else:
-            pw_obj = DcpAdeHzReal()
-            pw_param = DcpAdeMagneticParamReal()
+    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DcpAdeHz', cmplx, single)()
+        pw_param = pw_type('DcpAdeMagneticParam', cmplx, single)()
             
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -1380,13 +1642,10 @@ class DcpPlrc(Dielectric):
         for i in self.cps:
             i.display_info(indent+4)
         
-    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DcpPlrcExCmplx()
-            pw_param = DcpPlrcElectricParamCmplx()
-        else:
-            pw_obj = DcpPlrcExReal()
-            pw_param = DcpPlrcElectricParamReal()
+    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DcpPlrcEx', cmplx, single)()
+        pw_param = pw_type('DcpPlrcElectricParam', cmplx, single)()
             
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -1397,13 +1656,10 @@ class DcpPlrc(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DcpPlrcEyCmplx()
-            pw_param = DcpPlrcElectricParamCmplx()
-        else:
-            pw_obj = DcpPlrcEyReal()
-            pw_param = DcpPlrcElectricParamReal()
+    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DcpPlrcEy', cmplx, single)()
+        pw_param = pw_type('DcpPlrcElectricParam', cmplx, single)()
             
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -1414,13 +1670,10 @@ class DcpPlrc(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DcpPlrcEzCmplx()
-            pw_param = DcpPlrcElectricParamCmplx()
-        else:
-            pw_obj = DcpPlrcEzReal()
-            pw_param = DcpPlrcElectricParamReal()
+    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DcpPlrcEz', cmplx, single)()
+        pw_param = pw_type('DcpPlrcElectricParam', cmplx, single)()
             
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -1431,13 +1684,10 @@ class DcpPlrc(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DcpPlrcHxCmplx()
-            pw_param = DcpPlrcMagneticParamCmplx()
-        else:
-            pw_obj = DcpPlrcHxReal()
-            pw_param = DcpPlrcMagneticParamReal()
+    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DcpPlrcHx', cmplx, single)()
+        pw_param = pw_type('DcpPlrcMagneticParam', cmplx, single)()
             
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -1447,13 +1697,10 @@ class DcpPlrc(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DcpPlrcHyCmplx()
-            pw_param = DcpPlrcMagneticParamCmplx()
-        else:
-            pw_obj = DcpPlrcHyReal()
-            pw_param = DcpPlrcMagneticParamReal()
+    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DcpPlrcHy', cmplx, single)()
+        pw_param = pw_type('DcpPlrcMagneticParam', cmplx, single)()
             
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -1463,13 +1710,10 @@ class DcpPlrc(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DcpPlrcHzCmplx()
-            pw_param = DcpPlrcMagneticParamCmplx()
-        else:
-            pw_obj = DcpPlrcHzReal()
-            pw_param = DcpPlrcMagneticParamReal()
+    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DcpPlrcHz', cmplx, single)()
+        pw_param = pw_type('DcpPlrcMagneticParam', cmplx, single)()
             
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -1587,13 +1831,10 @@ class Drude(Dielectric):
         for p in self.dps:
             p.display_info(indent+4)
         
-    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DrudeExCmplx()
-            pw_param = DrudeElectricParamCmplx()
-        else:
-            pw_obj = DrudeExReal()
-            pw_param = DrudeElectricParamReal()
+    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DrudeEx', cmplx, single)()
+        pw_param = pw_type('DrudeElectricParam', cmplx, single)()
 
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -1605,13 +1846,10 @@ class Drude(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DrudeEyCmplx()
-            pw_param = DrudeElectricParamCmplx()
-        else:
-            pw_obj = DrudeEyReal()
-            pw_param = DrudeElectricParamReal()
+    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DrudeEy', cmplx, single)()
+        pw_param = pw_type('DrudeElectricParam', cmplx, single)()
 
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -1623,13 +1861,10 @@ class Drude(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DrudeEzCmplx()
-            pw_param = DrudeElectricParamCmplx()
-        else:
-            pw_obj = DrudeEzReal()
-            pw_param = DrudeElectricParamReal()
+    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DrudeEz', cmplx, single)()
+        pw_param = pw_type('DrudeElectricParam', cmplx, single)()
 
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -1641,13 +1876,10 @@ class Drude(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DrudeHxCmplx()
-            pw_param = DrudeMagneticParamCmplx()
-        else:
-            pw_obj = DrudeHxReal()
-            pw_param = DrudeMagneticParamReal()
+    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DrudeHx', cmplx, single)()
+        pw_param = pw_type('DrudeMagneticParam', cmplx, single)()
 
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -1657,13 +1889,10 @@ class Drude(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DrudeHyCmplx()
-            pw_param = DrudeMagneticParamCmplx()
-        else:
-            pw_obj = DrudeHyReal()
-            pw_param = DrudeMagneticParamReal()
+    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DrudeHy', cmplx, single)()
+        pw_param = pw_type('DrudeMagneticParam', cmplx, single)()
 
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -1673,13 +1902,10 @@ class Drude(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = DrudeHzCmplx()
-            pw_param = DrudeMagneticParamCmplx()
-        else:
-            pw_obj = DrudeHzReal()
-            pw_param = DrudeMagneticParamReal()
+    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('DrudeHz', cmplx, single)()
+        pw_param = pw_type('DrudeMagneticParam', cmplx, single)()
 
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -1765,13 +1991,10 @@ class Lorentz(Dielectric):
         for p in self.lps:
             p.display_info(indent+4)
         
-    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = LorentzExCmplx()
-            pw_param = LorentzElectricParamCmplx()
-        else:
-            pw_obj = LorentzExReal()
-            pw_param = LorentzElectricParamReal()
+    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('LorentzEx', cmplx, single)()
+        pw_param = pw_type('LorentzElectricParam', cmplx, single)()
             
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -1782,13 +2005,10 @@ class Lorentz(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
     
-    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = LorentzEyCmplx()
-            pw_param = LorentzElectricParamCmplx()
-        else:
-            pw_obj = LorentzEyReal()
-            pw_param = LorentzElectricParamReal()
+    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('LorentzEy', cmplx, single)()
+        pw_param = pw_type('LorentzElectricParam', cmplx, single)()
             
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -1799,13 +2019,10 @@ class Lorentz(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = LorentzEzCmplx()
-            pw_param = LorentzElectricParamCmplx()
-        else:
-            pw_obj = LorentzEzReal()
-            pw_param = LorentzElectricParamReal()
+    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('LorentzEz', cmplx, single)()
+        pw_param = pw_type('LorentzElectricParam', cmplx, single)()
             
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -1816,13 +2033,10 @@ class Lorentz(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = LorentzHxCmplx()
-            pw_param = LorentzMagneticParamCmplx()
-        else:
-            pw_obj = LorentzHxReal()
-            pw_param = LorentzMagneticParamReal()
+    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('LorentzHx', cmplx, single)()
+        pw_param = pw_type('LorentzMagneticParam', cmplx, single)()
             
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -1832,13 +2046,10 @@ class Lorentz(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = LorentzHyCmplx()
-            pw_param = LorentzMagneticParamCmplx()
-        else:
-            pw_obj = LorentzHyReal()
-            pw_param = LorentzMagneticParamReal()
+    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('LorentzHy', cmplx, single)()
+        pw_param = pw_type('LorentzMagneticParam', cmplx, single)()
             
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -1848,13 +2059,10 @@ class Lorentz(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False):
-        if cmplx:
-            pw_obj = LorentzHzCmplx()
-            pw_param = LorentzMagneticParamCmplx()
-        else:
-            pw_obj = LorentzHzReal()
-            pw_param = LorentzMagneticParamReal()
+    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
+        pw_obj = pw_type('LorentzHz', cmplx, single)()
+        pw_param = pw_type('LorentzMagneticParam', cmplx, single)()
             
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -1965,12 +2173,13 @@ class Dm2(Dielectric):
         print "normzlied reduced Planck constant:", self.hbar
         print "relative tolerance:", self.rtol
 
-    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False):
+    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
         if cmplx:
             raise ValueError('Dm2 class supports real fields only')
         else:
-            pw_obj = Dm2ExReal()
-            pw_param = Dm2ElectricParamReal()
+            pw_obj = pw_type('Dm2Ex', cmplx, single)()
+            pw_param = pw_type('Dm2ElectricParam', cmplx, single)()
 
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
@@ -1988,21 +2197,21 @@ class Dm2(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
         
-    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False):
+    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
         if cmplx:
             raise ValueError('Dm2 class supports real fields only')
         else:
-            pw_obj = Dm2EyReal()
-            pw_param = Dm2ElectricParamReal()
+            pw_obj = pw_type('Dm2Ey', cmplx, single)()
+            pw_param = pw_type('Dm2ElectricParam', cmplx, single)()
             
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
         else:
             pw_param.eps_inf = underneath.eps_inf
         
-        pw_param.omega = self.omega
+        pw_param.set(self.omega, self.n_atom)
         pw_param.rho30 = self.rho30
-        pw_param.n_atom = self.n_atom
         pw_param.gamma = self.gamma
         pw_param.t1 = self.t1
         pw_param.t2 = self.t2
@@ -2012,21 +2221,21 @@ class Dm2(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False):
+    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
         if cmplx:
             raise ValueError('Dm2 class supports real fields only')
         else:
-            pw_obj = Dm2EzReal()
-            pw_param = Dm2ElectricParamReal()
+            pw_obj = pw_type('Dm2Ez', cmplx, single)()
+            pw_param = pw_type('Dm2ElectricParam', cmplx, single)()
             
         if underneath is None:
             pw_param.eps_inf = self.eps_inf
         else:
             pw_param.eps_inf = underneath.eps_inf
         
-        pw_param.omega = self.omega
+        pw_param.set(self.omega, self.n_atom)
         pw_param.rho30 = self.rho30
-        pw_param.n_atom = self.n_atom
         pw_param.gamma = self.gamma
         pw_param.t1 = self.t1
         pw_param.t2 = self.t2
@@ -2036,12 +2245,13 @@ class Dm2(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False):
+    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
         if cmplx:
             raise ValueError('Dm2 class supports real fields only')
         else:
-            pw_obj = Dm2HxReal()
-            pw_param = Dm2MagneticParamReal()
+            pw_obj = pw_type('Dm2Hx', cmplx, single)()
+            pw_param = pw_type('Dm2MagneticParam', cmplx, single)()
             
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -2051,12 +2261,13 @@ class Dm2(Dielectric):
         pw_obj.attach(idx, pw_param)    
         return pw_obj
 
-    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False):
+    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
         if cmplx:
             raise ValueError('Dm2 class supports real fields only')
         else:
-            pw_obj = Dm2HyReal()
-            pw_param = Dm2MagneticParamReal()
+            pw_obj = pw_type('Dm2Hy', cmplx, single)()
+            pw_param = pw_type('Dm2MagneticParam', cmplx, single)()
             
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -2066,12 +2277,13 @@ class Dm2(Dielectric):
         pw_obj.attach(idx, pw_param)
         return pw_obj
 
-    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False):
+    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
         if cmplx:
             raise ValueError('Dm2 class supports real fields only')
         else:
-            pw_obj = Dm2HzReal()
-            pw_param = Dm2MagneticParamReal()
+            pw_obj = pw_type('Dm2Hz', cmplx, single)()
+            pw_param = pw_type('Dm2MagneticParam', cmplx, single)()
             
         if underneath is None:
             pw_param.mu_inf = self.mu_inf
@@ -37,10 +37,14 @@ namespace gmes
       Index3 index;
       std::copy(idx, idx + idx_size, index.begin());
       const int i = position(index);
-      if (i < 0)
+      if (i >= 0)
+	return param_list[i].eps_inf;
+
+      const int r = range_position(index);
+      if (r < 0)
 	return 0;
       else
-	return param_list[i].eps_inf;
+	return range_param_list[r].eps_inf;
     }
 
     PwMaterial<T>*
@@ -58,12 +62,29 @@ namespace gmes
       return this;
     }
     
+    // Attach the box [low, high] sharing a single parameter.
+    PwMaterial<T>*
+    attach_range(const int* const low, int low_size,
+		 const int* const high, int high_size,
+		 const PwMaterialParam* const pm_param_ptr)
+    {
+      IdxRange range;
+      std::copy(low, low + low_size, range.first.begin());
+      std::copy(high, high + high_size, range.second.begin());
+
+      push_range(range, *static_cast<const ConstElectricParam<T>*>(pm_param_ptr));
+
+      return this;
+    }
+
     PwMaterial<T>*
     merge(const PwMaterial<T>* const pm_ptr)
     {
       auto const_ptr = static_cast<const ConstElectric<T>*>(pm_ptr);
       std::copy(const_ptr->idx_list.begin(), const_ptr->idx_list.end(), std::back_inserter(idx_list));
       std::copy(const_ptr->param_list.begin(), const_ptr->param_list.end(), std::back_inserter(param_list));
+      for (std::size_t n = 0; n < const_ptr->range_list.size(); n++)
+	push_range(const_ptr->range_list[n], const_ptr->range_param_list[n]);
       return this;
     }
 
@@ -76,12 +97,20 @@ namespace gmes
 	       int in2_dim1, int in2_dim2, int in2_dim3,
 	       double d1, double d2, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(inplace_field, inplace_dim1, inplace_dim2, inplace_dim3,
-    	       in_field1, in1_dim1, in1_dim2, in1_dim3,
-    	       in_field2, in2_dim1, in2_dim2, in2_dim3,
-    	       d1, d2, dt, n, *idx, *param);
+      const int size = idx_list.size();
+#pragma omp parallel
+      {
+#pragma omp for nowait
+	for (int idx = 0; idx < size; idx++) {
+	  update(inplace_field, inplace_dim1, inplace_dim2, inplace_dim3,
+		 in_field1, in1_dim1, in1_dim2, in1_dim3,
+		 in_field2, in2_dim1, in2_dim2, in2_dim3,
+		 d1, d2, dt, n, idx_list[idx], param_list[idx]);
+	}
+
+	for (std::size_t r = 0; r < range_list.size(); r++)
+	  fill(inplace_field, inplace_dim1, inplace_dim2, inplace_dim3,
+	       range_list[r], range_param_list[r].value);
       }
     }
 
@@ -99,10 +128,55 @@ namespace gmes
       inplace_field(i,j,k) = const_param.value;
     }
 
+    void
+    fill(T* const inplace_field,
+	 int inplace_dim1, int inplace_dim2, int inplace_dim3,
+	 const IdxRange& range, const T& value) const
+    {
+#pragma omp for collapse(2) schedule(dynamic) nowait
+      for (int i = range.first[0]; i <= range.second[0]; i++)
+	for (int j = range.first[1]; j <= range.second[1]; j++)
+	  for (int k = range.first[2]; k <= range.second[2]; k++)
+	    inplace_field(i,j,k) = value;
+    }
+
   protected:
     using MaterialElectric<T>::position;
     using MaterialElectric<T>::idx_list;
+    using MaterialElectric<T>::range_position;
+    using MaterialElectric<T>::range_list;
     std::vector<ConstElectricParam<T> > param_list;
+    std::vector<ConstElectricParam<T> > range_param_list;
+
+    void
+    reorder(const std::vector<int>& perm)
+    {
+      permute(param_list, perm);
+    }
+
+    void
+    coalesce()
+    {
+      coalesce_ranges(range_list, range_param_list,
+		      [](const ConstElectricParam<T>& p1, const ConstElectricParam<T>& p2) {
+			return p1.eps_inf == p2.eps_inf && p1.value == p2.value;
+		      });
+    }
+
+    // Append range, or stack it onto the last range of the same value
+    // and medium.
+    void
+    push_range(const IdxRange& range, const ConstElectricParam<T>& const_param)
+    {
+      if (!range_list.empty() &&
+	  range_param_list.back().value == const_param.value &&
+	  range_param_list.back().eps_inf == const_param.eps_inf &&
+	  stack(range_list.back(), range))
+	return;
+
+      range_list.push_back(range);
+      range_param_list.push_back(const_param);
+    }
 
   private:
     static const std::string tag; // "ConstElectric"
@@ -142,10 +216,14 @@ namespace gmes
       Index3 index;
       std::copy(idx, idx + idx_size, index.begin());
       const int i = position(index);
-      if (i < 0)
+      if (i >= 0)
+	return param_list[i].mu_inf;
+
+      const int r = range_position(index);
+      if (r < 0)
 	return 0;
       else
-	return param_list[i].mu_inf;
+	return range_param_list[r].mu_inf;
     }
 
     PwMaterial<T>*
@@ -163,12 +241,29 @@ namespace gmes
       return this;
     }
 
+    // Attach the box [low, high] sharing a single parameter.
+    PwMaterial<T>*
+    attach_range(const int* const low, int low_size,
+		 const int* const high, int high_size,
+		 const PwMaterialParam* const pm_param_ptr)
+    {
+      IdxRange range;
+      std::copy(low, low + low_size, range.first.begin());
+      std::copy(high, high + high_size, range.second.begin());
+
+      push_range(range, *static_cast<const ConstMagneticParam<T>*>(pm_param_ptr));
+
+      return this;
+    }
+
     PwMaterial<T>*
     merge(const PwMaterial<T>* const pm_ptr)
     {
       auto const_ptr = static_cast<const ConstMagnetic<T>*>(pm_ptr);
       std::copy(const_ptr->idx_list.begin(), const_ptr->idx_list.end(), std::back_inserter(idx_list));
       std::copy(const_ptr->param_list.begin(), const_ptr->param_list.end(), std::back_inserter(param_list));
+      for (std::size_t n = 0; n < const_ptr->range_list.size(); n++)
+	push_range(const_ptr->range_list[n], const_ptr->range_param_list[n]);
       return this;
     }
 
@@ -181,12 +276,20 @@ namespace gmes
 	       int in2_dim1, int in2_dim2, int in2_dim3,
 	       double d1, double d2, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(inplace_field, inplace_dim1, inplace_dim2, inplace_dim3,
-    	       in_field1, in1_dim1, in1_dim2, in1_dim3,
-    	       in_field2, in2_dim1, in2_dim2, in2_dim3,
-    	       d1, d2, dt, n, *idx, *param);
+      const int size = idx_list.size();
+#pragma omp parallel
+      {
+#pragma omp for nowait
+	for (int idx = 0; idx < size; idx++) {
+	  update(inplace_field, inplace_dim1, inplace_dim2, inplace_dim3,
+		 in_field1, in1_dim1, in1_dim2, in1_dim3,
+		 in_field2, in2_dim1, in2_dim2, in2_dim3,
+		 d1, d2, dt, n, idx_list[idx], param_list[idx]);
+	}
+
+	for (std::size_t r = 0; r < range_list.size(); r++)
+	  fill(inplace_field, inplace_dim1, inplace_dim2, inplace_dim3,
+	       range_list[r], range_param_list[r].value);
       }
     }
 
@@ -204,10 +307,55 @@ namespace gmes
       inplace_field(i,j,k) = const_param.value;
     }
 
+    void
+    fill(T* const inplace_field,
+	 int inplace_dim1, int inplace_dim2, int inplace_dim3,
+	 const IdxRange& range, const T& value) const
+    {
+#pragma omp for collapse(2) schedule(dynamic) nowait
+      for (int i = range.first[0]; i <= range.second[0]; i++)
+	for (int j = range.first[1]; j <= range.second[1]; j++)
+	  for (int k = range.first[2]; k <= range.second[2]; k++)
+	    inplace_field(i,j,k) = value;
+    }
+
   protected:
     using MaterialMagnetic<T>::position;
     using MaterialMagnetic<T>::idx_list;
+    using MaterialMagnetic<T>::range_position;
+    using MaterialMagnetic<T>::range_list;
     std::vector<ConstMagneticParam<T> > param_list;
+    std::vector<ConstMagneticParam<T> > range_param_list;
+
+    void
+    reorder(const std::vector<int>& perm)
+    {
+      permute(param_list, perm);
+    }
+
+    void
+    coalesce()
+    {
+      coalesce_ranges(range_list, range_param_list,
+		      [](const ConstMagneticParam<T>& p1, const ConstMagneticParam<T>& p2) {
+			return p1.mu_inf == p2.mu_inf && p1.value == p2.value;
+		      });
+    }
+
+    // Append range, or stack it onto the last range of the same value
+    // and medium.
+    void
+    push_range(const IdxRange& range, const ConstMagneticParam<T>& const_param)
+    {
+      if (!range_list.empty() &&
+	  range_param_list.back().value == const_param.value &&
+	  range_param_list.back().mu_inf == const_param.mu_inf &&
+	  stack(range_list.back(), range))
+	return;
+
+      range_list.push_back(range);
+      range_param_list.push_back(const_param);
+    }
 
   private:
     static const std::string tag; // "ConstMagnetic"
@@ -12,12 +12,12 @@
 #include <utility>
 #include "pw_material.hh"
 
-#define ex(i,j,k) ex[ex_y_size==1?0:((i)*ex_y_size+(j))*ex_z_size+(k)]
-#define ey(i,j,k) ey[ey_z_size==1?0:((i)*ey_y_size+(j))*ey_z_size+(k)]
-#define ez(i,j,k) ez[ez_x_size==1?0:((i)*ez_y_size+(j))*ez_z_size+(k)]
-#define hx(i,j,k) hx[hx_y_size==1?0:((i)*hx_y_size+(j))*hx_z_size+(k)]
-#define hy(i,j,k) hy[hy_z_size==1?0:((i)*hy_y_size+(j))*hy_z_size+(k)]
-#define hz(i,j,k) hz[hz_x_size==1?0:((i)*hz_y_size+(j))*hz_z_size+(k)]
+#define ex(i,j,k) ex[ex_present?((i)*ex_y_size+(j))*ex_z_size+(k):0]
+#define ey(i,j,k) ey[ey_present?((i)*ey_y_size+(j))*ey_z_size+(k):0]
+#define ez(i,j,k) ez[ez_present?((i)*ez_y_size+(j))*ez_z_size+(k):0]
+#define hx(i,j,k) hx[hx_present?((i)*hx_y_size+(j))*hx_z_size+(k):0]
+#define hy(i,j,k) hy[hy_present?((i)*hy_y_size+(j))*hy_z_size+(k):0]
+#define hz(i,j,k) hz[hz_present?((i)*hz_y_size+(j))*hz_z_size+(k):0]
 
 namespace gmes
 {
@@ -54,7 +54,7 @@ namespace gmes
       if (i < 0)
 	return 0;
       else
-	return param_list[i].eps_inf;
+	return coef_list[coef_idx[i]].eps_inf;
     }
 
     PwMaterial<T>*
@@ -67,7 +67,9 @@ namespace gmes
       const auto& cpml_param = *static_cast<const CpmlElectricParam<T>*>(pm_param_ptr);
 
       idx_list.push_back(index);
-      param_list.push_back(cpml_param);
+      coef_idx.push_back(intern(coef_list, cpml_param, same_coef));
+      psi1.push_back(cpml_param.psi1);
+      psi2.push_back(cpml_param.psi2);
 
       return this;
     }
@@ -77,14 +79,44 @@ namespace gmes
     {
       auto cpml_ptr = static_cast<const CpmlElectric<T>*>(pm_ptr);
       std::copy(cpml_ptr->idx_list.begin(), cpml_ptr->idx_list.end(), std::back_inserter(idx_list));
-      std::copy(cpml_ptr->param_list.begin(), cpml_ptr->param_list.end(), std::back_inserter(param_list));
+
+      std::vector<int> coef_map;
+      for (auto c = cpml_ptr->coef_list.begin(); c != cpml_ptr->coef_list.end(); ++c)
+	coef_map.push_back(intern(coef_list, *c, same_coef));
+      for (auto c = cpml_ptr->coef_idx.begin(); c != cpml_ptr->coef_idx.end(); ++c)
+	coef_idx.push_back(coef_map[*c]);
+
+      std::copy(cpml_ptr->psi1.begin(), cpml_ptr->psi1.end(), std::back_inserter(psi1));
+      std::copy(cpml_ptr->psi2.begin(), cpml_ptr->psi2.end(), std::back_inserter(psi2));
       return this;
     }
 
   protected:
     using MaterialElectric<T>::position;
     using MaterialElectric<T>::idx_list;
-    std::vector<CpmlElectricParam<T> > param_list;
+
+    // The points of a layer share their coefficients, which are
+    // stored once. The states of coef_list are not used.
+    std::vector<CpmlElectricParam<T> > coef_list;
+    std::vector<int> coef_idx;
+    std::vector<T> psi1, psi2;
+
+    static bool
+    same_coef(const CpmlElectricParam<T>& p1, const CpmlElectricParam<T>& p2)
+    {
+      return (p1.eps_inf == p2.eps_inf && 
+	      p1.b1 == p2.b1 && p1.b2 == p2.b2 && 
+	      p1.c1 == p2.c1 && p1.c2 == p2.c2 &&
+	      p1.kappa1 == p2.kappa1 && p1.kappa2 == p2.kappa2);
+    }
+
+    void
+    reorder(const std::vector<int>& perm)
+    {
+      permute(coef_idx, perm);
+      permute(psi1, perm);
+      permute(psi2, perm);
+    }
 
   private:
     static const std::string tag; // "CpmlElectric"
@@ -103,23 +135,40 @@ namespace gmes
 	       const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
 	       double dy, double dz, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(ex, ex_x_size, ex_y_size, ex_z_size,
-	       hz, hz_x_size, hz_y_size, hz_z_size,
-	       hy, hy_x_size, hy_y_size, hy_z_size,
-	       dy, dz, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(hz_x_size != 1, hy_z_size != 1,
+		      (ex, ex_x_size, ex_y_size, ex_z_size,
+		       hz, hz_x_size, hz_y_size, hz_z_size,
+		       hy, hy_x_size, hy_y_size, hy_z_size,
+		       dy, dz, dt, n));
     }
 
   private:
+    template <bool ex_present, bool hz_present, bool hy_present>
+    void
+    sweep(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	  const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  double dy, double dz, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+    	update<ex_present, hz_present, hy_present>
+    	  (ex, ex_x_size, ex_y_size, ex_z_size,
+	   hz, hz_x_size, hz_y_size, hz_z_size,
+	   hy, hy_x_size, hy_y_size, hy_z_size,
+	   dy, dz, dt, n, idx_list[idx], coef_list[coef_idx[idx]], idx);
+      }
+    }
+
+    template <bool ex_present, bool hz_present, bool hy_present>
     void 
     update(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
 	   const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
 	   const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
 	   double dy, double dz, double dt, double n,
 	   const Index3& idx,
-	   CpmlElectricParam<T>& cpml_param) const
+	   const CpmlElectricParam<T>& cpml_param, int point)
     {
       const int i = idx[0], j = idx[1], k = idx[2];
 
@@ -130,8 +179,8 @@ namespace gmes
       const double cz = cpml_param.c2;
       const double kappay = cpml_param.kappa1;
       const double kappaz = cpml_param.kappa2;
-      T& psi1 = cpml_param.psi1;
-      T& psi2 = cpml_param.psi2;
+      T& psi1 = this->psi1[point];
+      T& psi2 = this->psi2[point];
 
       psi1 = by * psi1 + cy * (hz(i+1,j+1,k) - hz(i+1,j,k)) / dy;
       psi2 = bz * psi2 + cz * (hy(i+1,j,k+1) - hy(i+1,j,k)) / dz;
@@ -143,7 +192,8 @@ namespace gmes
 
   protected:
     using CpmlElectric<T>::idx_list;
-    using CpmlElectric<T>::param_list;
+    using CpmlElectric<T>::coef_list;
+    using CpmlElectric<T>::coef_idx;
   }; // template CpmlEx
 
   template <typename T> 
@@ -156,23 +206,40 @@ namespace gmes
 	       const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
 	       double dz, double dx, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(ey, ey_x_size, ey_y_size, ey_z_size,
-	       hx, hx_x_size, hx_y_size, hx_z_size,
-	       hz, hz_x_size, hz_y_size, hz_z_size,
-	       dz, dx, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(hx_y_size != 1, hz_x_size != 1,
+		      (ey, ey_x_size, ey_y_size, ey_z_size,
+		       hx, hx_x_size, hx_y_size, hx_z_size,
+		       hz, hz_x_size, hz_y_size, hz_z_size,
+		       dz, dx, dt, n));
     }
 
   private:
+    template <bool ey_present, bool hx_present, bool hz_present>
+    void
+    sweep(T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	  const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  double dz, double dx, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+    	update<ey_present, hx_present, hz_present>
+    	  (ey, ey_x_size, ey_y_size, ey_z_size,
+	   hx, hx_x_size, hx_y_size, hx_z_size,
+	   hz, hz_x_size, hz_y_size, hz_z_size,
+	   dz, dx, dt, n, idx_list[idx], coef_list[coef_idx[idx]], idx);
+      }
+    }
+
+    template <bool ey_present, bool hx_present, bool hz_present>
     void 
     update(T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
 	   const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
 	   const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
 	   double dz, double dx, double dt, double n,
 	   const Index3& idx,
-	   CpmlElectricParam<T>& cpml_param) const
+	   const CpmlElectricParam<T>& cpml_param, int point)
     {
       const int i = idx[0], j = idx[1], k = idx[2];
 
@@ -183,8 +250,8 @@ namespace gmes
       const double cx = cpml_param.c2;
       const double kappaz = cpml_param.kappa1;
       const double kappax = cpml_param.kappa2;
-      T& psi1 = cpml_param.psi1;
-      T& psi2 = cpml_param.psi2;
+      T& psi1 = this->psi1[point];
+      T& psi2 = this->psi2[point];
 
       psi1 = bz * psi1 + cz * (hx(i,j+1,k+1) - hx(i,j+1,k)) / dz;
       psi2 = bx * psi2 + cx * (hz(i+1,j+1,k) - hz(i,j+1,k)) / dx;
@@ -196,7 +263,8 @@ namespace gmes
 
   protected:
     using CpmlElectric<T>::idx_list;
-    using CpmlElectric<T>::param_list;
+    using CpmlElectric<T>::coef_list;
+    using CpmlElectric<T>::coef_idx;
   }; // template CpmlEy
 
   template <typename T> 
@@ -209,23 +277,40 @@ namespace gmes
 	       const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
 	       double dx, double dy, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-	update(ez, ez_x_size, ez_y_size, ez_z_size,
-	       hy, hy_x_size, hy_y_size, hy_z_size,
-	       hx, hx_x_size, hx_y_size, hx_z_size,
-	       dx, dy, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(hy_z_size != 1, hx_y_size != 1,
+		      (ez, ez_x_size, ez_y_size, ez_z_size,
+		       hy, hy_x_size, hy_y_size, hy_z_size,
+		       hx, hx_x_size, hx_y_size, hx_z_size,
+		       dx, dy, dt, n));
     }
-    
+
   private:
+    template <bool ez_present, bool hy_present, bool hx_present>
+    void
+    sweep(T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	  const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  double dx, double dy, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+	update<ez_present, hy_present, hx_present>
+	  (ez, ez_x_size, ez_y_size, ez_z_size,
+	   hy, hy_x_size, hy_y_size, hy_z_size,
+	   hx, hx_x_size, hx_y_size, hx_z_size,
+	   dx, dy, dt, n, idx_list[idx], coef_list[coef_idx[idx]], idx);
+      }
+    }
+
+    template <bool ez_present, bool hy_present, bool hx_present>
     void 
     update(T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
 	   const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
 	   const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
 	   double dx, double dy, double dt, double n,
 	   const Index3& idx,
-	   CpmlElectricParam<T>& cpml_param) const
+	   const CpmlElectricParam<T>& cpml_param, int point)
     {
       const int i = idx[0], j = idx[1], k = idx[2];
 
@@ -236,8 +321,8 @@ namespace gmes
       const double cy = cpml_param.c2;
       const double kappax = cpml_param.kappa1;
       const double kappay = cpml_param.kappa2;
-      T& psi1 = cpml_param.psi1;
-      T& psi2 = cpml_param.psi2;
+      T& psi1 = this->psi1[point];
+      T& psi2 = this->psi2[point];
 
       psi1 = bx * psi1 + cx * (hy(i+1,j,k+1) - hy(i,j,k+1)) / dx;
       psi2 = by * psi2 + cy * (hx(i,j+1,k+1) - hx(i,j,k+1)) / dy;
@@ -249,7 +334,8 @@ namespace gmes
 
   protected:
     using CpmlElectric<T>::idx_list;
-    using CpmlElectric<T>::param_list;
+    using CpmlElectric<T>::coef_list;
+    using CpmlElectric<T>::coef_idx;
   }; // template CpmlEz
 
   template <typename T>
@@ -271,7 +357,7 @@ namespace gmes
       if (i < 0)
 	return 0;
       else
-	return param_list[i].mu_inf;
+	return coef_list[coef_idx[i]].mu_inf;
     }
 
     PwMaterial<T>*
@@ -284,7 +370,9 @@ namespace gmes
       const auto& cpml_param = *static_cast<const CpmlMagneticParam<T>*>(pm_param_ptr);
       
       idx_list.push_back(index);
-      param_list.push_back(cpml_param);
+      coef_idx.push_back(intern(coef_list, cpml_param, same_coef));
+      psi1.push_back(cpml_param.psi1);
+      psi2.push_back(cpml_param.psi2);
 
       return this;
     }
@@ -294,14 +382,44 @@ namespace gmes
     {
       auto cpml_ptr = static_cast<const CpmlMagnetic<T>*>(pm_ptr);
       std::copy(cpml_ptr->idx_list.begin(), cpml_ptr->idx_list.end(), std::back_inserter(idx_list));
-      std::copy(cpml_ptr->param_list.begin(), cpml_ptr->param_list.end(), std::back_inserter(param_list));
+
+      std::vector<int> coef_map;
+      for (auto c = cpml_ptr->coef_list.begin(); c != cpml_ptr->coef_list.end(); ++c)
+	coef_map.push_back(intern(coef_list, *c, same_coef));
+      for (auto c = cpml_ptr->coef_idx.begin(); c != cpml_ptr->coef_idx.end(); ++c)
+	coef_idx.push_back(coef_map[*c]);
+
+      std::copy(cpml_ptr->psi1.begin(), cpml_ptr->psi1.end(), std::back_inserter(psi1));
+      std::copy(cpml_ptr->psi2.begin(), cpml_ptr->psi2.end(), std::back_inserter(psi2));
       return this;
     }
 
   protected:
     using MaterialMagnetic<T>::position;
     using PwMaterial<T>::idx_list;
-    std::vector<CpmlMagneticParam<T> > param_list;
+
+    // The points of a layer share their coefficients, which are
+    // stored once. The states of coef_list are not used.
+    std::vector<CpmlMagneticParam<T> > coef_list;
+    std::vector<int> coef_idx;
+    std::vector<T> psi1, psi2;
+
+    static bool
+    same_coef(const CpmlMagneticParam<T>& p1, const CpmlMagneticParam<T>& p2)
+    {
+      return (p1.mu_inf == p2.mu_inf && 
+	      p1.b1 == p2.b1 && p1.b2 == p2.b2 && 
+	      p1.c1 == p2.c1 && p1.c2 == p2.c2 &&
+	      p1.kappa1 == p2.kappa1 && p1.kappa2 == p2.kappa2);
+    }
+
+    void
+    reorder(const std::vector<int>& perm)
+    {
+      permute(coef_idx, perm);
+      permute(psi1, perm);
+      permute(psi2, perm);
+    }
 
   private:
     static const std::string tag; // "CpmlMagnetic"
@@ -320,23 +438,40 @@ namespace gmes
 	       const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
 	       double dy, double dz, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(hx, hx_x_size, hx_y_size, hx_z_size,
-	       ez, ez_x_size, ez_y_size, ez_z_size,
-	       ey, ey_x_size, ey_y_size, ey_z_size,
-	       dy, dz, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(ez_x_size != 1, ey_z_size != 1,
+		      (hx, hx_x_size, hx_y_size, hx_z_size,
+		       ez, ez_x_size, ez_y_size, ez_z_size,
+		       ey, ey_x_size, ey_y_size, ey_z_size,
+		       dy, dz, dt, n));
     }
 
   private:
+    template <bool hx_present, bool ez_present, bool ey_present>
+    void
+    sweep(T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	  const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	  double dy, double dz, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+    	update<hx_present, ez_present, ey_present>
+    	  (hx, hx_x_size, hx_y_size, hx_z_size,
+	   ez, ez_x_size, ez_y_size, ez_z_size,
+	   ey, ey_x_size, ey_y_size, ey_z_size,
+	   dy, dz, dt, n, idx_list[idx], coef_list[coef_idx[idx]], idx);
+      }
+    }
+
+    template <bool hx_present, bool ez_present, bool ey_present>
     void 
     update(T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
 	   const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
 	   const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
 	   double dy, double dz, double dt, double n,
 	   const Index3& idx,
-	   CpmlMagneticParam<T>& cpml_param) const
+	   const CpmlMagneticParam<T>& cpml_param, int point)
     {
       const int i = idx[0], j = idx[1], k = idx[2];
 
@@ -347,8 +482,8 @@ namespace gmes
       const double cz = cpml_param.c2;
       const double kappay = cpml_param.kappa1;
       const double kappaz = cpml_param.kappa2;
-      T& psi1 = cpml_param.psi1;
-      T& psi2 = cpml_param.psi2;
+      T& psi1 = this->psi1[point];
+      T& psi2 = this->psi2[point];
 
       psi1 = by * psi1 + cy * (ez(i,j,k-1) - ez(i,j-1,k-1)) / dy;
       psi2 = bz * psi2 + cz * (ey(i,j-1,k) - ey(i,j-1,k-1)) / dz;
@@ -360,7 +495,8 @@ namespace gmes
 
   protected:
     using CpmlMagnetic<T>::idx_list;
-    using CpmlMagnetic<T>::param_list;
+    using CpmlMagnetic<T>::coef_list;
+    using CpmlMagnetic<T>::coef_idx;
   }; // template CpmlHx
 
   template <typename T> 
@@ -373,23 +509,40 @@ namespace gmes
 	       const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
 	       double dz, double dx, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(hy, hy_x_size, hy_y_size, hy_z_size,
-	       ex, ex_x_size, ex_y_size, ex_z_size,
-	       ez, ez_x_size, ez_y_size, ez_z_size,
-	       dz, dx, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(ex_y_size != 1, ez_x_size != 1,
+		      (hy, hy_x_size, hy_y_size, hy_z_size,
+		       ex, ex_x_size, ex_y_size, ex_z_size,
+		       ez, ez_x_size, ez_y_size, ez_z_size,
+		       dz, dx, dt, n));
     }
 
   private:
+    template <bool hy_present, bool ex_present, bool ez_present>
+    void
+    sweep(T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	  const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	  double dz, double dx, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+    	update<hy_present, ex_present, ez_present>
+    	  (hy, hy_x_size, hy_y_size, hy_z_size,
+	   ex, ex_x_size, ex_y_size, ex_z_size,
+	   ez, ez_x_size, ez_y_size, ez_z_size,
+	   dz, dx, dt, n, idx_list[idx], coef_list[coef_idx[idx]], idx);
+      }
+    }
+
+    template <bool hy_present, bool ex_present, bool ez_present>
     void 
     update(T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
 	   const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
 	   const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
 	   double dz, double dx, double dt, double n,
 	   const Index3& idx,
-	   CpmlMagneticParam<T>& cpml_param) const
+	   const CpmlMagneticParam<T>& cpml_param, int point)
     {
       const int i = idx[0], j = idx[1], k = idx[2];
 
@@ -400,8 +553,8 @@ namespace gmes
       const double cx = cpml_param.c2;
       const double kappaz = cpml_param.kappa1;
       const double kappax = cpml_param.kappa2;
-      T& psi1 = cpml_param.psi1;
-      T& psi2 = cpml_param.psi2;
+      T& psi1 = this->psi1[point];
+      T& psi2 = this->psi2[point];
 
       psi1 = bz * psi1 + cz * (ex(i-1,j,k) - ex(i-1,j,k-1)) / dz;
       psi2 = bx * psi2 + cx * (ez(i,j,k-1) - ez(i-1,j,k-1)) / dx;
@@ -413,7 +566,8 @@ namespace gmes
 
   protected:
     using CpmlMagnetic<T>::idx_list;
-    using CpmlMagnetic<T>::param_list;
+    using CpmlMagnetic<T>::coef_list;
+    using CpmlMagnetic<T>::coef_idx;
   }; // template CpmlHy
 
   template <typename T> class CpmlHz: public CpmlMagnetic<T>
@@ -425,23 +579,40 @@ namespace gmes
 	       const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
 	       double dx, double dy, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(hz, hz_x_size, hz_y_size, hz_z_size,
-	       ey, ey_x_size, ey_y_size, ey_z_size,
-	       ex, ex_x_size, ex_y_size, ex_z_size,
-	       dx, dy, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(ey_z_size != 1, ex_y_size != 1,
+		      (hz, hz_x_size, hz_y_size, hz_z_size,
+		       ey, ey_x_size, ey_y_size, ey_z_size,
+		       ex, ex_x_size, ex_y_size, ex_z_size,
+		       dx, dy, dt, n));
     }
 
   private:
+    template <bool hz_present, bool ey_present, bool ex_present>
+    void
+    sweep(T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	  const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	  double dx, double dy, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+    	update<hz_present, ey_present, ex_present>
+    	  (hz, hz_x_size, hz_y_size, hz_z_size,
+	   ey, ey_x_size, ey_y_size, ey_z_size,
+	   ex, ex_x_size, ex_y_size, ex_z_size,
+	   dx, dy, dt, n, idx_list[idx], coef_list[coef_idx[idx]], idx);
+      }
+    }
+
+    template <bool hz_present, bool ey_present, bool ex_present>
     void 
     update(T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
 	   const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
 	   const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
 	   double dx, double dy, double dt, double n,
 	   const Index3& idx,
-	   CpmlMagneticParam<T>& cpml_param) const
+	   const CpmlMagneticParam<T>& cpml_param, int point)
     {
       const int i = idx[0], j = idx[1], k = idx[2];
 
@@ -452,8 +623,8 @@ namespace gmes
       const double cy = cpml_param.c2;
       const double kappax = cpml_param.kappa1;
       const double kappay = cpml_param.kappa2;
-      T& psi1 = cpml_param.psi1;
-      T& psi2 = cpml_param.psi2;
+      T& psi1 = this->psi1[point];
+      T& psi2 = this->psi2[point];
 
       psi1 = bx * psi1 + cx * (ey(i,j-1,k) - ey(i-1,j-1,k)) / dx;
       psi2 = by * psi2 + cy * (ex(i-1,j,k) - ex(i-1,j-1,k)) / dy;
@@ -465,7 +636,8 @@ namespace gmes
 
   protected:
     using CpmlMagnetic<T>::idx_list;
-    using CpmlMagnetic<T>::param_list;
+    using CpmlMagnetic<T>::coef_list;
+    using CpmlMagnetic<T>::coef_idx;
   }; // template CpmlHz
 } // namespace gmes
 
@@ -0,0 +1 @@
+#include "pw_cpml_slab.hh"
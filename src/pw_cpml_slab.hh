@@ -0,0 +1,977 @@
+/* Slab engine of the CPML.
+ *
+ * The CPML cells are kept as boxes whose coefficients vary only along
+ * the axes of the two spatial derivatives of the updated component.
+ * Each box stores the 1-D b, c, and kappa profiles along those axes,
+ * and the auxiliary variable psi only for the graded directions. The
+ * faces of the PML thus carry one psi array, and the edges and the 
+ * corners two. See pw_cpml.hh for the update equations.
+ */
+
+#ifndef PW_CPML_SLAB_HH_
+#define PW_CPML_SLAB_HH_
+
+#include <type_traits>
+#include "pw_material.hh"
+
+#define ex(i,j,k) ex[ex_present?((i)*ex_y_size+(j))*ex_z_size+(k):0]
+#define ey(i,j,k) ey[ey_present?((i)*ey_y_size+(j))*ey_z_size+(k):0]
+#define ez(i,j,k) ez[ez_present?((i)*ez_y_size+(j))*ez_z_size+(k):0]
+#define hx(i,j,k) hx[hx_present?((i)*hx_y_size+(j))*hx_z_size+(k):0]
+#define hy(i,j,k) hy[hy_present?((i)*hy_y_size+(j))*hy_z_size+(k):0]
+#define hz(i,j,k) hz[hz_present?((i)*hz_y_size+(j))*hz_z_size+(k):0]
+
+// Run the statement with graded1 and graded2, std::true_type or 
+// std::false_type objects telling whether the two directions of the
+// slab are graded. The psi updates of the kernels are then compiled
+// out where they are not needed.
+#define BY_GRADING(g1, g2, ...)						\
+  if (g1) {								\
+    const std::true_type graded1;					\
+    if (g2) { const std::true_type graded2; __VA_ARGS__; }		\
+    else { const std::false_type graded2; __VA_ARGS__; }		\
+  } else {								\
+    const std::false_type graded1;					\
+    if (g2) { const std::true_type graded2; __VA_ARGS__; }		\
+    else { const std::false_type graded2; __VA_ARGS__; }		\
+  }
+
+namespace gmes
+{
+  // b, c, and kappa of the two directions, indexed by the position in
+  // the box along the axis of the direction. The profiles of a 
+  // direction which is not graded, i.e., c = 0 and kappa = 1, are 
+  // empty.
+  template <typename T> 
+  struct CpmlSlabElectricParam: public ElectricParam<T>
+  {
+    std::vector<double> b1, c1, kappa1, b2, c2, kappa2;
+  }; // template CpmlSlabElectricParam
+  
+  template <typename T> 
+  struct CpmlSlabMagneticParam: public MagneticParam<T>
+  {
+    std::vector<double> b1, c1, kappa1, b2, c2, kappa2;
+  }; // template CpmlSlabMagneticParam
+
+#ifndef SWIG
+  template <typename T, typename Param>
+  struct CpmlSlab
+  {
+    Param param;
+    std::vector<T> psi1, psi2;
+  }; // template CpmlSlab
+
+  // Copy the cell values of the box from into the array of the box
+  // to, which covers it.
+  template <typename S>
+  void
+  paste(std::vector<S>& to_list, const IdxRange& to,
+	const std::vector<S>& from_list, const IdxRange& from)
+  {
+    const int y_size = to.second[1] - to.first[1] + 1;
+    const int z_size = to.second[2] - to.first[2] + 1;
+    auto value = from_list.begin();
+    for (int i = from.first[0]; i <= from.second[0]; i++)
+      for (int j = from.first[1]; j <= from.second[1]; j++)
+	for (int k = from.first[2]; k <= from.second[2]; k++)
+	  to_list[((i - to.first[0]) * y_size + 
+		   j - to.first[1]) * z_size + k - to.first[2]] = *value++;
+  }
+
+  // Whether the profile p of a direction along p_axis allows the 
+  // boxes to be joined along axis. Along p_axis the profiles are 
+  // concatenated, otherwise they must be the same.
+  inline bool
+  joinable(const std::vector<double>& p, const std::vector<double>& next_p,
+	   int p_axis, int axis)
+  {
+    if (p_axis == axis)
+      return p.empty() == next_p.empty();
+    else
+      return p == next_p;
+  }
+
+  inline void
+  join(std::vector<double>& p, const std::vector<double>& next_p,
+       int p_axis, int axis)
+  {
+    if (p_axis == axis)
+      p.insert(p.end(), next_p.begin(), next_p.end());
+  }
+
+  template <typename T>
+  void
+  join(std::vector<T>& psi, const IdxRange& range, 
+       const std::vector<T>& next_psi, const IdxRange& next_range,
+       const IdxRange& joined)
+  {
+    if (psi.empty())
+      return;
+
+    std::vector<T> tmp(volume(joined));
+    paste(tmp, joined, psi, range);
+    paste(tmp, joined, next_psi, next_range);
+    psi.swap(tmp);
+  }
+
+  // Grow the slab at range to cover the next one, if it continues the
+  // slab along axis and the coefficients allow it. The directions of
+  // the slabs are along axis1 and axis2.
+  template <typename T, typename Param, typename SameInf>
+  bool
+  join_slab(IdxRange& range, CpmlSlab<T, Param>& slab,
+	    const IdxRange& next_range, const CpmlSlab<T, Param>& next,
+	    int axis, int axis1, int axis2, SameInf same_inf)
+  {
+    const Param& p = slab.param;
+    const Param& q = next.param;
+    if (!(adjacent(range, next_range, axis) && same_inf(p, q) &&
+	  joinable(p.b1, q.b1, axis1, axis) && 
+	  joinable(p.c1, q.c1, axis1, axis) &&
+	  joinable(p.kappa1, q.kappa1, axis1, axis) &&
+	  joinable(p.b2, q.b2, axis2, axis) && 
+	  joinable(p.c2, q.c2, axis2, axis) &&
+	  joinable(p.kappa2, q.kappa2, axis2, axis)))
+      return false;
+
+    IdxRange joined = range;
+    joined.second[axis] = next_range.second[axis];
+    join(slab.psi1, range, next.psi1, next_range, joined);
+    join(slab.psi2, range, next.psi2, next_range, joined);
+
+    Param& r = slab.param;
+    join(r.b1, q.b1, axis1, axis);
+    join(r.c1, q.c1, axis1, axis);
+    join(r.kappa1, q.kappa1, axis1, axis);
+    join(r.b2, q.b2, axis2, axis);
+    join(r.c2, q.c2, axis2, axis);
+    join(r.kappa2, q.kappa2, axis2, axis);
+
+    range = joined;
+    return true;
+  }
+
+  // Join the slabs along the z, y, and then x axis. The directions of
+  // the slabs are along axis1 and axis2.
+  template <typename T, typename Param, typename SameInf>
+  void
+  coalesce_slabs(RangeCnt& range_list, std::vector<CpmlSlab<T, Param> >& slab_list,
+		 int axis1, int axis2, SameInf same_inf)
+  {
+    coalesce_boxes(range_list, slab_list,
+		   [axis1, axis2, same_inf](IdxRange& range, CpmlSlab<T, Param>& slab,
+					    const IdxRange& next_range,
+					    const CpmlSlab<T, Param>& next,
+					    int axis) {
+		     return join_slab(range, slab, next_range, next,
+				      axis, axis1, axis2, same_inf);
+		   });
+  }
+#endif // SWIG
+
+  template <typename T> 
+  class CpmlSlabElectric: public MaterialElectric<T>
+  {
+  public:
+    const std::string& 
+    name() const
+    {
+      return CpmlSlabElectric<T>::tag;
+    }
+
+    double
+    get_eps_inf(const int* const idx, int idx_size) const
+    {
+      Index3 index;
+      std::copy(idx, idx + idx_size, index.begin());
+      const int r = range_position(index);
+      if (r < 0)
+	return 0;
+      else
+	return slab_list[r].param.eps_inf;
+    }
+
+    PwMaterial<T>*
+    attach(const int* const idx, int idx_size, 
+	   const PwMaterialParam* const pm_param_ptr)
+    {
+      return attach_range(idx, idx_size, idx, idx_size, pm_param_ptr);
+    }
+
+    // Attach the box [low, high]. The profiles of the parameter span 
+    // the box along the axes of the directions. psi starts from zero.
+    PwMaterial<T>*
+    attach_range(const int* const low, int low_size,
+		 const int* const high, int high_size,
+		 const PwMaterialParam* const pm_param_ptr)
+    {
+      IdxRange range;
+      std::copy(low, low + low_size, range.first.begin());
+      std::copy(high, high + high_size, range.second.begin());
+
+      CpmlSlab<T, CpmlSlabElectricParam<T> > slab;
+      slab.param = *static_cast<const CpmlSlabElectricParam<T>*>(pm_param_ptr);
+      if (!slab.param.c1.empty())
+	slab.psi1.resize(volume(range), T(0));
+      if (!slab.param.c2.empty())
+	slab.psi2.resize(volume(range), T(0));
+
+      push_back(range, slab);
+      return this;
+    }
+
+    PwMaterial<T>*
+    merge(const PwMaterial<T>* const pm_ptr)
+    {
+      auto cpml_ptr = static_cast<const CpmlSlabElectric<T>*>(pm_ptr);
+      for (std::size_t n = 0; n < cpml_ptr->range_list.size(); n++)
+	push_back(cpml_ptr->range_list[n], cpml_ptr->slab_list[n]);
+      return this;
+    }
+
+  protected:
+    CpmlSlabElectric(int axis1, int axis2): 
+      axis1(axis1), axis2(axis2)
+    {
+    }
+
+    using MaterialElectric<T>::range_position;
+    using MaterialElectric<T>::range_list;
+
+    std::vector<CpmlSlab<T, CpmlSlabElectricParam<T> > > slab_list;
+
+    // The axes of the two directions.
+    const int axis1, axis2;
+
+    static bool
+    same_inf(const CpmlSlabElectricParam<T>& p1, const CpmlSlabElectricParam<T>& p2)
+    {
+      return p1.eps_inf == p2.eps_inf;
+    }
+
+    // Append the slab, or join it to the last one.
+    void
+    push_back(const IdxRange& range, 
+	      const CpmlSlab<T, CpmlSlabElectricParam<T> >& slab)
+    {
+      if (!range_list.empty())
+	for (int axis = 0; axis < 3; axis++)
+	  if (join_slab(range_list.back(), slab_list.back(), range, slab,
+			axis, axis1, axis2, same_inf))
+	    return;
+
+      range_list.push_back(range);
+      slab_list.push_back(slab);
+    }
+
+    void
+    reorder(const std::vector<int>& perm)
+    {
+    }
+
+    void
+    coalesce()
+    {
+      coalesce_slabs(range_list, slab_list, axis1, axis2, same_inf);
+    }
+
+  private:
+    static const std::string tag; // "CpmlSlabElectric"
+  }; // template CpmlSlabElectric
+
+  template <typename T>
+  const std::string CpmlSlabElectric<T>::tag = "CpmlSlabElectric";
+
+  template <typename T> 
+  class CpmlSlabEx: public CpmlSlabElectric<T>
+  {
+  public:
+    CpmlSlabEx(): 
+      CpmlSlabElectric<T>(1, 2)
+    {
+    }
+
+    void
+    update_all(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	       const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	       const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	       double dy, double dz, double dt, double n)
+    {
+      SWEEP_BY_LAYOUT(hz_x_size != 1, hy_z_size != 1,
+		      (ex, ex_x_size, ex_y_size, ex_z_size,
+		       hz, hz_x_size, hz_y_size, hz_z_size,
+		       hy, hy_x_size, hy_y_size, hy_z_size,
+		       dy, dz, dt, n));
+    }
+
+  private:
+    template <bool ex_present, bool hz_present, bool hy_present>
+    void
+    sweep(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	  const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  double dy, double dz, double dt, double n)
+    {
+      for (std::size_t s = 0; s < slab_list.size(); s++) {
+	auto& slab = slab_list[s];
+	BY_GRADING(!slab.param.c1.empty(), !slab.param.c2.empty(),
+		   update_slab<ex_present, hz_present, hy_present>
+		   (ex, ex_x_size, ex_y_size, ex_z_size,
+		    hz, hz_x_size, hz_y_size, hz_z_size,
+		    hy, hy_x_size, hy_y_size, hy_z_size,
+		    dy, dz, dt, n, range_list[s], slab, graded1, graded2));
+      }
+    }
+
+    template <bool ex_present, bool hz_present, bool hy_present, 
+	      bool g1, bool g2>
+    void
+    update_slab(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+		const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+		const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+		double dy, double dz, double dt, double n,
+		const IdxRange& range, 
+		CpmlSlab<T, CpmlSlabElectricParam<T> >& slab,
+		std::integral_constant<bool, g1>, 
+		std::integral_constant<bool, g2>)
+    {
+      const int i0 = range.first[0], j0 = range.first[1], k0 = range.first[2];
+      const int y_size = range.second[1] - j0 + 1;
+      const int z_size = range.second[2] - k0 + 1;
+
+      const double coef = dt / slab.param.eps_inf;
+      const double* const by = slab.param.b1.data();
+      const double* const bz = slab.param.b2.data();
+      const double* const cy = slab.param.c1.data();
+      const double* const cz = slab.param.c2.data();
+      const double* const kappay = slab.param.kappa1.data();
+      const double* const kappaz = slab.param.kappa2.data();
+      T* const psi1 = slab.psi1.data();
+      T* const psi2 = slab.psi2.data();
+
+#pragma omp parallel for
+      for (int i = i0; i <= range.second[0]; i++)
+	for (int j = j0; j <= range.second[1]; j++)
+	  for (int k = k0; k <= range.second[2]; k++) {
+	    const int cell = ((i - i0) * y_size + j - j0) * z_size + k - k0;
+	    const T diff1 = hz(i+1,j+1,k) - hz(i+1,j,k);
+	    const T diff2 = hy(i+1,j,k+1) - hy(i+1,j,k);
+
+	    T curl = ((g1 ? diff1 / dy / kappay[j - j0] : diff1 / dy) - 
+		      (g2 ? diff2 / dz / kappaz[k - k0] : diff2 / dz));
+	    if (g1) {
+	      psi1[cell] = by[j - j0] * psi1[cell] + cy[j - j0] * diff1 / dy;
+	      curl += psi1[cell];
+	    }
+	    if (g2) {
+	      psi2[cell] = bz[k - k0] * psi2[cell] + cz[k - k0] * diff2 / dz;
+	      curl -= psi2[cell];
+	    }
+
+	    ex(i,j,k) += coef * curl;
+	  }
+    }
+
+  protected:
+    using CpmlSlabElectric<T>::range_list;
+    using CpmlSlabElectric<T>::slab_list;
+  }; // template CpmlSlabEx
+
+  template <typename T> 
+  class CpmlSlabEy: public CpmlSlabElectric<T>
+  {
+  public:
+    CpmlSlabEy(): 
+      CpmlSlabElectric<T>(2, 0)
+    {
+    }
+
+    void
+    update_all(T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	       const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	       const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	       double dz, double dx, double dt, double n)
+    {
+      SWEEP_BY_LAYOUT(hx_y_size != 1, hz_x_size != 1,
+		      (ey, ey_x_size, ey_y_size, ey_z_size,
+		       hx, hx_x_size, hx_y_size, hx_z_size,
+		       hz, hz_x_size, hz_y_size, hz_z_size,
+		       dz, dx, dt, n));
+    }
+
+  private:
+    template <bool ey_present, bool hx_present, bool hz_present>
+    void
+    sweep(T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	  const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  double dz, double dx, double dt, double n)
+    {
+      for (std::size_t s = 0; s < slab_list.size(); s++) {
+	auto& slab = slab_list[s];
+	BY_GRADING(!slab.param.c1.empty(), !slab.param.c2.empty(),
+		   update_slab<ey_present, hx_present, hz_present>
+		   (ey, ey_x_size, ey_y_size, ey_z_size,
+		    hx, hx_x_size, hx_y_size, hx_z_size,
+		    hz, hz_x_size, hz_y_size, hz_z_size,
+		    dz, dx, dt, n, range_list[s], slab, graded1, graded2));
+      }
+    }
+
+    template <bool ey_present, bool hx_present, bool hz_present, 
+	      bool g1, bool g2>
+    void
+    update_slab(T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+		const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+		const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+		double dz, double dx, double dt, double n,
+		const IdxRange& range, 
+		CpmlSlab<T, CpmlSlabElectricParam<T> >& slab,
+		std::integral_constant<bool, g1>, 
+		std::integral_constant<bool, g2>)
+    {
+      const int i0 = range.first[0], j0 = range.first[1], k0 = range.first[2];
+      const int y_size = range.second[1] - j0 + 1;
+      const int z_size = range.second[2] - k0 + 1;
+
+      const double coef = dt / slab.param.eps_inf;
+      const double* const bz = slab.param.b1.data();
+      const double* const bx = slab.param.b2.data();
+      const double* const cz = slab.param.c1.data();
+      const double* const cx = slab.param.c2.data();
+      const double* const kappaz = slab.param.kappa1.data();
+      const double* const kappax = slab.param.kappa2.data();
+      T* const psi1 = slab.psi1.data();
+      T* const psi2 = slab.psi2.data();
+
+#pragma omp parallel for
+      for (int i = i0; i <= range.second[0]; i++)
+	for (int j = j0; j <= range.second[1]; j++)
+	  for (int k = k0; k <= range.second[2]; k++) {
+	    const int cell = ((i - i0) * y_size + j - j0) * z_size + k - k0;
+	    const T diff1 = hx(i,j+1,k+1) - hx(i,j+1,k);
+	    const T diff2 = hz(i+1,j+1,k) - hz(i,j+1,k);
+
+	    T curl = ((g1 ? diff1 / dz / kappaz[k - k0] : diff1 / dz) - 
+		      (g2 ? diff2 / dx / kappax[i - i0] : diff2 / dx));
+	    if (g1) {
+	      psi1[cell] = bz[k - k0] * psi1[cell] + cz[k - k0] * diff1 / dz;
+	      curl += psi1[cell];
+	    }
+	    if (g2) {
+	      psi2[cell] = bx[i - i0] * psi2[cell] + cx[i - i0] * diff2 / dx;
+	      curl -= psi2[cell];
+	    }
+
+	    ey(i,j,k) += coef * curl;
+	  }
+    }
+
+  protected:
+    using CpmlSlabElectric<T>::range_list;
+    using CpmlSlabElectric<T>::slab_list;
+  }; // template CpmlSlabEy
+
+  template <typename T> 
+  class CpmlSlabEz: public CpmlSlabElectric<T>
+  {
+  public:
+    CpmlSlabEz(): 
+      CpmlSlabElectric<T>(0, 1)
+    {
+    }
+
+    void
+    update_all(T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	       const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	       const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	       double dx, double dy, double dt, double n)
+    {
+      SWEEP_BY_LAYOUT(hy_z_size != 1, hx_y_size != 1,
+		      (ez, ez_x_size, ez_y_size, ez_z_size,
+		       hy, hy_x_size, hy_y_size, hy_z_size,
+		       hx, hx_x_size, hx_y_size, hx_z_size,
+		       dx, dy, dt, n));
+    }
+
+  private:
+    template <bool ez_present, bool hy_present, bool hx_present>
+    void
+    sweep(T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	  const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  double dx, double dy, double dt, double n)
+    {
+      for (std::size_t s = 0; s < slab_list.size(); s++) {
+	auto& slab = slab_list[s];
+	BY_GRADING(!slab.param.c1.empty(), !slab.param.c2.empty(),
+		   update_slab<ez_present, hy_present, hx_present>
+		   (ez, ez_x_size, ez_y_size, ez_z_size,
+		    hy, hy_x_size, hy_y_size, hy_z_size,
+		    hx, hx_x_size, hx_y_size, hx_z_size,
+		    dx, dy, dt, n, range_list[s], slab, graded1, graded2));
+      }
+    }
+
+    template <bool ez_present, bool hy_present, bool hx_present, 
+	      bool g1, bool g2>
+    void
+    update_slab(T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+		const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+		const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+		double dx, double dy, double dt, double n,
+		const IdxRange& range, 
+		CpmlSlab<T, CpmlSlabElectricParam<T> >& slab,
+		std::integral_constant<bool, g1>, 
+		std::integral_constant<bool, g2>)
+    {
+      const int i0 = range.first[0], j0 = range.first[1], k0 = range.first[2];
+      const int y_size = range.second[1] - j0 + 1;
+      const int z_size = range.second[2] - k0 + 1;
+
+      const double coef = dt / slab.param.eps_inf;
+      const double* const bx = slab.param.b1.data();
+      const double* const by = slab.param.b2.data();
+      const double* const cx = slab.param.c1.data();
+      const double* const cy = slab.param.c2.data();
+      const double* const kappax = slab.param.kappa1.data();
+      const double* const kappay = slab.param.kappa2.data();
+      T* const psi1 = slab.psi1.data();
+      T* const psi2 = slab.psi2.data();
+
+#pragma omp parallel for
+      for (int i = i0; i <= range.second[0]; i++)
+	for (int j = j0; j <= range.second[1]; j++)
+	  for (int k = k0; k <= range.second[2]; k++) {
+	    const int cell = ((i - i0) * y_size + j - j0) * z_size + k - k0;
+	    const T diff1 = hy(i+1,j,k+1) - hy(i,j,k+1);
+	    const T diff2 = hx(i,j+1,k+1) - hx(i,j,k+1);
+
+	    T curl = ((g1 ? diff1 / dx / kappax[i - i0] : diff1 / dx) - 
+		      (g2 ? diff2 / dy / kappay[j - j0] : diff2 / dy));
+	    if (g1) {
+	      psi1[cell] = bx[i - i0] * psi1[cell] + cx[i - i0] * diff1 / dx;
+	      curl += psi1[cell];
+	    }
+	    if (g2) {
+	      psi2[cell] = by[j - j0] * psi2[cell] + cy[j - j0] * diff2 / dy;
+	      curl -= psi2[cell];
+	    }
+
+	    ez(i,j,k) += coef * curl;
+	  }
+    }
+
+  protected:
+    using CpmlSlabElectric<T>::range_list;
+    using CpmlSlabElectric<T>::slab_list;
+  }; // template CpmlSlabEz
+
+  template <typename T> 
+  class CpmlSlabMagnetic: public MaterialMagnetic<T>
+  {
+  public:
+    const std::string& 
+    name() const
+    {
+      return CpmlSlabMagnetic<T>::tag;
+    }
+
+    double
+    get_mu_inf(const int* const idx, int idx_size) const
+    {
+      Index3 index;
+      std::copy(idx, idx + idx_size, index.begin());
+      const int r = range_position(index);
+      if (r < 0)
+	return 0;
+      else
+	return slab_list[r].param.mu_inf;
+    }
+
+    PwMaterial<T>*
+    attach(const int* const idx, int idx_size, 
+	   const PwMaterialParam* const pm_param_ptr)
+    {
+      return attach_range(idx, idx_size, idx, idx_size, pm_param_ptr);
+    }
+
+    // Attach the box [low, high]. The profiles of the parameter span 
+    // the box along the axes of the directions. psi starts from zero.
+    PwMaterial<T>*
+    attach_range(const int* const low, int low_size,
+		 const int* const high, int high_size,
+		 const PwMaterialParam* const pm_param_ptr)
+    {
+      IdxRange range;
+      std::copy(low, low + low_size, range.first.begin());
+      std::copy(high, high + high_size, range.second.begin());
+
+      CpmlSlab<T, CpmlSlabMagneticParam<T> > slab;
+      slab.param = *static_cast<const CpmlSlabMagneticParam<T>*>(pm_param_ptr);
+      if (!slab.param.c1.empty())
+	slab.psi1.resize(volume(range), T(0));
+      if (!slab.param.c2.empty())
+	slab.psi2.resize(volume(range), T(0));
+
+      push_back(range, slab);
+      return this;
+    }
+
+    PwMaterial<T>*
+    merge(const PwMaterial<T>* const pm_ptr)
+    {
+      auto cpml_ptr = static_cast<const CpmlSlabMagnetic<T>*>(pm_ptr);
+      for (std::size_t n = 0; n < cpml_ptr->range_list.size(); n++)
+	push_back(cpml_ptr->range_list[n], cpml_ptr->slab_list[n]);
+      return this;
+    }
+
+  protected:
+    CpmlSlabMagnetic(int axis1, int axis2): 
+      axis1(axis1), axis2(axis2)
+    {
+    }
+
+    using MaterialMagnetic<T>::range_position;
+    using MaterialMagnetic<T>::range_list;
+
+    std::vector<CpmlSlab<T, CpmlSlabMagneticParam<T> > > slab_list;
+
+    // The axes of the two directions.
+    const int axis1, axis2;
+
+    static bool
+    same_inf(const CpmlSlabMagneticParam<T>& p1, const CpmlSlabMagneticParam<T>& p2)
+    {
+      return p1.mu_inf == p2.mu_inf;
+    }
+
+    // Append the slab, or join it to the last one.
+    void
+    push_back(const IdxRange& range, 
+	      const CpmlSlab<T, CpmlSlabMagneticParam<T> >& slab)
+    {
+      if (!range_list.empty())
+	for (int axis = 0; axis < 3; axis++)
+	  if (join_slab(range_list.back(), slab_list.back(), range, slab,
+			axis, axis1, axis2, same_inf))
+	    return;
+
+      range_list.push_back(range);
+      slab_list.push_back(slab);
+    }
+
+    void
+    reorder(const std::vector<int>& perm)
+    {
+    }
+
+    void
+    coalesce()
+    {
+      coalesce_slabs(range_list, slab_list, axis1, axis2, same_inf);
+    }
+
+  private:
+    static const std::string tag; // "CpmlSlabMagnetic"
+  }; // template CpmlSlabMagnetic
+
+  template <typename T>
+  const std::string CpmlSlabMagnetic<T>::tag = "CpmlSlabMagnetic";
+
+  template <typename T> 
+  class CpmlSlabHx: public CpmlSlabMagnetic<T>
+  {
+  public:
+    CpmlSlabHx(): 
+      CpmlSlabMagnetic<T>(1, 2)
+    {
+    }
+
+    void
+    update_all(T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	       const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	       const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	       double dy, double dz, double dt, double n)
+    {
+      SWEEP_BY_LAYOUT(ez_x_size != 1, ey_z_size != 1,
+		      (hx, hx_x_size, hx_y_size, hx_z_size,
+		       ez, ez_x_size, ez_y_size, ez_z_size,
+		       ey, ey_x_size, ey_y_size, ey_z_size,
+		       dy, dz, dt, n));
+    }
+
+  private:
+    template <bool hx_present, bool ez_present, bool ey_present>
+    void
+    sweep(T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	  const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	  double dy, double dz, double dt, double n)
+    {
+      for (std::size_t s = 0; s < slab_list.size(); s++) {
+	auto& slab = slab_list[s];
+	BY_GRADING(!slab.param.c1.empty(), !slab.param.c2.empty(),
+		   update_slab<hx_present, ez_present, ey_present>
+		   (hx, hx_x_size, hx_y_size, hx_z_size,
+		    ez, ez_x_size, ez_y_size, ez_z_size,
+		    ey, ey_x_size, ey_y_size, ey_z_size,
+		    dy, dz, dt, n, range_list[s], slab, graded1, graded2));
+      }
+    }
+
+    template <bool hx_present, bool ez_present, bool ey_present, 
+	      bool g1, bool g2>
+    void
+    update_slab(T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+		const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+		const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+		double dy, double dz, double dt, double n,
+		const IdxRange& range, 
+		CpmlSlab<T, CpmlSlabMagneticParam<T> >& slab,
+		std::integral_constant<bool, g1>, 
+		std::integral_constant<bool, g2>)
+    {
+      const int i0 = range.first[0], j0 = range.first[1], k0 = range.first[2];
+      const int y_size = range.second[1] - j0 + 1;
+      const int z_size = range.second[2] - k0 + 1;
+
+      const double coef = dt / slab.param.mu_inf;
+      const double* const by = slab.param.b1.data();
+      const double* const bz = slab.param.b2.data();
+      const double* const cy = slab.param.c1.data();
+      const double* const cz = slab.param.c2.data();
+      const double* const kappay = slab.param.kappa1.data();
+      const double* const kappaz = slab.param.kappa2.data();
+      T* const psi1 = slab.psi1.data();
+      T* const psi2 = slab.psi2.data();
+
+#pragma omp parallel for
+      for (int i = i0; i <= range.second[0]; i++)
+	for (int j = j0; j <= range.second[1]; j++)
+	  for (int k = k0; k <= range.second[2]; k++) {
+	    const int cell = ((i - i0) * y_size + j - j0) * z_size + k - k0;
+	    const T diff1 = ez(i,j,k-1) - ez(i,j-1,k-1);
+	    const T diff2 = ey(i,j-1,k) - ey(i,j-1,k-1);
+
+	    T curl = ((g1 ? diff1 / dy / kappay[j - j0] : diff1 / dy) - 
+		      (g2 ? diff2 / dz / kappaz[k - k0] : diff2 / dz));
+	    if (g1) {
+	      psi1[cell] = by[j - j0] * psi1[cell] + cy[j - j0] * diff1 / dy;
+	      curl += psi1[cell];
+	    }
+	    if (g2) {
+	      psi2[cell] = bz[k - k0] * psi2[cell] + cz[k - k0] * diff2 / dz;
+	      curl -= psi2[cell];
+	    }
+
+	    hx(i,j,k) -= coef * curl;
+	  }
+    }
+
+  protected:
+    using CpmlSlabMagnetic<T>::range_list;
+    using CpmlSlabMagnetic<T>::slab_list;
+  }; // template CpmlSlabHx
+
+  template <typename T> 
+  class CpmlSlabHy: public CpmlSlabMagnetic<T>
+  {
+  public:
+    CpmlSlabHy(): 
+      CpmlSlabMagnetic<T>(2, 0)
+    {
+    }
+
+    void
+    update_all(T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	       const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	       const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	       double dz, double dx, double dt, double n)
+    {
+      SWEEP_BY_LAYOUT(ex_y_size != 1, ez_x_size != 1,
+		      (hy, hy_x_size, hy_y_size, hy_z_size,
+		       ex, ex_x_size, ex_y_size, ex_z_size,
+		       ez, ez_x_size, ez_y_size, ez_z_size,
+		       dz, dx, dt, n));
+    }
+
+  private:
+    template <bool hy_present, bool ex_present, bool ez_present>
+    void
+    sweep(T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	  const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	  double dz, double dx, double dt, double n)
+    {
+      for (std::size_t s = 0; s < slab_list.size(); s++) {
+	auto& slab = slab_list[s];
+	BY_GRADING(!slab.param.c1.empty(), !slab.param.c2.empty(),
+		   update_slab<hy_present, ex_present, ez_present>
+		   (hy, hy_x_size, hy_y_size, hy_z_size,
+		    ex, ex_x_size, ex_y_size, ex_z_size,
+		    ez, ez_x_size, ez_y_size, ez_z_size,
+		    dz, dx, dt, n, range_list[s], slab, graded1, graded2));
+      }
+    }
+
+    template <bool hy_present, bool ex_present, bool ez_present, 
+	      bool g1, bool g2>
+    void
+    update_slab(T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+		const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+		const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+		double dz, double dx, double dt, double n,
+		const IdxRange& range, 
+		CpmlSlab<T, CpmlSlabMagneticParam<T> >& slab,
+		std::integral_constant<bool, g1>, 
+		std::integral_constant<bool, g2>)
+    {
+      const int i0 = range.first[0], j0 = range.first[1], k0 = range.first[2];
+      const int y_size = range.second[1] - j0 + 1;
+      const int z_size = range.second[2] - k0 + 1;
+
+      const double coef = dt / slab.param.mu_inf;
+      const double* const bz = slab.param.b1.data();
+      const double* const bx = slab.param.b2.data();
+      const double* const cz = slab.param.c1.data();
+      const double* const cx = slab.param.c2.data();
+      const double* const kappaz = slab.param.kappa1.data();
+      const double* const kappax = slab.param.kappa2.data();
+      T* const psi1 = slab.psi1.data();
+      T* const psi2 = slab.psi2.data();
+
+#pragma omp parallel for
+      for (int i = i0; i <= range.second[0]; i++)
+	for (int j = j0; j <= range.second[1]; j++)
+	  for (int k = k0; k <= range.second[2]; k++) {
+	    const int cell = ((i - i0) * y_size + j - j0) * z_size + k - k0;
+	    const T diff1 = ex(i-1,j,k) - ex(i-1,j,k-1);
+	    const T diff2 = ez(i,j,k-1) - ez(i-1,j,k-1);
+
+	    T curl = ((g1 ? diff1 / dz / kappaz[k - k0] : diff1 / dz) - 
+		      (g2 ? diff2 / dx / kappax[i - i0] : diff2 / dx));
+	    if (g1) {
+	      psi1[cell] = bz[k - k0] * psi1[cell] + cz[k - k0] * diff1 / dz;
+	      curl += psi1[cell];
+	    }
+	    if (g2) {
+	      psi2[cell] = bx[i - i0] * psi2[cell] + cx[i - i0] * diff2 / dx;
+	      curl -= psi2[cell];
+	    }
+
+	    hy(i,j,k) -= coef * curl;
+	  }
+    }
+
+  protected:
+    using CpmlSlabMagnetic<T>::range_list;
+    using CpmlSlabMagnetic<T>::slab_list;
+  }; // template CpmlSlabHy
+
+  template <typename T> 
+  class CpmlSlabHz: public CpmlSlabMagnetic<T>
+  {
+  public:
+    CpmlSlabHz(): 
+      CpmlSlabMagnetic<T>(0, 1)
+    {
+    }
+
+    void
+    update_all(T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	       const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	       const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	       double dx, double dy, double dt, double n)
+    {
+      SWEEP_BY_LAYOUT(ey_z_size != 1, ex_y_size != 1,
+		      (hz, hz_x_size, hz_y_size, hz_z_size,
+		       ey, ey_x_size, ey_y_size, ey_z_size,
+		       ex, ex_x_size, ex_y_size, ex_z_size,
+		       dx, dy, dt, n));
+    }
+
+  private:
+    template <bool hz_present, bool ey_present, bool ex_present>
+    void
+    sweep(T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	  const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	  double dx, double dy, double dt, double n)
+    {
+      for (std::size_t s = 0; s < slab_list.size(); s++) {
+	auto& slab = slab_list[s];
+	BY_GRADING(!slab.param.c1.empty(), !slab.param.c2.empty(),
+		   update_slab<hz_present, ey_present, ex_present>
+		   (hz, hz_x_size, hz_y_size, hz_z_size,
+		    ey, ey_x_size, ey_y_size, ey_z_size,
+		    ex, ex_x_size, ex_y_size, ex_z_size,
+		    dx, dy, dt, n, range_list[s], slab, graded1, graded2));
+      }
+    }
+
+    template <bool hz_present, bool ey_present, bool ex_present, 
+	      bool g1, bool g2>
+    void
+    update_slab(T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+		const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+		const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+		double dx, double dy, double dt, double n,
+		const IdxRange& range, 
+		CpmlSlab<T, CpmlSlabMagneticParam<T> >& slab,
+		std::integral_constant<bool, g1>, 
+		std::integral_constant<bool, g2>)
+    {
+      const int i0 = range.first[0], j0 = range.first[1], k0 = range.first[2];
+      const int y_size = range.second[1] - j0 + 1;
+      const int z_size = range.second[2] - k0 + 1;
+
+      const double coef = dt / slab.param.mu_inf;
+      const double* const bx = slab.param.b1.data();
+      const double* const by = slab.param.b2.data();
+      const double* const cx = slab.param.c1.data();
+      const double* const cy = slab.param.c2.data();
+      const double* const kappax = slab.param.kappa1.data();
+      const double* const kappay = slab.param.kappa2.data();
+      T* const psi1 = slab.psi1.data();
+      T* const psi2 = slab.psi2.data();
+
+#pragma omp parallel for
+      for (int i = i0; i <= range.second[0]; i++)
+	for (int j = j0; j <= range.second[1]; j++)
+	  for (int k = k0; k <= range.second[2]; k++) {
+	    const int cell = ((i - i0) * y_size + j - j0) * z_size + k - k0;
+	    const T diff1 = ey(i,j-1,k) - ey(i-1,j-1,k);
+	    const T diff2 = ex(i-1,j,k) - ex(i-1,j-1,k);
+
+	    T curl = ((g1 ? diff1 / dx / kappax[i - i0] : diff1 / dx) - 
+		      (g2 ? diff2 / dy / kappay[j - j0] : diff2 / dy));
+	    if (g1) {
+	      psi1[cell] = bx[i - i0] * psi1[cell] + cx[i - i0] * diff1 / dx;
+	      curl += psi1[cell];
+	    }
+	    if (g2) {
+	      psi2[cell] = by[j - j0] * psi2[cell] + cy[j - j0] * diff2 / dy;
+	      curl -= psi2[cell];
+	    }
+
+	    hz(i,j,k) -= coef * curl;
+	  }
+    }
+
+  protected:
+    using CpmlSlabMagnetic<T>::range_list;
+    using CpmlSlabMagnetic<T>::slab_list;
+  }; // template CpmlSlabHz
+} // namespace gmes
+
+#undef ex
+#undef ey
+#undef ez
+#undef hx
+#undef hy
+#undef hz
+
+#endif // PW_CPML_SLAB_HH_
@@ -21,15 +21,27 @@
 #include <vector>
 #include "pw_dielectric.hh"
 
-#define ex(i,j,k) ex[ex_y_size==1?0:((i)*ex_y_size+(j))*ex_z_size+(k)]
-#define ey(i,j,k) ey[ey_z_size==1?0:((i)*ey_y_size+(j))*ey_z_size+(k)]
-#define ez(i,j,k) ez[ez_x_size==1?0:((i)*ez_y_size+(j))*ez_z_size+(k)]
-#define hx(i,j,k) hx[hx_y_size==1?0:((i)*hx_y_size+(j))*hx_z_size+(k)]
-#define hy(i,j,k) hy[hy_z_size==1?0:((i)*hy_y_size+(j))*hy_z_size+(k)]
-#define hz(i,j,k) hz[hz_x_size==1?0:((i)*hz_y_size+(j))*hz_z_size+(k)]
-
-// The classes should be rewritten using template specialization
-// to increase the calculation speed.
+#define ex(i,j,k) ex[ex_present?((i)*ex_y_size+(j))*ex_z_size+(k):0]
+#define ey(i,j,k) ey[ey_present?((i)*ey_y_size+(j))*ey_z_size+(k):0]
+#define ez(i,j,k) ez[ez_present?((i)*ez_y_size+(j))*ez_z_size+(k):0]
+#define hx(i,j,k) hx[hx_present?((i)*hx_y_size+(j))*hx_z_size+(k):0]
+#define hy(i,j,k) hy[hy_present?((i)*hy_y_size+(j))*hy_z_size+(k):0]
+#define hz(i,j,k) hz[hz_present?((i)*hz_y_size+(j))*hz_z_size+(k):0]
+
+// Run the statement with dps and cps, the Poles objects of the Drude
+// and critical point terms. The counts of the gold and silver models,
+// one Drude pole and two critical points, are fixed at compile time.
+#define BY_DCP_POLE_COUNT(na, nb, ...)				\
+  if ((na) == 1 && (nb) == 2) {					\
+    const Poles<1> dps;						\
+    const Poles<2> cps;						\
+    __VA_ARGS__;						\
+  } else {							\
+    const Poles<DYNAMIC_POLES> dps;				\
+    const Poles<DYNAMIC_POLES> cps;				\
+    __VA_ARGS__;						\
+  }
+
 namespace gmes
 {
   /* The following auxiliary differential equation(ADE) 
@@ -83,7 +95,7 @@ namespace gmes
       if (i < 0)
 	return 0;
       else
-	return param_list[i].eps_inf;
+	return coef_list[coef_idx[i]].eps_inf;
     }
 
     PwMaterial<T>*
@@ -96,7 +108,12 @@ namespace gmes
       const auto& dcp_param = *static_cast<const DcpAdeElectricParam<T> * const>(pm_param_ptr);
       
       idx_list.push_back(index);
-      param_list.push_back(dcp_param);
+      coef_idx.push_back(intern(coef_list, dcp_param, same_coef));
+      e_old.push_back(dcp_param.e_old);
+      q_old.push_back(dcp_param.q_old);
+      q_now.push_back(dcp_param.q_now);
+      p_old.push_back(dcp_param.p_old);
+      p_now.push_back(dcp_param.p_now);
 
       return this;
     }
@@ -106,78 +123,111 @@ namespace gmes
     {
       auto dcp_ptr = static_cast<const DcpAdeElectric<T>*>(pm_ptr);
       std::copy(dcp_ptr->idx_list.begin(), dcp_ptr->idx_list.end(), std::back_inserter(idx_list));
-      std::copy(dcp_ptr->param_list.begin(), dcp_ptr->param_list.end(), std::back_inserter(param_list));
+
+      std::vector<int> coef_map;
+      for (auto c = dcp_ptr->coef_list.begin(); c != dcp_ptr->coef_list.end(); ++c)
+	coef_map.push_back(intern(coef_list, *c, same_coef));
+      for (auto c = dcp_ptr->coef_idx.begin(); c != dcp_ptr->coef_idx.end(); ++c)
+	coef_idx.push_back(coef_map[*c]);
+
+      std::copy(dcp_ptr->e_old.begin(), dcp_ptr->e_old.end(), std::back_inserter(e_old));
+      q_old.append(dcp_ptr->q_old);
+      q_now.append(dcp_ptr->q_now);
+      p_old.append(dcp_ptr->p_old);
+      p_now.append(dcp_ptr->p_now);
       return this;
     }
 
+    template <int np>
     T 
-    dps_sum(const T& init, const DcpAdeElectricParam<T>& dcp_param) const
+    dps_sum(const T& init, const DcpAdeElectricParam<T>& dcp_param,
+	    int point, Poles<np> poles) const
     {
       const auto& a = dcp_param.a;
-      const auto& q_old = dcp_param.q_old;
-      const auto& q_now = dcp_param.q_now;
       
       T sum(init);
-      for (typename std::vector<T>::size_type i = 0; i < a.size(); ++i) {
-	sum += (1 - a[i][1]) * q_now[i] - a[i][0] * q_old[i];
+      for (int i = 0; i < pole_count(poles, a.size()); ++i) {
+	sum += (1 - a[i][1]) * q_now(i, point) - a[i][0] * q_old(i, point);
       }
 
       return sum;
     }
     
+    template <int np>
     T 
-    cps_sum(const T& init, const DcpAdeElectricParam<T>& dcp_param) const
+    cps_sum(const T& init, const DcpAdeElectricParam<T>& dcp_param,
+	    int point, Poles<np> poles) const
     {
       const auto& b = dcp_param.b;
-      const auto& p_old = dcp_param.p_old;
-      const auto& p_now = dcp_param.p_now;
 
       T sum(init);
-      for (typename std::vector<T>::size_type i = 0; i < b.size(); ++i) {
-	sum += (1 - b[i][1]) * p_now[i] - b[i][0] * p_old[i];
+      for (int i = 0; i < pole_count(poles, b.size()); ++i) {
+	sum += (1 - b[i][1]) * p_now(i, point) - b[i][0] * p_old(i, point);
       }
       
       return sum;
     }
 
+    template <int np>
     void 
     update_q(const T& e_old, const T& e_now, const T& e_new,
-	     DcpAdeElectricParam<T>& dcp_param)
+	     const DcpAdeElectricParam<T>& dcp_param, int point,
+	     Poles<np> poles)
     {
       const auto& a = dcp_param.a;
-      auto& q_old = dcp_param.q_old;
-      auto& q_now = dcp_param.q_now;
 
-      std::vector<T> q_new(a.size());
-      for (typename std::vector<T>::size_type i = 0; i < a.size(); ++i) {
-	q_new[i] = a[i][0] * q_old[i] + a[i][1] * q_now[i] + a[i][2] * (e_old + 2.0 * e_now + e_new);
+      for (int i = 0; i < pole_count(poles, a.size()); ++i) {
+	const T q_new = a[i][0] * q_old(i, point) + a[i][1] * q_now(i, point) + a[i][2] * (e_old + 2.0 * e_now + e_new);
+	q_old(i, point) = q_now(i, point);
+	q_now(i, point) = q_new;
       }
-      
-      std::copy(q_now.begin(), q_now.end(), q_old.begin());
-      std::copy(q_new.begin(), q_new.end(), q_now.begin());
     }
     
+    template <int np>
     void 
     update_p(const T& e_old, const T& e_now, const T& e_new,
-	     DcpAdeElectricParam<T>& dcp_param)
+	     const DcpAdeElectricParam<T>& dcp_param, int point,
+	     Poles<np> poles)
     {
       const auto& b = dcp_param.b;
-      auto& p_old = dcp_param.p_old;
-      auto& p_now = dcp_param.p_now;
     
-      std::vector<T> p_new(b.size());
-      for (typename std::vector<T>::size_type i = 0; i < b.size(); ++i) {
-	p_new[i] = b[i][0] * p_old[i] + b[i][1] * p_now[i] + b[i][2] 
+      for (int i = 0; i < pole_count(poles, b.size()); ++i) {
+	const T p_new = b[i][0] * p_old(i, point) + b[i][1] * p_now(i, point) + b[i][2] 
 	  * e_old + b[i][3] * e_now + b[i][4] * e_new;
+	p_old(i, point) = p_now(i, point);
+	p_now(i, point) = p_new;
       }
-      std::copy(p_now.begin(), p_now.end(), p_old.begin());
-      std::copy(p_new.begin(), p_new.end(), p_now.begin());
     }
   
   protected:
     using MaterialElectric<T>::position;
     using MaterialElectric<T>::idx_list;
-    std::vector<DcpAdeElectricParam<T> > param_list;
+
+    // The coefficients are stored once per distinct material. The
+    // states of coef_list are not used.
+    std::vector<DcpAdeElectricParam<T> > coef_list;
+    std::vector<int> coef_idx;
+    std::vector<T> e_old;
+    PoleArray<T> q_old, q_now, p_old, p_now;
+
+    static bool
+    same_coef(const DcpAdeElectricParam<T>& p1, 
+	      const DcpAdeElectricParam<T>& p2)
+    {
+      return (p1.eps_inf == p2.eps_inf && p1.a == p2.a && 
+	      p1.b == p2.b && p1.c == p2.c);
+    }
+
+    void
+    reorder(const std::vector<int>& perm)
+    {
+      permute(coef_idx, perm);
+      permute(e_old, perm);
+      q_old.reorder(perm);
+      q_now.reorder(perm);
+      p_old.reorder(perm);
+      p_now.reorder(perm);
+    }
 
   private:
     static const std::string tag; // "DcpAdeElectric"
@@ -196,38 +246,58 @@ namespace gmes
 	       const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
 	       double dy, double dz, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(ex, ex_x_size, ex_y_size, ex_z_size,
-	       hz, hz_x_size, hz_y_size, hz_z_size,
-	       hy, hy_x_size, hy_y_size, hy_z_size,
-	       dy, dz, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(hz_x_size != 1, hy_z_size != 1,
+		      (ex, ex_x_size, ex_y_size, ex_z_size,
+		       hz, hz_x_size, hz_y_size, hz_z_size,
+		       hy, hy_x_size, hy_y_size, hy_z_size,
+		       dy, dz, dt, n));
     }
 
   private:
+    template <bool ex_present, bool hz_present, bool hy_present>
+    void
+    sweep(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	  const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  double dy, double dz, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+	const auto& dcp_param = coef_list[coef_idx[idx]];
+	BY_DCP_POLE_COUNT(dcp_param.a.size(), dcp_param.b.size(),
+			  update<ex_present, hz_present, hy_present>
+			  (ex, ex_x_size, ex_y_size, ex_z_size,
+			   hz, hz_x_size, hz_y_size, hz_z_size,
+			   hy, hy_x_size, hy_y_size, hy_z_size,
+			   dy, dz, dt, n, idx_list[idx], dcp_param, idx, dps, cps));
+      }
+    }
+
+    template <bool ex_present, bool hz_present, bool hy_present, int dp, int cp>
     void 
     update(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
 	   const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
 	   const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
 	   double dy, double dz, double dt, double n,
 	   const Index3& idx,
-	   DcpAdeElectricParam<T>& dcp_param)
+	   const DcpAdeElectricParam<T>& dcp_param, int point,
+	   Poles<dp> dps, Poles<cp> cps)
     {
       const int i = idx[0], j = idx[1], k = idx[2];
       
       const auto& c = dcp_param.c;
-      T& e_old = dcp_param.e_old;
+      T& e_old = this->e_old[point];
 
       const T& e_now = ex(i,j,k);
       const T e_new = c[0] * ((hz(i+1,j+1,k) - hz(i+1,j,k)) / dy - 
 			      (hy(i+1,j,k+1) - hy(i+1,j,k)) / dz) 
-	+ c[1] * (dps_sum(static_cast<T>(0), dcp_param) + 
-		  cps_sum(static_cast<T>(0), dcp_param))
+	+ c[1] * (dps_sum(static_cast<T>(0), dcp_param, point, dps) + 
+		  cps_sum(static_cast<T>(0), dcp_param, point, cps))
 	+ c[2] * e_old + c[3] * e_now;
       
-      update_q(e_old, e_now, e_new, dcp_param);
-      update_p(e_old, e_now, e_new, dcp_param);
+      update_q(e_old, e_now, e_new, dcp_param, point, dps);
+      update_p(e_old, e_now, e_new, dcp_param, point, cps);
       
       e_old = e_now;
       ex(i,j,k) = e_new;
@@ -235,7 +305,8 @@ namespace gmes
     
   protected:
     using DcpAdeElectric<T>::idx_list;
-    using DcpAdeElectric<T>::param_list;
+    using DcpAdeElectric<T>::coef_list;
+    using DcpAdeElectric<T>::coef_idx;
     using DcpAdeElectric<T>::dps_sum;
     using DcpAdeElectric<T>::cps_sum;
     using DcpAdeElectric<T>::update_q;
@@ -252,38 +323,58 @@ namespace gmes
 	       const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
 	       double dz, double dx, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(ey, ey_x_size, ey_y_size, ey_z_size,
-	       hx, hx_x_size, hx_y_size, hx_z_size,
-	       hz, hz_x_size, hz_y_size, hz_z_size,
-	       dz, dx, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(hx_y_size != 1, hz_x_size != 1,
+		      (ey, ey_x_size, ey_y_size, ey_z_size,
+		       hx, hx_x_size, hx_y_size, hx_z_size,
+		       hz, hz_x_size, hz_y_size, hz_z_size,
+		       dz, dx, dt, n));
     }
 
   private:
+    template <bool ey_present, bool hx_present, bool hz_present>
+    void
+    sweep(T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	  const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  double dz, double dx, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+	const auto& dcp_param = coef_list[coef_idx[idx]];
+	BY_DCP_POLE_COUNT(dcp_param.a.size(), dcp_param.b.size(),
+			  update<ey_present, hx_present, hz_present>
+			  (ey, ey_x_size, ey_y_size, ey_z_size,
+			   hx, hx_x_size, hx_y_size, hx_z_size,
+			   hz, hz_x_size, hz_y_size, hz_z_size,
+			   dz, dx, dt, n, idx_list[idx], dcp_param, idx, dps, cps));
+      }
+    }
+
+    template <bool ey_present, bool hx_present, bool hz_present, int dp, int cp>
     void 
     update(T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
 	   const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
 	   const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
 	   double dz, double dx, double dt, double n,
 	   const Index3& idx,
-	   DcpAdeElectricParam<T>& dcp_param)
+	   const DcpAdeElectricParam<T>& dcp_param, int point,
+	   Poles<dp> dps, Poles<cp> cps)
     {
       const int i = idx[0], j = idx[1], k = idx[2];
       
       const auto& c = dcp_param.c;
-      T& e_old = dcp_param.e_old;
+      T& e_old = this->e_old[point];
       
       const T& e_now = ey(i,j,k);
       T e_new = c[0] * ((hx(i,j+1,k+1) - hx(i,j+1,k)) / dz - 
 			(hz(i+1,j+1,k) - hz(i,j+1,k)) / dx)
-	+ c[1] * (dps_sum(static_cast<T>(0), dcp_param) + 
-		  cps_sum(static_cast<T>(0), dcp_param))
+	+ c[1] * (dps_sum(static_cast<T>(0), dcp_param, point, dps) + 
+		  cps_sum(static_cast<T>(0), dcp_param, point, cps))
 	+ c[2] * e_old + c[3] * e_now;
 
-      update_q(e_old, e_now, e_new, dcp_param);
-      update_p(e_old, e_now, e_new, dcp_param);
+      update_q(e_old, e_now, e_new, dcp_param, point, dps);
+      update_p(e_old, e_now, e_new, dcp_param, point, cps);
       
       e_old = e_now;
       ey(i,j,k) = e_new;
@@ -291,7 +382,8 @@ namespace gmes
     
   protected:
     using DcpAdeElectric<T>::idx_list;
-    using DcpAdeElectric<T>::param_list;
+    using DcpAdeElectric<T>::coef_list;
+    using DcpAdeElectric<T>::coef_idx;
     using DcpAdeElectric<T>::dps_sum;
     using DcpAdeElectric<T>::cps_sum;
     using DcpAdeElectric<T>::update_q;
@@ -308,38 +400,58 @@ namespace gmes
 	       const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
 	       double dx, double dy, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(ez, ez_x_size, ez_y_size, ez_z_size,
-	       hy, hy_x_size, hy_y_size, hy_z_size,
-	       hx, hx_x_size, hx_y_size, hx_z_size,
-	       dx, dy, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(hy_z_size != 1, hx_y_size != 1,
+		      (ez, ez_x_size, ez_y_size, ez_z_size,
+		       hy, hy_x_size, hy_y_size, hy_z_size,
+		       hx, hx_x_size, hx_y_size, hx_z_size,
+		       dx, dy, dt, n));
     }
 
   private:
+    template <bool ez_present, bool hy_present, bool hx_present>
+    void
+    sweep(T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	  const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  double dx, double dy, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+	const auto& dcp_param = coef_list[coef_idx[idx]];
+	BY_DCP_POLE_COUNT(dcp_param.a.size(), dcp_param.b.size(),
+			  update<ez_present, hy_present, hx_present>
+			  (ez, ez_x_size, ez_y_size, ez_z_size,
+			   hy, hy_x_size, hy_y_size, hy_z_size,
+			   hx, hx_x_size, hx_y_size, hx_z_size,
+			   dx, dy, dt, n, idx_list[idx], dcp_param, idx, dps, cps));
+      }
+    }
+
+    template <bool ez_present, bool hy_present, bool hx_present, int dp, int cp>
     void 
     update(T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
 	   const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
 	   const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
 	   double dx, double dy, double dt, double n,
 	   const Index3& idx,
-	   DcpAdeElectricParam<T>& dcp_param)
+	   const DcpAdeElectricParam<T>& dcp_param, int point,
+	   Poles<dp> dps, Poles<cp> cps)
     {
       const int i = idx[0], j = idx[1], k = idx[2];
       
       const auto& c = dcp_param.c;
-      T& e_old = dcp_param.e_old;
+      T& e_old = this->e_old[point];
 
       const T& e_now = ez(i,j,k);
       T e_new = c[0] * ((hy(i+1,j,k+1) - hy(i,j,k+1)) / dx - 
 			(hx(i,j+1,k+1) - hx(i,j,k+1)) / dy)
-	+ c[1] * (dps_sum(static_cast<T>(0), dcp_param) + 
-		  cps_sum(static_cast<T>(0), dcp_param))
+	+ c[1] * (dps_sum(static_cast<T>(0), dcp_param, point, dps) + 
+		  cps_sum(static_cast<T>(0), dcp_param, point, cps))
 	+ c[2] * e_old + c[3] * e_now;
       
-      update_q(e_old, e_now, e_new, dcp_param);
-      update_p(e_old, e_now, e_new, dcp_param);
+      update_q(e_old, e_now, e_new, dcp_param, point, dps);
+      update_p(e_old, e_now, e_new, dcp_param, point, cps);
       
       e_old = e_now;
       ez(i,j,k) = e_new;
@@ -347,7 +459,8 @@ namespace gmes
 
   protected:
     using DcpAdeElectric<T>::idx_list;
-    using DcpAdeElectric<T>::param_list;
+    using DcpAdeElectric<T>::coef_list;
+    using DcpAdeElectric<T>::coef_idx;
     using DcpAdeElectric<T>::dps_sum;
     using DcpAdeElectric<T>::cps_sum;
     using DcpAdeElectric<T>::update_q;
@@ -450,7 +563,7 @@ namespace gmes
       if (i < 0)
 	return 0;
       else
-	return param_list[i].eps_inf;
+	return coef_list[coef_idx[i]].eps_inf;
     }
 
     PwMaterial<T>*
@@ -460,10 +573,14 @@ namespace gmes
       Index3 index;
       std::copy(idx, idx + idx_size, index.begin());
 
-      auto dcp_param = *static_cast<const DcpPlrcElectricParam<T> * const>(pm_param_ptr);
+      const auto& dcp_param = *static_cast<const DcpPlrcElectricParam<T> * const>(pm_param_ptr);
 
       idx_list.push_back(index);
-      param_list.push_back(dcp_param);
+      coef_idx.push_back(intern(coef_list, dcp_param, same_coef));
+      psi_dp_re.push_back(dcp_param.psi_dp_re);
+      psi_dp_im.push_back(dcp_param.psi_dp_im);
+      psi_cp_re.push_back(dcp_param.psi_cp_re);
+      psi_cp_im.push_back(dcp_param.psi_cp_im);
       
       return this;
     }
@@ -473,67 +590,106 @@ namespace gmes
     {
       auto dcp_ptr = static_cast<const DcpPlrcElectric<T>*>(pm_ptr);
       std::copy(dcp_ptr->idx_list.begin(), dcp_ptr->idx_list.end(), std::back_inserter(idx_list));
-      std::copy(dcp_ptr->param_list.begin(), dcp_ptr->param_list.end(), std::back_inserter(param_list));
+
+      std::vector<int> coef_map;
+      for (auto c = dcp_ptr->coef_list.begin(); c != dcp_ptr->coef_list.end(); ++c)
+	coef_map.push_back(intern(coef_list, *c, same_coef));
+      for (auto c = dcp_ptr->coef_idx.begin(); c != dcp_ptr->coef_idx.end(); ++c)
+	coef_idx.push_back(coef_map[*c]);
+
+      psi_dp_re.append(dcp_ptr->psi_dp_re);
+      psi_dp_im.append(dcp_ptr->psi_dp_im);
+      psi_cp_re.append(dcp_ptr->psi_cp_re);
+      psi_cp_im.append(dcp_ptr->psi_cp_im);
       return this;
     }
 
+    template <int np>
     void 
     update_psi_dp(const std::complex<double>& e_now, 
 		  const std::complex<double>& e_new,
-		  DcpPlrcElectricParam<T>& dcp_param)
+		  const DcpPlrcElectricParam<T>& dcp_param, int point,
+		  Poles<np> poles)
     {
       const auto& a = dcp_param.a;
-      auto& psi_dp_re = dcp_param.psi_dp_re;
-      auto& psi_dp_im = dcp_param.psi_dp_im;
       
-      for (typename std::vector<T>::size_type i = 0; i < a.size(); ++i) {
-	psi_dp_re[i] = a[i][0] * e_new.real() 
-	  + a[i][1] * e_now.real() + a[i][2] * psi_dp_re[i];
-	psi_dp_im[i] = a[i][0] * e_new.imag() 
-	  + a[i][1] * e_now.imag() + a[i][2] * psi_dp_im[i];
+      for (int i = 0; i < pole_count(poles, a.size()); ++i) {
+	psi_dp_re(i, point) = a[i][0] * e_new.real() 
+	  + a[i][1] * e_now.real() + a[i][2] * psi_dp_re(i, point);
+	psi_dp_im(i, point) = a[i][0] * e_new.imag() 
+	  + a[i][1] * e_now.imag() + a[i][2] * psi_dp_im(i, point);
       }
     }
 
+    template <int np>
     void 
     update_psi_cp(const std::complex<double>& e_now, 
 		  const std::complex<double>& e_new,
-		  DcpPlrcElectricParam<T>& dcp_param)
+		  const DcpPlrcElectricParam<T>& dcp_param, int point,
+		  Poles<np> poles)
     {
       const auto& b = dcp_param.b;
-      auto& psi_cp_re = dcp_param.psi_cp_re;
-      auto& psi_cp_im = dcp_param.psi_cp_im;
       
-      for (typename std::vector<std::complex<double> >::size_type i = 0; i < b.size(); ++i) {
-	psi_cp_re[i] = b[i][0] * e_new.real() 
-	  + b[i][1] * e_now.real() + b[i][2] * psi_cp_re[i];
-	psi_cp_im[i] = b[i][0] * e_new.imag()
-	  + b[i][1] * e_now.imag() + b[i][2] * psi_cp_im[i];
+      for (int i = 0; i < pole_count(poles, b.size()); ++i) {
+	psi_cp_re(i, point) = b[i][0] * e_new.real() 
+	  + b[i][1] * e_now.real() + b[i][2] * psi_cp_re(i, point);
+	psi_cp_im(i, point) = b[i][0] * e_new.imag()
+	  + b[i][1] * e_now.imag() + b[i][2] * psi_cp_im(i, point);
       }
     }
 
+    template <int dp, int cp>
     std::complex<double> 
-    psi_total(const DcpPlrcElectricParam<T>& dcp_param) const
+    psi_total(const DcpPlrcElectricParam<T>& dcp_param, int point,
+	      Poles<dp> dps, Poles<cp> cps) const
     {
-      const auto& psi_dp_re = dcp_param.psi_dp_re;
-      const auto& psi_dp_im = dcp_param.psi_dp_im;
-      const auto& psi_cp_re = dcp_param.psi_cp_re;
-      const auto& psi_cp_im = dcp_param.psi_cp_im;
+      const auto& a = dcp_param.a;
+      const auto& b = dcp_param.b;
 
-      double psi_re = 
-	std::accumulate(psi_dp_re.begin(), psi_dp_re.end(), 0.0) + 
-	std::accumulate(psi_cp_re.begin(), psi_cp_re.end(), std::complex<double>(0)).real();
+      double psi_re = 0, psi_im = 0;
+      for (int i = 0; i < pole_count(dps, a.size()); ++i) {
+	psi_re += psi_dp_re(i, point);
+	psi_im += psi_dp_im(i, point);
+      }
       
-      double psi_im = 
-	std::accumulate(psi_dp_im.begin(), psi_dp_im.end(), 0.0) +
-	std::accumulate(psi_cp_im.begin(), psi_cp_im.end(), std::complex<double>(0)).real();
+      double psi_cp_re_sum = 0, psi_cp_im_sum = 0;
+      for (int i = 0; i < pole_count(cps, b.size()); ++i) {
+	psi_cp_re_sum += psi_cp_re(i, point).real();
+	psi_cp_im_sum += psi_cp_im(i, point).real();
+      }
       
-      return std::complex<double>(psi_re, psi_im);
+      return std::complex<double>(psi_re + psi_cp_re_sum, 
+				  psi_im + psi_cp_im_sum);
     }
     
   protected:
     using MaterialElectric<T>::position;
     using MaterialElectric<T>::idx_list;
-    std::vector<DcpPlrcElectricParam<T> > param_list;
+
+    // The coefficients are stored once per distinct material. The
+    // states of coef_list are not used.
+    std::vector<DcpPlrcElectricParam<T> > coef_list;
+    std::vector<int> coef_idx;
+    PoleArray<double> psi_dp_re, psi_dp_im;
+    PoleArray<std::complex<double> > psi_cp_re, psi_cp_im;
+
+    static bool
+    same_coef(const DcpPlrcElectricParam<T>& p1, 
+	      const DcpPlrcElectricParam<T>& p2)
+    {
+      return (p1.eps_inf == p2.eps_inf && p1.a == p2.a && 
+	      p1.b == p2.b && p1.c == p2.c);
+    }
+
+    void
+    reorder(const std::vector<int>& perm)
+    {
+      permute(coef_idx, perm);
+      psi_dp_re.reorder(perm);
+      psi_dp_im.reorder(perm);
+      psi_cp_re.reorder(perm);
+      psi_cp_im.reorder(perm);
+    }
 
   private:
     static const std::string tag; // "DcpPlrcElectric"
@@ -565,23 +721,43 @@ namespace gmes
 	       const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
 	       double dy, double dz, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(ex, ex_x_size, ex_y_size, ex_z_size,
-	       hz, hz_x_size, hz_y_size, hz_z_size,
-	       hy, hy_x_size, hy_y_size, hy_z_size,
-	       dy, dz, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(hz_x_size != 1, hy_z_size != 1,
+		      (ex, ex_x_size, ex_y_size, ex_z_size,
+		       hz, hz_x_size, hz_y_size, hz_z_size,
+		       hy, hy_x_size, hy_y_size, hy_z_size,
+		       dy, dz, dt, n));
     }
 
   private:
+    template <bool ex_present, bool hz_present, bool hy_present>
+    void
+    sweep(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	  const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  double dy, double dz, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+	const auto& dcp_param = coef_list[coef_idx[idx]];
+	BY_DCP_POLE_COUNT(dcp_param.a.size(), dcp_param.b.size(),
+			  update<ex_present, hz_present, hy_present>
+			  (ex, ex_x_size, ex_y_size, ex_z_size,
+			   hz, hz_x_size, hz_y_size, hz_z_size,
+			   hy, hy_x_size, hy_y_size, hy_z_size,
+			   dy, dz, dt, n, idx_list[idx], dcp_param, idx, dps, cps));
+      }
+    }
+
+    template <bool ex_present, bool hz_present, bool hy_present, int dp, int cp>
     void 
     update(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
 	   const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
 	   const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
 	   double dy, double dz, double dt, double n,
 	   const Index3& idx, 
-	   DcpPlrcElectricParam<T>& dcp_param)
+	   const DcpPlrcElectricParam<T>& dcp_param, int point,
+	   Poles<dp> dps, Poles<cp> cps)
     {
       const int i = idx[0], j = idx[1], k = idx[2];
       
@@ -591,17 +767,18 @@ namespace gmes
       const std::complex<double> e_new = 
 	c[0] * ((hz(i+1,j+1,k) - hz(i+1,j,k)) / dy - 
 		(hy(i+1,j,k+1) - hy(i+1,j,k)) / dz) +
-	c[1] * e_now + c[2] * psi_total(dcp_param);
+	c[1] * e_now + c[2] * psi_total(dcp_param, point, dps, cps);
       
-      update_psi_dp(e_now, e_new, dcp_param);
-      update_psi_cp(e_now, e_new, dcp_param);
+      update_psi_dp(e_now, e_new, dcp_param, point, dps);
+      update_psi_cp(e_now, e_new, dcp_param, point, cps);
 
       assign(e_new, ex(i,j,k));
   }
 
   protected:
     using DcpPlrcElectric<T>::idx_list;
-    using DcpPlrcElectric<T>::param_list;
+    using DcpPlrcElectric<T>::coef_list;
+    using DcpPlrcElectric<T>::coef_idx;
     using DcpPlrcElectric<T>::update_psi_dp;
     using DcpPlrcElectric<T>::update_psi_cp;
     using DcpPlrcElectric<T>::psi_total;
@@ -616,23 +793,43 @@ namespace gmes
 	       const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
 	       double dz, double dx, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(ey, ey_x_size, ey_y_size, ey_z_size,
-	       hx, hx_x_size, hx_y_size, hx_z_size,
-	       hz, hz_x_size, hz_y_size, hz_z_size,
-	       dz, dx, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(hx_y_size != 1, hz_x_size != 1,
+		      (ey, ey_x_size, ey_y_size, ey_z_size,
+		       hx, hx_x_size, hx_y_size, hx_z_size,
+		       hz, hz_x_size, hz_y_size, hz_z_size,
+		       dz, dx, dt, n));
     }
 
   private:
+    template <bool ey_present, bool hx_present, bool hz_present>
+    void
+    sweep(T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	  const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  double dz, double dx, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+	const auto& dcp_param = coef_list[coef_idx[idx]];
+	BY_DCP_POLE_COUNT(dcp_param.a.size(), dcp_param.b.size(),
+			  update<ey_present, hx_present, hz_present>
+			  (ey, ey_x_size, ey_y_size, ey_z_size,
+			   hx, hx_x_size, hx_y_size, hx_z_size,
+			   hz, hz_x_size, hz_y_size, hz_z_size,
+			   dz, dx, dt, n, idx_list[idx], dcp_param, idx, dps, cps));
+      }
+    }
+
+    template <bool ey_present, bool hx_present, bool hz_present, int dp, int cp>
     void 
     update(T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
 	   const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
 	   const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
 	   double dz, double dx, double dt, double n,
 	   const Index3& idx, 
-	   DcpPlrcElectricParam<T>& dcp_param)
+	   const DcpPlrcElectricParam<T>& dcp_param, int point,
+	   Poles<dp> dps, Poles<cp> cps)
     {
       const int i = idx[0], j = idx[1], k = idx[2];
       
@@ -642,17 +839,18 @@ namespace gmes
       const std::complex<double> e_new = 
 	c[0] * ((hx(i,j+1,k+1) - hx(i,j+1,k)) / dz - 
 		(hz(i+1,j+1,k) - hz(i,j+1,k)) / dx) +
-	c[1] * e_now + c[2] * psi_total(dcp_param);
+	c[1] * e_now + c[2] * psi_total(dcp_param, point, dps, cps);
 
-      update_psi_dp(e_now, e_new, dcp_param);
-      update_psi_cp(e_now, e_new, dcp_param);
+      update_psi_dp(e_now, e_new, dcp_param, point, dps);
+      update_psi_cp(e_now, e_new, dcp_param, point, cps);
 
       assign(e_new, ey(i,j,k));
     }
 
   protected:
     using DcpPlrcElectric<T>::idx_list;
-    using DcpPlrcElectric<T>::param_list;
+    using DcpPlrcElectric<T>::coef_list;
+    using DcpPlrcElectric<T>::coef_idx;
     using DcpPlrcElectric<T>::update_psi_dp;
     using DcpPlrcElectric<T>::update_psi_cp;
     using DcpPlrcElectric<T>::psi_total;
@@ -667,23 +865,43 @@ namespace gmes
 	       const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
 	       double dx, double dy, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(ez, ez_x_size, ez_y_size, ez_z_size,
-	       hy, hy_x_size, hy_y_size, hy_z_size,
-	       hx, hx_x_size, hx_y_size, hx_z_size,
-	       dx, dy, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(hy_z_size != 1, hx_y_size != 1,
+		      (ez, ez_x_size, ez_y_size, ez_z_size,
+		       hy, hy_x_size, hy_y_size, hy_z_size,
+		       hx, hx_x_size, hx_y_size, hx_z_size,
+		       dx, dy, dt, n));
     }
 
   private:
+    template <bool ez_present, bool hy_present, bool hx_present>
+    void
+    sweep(T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	  const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  double dx, double dy, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+	const auto& dcp_param = coef_list[coef_idx[idx]];
+	BY_DCP_POLE_COUNT(dcp_param.a.size(), dcp_param.b.size(),
+			  update<ez_present, hy_present, hx_present>
+			  (ez, ez_x_size, ez_y_size, ez_z_size,
+			   hy, hy_x_size, hy_y_size, hy_z_size,
+			   hx, hx_x_size, hx_y_size, hx_z_size,
+			   dx, dy, dt, n, idx_list[idx], dcp_param, idx, dps, cps));
+      }
+    }
+
+    template <bool ez_present, bool hy_present, bool hx_present, int dp, int cp>
     void 
     update(T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
 	   const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
 	   const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
 	   double dx, double dy, double dt, double n,
 	   const Index3& idx, 
-	   DcpPlrcElectricParam<T>& dcp_param)
+	   const DcpPlrcElectricParam<T>& dcp_param, int point,
+	   Poles<dp> dps, Poles<cp> cps)
     {
       const int i = idx[0], j = idx[1], k = idx[2];
       
@@ -693,17 +911,18 @@ namespace gmes
       const std::complex<double> e_new = 
 	c[0] * ((hy(i+1,j,k+1) - hy(i,j,k+1)) / dx - 
 		(hx(i,j+1,k+1) - hx(i,j,k+1)) / dy) +
-	c[1] * e_now + c[2] * psi_total(dcp_param);
+	c[1] * e_now + c[2] * psi_total(dcp_param, point, dps, cps);
 
-      update_psi_dp(e_now, e_new, dcp_param);
-      update_psi_cp(e_now, e_new, dcp_param);
+      update_psi_dp(e_now, e_new, dcp_param, point, dps);
+      update_psi_cp(e_now, e_new, dcp_param, point, cps);
       
       assign(e_new, ez(i,j,k));
     }
 
   protected:
     using DcpPlrcElectric<T>::idx_list;
-    using DcpPlrcElectric<T>::param_list;
+    using DcpPlrcElectric<T>::coef_list;
+    using DcpPlrcElectric<T>::coef_idx;
     using DcpPlrcElectric<T>::update_psi_dp;
     using DcpPlrcElectric<T>::update_psi_cp;
     using DcpPlrcElectric<T>::psi_total;
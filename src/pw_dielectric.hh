@@ -11,12 +11,12 @@
 #include <utility>
 #include "pw_material.hh"
 
-#define ex(i,j,k) ex[ex_y_size==1?0:((i)*ex_y_size+(j))*ex_z_size+(k)]
-#define ey(i,j,k) ey[ey_z_size==1?0:((i)*ey_y_size+(j))*ey_z_size+(k)]
-#define ez(i,j,k) ez[ez_x_size==1?0:((i)*ez_y_size+(j))*ez_z_size+(k)]
-#define hx(i,j,k) hx[hx_y_size==1?0:((i)*hx_y_size+(j))*hx_z_size+(k)]
-#define hy(i,j,k) hy[hy_z_size==1?0:((i)*hy_y_size+(j))*hy_z_size+(k)]
-#define hz(i,j,k) hz[hz_x_size==1?0:((i)*hz_y_size+(j))*hz_z_size+(k)]
+#define ex(i,j,k) ex[ex_present?((i)*ex_y_size+(j))*ex_z_size+(k):0]
+#define ey(i,j,k) ey[ey_present?((i)*ey_y_size+(j))*ey_z_size+(k):0]
+#define ez(i,j,k) ez[ez_present?((i)*ez_y_size+(j))*ez_z_size+(k):0]
+#define hx(i,j,k) hx[hx_present?((i)*hx_y_size+(j))*hx_z_size+(k):0]
+#define hy(i,j,k) hy[hy_present?((i)*hy_y_size+(j))*hy_z_size+(k):0]
+#define hz(i,j,k) hz[hz_present?((i)*hz_y_size+(j))*hz_z_size+(k):0]
 
 namespace gmes
 {
@@ -46,10 +46,14 @@ namespace gmes
       Index3 index;
       std::copy(idx, idx + idx_size, index.begin());
       const int i = position(index);
-      if (i < 0)
+      if (i >= 0)
+	return param_list[i].eps_inf;
+
+      const int r = range_position(index);
+      if (r < 0)
 	return 0;
       else
-	return param_list[i].eps_inf;
+	return range_param_list[r].eps_inf;
     }
 
     PwMaterial<T>*
@@ -66,6 +70,21 @@ namespace gmes
 
       return this;
     }
+
+    // Attach the box [low, high] sharing a single parameter.
+    PwMaterial<T>*
+    attach_range(const int* const low, int low_size,
+		 const int* const high, int high_size,
+		 const PwMaterialParam* const pm_param_ptr)
+    {
+      IdxRange range;
+      std::copy(low, low + low_size, range.first.begin());
+      std::copy(high, high + high_size, range.second.begin());
+
+      push_range(range, *static_cast<const DielectricElectricParam<T>*>(pm_param_ptr));
+
+      return this;
+    }
     
     PwMaterial<T>*
     merge(const PwMaterial<T>* const pm_ptr)
@@ -78,13 +97,50 @@ namespace gmes
       std::copy(dielectric_ptr->param_list.begin(), 
 		dielectric_ptr->param_list.end(), 
 		std::back_inserter(param_list));
+      for (std::size_t n = 0; n < dielectric_ptr->range_list.size(); n++)
+	push_range(dielectric_ptr->range_list[n], 
+		   dielectric_ptr->range_param_list[n]);
       return this;
     }
 
   protected:
     using MaterialElectric<T>::position;
+    using MaterialElectric<T>::range_position;
     using MaterialElectric<T>::idx_list;
+    using MaterialElectric<T>::range_list;
     std::vector<DielectricElectricParam<T> > param_list;
+    std::vector<DielectricElectricParam<T> > range_param_list;
+
+    void
+    reorder(const std::vector<int>& perm)
+    {
+      permute(param_list, perm);
+    }
+
+    void
+    coalesce()
+    {
+      coalesce_ranges(range_list, range_param_list, same_eps_inf);
+    }
+
+    static bool
+    same_eps_inf(const DielectricElectricParam<T>& p1, const DielectricElectricParam<T>& p2)
+    {
+      return p1.eps_inf == p2.eps_inf;
+    }
+
+    // Append range, or stack it onto the last range of the same medium.
+    void
+    push_range(const IdxRange& range, const DielectricElectricParam<T>& dielectric_param)
+    {
+      if (!range_list.empty() &&
+	  same_eps_inf(range_param_list.back(), dielectric_param) &&
+	  stack(range_list.back(), range))
+	return;
+
+      range_list.push_back(range);
+      range_param_list.push_back(dielectric_param);
+    }
 
   private:
     static const std::string tag; // "DielectricElectric"
@@ -103,16 +159,49 @@ namespace gmes
 	       const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
 	       double dy, double dz, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(ex, ex_x_size, ex_y_size, ex_z_size,
-	       hz, hz_x_size, hz_y_size, hz_z_size,
-	       hy, hy_x_size, hy_y_size, hy_z_size,
-	       dy, dz, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(hz_x_size != 1, hy_z_size != 1,
+		      (ex, ex_x_size, ex_y_size, ex_z_size,
+		       hz, hz_x_size, hz_y_size, hz_z_size,
+		       hy, hy_x_size, hy_y_size, hy_z_size,
+		       dy, dz, dt, n));
     }
-    
+
   private:
+    template <bool ex_present, bool hz_present, bool hy_present>
+    void
+    sweep(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	  const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  double dy, double dz, double dt, double n)
+    {
+      // A single parallel region for the points and the ranges. The 
+      // rows of each range are shared among the threads by the loop in
+      // update_range, and no thread waits at the end of a range since
+      // the ranges do not overlap.
+      const int size = idx_list.size();
+#pragma omp parallel
+      {
+#pragma omp for nowait
+	for (int idx = 0; idx < size; idx++) {
+	  update<ex_present, hz_present, hy_present>
+	    (ex, ex_x_size, ex_y_size, ex_z_size,
+	     hz, hz_x_size, hz_y_size, hz_z_size,
+	     hy, hy_x_size, hy_y_size, hy_z_size,
+	     dy, dz, dt, n, idx_list[idx], param_list[idx]);
+	}
+
+	for (auto range = range_list.begin(), param = range_param_list.begin();
+	     range != range_list.end(); ++range, ++param) {
+	  update_range<ex_present, hz_present, hy_present>
+	    (ex, ex_x_size, ex_y_size, ex_z_size,
+	     hz, hz_x_size, hz_y_size, hz_z_size,
+	     hy, hy_x_size, hy_y_size, hy_z_size,
+	     dy, dz, dt, n, *range, *param);
+	}
+      }
+    }
+
+    template <bool ex_present, bool hz_present, bool hy_present>
     void 
     update(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
 	   const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
@@ -127,10 +216,31 @@ namespace gmes
       ex(i,j,k) += dt / eps_inf * ((hz(i+1,j+1,k) - hz(i+1,j,k)) / dy - 
 				   (hy(i+1,j,k+1) - hy(i+1,j,k)) / dz);
     }
-    
+
+    template <bool ex_present, bool hz_present, bool hy_present>
+    void
+    update_range(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+		 const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+		 const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+		 double dy, double dz, double dt, double n,
+		 const IdxRange& range,
+		 const DielectricElectricParam<T>& dielectric_param) const
+    {
+      const double coef = dt / dielectric_param.eps_inf;
+
+#pragma omp for collapse(2) schedule(dynamic) nowait
+      for (int i = range.first[0]; i <= range.second[0]; i++)
+	for (int j = range.first[1]; j <= range.second[1]; j++)
+	  for (int k = range.first[2]; k <= range.second[2]; k++)
+	    ex(i,j,k) += coef * ((hz(i+1,j+1,k) - hz(i+1,j,k)) / dy - 
+				 (hy(i+1,j,k+1) - hy(i+1,j,k)) / dz);
+    }
+
   protected:
     using DielectricElectric<T>::idx_list;
     using DielectricElectric<T>::param_list;
+    using DielectricElectric<T>::range_list;
+    using DielectricElectric<T>::range_param_list;
   }; // template DielectricEx
 
   template <typename T>
@@ -143,16 +253,45 @@ namespace gmes
 	       const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
 	       double dz, double dx, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-      	update(ey, ey_x_size, ey_y_size, ey_z_size,
-	       hx, hx_x_size, hx_y_size, hx_z_size,
-	       hz, hz_x_size, hz_y_size, hz_z_size,
-	       dz, dx, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(hx_y_size != 1, hz_x_size != 1,
+		      (ey, ey_x_size, ey_y_size, ey_z_size,
+		       hx, hx_x_size, hx_y_size, hx_z_size,
+		       hz, hz_x_size, hz_y_size, hz_z_size,
+		       dz, dx, dt, n));
     }
 
   private:
+    template <bool ey_present, bool hx_present, bool hz_present>
+    void
+    sweep(T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	  const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  double dz, double dx, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel
+      {
+#pragma omp for nowait
+	for (int idx = 0; idx < size; idx++) {
+	  update<ey_present, hx_present, hz_present>
+	    (ey, ey_x_size, ey_y_size, ey_z_size,
+	     hx, hx_x_size, hx_y_size, hx_z_size,
+	     hz, hz_x_size, hz_y_size, hz_z_size,
+	     dz, dx, dt, n, idx_list[idx], param_list[idx]);
+	}
+
+	for (auto range = range_list.begin(), param = range_param_list.begin();
+	     range != range_list.end(); ++range, ++param) {
+	  update_range<ey_present, hx_present, hz_present>
+	    (ey, ey_x_size, ey_y_size, ey_z_size,
+	     hx, hx_x_size, hx_y_size, hx_z_size,
+	     hz, hz_x_size, hz_y_size, hz_z_size,
+	     dz, dx, dt, n, *range, *param);
+	}
+      }
+    }
+
+    template <bool ey_present, bool hx_present, bool hz_present>
     void 
     update(T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
 	   const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
@@ -168,9 +307,30 @@ namespace gmes
 				   (hz(i+1,j+1,k) - hz(i,j+1,k)) / dx);
     }
 
+    template <bool ey_present, bool hx_present, bool hz_present>
+    void
+    update_range(T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+		 const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+		 const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+		 double dz, double dx, double dt, double n,
+		 const IdxRange& range,
+		 const DielectricElectricParam<T>& dielectric_param) const
+    {
+      const double coef = dt / dielectric_param.eps_inf;
+
+#pragma omp for collapse(2) schedule(dynamic) nowait
+      for (int i = range.first[0]; i <= range.second[0]; i++)
+	for (int j = range.first[1]; j <= range.second[1]; j++)
+	  for (int k = range.first[2]; k <= range.second[2]; k++)
+	    ey(i,j,k) += coef * ((hx(i,j+1,k+1) - hx(i,j+1,k)) / dz - 
+				 (hz(i+1,j+1,k) - hz(i,j+1,k)) / dx);
+    }
+
   protected:
     using DielectricElectric<T>::idx_list;
     using DielectricElectric<T>::param_list;
+    using DielectricElectric<T>::range_list;
+    using DielectricElectric<T>::range_param_list;
   }; // template DielectricEy
 
   template <typename T> 
@@ -183,17 +343,46 @@ namespace gmes
 	       const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
 	       double dx, double dy, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-	update(ez, ez_x_size, ez_y_size, ez_z_size,
-	       hy, hy_x_size, hy_y_size, hy_z_size,
-	       hx, hx_x_size, hx_y_size, hx_z_size,
-	       dx, dy, dt, n,
-      	       *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(hy_z_size != 1, hx_y_size != 1,
+		      (ez, ez_x_size, ez_y_size, ez_z_size,
+		       hy, hy_x_size, hy_y_size, hy_z_size,
+		       hx, hx_x_size, hx_y_size, hx_z_size,
+		       dx, dy, dt, n));
     }
 
   private:
+    template <bool ez_present, bool hy_present, bool hx_present>
+    void
+    sweep(T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	  const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  double dx, double dy, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel
+      {
+#pragma omp for nowait
+	for (int idx = 0; idx < size; idx++) {
+	  update<ez_present, hy_present, hx_present>
+	    (ez, ez_x_size, ez_y_size, ez_z_size,
+	     hy, hy_x_size, hy_y_size, hy_z_size,
+	     hx, hx_x_size, hx_y_size, hx_z_size,
+	     dx, dy, dt, n,
+	     idx_list[idx], param_list[idx]);
+	}
+
+	for (auto range = range_list.begin(), param = range_param_list.begin();
+	     range != range_list.end(); ++range, ++param) {
+	  update_range<ez_present, hy_present, hx_present>
+	    (ez, ez_x_size, ez_y_size, ez_z_size,
+	     hy, hy_x_size, hy_y_size, hy_z_size,
+	     hx, hx_x_size, hx_y_size, hx_z_size,
+	     dx, dy, dt, n, *range, *param);
+	}
+      }
+    }
+
+    template <bool ez_present, bool hy_present, bool hx_present>
     void 
     update(T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
 	   const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
@@ -209,9 +398,30 @@ namespace gmes
       				   (hx(i,j+1,k+1) - hx(i,j,k+1)) / dy);
     }
 
+    template <bool ez_present, bool hy_present, bool hx_present>
+    void
+    update_range(T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+		 const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+		 const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+		 double dx, double dy, double dt, double n,
+		 const IdxRange& range,
+		 const DielectricElectricParam<T>& dielectric_param) const
+    {
+      const double coef = dt / dielectric_param.eps_inf;
+
+#pragma omp for collapse(2) schedule(dynamic) nowait
+      for (int i = range.first[0]; i <= range.second[0]; i++)
+	for (int j = range.first[1]; j <= range.second[1]; j++)
+	  for (int k = range.first[2]; k <= range.second[2]; k++)
+	    ez(i,j,k) += coef * ((hy(i+1,j,k+1) - hy(i,j,k+1)) / dx -
+				 (hx(i,j+1,k+1) - hx(i,j,k+1)) / dy);
+    }
+
   protected:
     using DielectricElectric<T>::idx_list;
     using DielectricElectric<T>::param_list;
+    using DielectricElectric<T>::range_list;
+    using DielectricElectric<T>::range_param_list;
   }; // template DielectricEz
 
   template <typename T> 
@@ -230,10 +440,14 @@ namespace gmes
       Index3 index;
       std::copy(idx, idx + idx_size, index.begin());
       const int i = position(index);
-      if (i < 0)
+      if (i >= 0)
+	return param_list[i].mu_inf;
+
+      const int r = range_position(index);
+      if (r < 0)
 	return 0;
       else
-	return param_list[i].mu_inf;
+	return range_param_list[r].mu_inf;
     }
 
     PwMaterial<T>*
@@ -250,6 +464,21 @@ namespace gmes
       
       return this;
     }
+
+    // Attach the box [low, high] sharing a single parameter.
+    PwMaterial<T>*
+    attach_range(const int* const low, int low_size,
+		 const int* const high, int high_size,
+		 const PwMaterialParam* const pm_param_ptr)
+    {
+      IdxRange range;
+      std::copy(low, low + low_size, range.first.begin());
+      std::copy(high, high + high_size, range.second.begin());
+
+      push_range(range, *static_cast<const DielectricMagneticParam<T>*>(pm_param_ptr));
+
+      return this;
+    }
     
     PwMaterial<T>*
     merge(const PwMaterial<T>* const pm_ptr)
@@ -257,13 +486,49 @@ namespace gmes
       auto dielectric_ptr = static_cast<const DielectricMagnetic<T>*>(pm_ptr);
       std::copy(dielectric_ptr->idx_list.begin(), dielectric_ptr->idx_list.end(), std::back_inserter(idx_list));
       std::copy(dielectric_ptr->param_list.begin(), dielectric_ptr->param_list.end(), std::back_inserter(param_list));
+      for (std::size_t n = 0; n < dielectric_ptr->range_list.size(); n++)
+	push_range(dielectric_ptr->range_list[n], dielectric_ptr->range_param_list[n]);
       return this;
     }
 
   protected:
     using MaterialMagnetic<T>::position;
+    using MaterialMagnetic<T>::range_position;
     using MaterialMagnetic<T>::idx_list;
+    using MaterialMagnetic<T>::range_list;
     std::vector<DielectricMagneticParam<T> > param_list;
+    std::vector<DielectricMagneticParam<T> > range_param_list;
+
+    void
+    reorder(const std::vector<int>& perm)
+    {
+      permute(param_list, perm);
+    }
+
+    void
+    coalesce()
+    {
+      coalesce_ranges(range_list, range_param_list, same_mu_inf);
+    }
+
+    static bool
+    same_mu_inf(const DielectricMagneticParam<T>& p1, const DielectricMagneticParam<T>& p2)
+    {
+      return p1.mu_inf == p2.mu_inf;
+    }
+
+    // Append range, or stack it onto the last range of the same medium.
+    void
+    push_range(const IdxRange& range, const DielectricMagneticParam<T>& dielectric_param)
+    {
+      if (!range_list.empty() &&
+	  same_mu_inf(range_param_list.back(), dielectric_param) &&
+	  stack(range_list.back(), range))
+	return;
+
+      range_list.push_back(range);
+      range_param_list.push_back(dielectric_param);
+    }
 
   private:
     static const std::string tag; // "DielectricMagnetic"
@@ -282,16 +547,45 @@ namespace gmes
 	       const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
 	       double dy, double dz, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-      	update(hx, hx_x_size, hx_y_size, hx_z_size,
-	       ez, ez_x_size, ez_y_size, ez_z_size,
-	       ey, ey_x_size, ey_y_size, ey_z_size,
-	       dy, dz, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(ez_x_size != 1, ey_z_size != 1,
+		      (hx, hx_x_size, hx_y_size, hx_z_size,
+		       ez, ez_x_size, ez_y_size, ez_z_size,
+		       ey, ey_x_size, ey_y_size, ey_z_size,
+		       dy, dz, dt, n));
     }
 
   private:
+    template <bool hx_present, bool ez_present, bool ey_present>
+    void
+    sweep(T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	  const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	  double dy, double dz, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel
+      {
+#pragma omp for nowait
+	for (int idx = 0; idx < size; idx++) {
+	  update<hx_present, ez_present, ey_present>
+	    (hx, hx_x_size, hx_y_size, hx_z_size,
+	     ez, ez_x_size, ez_y_size, ez_z_size,
+	     ey, ey_x_size, ey_y_size, ey_z_size,
+	     dy, dz, dt, n, idx_list[idx], param_list[idx]);
+	}
+
+	for (auto range = range_list.begin(), param = range_param_list.begin();
+	     range != range_list.end(); ++range, ++param) {
+	  update_range<hx_present, ez_present, ey_present>
+	    (hx, hx_x_size, hx_y_size, hx_z_size,
+	     ez, ez_x_size, ez_y_size, ez_z_size,
+	     ey, ey_x_size, ey_y_size, ey_z_size,
+	     dy, dz, dt, n, *range, *param);
+	}
+      }
+    }
+
+    template <bool hx_present, bool ez_present, bool ey_present>
     void
     update(T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
 	   const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
@@ -307,9 +601,30 @@ namespace gmes
       				  (ez(i,j,k-1) - ez(i,j-1,k-1)) / dy);
     }
 
+    template <bool hx_present, bool ez_present, bool ey_present>
+    void
+    update_range(T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+		 const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+		 const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+		 double dy, double dz, double dt, double n,
+		 const IdxRange& range,
+		 const DielectricMagneticParam<T>& dielectric_param) const
+    {
+      const double coef = dt / dielectric_param.mu_inf;
+
+#pragma omp for collapse(2) schedule(dynamic) nowait
+      for (int i = range.first[0]; i <= range.second[0]; i++)
+	for (int j = range.first[1]; j <= range.second[1]; j++)
+	  for (int k = range.first[2]; k <= range.second[2]; k++)
+	    hx(i,j,k) += coef * ((ey(i,j-1,k) - ey(i,j-1,k-1)) / dz -
+				 (ez(i,j,k-1) - ez(i,j-1,k-1)) / dy);
+    }
+
   protected:
     using DielectricMagnetic<T>::idx_list;
     using DielectricMagnetic<T>::param_list;
+    using DielectricMagnetic<T>::range_list;
+    using DielectricMagnetic<T>::range_param_list;
   }; // template DielectricHx
 
   template <typename T> 
@@ -322,16 +637,45 @@ namespace gmes
 	       const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
 	       double dz, double dx, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-      	update(hy, hy_x_size, hy_y_size, hy_z_size,
-	       ex, ex_x_size, ex_y_size, ex_z_size,
-	       ez, ez_x_size, ez_y_size, ez_z_size,
-	       dz, dx, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(ex_y_size != 1, ez_x_size != 1,
+		      (hy, hy_x_size, hy_y_size, hy_z_size,
+		       ex, ex_x_size, ex_y_size, ex_z_size,
+		       ez, ez_x_size, ez_y_size, ez_z_size,
+		       dz, dx, dt, n));
     }
 
   private:
+    template <bool hy_present, bool ex_present, bool ez_present>
+    void
+    sweep(T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	  const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	  double dz, double dx, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel
+      {
+#pragma omp for nowait
+	for (int idx = 0; idx < size; idx++) {
+	  update<hy_present, ex_present, ez_present>
+	    (hy, hy_x_size, hy_y_size, hy_z_size,
+	     ex, ex_x_size, ex_y_size, ex_z_size,
+	     ez, ez_x_size, ez_y_size, ez_z_size,
+	     dz, dx, dt, n, idx_list[idx], param_list[idx]);
+	}
+
+	for (auto range = range_list.begin(), param = range_param_list.begin();
+	     range != range_list.end(); ++range, ++param) {
+	  update_range<hy_present, ex_present, ez_present>
+	    (hy, hy_x_size, hy_y_size, hy_z_size,
+	     ex, ex_x_size, ex_y_size, ex_z_size,
+	     ez, ez_x_size, ez_y_size, ez_z_size,
+	     dz, dx, dt, n, *range, *param);
+	}
+      }
+    }
+
+    template <bool hy_present, bool ex_present, bool ez_present>
     void 
     update(T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
 	   const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
@@ -347,9 +691,30 @@ namespace gmes
       				  (ex(i-1,j,k) - ex(i-1,j,k-1)) / dz);
     }
 
+    template <bool hy_present, bool ex_present, bool ez_present>
+    void
+    update_range(T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+		 const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+		 const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+		 double dz, double dx, double dt, double n,
+		 const IdxRange& range,
+		 const DielectricMagneticParam<T>& dielectric_param) const
+    {
+      const double coef = dt / dielectric_param.mu_inf;
+
+#pragma omp for collapse(2) schedule(dynamic) nowait
+      for (int i = range.first[0]; i <= range.second[0]; i++)
+	for (int j = range.first[1]; j <= range.second[1]; j++)
+	  for (int k = range.first[2]; k <= range.second[2]; k++)
+	    hy(i,j,k) += coef * ((ez(i,j,k-1) - ez(i-1,j,k-1)) / dx -
+				 (ex(i-1,j,k) - ex(i-1,j,k-1)) / dz);
+    }
+
   protected:
     using DielectricMagnetic<T>::idx_list;
     using DielectricMagnetic<T>::param_list;
+    using DielectricMagnetic<T>::range_list;
+    using DielectricMagnetic<T>::range_param_list;
   }; // template DielectricHy
 
   template <typename T> 
@@ -362,16 +727,45 @@ namespace gmes
 	       const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
 	       double dx, double dy, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(hz, hz_x_size, hz_y_size, hz_z_size,
-	       ey, ey_x_size, ey_y_size, ey_z_size,
-	       ex, ex_x_size, ex_y_size, ex_z_size,
-	       dx, dy, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(ey_z_size != 1, ex_y_size != 1,
+		      (hz, hz_x_size, hz_y_size, hz_z_size,
+		       ey, ey_x_size, ey_y_size, ey_z_size,
+		       ex, ex_x_size, ex_y_size, ex_z_size,
+		       dx, dy, dt, n));
     }
 
   private:
+    template <bool hz_present, bool ey_present, bool ex_present>
+    void
+    sweep(T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	  const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	  double dx, double dy, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel
+      {
+#pragma omp for nowait
+	for (int idx = 0; idx < size; idx++) {
+	  update<hz_present, ey_present, ex_present>
+	    (hz, hz_x_size, hz_y_size, hz_z_size,
+	     ey, ey_x_size, ey_y_size, ey_z_size,
+	     ex, ex_x_size, ex_y_size, ex_z_size,
+	     dx, dy, dt, n, idx_list[idx], param_list[idx]);
+	}
+
+	for (auto range = range_list.begin(), param = range_param_list.begin();
+	     range != range_list.end(); ++range, ++param) {
+	  update_range<hz_present, ey_present, ex_present>
+	    (hz, hz_x_size, hz_y_size, hz_z_size,
+	     ey, ey_x_size, ey_y_size, ey_z_size,
+	     ex, ex_x_size, ex_y_size, ex_z_size,
+	     dx, dy, dt, n, *range, *param);
+	}
+      }
+    }
+
+    template <bool hz_present, bool ey_present, bool ex_present>
     void 
     update(T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
 	   const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
@@ -387,9 +781,30 @@ namespace gmes
 				  (ey(i,j-1,k) - ey(i-1,j-1,k)) / dx);
     }
 
+    template <bool hz_present, bool ey_present, bool ex_present>
+    void
+    update_range(T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+		 const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+		 const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+		 double dx, double dy, double dt, double n,
+		 const IdxRange& range,
+		 const DielectricMagneticParam<T>& dielectric_param) const
+    {
+      const double coef = dt / dielectric_param.mu_inf;
+
+#pragma omp for collapse(2) schedule(dynamic) nowait
+      for (int i = range.first[0]; i <= range.second[0]; i++)
+	for (int j = range.first[1]; j <= range.second[1]; j++)
+	  for (int k = range.first[2]; k <= range.second[2]; k++)
+	    hz(i,j,k) += coef * ((ex(i-1,j,k) - ex(i-1,j-1,k)) / dy -
+				 (ey(i,j-1,k) - ey(i-1,j-1,k)) / dx);
+    }
+
   protected:
     using DielectricMagnetic<T>::idx_list;
     using DielectricMagnetic<T>::param_list;
+    using DielectricMagnetic<T>::range_list;
+    using DielectricMagnetic<T>::range_param_list;
   }; // template DielectricHz
 } // namespace gmes
 
@@ -9,82 +9,33 @@
  * broadened media using an iterative predictor corrector 
  * FDTD method. Opt. Express 13, 182–194 (2005).
  *
- * This module just handles 1D case with Ex and Hy fields.
  * The dipole moments are assumed to be aligned along the 
- * electric field.
- *
- * TODOs
- * 1. Replace array with valarray.
- * 2. multi dimension support
+ * electric field, so that each electric component is 
+ * coupled to its own Bloch vectors. The Bloch vectors of 
+ * the points are stored per bin in contiguous arrays, and 
+ * the corrector iterations of all points run in lockstep, 
+ * each point dropping out once it converges.
  */
 
 #ifndef PW_DM2_HH_
 #define PW_DM2_HH_
 
 #include <array>
-#include <numeric>
+#include <cmath>
 #include <stdexcept>
 #include <vector>
 
 #include "pw_dielectric.hh"
 
-#define ex(i,j,k) ex[ex_y_size==1?0:((i)*ex_y_size+(j))*ex_z_size+(k)]
-#define ey(i,j,k) ey[ey_z_size==1?0:((i)*ey_y_size+(j))*ey_z_size+(k)]
-#define ez(i,j,k) ez[ez_x_size==1?0:((i)*ez_y_size+(j))*ez_z_size+(k)]
-#define hx(i,j,k) hx[hx_y_size==1?0:((i)*hx_y_size+(j))*hx_z_size+(k)]
-#define hy(i,j,k) hy[hy_z_size==1?0:((i)*hy_y_size+(j))*hy_z_size+(k)]
-#define hz(i,j,k) hz[hz_x_size==1?0:((i)*hz_y_size+(j))*hz_z_size+(k)]
+#define ex(i,j,k) ex[ex_present?((i)*ex_y_size+(j))*ex_z_size+(k):0]
+#define ey(i,j,k) ey[ey_present?((i)*ey_y_size+(j))*ey_z_size+(k):0]
+#define ez(i,j,k) ez[ez_present?((i)*ez_y_size+(j))*ez_z_size+(k):0]
+#define hx(i,j,k) hx[hx_present?((i)*hx_y_size+(j))*hx_z_size+(k):0]
+#define hy(i,j,k) hy[hy_present?((i)*hy_y_size+(j))*hy_z_size+(k):0]
+#define hz(i,j,k) hz[hz_present?((i)*hz_y_size+(j))*hz_z_size+(k):0]
 
 namespace gmes
 {  
-  // TODO: l2_norm should be a local function.
-  template <typename T>
-  double 
-  l2_norm(const T& e, const std::vector<std::array<T, 3> >& u)
-  {
-    T accu = e * e;
-    for (std::size_t i = 0; i < u.size(); ++i) {  
-      accu += std::inner_product(u[i].begin(), u[i].end(), 
-                                 u[i].begin(), static_cast<T>(0));
-    }
-
-    // accu += std::accumulate(u.begin(), u.end(), 0,
-    //                         [](int a, const std::array<int, 3>& b)
-    //                         { 
-    //                           return a + std::inner_product(b.begin(), b.end(), 
-    //                                                         b.begin(),
-    //                                                         static_cast<T>(0));
-    //                         }
-    //                         );
-
-    return std::sqrt(accu);
-  } // template l2_norm
-
-
-  // TODO: rel_error should be a local function.
-  template <typename T>
-  double
-  rel_error(const T& e_new, const std::vector<std::array<T, 3> >& u_new,
-            const T& e_ref, const std::vector<std::array<T, 3> >& u_ref)
-  {
-    T e_diff = e_new - e_ref;
-
-    std::vector<std::array<T, 3> > u_diff;
-    u_diff.reserve(u_ref.size());
-
-    for (std::size_t  i = 0; i < u_ref.size(); ++i) {
-      std::set_difference(u_new[i].begin(), u_new[i].end(),
-                          u_ref[i].begin(), u_ref[i].end(),
-                          u_diff[i].begin());
-    }
-
-    double denom = l2_norm(e_diff, u_diff);
-    double num = l2_norm(e_ref, u_ref);
-    
-    return denom / num;
-  } // template rel_error
-
-
   template <typename T> 
   struct Dm2ElectricParam: public ElectricParam<T>
   {
@@ -121,15 +72,16 @@ namespace gmes
       if (i < 0)
         return 0;
       else {
-        const auto& p = param_list[i];
+        const auto& p = coef_list[coef_idx[i]];
 	  
         switch (rho_idx)
           {
           case 0:
+            return exp(-t / p.t2) * u(bin, i);
           case 1:
-            return exp(-t / p.t2) * p.u[bin][rho_idx];
+            return exp(-t / p.t2) * v(bin, i);
 	  case 2:
-            return p.rho30 + exp(-t / p.t1) * p.u[bin][rho_idx];
+            return p.rho30 + exp(-t / p.t1) * w(bin, i);
 	  default:
             throw std::out_of_range("rho_idx should be in [0, 2]");
             return 0;
@@ -137,6 +89,16 @@ namespace gmes
       }
     }
     
+    // get_rho of each row of idx_array.
+    void
+    get_rho_array(const int* const idx_array, int idx_rows, int idx_cols,
+                  int bin, int rho_idx, double t, 
+                  double* const rho, int rho_size) const
+    {
+      for (int n = 0; n < idx_rows && n < rho_size; n++)
+        rho[n] = get_rho(idx_array + n * idx_cols, idx_cols, bin, rho_idx, t);
+    }
+
     void
     get_u(const int* const idx, int idx_size, double t, double* const u, int u_size) const
     {
@@ -147,11 +109,11 @@ namespace gmes
       if (i < 0)
         return;
       else {
-        const auto& p = param_list[i];
+        const auto& p = coef_list[coef_idx[i]];
 
         double factor = exp(-t / p.t2);
-        for (int j = 0; j < u_size; ++j) {
-          u[j] = factor * p.u[j][0];
+        for (int j = 0; j < u_size && j < static_cast<int>(p.omega.size()); ++j) {
+          u[j] = factor * this->u(j, i);
         }
       }
     }
@@ -166,11 +128,11 @@ namespace gmes
       if (i < 0)
         return;
       else {
-        const auto& p = param_list[i];
+        const auto& p = coef_list[coef_idx[i]];
 
         double factor = exp(-t / p.t2);
-        for (int j = 0; j < v_size; ++j) {
-          v[j] = factor * p.u[j][1];
+        for (int j = 0; j < v_size && j < static_cast<int>(p.omega.size()); ++j) {
+          v[j] = factor * this->v(j, i);
         }
       }
     }
@@ -185,15 +147,41 @@ namespace gmes
       if (i < 0)
         return;
       else {
-        const auto& p = param_list[i];
+        const auto& p = coef_list[coef_idx[i]];
 
         double factor = exp(-t / p.t1);
-        for (int j = 0; j < w_size; ++j) {
-          w[j] = p.rho30 + factor * p.u[j][2];
+        for (int j = 0; j < w_size && j < static_cast<int>(p.omega.size()); ++j) {
+          w[j] = p.rho30 + factor * this->w(j, i);
         }
       }
     }
 
+    // get_u, get_v, and get_w of each row of idx_array, into the rows
+    // of bloch. The rows of the points not found are left as they are.
+    void
+    get_u_array(const int* const idx_array, int idx_rows, int idx_cols,
+                double t, double* const bloch, int bloch_rows, int bloch_cols) const
+    {
+      for (int n = 0; n < idx_rows && n < bloch_rows; n++)
+        get_u(idx_array + n * idx_cols, idx_cols, t, bloch + n * bloch_cols, bloch_cols);
+    }
+
+    void
+    get_v_array(const int* const idx_array, int idx_rows, int idx_cols,
+                double t, double* const bloch, int bloch_rows, int bloch_cols) const
+    {
+      for (int n = 0; n < idx_rows && n < bloch_rows; n++)
+        get_v(idx_array + n * idx_cols, idx_cols, t, bloch + n * bloch_cols, bloch_cols);
+    }
+
+    void
+    get_w_array(const int* const idx_array, int idx_rows, int idx_cols,
+                double t, double* const bloch, int bloch_rows, int bloch_cols) const
+    {
+      for (int n = 0; n < idx_rows && n < bloch_rows; n++)
+        get_w(idx_array + n * idx_cols, idx_cols, t, bloch + n * bloch_cols, bloch_cols);
+    }
+
     const std::string& 
     name() const
     {
@@ -209,7 +197,7 @@ namespace gmes
       if (i < 0)
 	return 0;
       else
-	return param_list[i].eps_inf;
+	return coef_list[coef_idx[i]].eps_inf;
     }
 
     PwMaterial<T>*
@@ -222,7 +210,17 @@ namespace gmes
       const auto& dm2_param = *static_cast<const Dm2ElectricParam<T> * const>(pm_param_ptr);
 
       idx_list.push_back(index);
-      param_list.push_back(dm2_param);
+      coef_idx.push_back(intern(coef_list, dm2_param, same_coef));
+
+      std::vector<T> u_init, v_init, w_init;
+      for (auto b = dm2_param.u.begin(); b != dm2_param.u.end(); ++b) {
+	u_init.push_back((*b)[0]);
+	v_init.push_back((*b)[1]);
+	w_init.push_back((*b)[2]);
+      }
+      u.push_back(u_init);
+      v.push_back(v_init);
+      w.push_back(w_init);
 
       return this;
     };
@@ -235,78 +233,169 @@ namespace gmes
       std::copy(dm2_ptr->idx_list.begin(), 
 		dm2_ptr->idx_list.end(), 
 		std::back_inserter(idx_list));
-      std::copy(dm2_ptr->param_list.begin(), 
-		dm2_ptr->param_list.end(), 
-		std::back_inserter(param_list));
+
+      std::vector<int> coef_map;
+      for (auto c = dm2_ptr->coef_list.begin(); c != dm2_ptr->coef_list.end(); ++c)
+	coef_map.push_back(intern(coef_list, *c, same_coef));
+      for (auto c = dm2_ptr->coef_idx.begin(); c != dm2_ptr->coef_idx.end(); ++c)
+	coef_idx.push_back(coef_map[*c]);
+
+      u.append(dm2_ptr->u);
+      v.append(dm2_ptr->v);
+      w.append(dm2_ptr->w);
       return this;
     }
     
   protected:
     using MaterialElectric<T>::position;
     using MaterialElectric<T>::idx_list;
-    std::vector<Dm2ElectricParam<T> > param_list;
 
-    void
-    a(double t, const Dm2ElectricParam<T>& dm2_param,
-      std::vector<double>& a_out) const 
+    // The coefficients are stored once per distinct material. The
+    // Bloch vectors of coef_list are not used.
+    std::vector<Dm2ElectricParam<T> > coef_list;
+    std::vector<int> coef_idx;
+
+    // The components of the Bloch vectors.
+    PoleArray<T> u, v, w;
+
+    // The time-dependent factors of coef_list at a time step. a and b
+    // are yet to be multiplied by n_atom and n_atom * omega of a bin.
+    struct Factor
     {
-      const auto& n_atom = dm2_param.n_atom;
-      const auto& gamma = dm2_param.gamma;
-      const auto& t2 = dm2_param.t2;
+      double a, b, c_plus, c_minus, d;
+    };
 
-      for (std::size_t i = 0; i < n_atom.size(); ++i) {
-        a_out.push_back(n_atom[i] * gamma / t2 * exp(-t / t2));
-      }
+    // The working storage of solve, which is kept between the time 
+    // steps. The subclasses fill e_old and curl, the curl of the 
+    // magnetic field, and read e_new.
+    std::vector<Factor> factor;
+    std::vector<T> e_old, e_new, curl;
+    PoleArray<T> u_new, v_new, w_new;
+    std::vector<char> active;
+
+    static bool
+    same_coef(const Dm2ElectricParam<T>& p1, const Dm2ElectricParam<T>& p2)
+    {
+      return (p1.eps_inf == p2.eps_inf && p1.omega == p2.omega && 
+	      p1.n_atom == p2.n_atom && p1.rho30 == p2.rho30 && 
+	      p1.gamma == p2.gamma && p1.t1 == p2.t1 && p1.t2 == p2.t2 && 
+	      p1.hbar == p2.hbar && p1.rtol == p2.rtol);
     }
 
     void
-    b(double t, const Dm2ElectricParam<T>& dm2_param,
-      std::vector<double>& b_out) const
+    reorder(const std::vector<int>& perm)
     {
-      const auto& n_atom = dm2_param.n_atom;
-      const auto& gamma = dm2_param.gamma;
-      const auto& omega = dm2_param.omega;
-      const auto& t2 = dm2_param.t2;
-
-      for (std::size_t i = 0; i < n_atom.size(); ++i) {
-        b_out.push_back(n_atom[i] * gamma * omega[i] * exp(-t / t2));
-      }
+      permute(coef_idx, perm);
+      u.reorder(perm);
+      v.reorder(perm);
+      w.reorder(perm);
     }
 
-    void 
-    c_plus(double t, const Dm2ElectricParam<T>& dm2_param,
-           double& c_out) const
+    // Size the working storage for the points.
+    void
+    prepare()
     {
-      const auto& gamma = dm2_param.gamma;
-      const auto& t1 = dm2_param.t1;
-      const auto& t2 = dm2_param.t2;
-      const auto& hbar = dm2_param.hbar;
-      
-      c_out = 2 / hbar * gamma * exp(-t * (1 / t1 - 1 / t2));
+      const std::size_t size = idx_list.size();
+      e_old.resize(size);
+      e_new.resize(size);
+      curl.resize(size);
+      active.resize(size);
     }
 
+    // Advance the fields from e_old into e_new and the Bloch vectors, 
+    // iterating the corrector over all points together until each 
+    // point converges.
     void
-    c_minus(double t, const Dm2ElectricParam<T>& dm2_param,
-            double& c_out) const
+    solve(double dt, double n)
     {
-      const auto& gamma = dm2_param.gamma;
-      const auto& t1 = dm2_param.t1;
-      const auto& t2 = dm2_param.t2;
-      const auto& hbar = dm2_param.hbar;
+      const int size = idx_list.size();
+      const double t = (n + 0.5) * dt;
+
+      factor.resize(coef_list.size());
+      for (std::size_t c = 0; c < coef_list.size(); c++) {
+	const auto& p = coef_list[c];
+	factor[c].a = p.gamma / p.t2 * exp(-t / p.t2);
+	factor[c].b = p.gamma * exp(-t / p.t2);
+	factor[c].c_plus = 2 / p.hbar * p.gamma * exp(-t * (1 / p.t1 - 1 / p.t2));
+	factor[c].c_minus = 2 / p.hbar * p.gamma * exp(-t * (1 / p.t2 - 1 / p.t1));
+	factor[c].d = 2 / p.hbar * p.gamma * p.rho30 * exp(t / p.t2);
+      }
+
+      u_new = u;
+      v_new = v;
+      w_new = w;
+      std::copy(e_old.begin(), e_old.end(), e_new.begin());
+      std::fill(active.begin(), active.end(), 1);
+
+      for (int remaining = size; remaining > 0;) {
+	remaining = 0;
+#pragma omp parallel for reduction(+:remaining)
+	for (int point = 0; point < size; point++) {
+	  if (!active[point])
+	    continue;
+
+	  const int c = coef_idx[point];
+	  bool more = false;
+	  BY_POLE_COUNT(coef_list[c].omega.size(),
+			more = iterate(dt, coef_list[c], factor[c], 
+				       point, poles));
+	  if (more)
+	    remaining++;
+	  else
+	    active[point] = 0;
+	}
+      }
 
-      c_out = 2 / hbar * gamma * exp(-t * (1 / t2 - 1 / t1));
+      std::swap(u, u_new);
+      std::swap(v, v_new);
+      std::swap(w, w_new);
     }
 
-    void
-    d(double t, const Dm2ElectricParam<T>& dm2_param,
-      double& d_out) const
+    // Run a corrector iteration of the point, and return whether it
+    // has yet to converge.
+    template <int np>
+    bool
+    iterate(double dt, const Dm2ElectricParam<T>& p, const Factor& f,
+	    int point, Poles<np> poles)
     {
-      const auto& gamma = dm2_param.gamma;
-      const auto& rho30 = dm2_param.rho30;
-      const auto& t2 = dm2_param.t2;
-      const auto& hbar = dm2_param.hbar;
+      const std::vector<double>& omega = p.omega;
+      const std::vector<double>& n_atom = p.n_atom;
+      const T e_now = e_old[point];
+      const T e_prev = e_new[point];
+
+      T e_next = curl[point];
+      for (int i = 0; i < pole_count(poles, omega.size()); ++i) {
+	e_next -= .5 * f.a * n_atom[i] * (u_new(i, point) + u(i, point));
+	e_next += .5 * f.b * n_atom[i] * omega[i] 
+	  * (v_new(i, point) + v(i, point));
+      }
+      e_next = e_now + dt / p.eps_inf * e_next;
+
+      const T e_sum = e_next + e_now;
+      double diff = (e_next - e_prev) * (e_next - e_prev);
+      double norm = e_prev * e_prev;
+      for (int i = 0; i < pole_count(poles, omega.size()); ++i) {
+	const T u_prev = u_new(i, point);
+	const T v_prev = v_new(i, point);
+	const T w_prev = w_new(i, point);
+
+	u_new(i, point) = u(i, point) 
+	  + .5 * dt * omega[i] * (v_prev + v(i, point));
+	v_new(i, point) = v(i, point) 
+	  - .5 * dt * omega[i] * (u_new(i, point) + u(i, point))
+	  + .25 * dt * f.c_plus * (w_prev + w(i, point)) * e_sum
+	  + .5 * dt * f.d * e_sum;
+	w_new(i, point) = w(i, point) 
+	  - .25 * dt * f.c_minus * (v_new(i, point) + v(i, point)) * e_sum;
+
+	diff += ((u_new(i, point) - u_prev) * (u_new(i, point) - u_prev) +
+		 (v_new(i, point) - v_prev) * (v_new(i, point) - v_prev) +
+		 (w_new(i, point) - w_prev) * (w_new(i, point) - w_prev));
+	norm += u_prev * u_prev + v_prev * v_prev + w_prev * w_prev;
+      }
 
-      d_out = 2 / hbar * gamma * rho30 * exp(t / t2);
+      e_new[point] = e_next;
+      return diff > p.rtol * p.rtol * norm;
     }
     
   private:
@@ -327,82 +416,52 @@ namespace gmes
 	       const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
 	       double dy, double dz, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(ex, ex_x_size, ex_y_size, ex_z_size,
-	       hz, hz_x_size, hz_y_size, hz_z_size,
-	       hy, hy_x_size, hy_y_size, hy_z_size,
-	       dy, dz, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(hz_x_size != 1, hy_z_size != 1,
+		      (ex, ex_x_size, ex_y_size, ex_z_size,
+		       hz, hz_x_size, hz_y_size, hz_z_size,
+		       hy, hy_x_size, hy_y_size, hy_z_size,
+		       dy, dz, dt, n));
     }
 
   private:
-    void 
-    update(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
-	   const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
-	   const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
-	   double dy, double dz, double dt, double n,
-	   const Index3& idx, 
-	   Dm2ElectricParam<T>& dm2_param)
+    template <bool ex_present, bool hz_present, bool hy_present>
+    void
+    sweep(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	  const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  double dy, double dz, double dt, double n)
     {
-      const int i = idx[0], j = idx[1], k = idx[2];
-      const std::vector<double>& omega = dm2_param.omega;
-      const double rtol = dm2_param.rtol;
-      std::vector<std::array<T, 3> >& u = dm2_param.u;
-      
-      const double t = (n + 0.5) * dt;
-      
-      std::vector<double> a, b;
-      double c_plus, c_minus, d;
-
-      this->a(t, dm2_param, a);
-      this->b(t, dm2_param, b);
-      this->c_plus(t, dm2_param, c_plus);
-      this->c_minus(t, dm2_param, c_minus);
-      this->d(t, dm2_param, d);
-      
-      T e_new = ex(i,j,k);
-      std::vector<std::array<T, 3> > u_new = u;
-
-      const T e_old = ex(i,j,k);
-      const T hy_dz = (hy(i+1,j,k+1) - hy(i+1,j,k)) / dz;
-
-      double error;
-      do {
-        T e_tmp = e_new;
-        std::vector<std::array<T, 3> > u_tmp = u_new;
-        
-	e_new = e_old - dt * hy_dz;
-        for (std::size_t i = 0; i < u.size(); ++i) {
-	  e_new -= .5 * dt * a[i] * (u_new[i][0] + u[i][0]);
-	  e_new += .5 * dt * b[i] * (u_new[i][1] + u[i][1]);
-        }
+      const int size = idx_list.size();
+      this->prepare();
+
+#pragma omp parallel for
+      for (int point = 0; point < size; point++) {
+	const int i = idx_list[point][0];
+	const int j = idx_list[point][1];
+	const int k = idx_list[point][2];
+	e_old[point] = ex(i,j,k);
+	curl[point] = ((hz(i+1,j+1,k) - hz(i+1,j,k)) / dy - 
+		       (hy(i+1,j,k+1) - hy(i+1,j,k)) / dz);
+      }
 
-        for (std::size_t i = 0; i < u.size(); ++i) {
-          u_new[i][0] = u[i][0] 
-            + .5 * dt * omega[i] * (u_new[i][1] + u[i][1]);
-          u_new[i][1] = u[i][1] 
-            - .5 * dt * omega[i] * (u_new[i][0] + u[i][0])
-            + .25 * dt * c_plus * (u_new[i][2] + u[i][2]) * (e_new + e_old) 
-            + .5 * dt * d * (e_new + e_old);
-          u_new[i][2] = u[i][2] 
-            - .25 * dt * c_minus * (u_new[i][1] + u[i][1]) * (e_new + e_old);
-        }
-        
-        error = rel_error(e_new, u_new, e_tmp, u_tmp);
-      } while (error > rtol);
-      
-      ex(i,j,k) = e_new;
-      std::copy(u_new.begin(), u_new.end(), u.begin());
+      this->solve(dt, n);
+
+#pragma omp parallel for
+      for (int point = 0; point < size; point++) {
+	const Index3& idx = idx_list[point];
+	ex(idx[0],idx[1],idx[2]) = e_new[point];
+      }
     }
-    
+
   protected:
     using Dm2Electric<T>::idx_list;
-    using Dm2Electric<T>::param_list;
+    using Dm2Electric<T>::e_old;
+    using Dm2Electric<T>::e_new;
+    using Dm2Electric<T>::curl;
   }; // template Dm2Ex
-  
 
-  template <typename T>
+  
+  template <typename T> 
   class Dm2Ey: public Dm2Electric<T>
   {
   public:
@@ -412,81 +471,51 @@ namespace gmes
 	       const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
 	       double dz, double dx, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-	update(ey, ey_x_size, ey_y_size, ey_z_size,
-	       hx, hx_x_size, hx_y_size, hx_z_size,
-	       hz, hz_x_size, hz_y_size, hz_z_size,
-	       dz, dx, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(hx_y_size != 1, hz_x_size != 1,
+		      (ey, ey_x_size, ey_y_size, ey_z_size,
+		       hx, hx_x_size, hx_y_size, hx_z_size,
+		       hz, hz_x_size, hz_y_size, hz_z_size,
+		       dz, dx, dt, n));
     }
 
   private:
-    void 
-    update(T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
-	   const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
-	   const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
-	   double dz, double dx, double dt, double n, 
-	   const Index3& idx, 
-	   Dm2ElectricParam<T>& dm2_param)
+    template <bool ey_present, bool hx_present, bool hz_present>
+    void
+    sweep(T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	  const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  double dz, double dx, double dt, double n)
     {
-      const int i = idx[0], j = idx[1], k = idx[2];
-      const std::vector<double>& omega = dm2_param.omega;
-      const double rtol = dm2_param.rtol;
-      std::vector<std::array<T, 3> >& u = dm2_param.u;
-      
-      const double t = (n + 0.5) * dt;
-      
-      std::vector<double> a, b;
-      double c_plus, c_minus, d;
-
-      this->a(t, dm2_param, a);
-      this->b(t, dm2_param, b);
-      this->c_plus(t, dm2_param, c_plus);
-      this->c_minus(t, dm2_param, c_minus);
-      this->d(t, dm2_param, d);
-      
-      T e_new = ey(i,j,k);
-      std::vector<std::array<T, 3> > u_new = u;
-
-      const T e_old = ey(i,j,k);
-      const T hz_dx = (hz(i+1,j+1,k) - hz(i,j+1,k)) / dx;
-
-      double error;
-      do {
-        T e_tmp = e_new;
-        std::vector<std::array<T, 3> > u_tmp = u_new;
-        
-	e_new = e_old - dt * hz_dx;
-        for (std::size_t i = 0; i < u.size(); ++i) {
-	  e_new -= .5 * dt * a[i] * (u_new[i][0] + u[i][0]);
-	  e_new += .5 * dt * b[i] * (u_new[i][1] + u[i][1]);
-        }
+      const int size = idx_list.size();
+      this->prepare();
+
+#pragma omp parallel for
+      for (int point = 0; point < size; point++) {
+	const int i = idx_list[point][0];
+	const int j = idx_list[point][1];
+	const int k = idx_list[point][2];
+	e_old[point] = ey(i,j,k);
+	curl[point] = ((hx(i,j+1,k+1) - hx(i,j+1,k)) / dz - 
+		       (hz(i+1,j+1,k) - hz(i,j+1,k)) / dx);
+      }
 
-        for (std::size_t i = 0; i < u.size(); ++i) {
-          u_new[i][0] = u[i][0] 
-            + .5 * dt * omega[i] * (u_new[i][1] + u[i][1]);
-          u_new[i][1] = u[i][1] 
-            - .5 * dt * omega[i] * (u_new[i][0] + u[i][0])
-            + .25 * dt * c_plus * (u_new[i][2] + u[i][2]) * (e_new + e_old) 
-            + .5 * dt * d * (e_new + e_old);
-          u_new[i][2] = u[i][2] 
-            - .25 * dt * c_minus * (u_new[i][1] + u[i][1]) * (e_new + e_old);
-        }
-        
-        error = rel_error(e_new, u_new, e_tmp, u_tmp);
-      } while (error > rtol);
-      
-      ey(i,j,k) = e_new;
-      std::copy(u_new.begin(), u_new.end(), u.begin());
+      this->solve(dt, n);
+
+#pragma omp parallel for
+      for (int point = 0; point < size; point++) {
+	const Index3& idx = idx_list[point];
+	ey(idx[0],idx[1],idx[2]) = e_new[point];
+      }
     }
 
   protected:
     using Dm2Electric<T>::idx_list;
-    using Dm2Electric<T>::param_list;
+    using Dm2Electric<T>::e_old;
+    using Dm2Electric<T>::e_new;
+    using Dm2Electric<T>::curl;
   }; // template Dm2Ey
 
-
+  
   template <typename T> 
   class Dm2Ez: public Dm2Electric<T>
   {
@@ -497,78 +526,48 @@ namespace gmes
 	       const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
 	       double dx, double dy, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(ez, ez_x_size, ez_y_size, ez_z_size,
-	       hy, hy_x_size, hy_y_size, hy_z_size,
-	       hx, hx_x_size, hx_y_size, hx_z_size,
-	       dx, dy, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(hy_z_size != 1, hx_y_size != 1,
+		      (ez, ez_x_size, ez_y_size, ez_z_size,
+		       hy, hy_x_size, hy_y_size, hy_z_size,
+		       hx, hx_x_size, hx_y_size, hx_z_size,
+		       dx, dy, dt, n));
     }
 
   private:
-    void 
-    update(T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
-	   const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
-	   const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
-	   double dx, double dy, double dt, double n, 
-	   const Index3& idx, 
-	   Dm2ElectricParam<T>& dm2_param)
+    template <bool ez_present, bool hy_present, bool hx_present>
+    void
+    sweep(T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	  const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  double dx, double dy, double dt, double n)
     {
-      const int i = idx[0], j = idx[1], k = idx[2];
-      const std::vector<double>& omega = dm2_param.omega;
-      const double rtol = dm2_param.rtol;
-      std::vector<std::array<T, 3> >& u = dm2_param.u;
-      
-      const double t = (n + 0.5) * dt;
-      
-      std::vector<double> a, b;
-      double c_plus, c_minus, d;
-
-      this->a(t, dm2_param, a);
-      this->b(t, dm2_param, b);
-      this->c_plus(t, dm2_param, c_plus);
-      this->c_minus(t, dm2_param, c_minus);
-      this->d(t, dm2_param, d);
-      
-      T e_new = ez(i,j,k);
-      std::vector<std::array<T, 3> > u_new = u;
-
-      const T e_old = ez(i,j,k);
-      const T hx_dy = (hx(i,j+1,k+1) - hx(i,j,k+1)) / dy;
-
-      double error;
-      do {
-        T e_tmp = e_new;
-        std::vector<std::array<T, 3> > u_tmp = u_new;
-        
-	e_new = e_old - dt * hx_dy;
-        for (std::size_t i = 0; i < u.size(); ++i) {
-	  e_new -= .5 * dt * a[i] * (u_new[i][0] + u[i][0]);
-	  e_new += .5 * dt * b[i] * (u_new[i][1] + u[i][1]);
-        }
+      const int size = idx_list.size();
+      this->prepare();
+
+#pragma omp parallel for
+      for (int point = 0; point < size; point++) {
+	const int i = idx_list[point][0];
+	const int j = idx_list[point][1];
+	const int k = idx_list[point][2];
+	e_old[point] = ez(i,j,k);
+	curl[point] = ((hy(i+1,j,k+1) - hy(i,j,k+1)) / dx - 
+		       (hx(i,j+1,k+1) - hx(i,j,k+1)) / dy);
+      }
 
-        for (std::size_t i = 0; i < u.size(); ++i) {
-          u_new[i][0] = u[i][0] 
-            + .5 * dt * omega[i] * (u_new[i][1] + u[i][1]);
-          u_new[i][1] = u[i][1] 
-            - .5 * dt * omega[i] * (u_new[i][0] + u[i][0])
-            + .25 * dt * c_plus * (u_new[i][2] + u[i][2]) * (e_new + e_old) 
-            + .5 * dt * d * (e_new + e_old);
-          u_new[i][2] = u[i][2] 
-            - .25 * dt * c_minus * (u_new[i][1] + u[i][1]) * (e_new + e_old);
-        }
-        
-        error = rel_error(e_new, u_new, e_tmp, u_tmp);
-      } while (error > rtol);
-      
-      ez(i,j,k) = e_new;
-      std::copy(u_new.begin(), u_new.end(), u.begin());
+      this->solve(dt, n);
+
+#pragma omp parallel for
+      for (int point = 0; point < size; point++) {
+	const Index3& idx = idx_list[point];
+	ez(idx[0],idx[1],idx[2]) = e_new[point];
+      }
     }
 
   protected:
     using Dm2Electric<T>::idx_list;
-    using Dm2Electric<T>::param_list;
+    using Dm2Electric<T>::e_old;
+    using Dm2Electric<T>::e_new;
+    using Dm2Electric<T>::curl;
   }; // template Dm2Ez
 
 
@@ -594,21 +593,6 @@ namespace gmes
   class Dm2Hy: public DielectricHy<T>
   {
   public:
-    void
-    update_all(T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
-	       const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
-	       const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
-	       double dz, double dx, double dt, double n)
-    {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-      	update(hy, hy_x_size, hy_y_size, hy_z_size,
-	       ex, ex_x_size, ex_y_size, ex_z_size,
-	       ez, ez_x_size, ez_y_size, ez_z_size,
-	       dz, dx, dt, n, *idx, *param);
-      }
-    }
-
     const std::string& 
     name() const
     {
@@ -616,26 +600,7 @@ namespace gmes
     }
 
   private:
-    void 
-    update(T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
-	   const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
-	   const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
-	   double dz, double dx, double dt, double n, 
-	   const Index3& idx, 
-	   const DielectricMagneticParam<T>& dielectric_param) const
-    {
-      const int i = idx[0], j = idx[1], k = idx[2];
-      const double mu_inf = dielectric_param.mu_inf;
-      
-      hy(i,j,k) += dt / mu_inf * ((ez(i,j,k-1) - ez(i-1,j,k-1)) / dx -
-      				  (ex(i-1,j,k) - ex(i-1,j,k-1)) / dz);
-    }
-    
     static const std::string tag; // "Dm2Magnetic"
-
-  protected:
-    using DielectricHy<T>::idx_list;
-    using DielectricHy<T>::param_list;
   }; // template Dm2Hy
 
   template <typename T>
@@ -0,0 +1,509 @@
+/* Compiled time-stepping driver.
+ *
+ * A driver holds the field arrays, the pointwise materials of each
+ * field component, the periodic boundary exchanges, and the probe
+ * points of an FDTD, and advances it by a number of time steps
+ * without returning to Python. The half steps follow FDTD.step():
+ * the H halos are exchanged, the fused objects and then the E
+ * components are updated, and the E probes are recorded; then the
+ * same for the E halos, the H components, and the H probes.
+ *
+ * The components are numbered 0 to 5 in the order Ex, Ey, Ez, Hx, Hy,
+ * and Hz. The driver does not own the arrays and the materials, so
+ * that they should outlive it.
+ *
+ * With temporal blocking, the driver advances several time steps at a
+ * time in an interior box which only the fused objects update. The
+ * half steps of a block first go through the cells outside the box,
+ * which shrinks by a cell per half step so that the cells read by the
+ * box are up to date. The box is then advanced by the whole block, a
+ * tile of x and y columns at a time, so that a tile is swept several
+ * times while it is in the cache. The tiles lean back by a cell along
+ * x and y per half step, so that a tile only reads the cells which
+ * the previous tiles have left at the previous half step. The result
+ * is the same as that of the plain half steps.
+ *
+ * The driver can also track the box of the cells which the fields
+ * can have reached from the sources, and sweep the grids only there
+ * until the box covers them.
+ *
+ * The 1-D FDTDs of the incident plane waves advance a time step after
+ * each E half step, as FDTD.step() steps the auxiliary FDTDs.
+ *
+ * The rows of an array can be padded beyond the cells of its field.
+ * The array is then set with its padded size, which the kernels take
+ * as the stride, and set_extent gives the size of the field.
+ */
+
+#ifndef PW_DRIVER_HH_
+#define PW_DRIVER_HH_
+
+#include "pw_material.hh"
+#include "pw_fused.hh"
+#include "pw_incident.hh"
+
+namespace gmes
+{
+  template <typename T>
+  class Driver
+  {
+  public:
+    Driver(): n(0), dt(0), depth(1), tile(8), 
+	      active(no_cells()), tracking(false)
+    {
+      d.fill(1);
+      for (int c = 0; c < 6; c++) {
+	field[c] = 0;
+	shape[c].fill(0);
+	extent[c].fill(0);
+      }
+    }
+
+    void
+    set_ex(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size)
+    {
+      set_field(0, ex, ex_x_size, ex_y_size, ex_z_size);
+    }
+
+    void
+    set_ey(T* const ey, int ey_x_size, int ey_y_size, int ey_z_size)
+    {
+      set_field(1, ey, ey_x_size, ey_y_size, ey_z_size);
+    }
+
+    void
+    set_ez(T* const ez, int ez_x_size, int ez_y_size, int ez_z_size)
+    {
+      set_field(2, ez, ez_x_size, ez_y_size, ez_z_size);
+    }
+
+    void
+    set_hx(T* const hx, int hx_x_size, int hx_y_size, int hx_z_size)
+    {
+      set_field(3, hx, hx_x_size, hx_y_size, hx_z_size);
+    }
+
+    void
+    set_hy(T* const hy, int hy_x_size, int hy_y_size, int hy_z_size)
+    {
+      set_field(4, hy, hy_x_size, hy_y_size, hy_z_size);
+    }
+
+    void
+    set_hz(T* const hz, int hz_x_size, int hz_y_size, int hz_z_size)
+    {
+      set_field(5, hz, hz_x_size, hz_y_size, hz_z_size);
+    }
+
+    // Limit comp to the first x_size by y_size by z_size cells of its
+    // array. The set methods reset it to the whole array.
+    void
+    set_extent(int comp, int x_size, int y_size, int z_size)
+    {
+      extent[comp][0] = x_size;
+      extent[comp][1] = y_size;
+      extent[comp][2] = z_size;
+    }
+
+    void
+    set_differential(double dx, double dy, double dz)
+    {
+      d[0] = dx;
+      d[1] = dy;
+      d[2] = dz;
+    }
+
+    void
+    set_time_step(double dt, double n)
+    {
+      this->dt = dt;
+      this->n = n;
+    }
+
+    double
+    get_n() const
+    {
+      return n;
+    }
+
+    // Update comp with pw_obj in every half step of comp.
+    void
+    add_update(int comp, PwMaterial<T>* const pw_obj)
+    {
+      Update u = {comp, pw_obj};
+      update_list.push_back(u);
+    }
+
+    // Update the E components with fused in every E half step, before
+    // the objects of add_update.
+    void
+    add_fused(DielectricFusedElectric<T>* const fused)
+    {
+      fused_electric_list.push_back(fused);
+    }
+
+    // Update the H components with fused in every H half step, before
+    // the objects of add_update.
+    void
+    add_fused(DielectricFusedMagnetic<T>* const fused)
+    {
+      fused_magnetic_list.push_back(fused);
+    }
+
+    // Advance incident a time step after every E half step.
+    void
+    add_incident(Incident<T>* const incident)
+    {
+      incident_list.push_back(incident);
+    }
+
+    // Copy the src plane of comp along axis into the dest plane,
+    // multiplied by phase. Negative planes count from the end.
+    void
+    add_halo(int comp, int axis, int src, int dest, T phase)
+    {
+      Halo h = {comp, axis, src, dest, phase};
+      halo_list.push_back(h);
+    }
+
+    // Record comp at (i, j, k) into record in every half step of
+    // comp. run can advance at most record_size steps.
+    void
+    add_probe(int comp, int i, int j, int k, T* const record, int record_size)
+    {
+      const int pos = (i * shape[comp][1] + j) * shape[comp][2] + k;
+      const Index3 idx = {{i, j, k}};
+      Probe p = {comp, pos, idx, record, record_size};
+      probe_list.push_back(p);
+    }
+
+    // Advance depth time steps at a time in the interior of the fused
+    // objects, in tiles of tile by tile columns along the z axis. depth
+    // 1 disables the temporal blocking.
+    void
+    set_blocking(int depth, int tile)
+    {
+      this->depth = std::max(depth, 1);
+      this->tile = std::max(tile, 1);
+    }
+
+    // Sweep the grids only in the cells which the fields can reach
+    // from the box from (i0, j0, k0) to (i1, j1, k1), outside which the
+    // fields are zero. The box grows by a cell per half step until it 
+    // covers the grid. It spans an axis with halos once it reaches an
+    // end of the axis.
+    void
+    set_active(int i0, int j0, int k0, int i1, int j1, int k1)
+    {
+      const Index3 first = {{i0, j0, k0}}, second = {{i1, j1, k1}};
+      active = IdxRange(first, second);
+      tracking = true;
+    }
+
+    // Advance steps time steps.
+    void
+    run(int steps)
+    {
+      int s = 0;
+      for (; s < steps && tracking; s++) {
+	n += 0.5;
+	grow_active();
+	half_step(3, 0, s, no_cells());
+	n += 0.5;
+	grow_active();
+	half_step(0, 3, s, no_cells());
+      }
+
+      if (depth > 1 && steps - s >= depth) {
+	const IdxRange box = blocking_box();
+	if (!is_empty(box))
+	  for (; s + depth <= steps; s += depth)
+	    block_step(box, s);
+      }
+
+      for (; s < steps; s++) {
+	n += 0.5;
+	half_step(3, 0, s, no_cells());
+	n += 0.5;
+	half_step(0, 3, s, no_cells());
+      }
+    }
+
+  private:
+    struct Update
+    {
+      int comp;
+      PwMaterial<T>* pw_obj;
+    };
+
+    struct Halo
+    {
+      int comp, axis, src, dest;
+      T phase;
+    };
+
+    struct Probe
+    {
+      int comp, pos;
+      Index3 idx;
+      T* record;
+      int record_size;
+    };
+
+    void
+    set_field(int comp, T* const data, int x_size, int y_size, int z_size)
+    {
+      field[comp] = data;
+      shape[comp][0] = x_size;
+      shape[comp][1] = y_size;
+      shape[comp][2] = z_size;
+      extent[comp] = shape[comp];
+    }
+
+    // Exchange the halos of the components from other to other + 2,
+    // and update and record the components from comp to comp + 2. The
+    // fused objects skip the cells in hole. The E half steps then step
+    // the incident waves.
+    void
+    half_step(int other, int comp, int s, const IdxRange& hole)
+    {
+      for (auto h = halo_list.begin(); h != halo_list.end(); ++h)
+	if (h->comp >= other && h->comp < other + 3)
+	  exchange(*h);
+
+      if (comp == 0)
+	for (auto f = fused_electric_list.begin(); 
+	     f != fused_electric_list.end(); ++f)
+	  update_fused(*f, all_cells(), hole);
+      else
+	for (auto f = fused_magnetic_list.begin(); 
+	     f != fused_magnetic_list.end(); ++f)
+	  update_fused(*f, all_cells(), hole);
+
+      for (auto u = update_list.begin(); u != update_list.end(); ++u)
+	if (u->comp >= comp && u->comp < comp + 3)
+	  update(*u);
+
+      for (auto p = probe_list.begin(); p != probe_list.end(); ++p)
+	if (p->comp >= comp && p->comp < comp + 3 && s < p->record_size)
+	  p->record[s] = field[p->comp][p->pos];
+
+      if (comp == 0)
+	for (auto i = incident_list.begin(); i != incident_list.end(); ++i)
+	  (*i)->step();
+    }
+
+    void
+    exchange(const Halo& h)
+    {
+      T* const f = field[h.comp];
+      const Index3& size = extent[h.comp];
+      const int stride[3] = {shape[h.comp][1] * shape[h.comp][2], 
+			     shape[h.comp][2], 1};
+      const int a = h.axis, b = (a + 1) % 3, c = (a + 2) % 3;
+      const int src = (h.src < 0 ? size[a] + h.src : h.src) * stride[a];
+      const int dest = (h.dest < 0 ? size[a] + h.dest : h.dest) * stride[a];
+
+      for (int i = 0; i < size[b]; i++)
+	for (int j = 0; j < size[c]; j++) {
+	  const int pos = i * stride[b] + j * stride[c];
+	  f[pos + dest] = h.phase * f[pos + src];
+	}
+    }
+
+    // The inputs of an electric component are the magnetic components
+    // of the other two axes, and vice versa.
+    void
+    update(const Update& u)
+    {
+      const int a = u.comp % 3;
+      const int other = u.comp < 3 ? 3 : 0;
+      const int in1 = other + (a + 2) % 3, in2 = other + (a + 1) % 3;
+
+      u.pw_obj->update_all(field[u.comp],
+			   shape[u.comp][0], shape[u.comp][1], shape[u.comp][2],
+			   field[in1], shape[in1][0], shape[in1][1], shape[in1][2],
+			   field[in2], shape[in2][0], shape[in2][1], shape[in2][2],
+			   d[(a + 1) % 3], d[(a + 2) % 3], dt, n);
+    }
+
+    void
+    update_fused(DielectricFusedElectric<T>* const f,
+		 const IdxRange& clip, const IdxRange& hole)
+    {
+      f->update_region(field[0], shape[0][0], shape[0][1], shape[0][2],
+		       field[1], shape[1][0], shape[1][1], shape[1][2],
+		       field[2], shape[2][0], shape[2][1], shape[2][2],
+		       field[3], shape[3][0], shape[3][1], shape[3][2],
+		       field[4], shape[4][0], shape[4][1], shape[4][2],
+		       field[5], shape[5][0], shape[5][1], shape[5][2],
+		       d[0], d[1], d[2], dt, n, clip, hole);
+    }
+
+    void
+    update_fused(DielectricFusedMagnetic<T>* const f,
+		 const IdxRange& clip, const IdxRange& hole)
+    {
+      f->update_region(field[3], shape[3][0], shape[3][1], shape[3][2],
+		       field[4], shape[4][0], shape[4][1], shape[4][2],
+		       field[5], shape[5][0], shape[5][1], shape[5][2],
+		       field[0], shape[0][0], shape[0][1], shape[0][2],
+		       field[1], shape[1][0], shape[1][1], shape[1][2],
+		       field[2], shape[2][0], shape[2][1], shape[2][2],
+		       d[0], d[1], d[2], dt, n, clip, hole);
+    }
+
+    static IdxRange
+    shrink(const IdxRange& box, int margin)
+    {
+      IdxRange inner = box;
+      for (int a = 0; a < 3; a++) {
+	inner.first[a] += margin;
+	inner.second[a] -= margin;
+      }
+      return inner;
+    }
+
+    // Grow the active box by a half step and clip the grids to it, or
+    // stop the tracking once it covers the grid.
+    void
+    grow_active()
+    {
+      if (!tracking)
+	return;
+
+      const bool empty = is_empty(active);
+      bool full = true;
+      for (int a = 0; a < 3; a++) {
+	int last = 0;
+	for (int c = 0; c < 6; c++)
+	  last = std::max(last, extent[c][a] - 1);
+
+	if (!empty) {
+	  active.first[a] = std::max(active.first[a] - 1, 0);
+	  active.second[a] = std::min(active.second[a] + 1, last);
+	  for (auto h = halo_list.begin(); h != halo_list.end(); ++h)
+	    if (h->axis == a && 
+		(active.first[a] == 0 || active.second[a] == last)) {
+	      active.first[a] = 0;
+	      active.second[a] = last;
+	    }
+	}
+	full = full && active.first[a] == 0 && active.second[a] == last;
+      }
+
+      tracking = !full;
+      for (auto u = update_list.begin(); u != update_list.end(); ++u)
+	if (tracking)
+	  u->pw_obj->set_clip(active.first[0], active.first[1], 
+			      active.first[2], active.second[0], 
+			      active.second[1], active.second[2]);
+	else
+	  u->pw_obj->clear_clip();
+    }
+
+    // Cut box down to the largest of the parts on the six sides of
+    // cells.
+    static void
+    exclude(IdxRange& box, const IdxRange& cells)
+    {
+      if (is_empty(intersection(box, cells)))
+	return;
+
+      IdxRange best = no_cells();
+      for (int a = 0; a < 3; a++) {
+	IdxRange low = box, high = box;
+	low.second[a] = cells.first[a] - 1;
+	high.first[a] = cells.second[a] + 1;
+	if (!is_empty(low) && (is_empty(best) || volume(low) > volume(best)))
+	  best = low;
+	if (!is_empty(high) && (is_empty(best) || volume(high) > volume(best)))
+	  best = high;
+      }
+      box = best;
+    }
+
+    // The box of the cells which only the fused objects update. It
+    // keeps off the boundary planes, which the halos exchange, the
+    // points of the other materials, and the probes.
+    IdxRange
+    blocking_box()
+    {
+      if (fused_electric_list.size() != 1 || fused_magnetic_list.size() != 1)
+	return no_cells();
+
+      IdxRange box = 
+	intersection(fused_electric_list[0]->get_box(shape[0], shape[1], 
+						     shape[2], dt),
+		     fused_magnetic_list[0]->get_box(shape[3], shape[4], 
+						     shape[5], dt));
+      for (int c = 0; c < 6; c++)
+	for (int a = 0; a < 3; a++) {
+	  box.first[a] = std::max(box.first[a], 1);
+	  box.second[a] = std::min(box.second[a], extent[c][a] - 2);
+	}
+
+      for (auto u = update_list.begin(); u != update_list.end(); ++u)
+	if (!u->pw_obj->idle())
+	  u->pw_obj->for_each_box([&box](const IdxRange& cells) {
+	      exclude(box, cells);
+	    });
+
+      for (auto p = probe_list.begin(); p != probe_list.end(); ++p)
+	exclude(box, IdxRange(p->idx, p->idx));
+
+      return box;
+    }
+
+    // Advance depth time steps from the step s of run. The half step h
+    // of the block leaves the cells of box shrunk by 2 * depth - h to
+    // the tiles.
+    void
+    block_step(const IdxRange& box, int s)
+    {
+      const double n0 = n;
+      for (int h = 1; h <= 2 * depth; h++) {
+	n = n0 + 0.5 * h;
+	if (h % 2)
+	  half_step(3, 0, s + h / 2, shrink(box, 2 * depth - h));
+	else
+	  half_step(0, 3, s + h / 2 - 1, shrink(box, 2 * depth - h));
+      }
+
+      for (int x = box.first[0]; x <= box.second[0] + 2 * depth; x += tile)
+	for (int y = box.first[1]; y <= box.second[1] + 2 * depth; y += tile)
+	  for (int h = 1; h <= 2 * depth; h++) {
+	    IdxRange clip = shrink(box, 2 * depth - h);
+	    clip.first[0] = std::max(clip.first[0], x - h);
+	    clip.second[0] = std::min(clip.second[0], x + tile - h - 1);
+	    clip.first[1] = std::max(clip.first[1], y - h);
+	    clip.second[1] = std::min(clip.second[1], y + tile - h - 1);
+	    if (h % 2)
+	      for (auto f = fused_electric_list.begin(); 
+		   f != fused_electric_list.end(); ++f)
+		update_fused(*f, clip, no_cells());
+	    else
+	      for (auto f = fused_magnetic_list.begin(); 
+		   f != fused_magnetic_list.end(); ++f)
+		update_fused(*f, clip, no_cells());
+	  }
+    }
+
+    std::array<T*, 6> field;
+    std::array<Index3, 6> shape, extent;
+    std::array<double, 3> d;
+    double n, dt;
+    int depth, tile;
+    IdxRange active;
+    bool tracking;
+
+    std::vector<DielectricFusedElectric<T>*> fused_electric_list;
+    std::vector<DielectricFusedMagnetic<T>*> fused_magnetic_list;
+    std::vector<Update> update_list;
+    std::vector<Halo> halo_list;
+    std::vector<Probe> probe_list;
+    std::vector<Incident<T>*> incident_list;
+  }; // template Driver
+} // namespace gmes
+
+#endif // PW_DRIVER_HH_
@@ -11,12 +11,12 @@
 #include <vector>
 #include "pw_dielectric.hh"
 
-#define ex(i,j,k) ex[ex_y_size==1?0:((i)*ex_y_size+(j))*ex_z_size+(k)]
-#define ey(i,j,k) ey[ey_z_size==1?0:((i)*ey_y_size+(j))*ey_z_size+(k)]
-#define ez(i,j,k) ez[ez_x_size==1?0:((i)*ez_y_size+(j))*ez_z_size+(k)]
-#define hx(i,j,k) hx[hx_y_size==1?0:((i)*hx_y_size+(j))*hx_z_size+(k)]
-#define hy(i,j,k) hy[hy_z_size==1?0:((i)*hy_y_size+(j))*hy_z_size+(k)]
-#define hz(i,j,k) hz[hz_x_size==1?0:((i)*hz_y_size+(j))*hz_z_size+(k)]
+#define ex(i,j,k) ex[ex_present?((i)*ex_y_size+(j))*ex_z_size+(k):0]
+#define ey(i,j,k) ey[ey_present?((i)*ey_y_size+(j))*ey_z_size+(k):0]
+#define ez(i,j,k) ez[ez_present?((i)*ez_y_size+(j))*ez_z_size+(k):0]
+#define hx(i,j,k) hx[hx_present?((i)*hx_y_size+(j))*hx_z_size+(k):0]
+#define hy(i,j,k) hy[hy_present?((i)*hy_y_size+(j))*hy_z_size+(k):0]
+#define hz(i,j,k) hz[hz_present?((i)*hz_y_size+(j))*hz_z_size+(k):0]
 
 namespace gmes
 {
@@ -52,7 +52,7 @@ namespace gmes
       if (i < 0)
 	return 0;
       else
-	return param_list[i].eps_inf;
+	return coef_list[coef_idx[i]].eps_inf;
     }
 
     PwMaterial<T>*
@@ -65,7 +65,9 @@ namespace gmes
       const auto& drude_param = *static_cast<const DrudeElectricParam<T>*>(pm_param_ptr);
 
       idx_list.push_back(index);
-      param_list.push_back(drude_param);
+      coef_idx.push_back(intern(coef_list, drude_param, same_coef));
+      q_now.push_back(drude_param.q_now);
+      q_new.push_back(drude_param.q_new);
 
       return this;
     };
@@ -75,43 +77,70 @@ namespace gmes
     {
       auto drude_ptr = static_cast<const DrudeElectric<T>*>(pm_ptr);
       std::copy(drude_ptr->idx_list.begin(), drude_ptr->idx_list.end(), std::back_inserter(idx_list));
-      std::copy(drude_ptr->param_list.begin(), drude_ptr->param_list.end(), std::back_inserter(param_list));
+
+      std::vector<int> coef_map;
+      for (auto c = drude_ptr->coef_list.begin(); c != drude_ptr->coef_list.end(); ++c)
+	coef_map.push_back(intern(coef_list, *c, same_coef));
+      for (auto c = drude_ptr->coef_idx.begin(); c != drude_ptr->coef_idx.end(); ++c)
+	coef_idx.push_back(coef_map[*c]);
+
+      q_now.append(drude_ptr->q_now);
+      q_new.append(drude_ptr->q_new);
       return this;
     }
 
+    template <int np>
     T 
-    dps_sum(const T& init, const DrudeElectricParam<T>& drude_param) const
+    dps_sum(const T& init, const DrudeElectricParam<T>& drude_param, 
+	    int point, Poles<np> poles) const
     {
       const auto& a = drude_param.a;
-      const auto& q_now = drude_param.q_now;
-      const auto& q_new = drude_param.q_new;
 
       T sum(init);
-      for (typename std::vector<T>::size_type i = 0; i < a.size(); ++i)	{
-	sum += q_new[i] - q_now[i];
+      for (int i = 0; i < pole_count(poles, a.size()); ++i)	{
+	sum += q_new(i, point) - q_now(i, point);
       }
 
       return sum;
     }
 
+    template <int np>
     void 
-    update_q(const T& e_now, DrudeElectricParam<T>& drude_param)
+    update_q(const T& e_now, const DrudeElectricParam<T>& drude_param, 
+	     int point, Poles<np> poles)
     {
       const std::vector<std::array<double, 3> >& a = drude_param.a;
-      std::vector<T>& q_now = drude_param.q_now;
-      std::vector<T>& q_new = drude_param.q_new;
 
-      std::vector<T> q_old(q_now);
-      std::copy(q_new.begin(), q_new.end(), q_now.begin());
-      for (typename std::vector<T>::size_type i = 0; i < a.size(); ++i)	{
-	q_new[i] = a[i][0] * q_old[i] + a[i][1] * q_now[i] + a[i][2] * e_now;
+      for (int i = 0; i < pole_count(poles, a.size()); ++i)	{
+	const T q_old = q_now(i, point);
+	q_now(i, point) = q_new(i, point);
+	q_new(i, point) = a[i][0] * q_old + a[i][1] * q_now(i, point) + a[i][2] * e_now;
       }
     }
 
   protected:
     using MaterialElectric<T>::position;
     using MaterialElectric<T>::idx_list;
-    std::vector<DrudeElectricParam<T> > param_list;
+
+    // The coefficients are stored once per distinct material. The
+    // states of coef_list are not used.
+    std::vector<DrudeElectricParam<T> > coef_list;
+    std::vector<int> coef_idx;
+    PoleArray<T> q_now, q_new;
+
+    static bool
+    same_coef(const DrudeElectricParam<T>& p1, const DrudeElectricParam<T>& p2)
+    {
+      return p1.eps_inf == p2.eps_inf && p1.a == p2.a && p1.c == p2.c;
+    }
+
+    void
+    reorder(const std::vector<int>& perm)
+    {
+      permute(coef_idx, perm);
+      q_now.reorder(perm);
+      q_new.reorder(perm);
+    }
 
   private:
     static const std::string tag; // "DrudeElectric"
@@ -130,38 +159,59 @@ namespace gmes
 	       const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
 	       double dy, double dz, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(ex, ex_x_size, ex_y_size, ex_z_size,
-	       hz, hz_x_size, hz_y_size, hz_z_size,
-	       hy, hy_x_size, hy_y_size, hy_z_size,
-	       dy, dz, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(hz_x_size != 1, hy_z_size != 1,
+		      (ex, ex_x_size, ex_y_size, ex_z_size,
+		       hz, hz_x_size, hz_y_size, hz_z_size,
+		       hy, hy_x_size, hy_y_size, hy_z_size,
+		       dy, dz, dt, n));
     }
 
   private:
+    template <bool ex_present, bool hz_present, bool hy_present>
+    void
+    sweep(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	  const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  double dy, double dz, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+	const auto& drude_param = coef_list[coef_idx[idx]];
+	BY_POLE_COUNT(drude_param.a.size(),
+		      update<ex_present, hz_present, hy_present>
+		      (ex, ex_x_size, ex_y_size, ex_z_size,
+		       hz, hz_x_size, hz_y_size, hz_z_size,
+		       hy, hy_x_size, hy_y_size, hy_z_size,
+		       dy, dz, dt, n, idx_list[idx], drude_param, idx, poles));
+      }
+    }
+
+    template <bool ex_present, bool hz_present, bool hy_present, int np>
     void 
     update(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
 	   const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
 	   const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
 	   double dy, double dz, double dt, double n, 
 	   const Index3& idx, 
-	   DrudeElectricParam<T>& drude_param)
+	   const DrudeElectricParam<T>& drude_param, int point,
+	   Poles<np> poles)
     {
       const int i = idx[0], j = idx[1], k = idx[2];
 
       const auto& c = drude_param.c;
       
       const T& e_now = ex(i,j,k);
-      update_q(e_now, drude_param);
+      update_q(e_now, drude_param, point, poles);
       ex(i,j,k) = c[0] * ((hz(i+1,j+1,k) - hz(i+1,j,k)) / dy - 
 			  (hy(i+1,j,k+1) - hy(i+1,j,k)) / dz)
-	+ c[1] * dps_sum(static_cast<T>(0), drude_param) + c[2] * e_now;
+	+ c[1] * dps_sum(static_cast<T>(0), drude_param, point, poles) + c[2] * e_now;
     }
 
   protected:
     using DrudeElectric<T>::idx_list;
-    using DrudeElectric<T>::param_list;
+    using DrudeElectric<T>::coef_list;
+    using DrudeElectric<T>::coef_idx;
     using DrudeElectric<T>::update_q;
     using DrudeElectric<T>::dps_sum;
   }; // template DrudeEx
@@ -176,38 +226,59 @@ namespace gmes
 	       const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
 	       double dz, double dx, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(ey, ey_x_size, ey_y_size, ey_z_size,
-	       hx, hx_x_size, hx_y_size, hx_z_size,
-	       hz, hz_x_size, hz_y_size, hz_z_size,
-	       dz, dx, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(hx_y_size != 1, hz_x_size != 1,
+		      (ey, ey_x_size, ey_y_size, ey_z_size,
+		       hx, hx_x_size, hx_y_size, hx_z_size,
+		       hz, hz_x_size, hz_y_size, hz_z_size,
+		       dz, dx, dt, n));
     }
 
   private:
+    template <bool ey_present, bool hx_present, bool hz_present>
+    void
+    sweep(T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	  const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  double dz, double dx, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+	const auto& drude_param = coef_list[coef_idx[idx]];
+	BY_POLE_COUNT(drude_param.a.size(),
+		      update<ey_present, hx_present, hz_present>
+		      (ey, ey_x_size, ey_y_size, ey_z_size,
+		       hx, hx_x_size, hx_y_size, hx_z_size,
+		       hz, hz_x_size, hz_y_size, hz_z_size,
+		       dz, dx, dt, n, idx_list[idx], drude_param, idx, poles));
+      }
+    }
+
+    template <bool ey_present, bool hx_present, bool hz_present, int np>
     void 
     update(T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
 	   const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
 	   const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
 	   double dz, double dx, double dt, double n,
 	   const Index3& idx, 
-	   DrudeElectricParam<T>& drude_param)
+	   const DrudeElectricParam<T>& drude_param, int point,
+	   Poles<np> poles)
     {
       const int i = idx[0], j = idx[1], k = idx[2];
 
       const auto& c = drude_param.c;
       
       const T& e_now = ey(i,j,k);
-      update_q(e_now, drude_param);
+      update_q(e_now, drude_param, point, poles);
       ey(i,j,k) = c[0] * ((hx(i,j+1,k+1) - hx(i,j+1,k)) / dz - 
 			  (hz(i+1,j+1,k) - hz(i,j+1,k)) / dx)
-	+ c[1] * dps_sum(static_cast<T>(0), drude_param) + c[2] * e_now;
+	+ c[1] * dps_sum(static_cast<T>(0), drude_param, point, poles) + c[2] * e_now;
     }
 
   protected:
     using DrudeElectric<T>::idx_list;
-    using DrudeElectric<T>::param_list;
+    using DrudeElectric<T>::coef_list;
+    using DrudeElectric<T>::coef_idx;
     using DrudeElectric<T>::update_q;
     using DrudeElectric<T>::dps_sum;
   }; // template DrudeEy
@@ -221,38 +292,59 @@ namespace gmes
 	       const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
 	       double dx, double dy, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(ez, ez_x_size, ez_y_size, ez_z_size,
-	       hy, hy_x_size, hy_y_size, hy_z_size,
-	       hx, hx_x_size, hx_y_size, hx_z_size,
-	       dx, dy, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(hy_z_size != 1, hx_y_size != 1,
+		      (ez, ez_x_size, ez_y_size, ez_z_size,
+		       hy, hy_x_size, hy_y_size, hy_z_size,
+		       hx, hx_x_size, hx_y_size, hx_z_size,
+		       dx, dy, dt, n));
     }
 
   private:
+    template <bool ez_present, bool hy_present, bool hx_present>
+    void
+    sweep(T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	  const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  double dx, double dy, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+	const auto& drude_param = coef_list[coef_idx[idx]];
+	BY_POLE_COUNT(drude_param.a.size(),
+		      update<ez_present, hy_present, hx_present>
+		      (ez, ez_x_size, ez_y_size, ez_z_size,
+		       hy, hy_x_size, hy_y_size, hy_z_size,
+		       hx, hx_x_size, hx_y_size, hx_z_size,
+		       dx, dy, dt, n, idx_list[idx], drude_param, idx, poles));
+      }
+    }
+
+    template <bool ez_present, bool hy_present, bool hx_present, int np>
     void 
     update(T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
 	   const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
 	   const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
 	   double dx, double dy, double dt, double n,
 	   const Index3& idx, 
-	   DrudeElectricParam<T>& drude_param)
+	   const DrudeElectricParam<T>& drude_param, int point,
+	   Poles<np> poles)
     {
       const int i = idx[0], j = idx[1], k = idx[2];
 
       const auto& c = drude_param.c;
       
       const T& e_now = ez(i,j,k);
-      update_q(e_now, drude_param);
+      update_q(e_now, drude_param, point, poles);
       ez(i,j,k) = c[0] * ((hy(i+1,j,k+1) - hy(i,j,k+1)) / dx - 
 			  (hx(i,j+1,k+1) - hx(i,j,k+1)) / dy)
-	+ c[1] * dps_sum(static_cast<T>(0), drude_param) + c[2] * e_now;
+	+ c[1] * dps_sum(static_cast<T>(0), drude_param, point, poles) + c[2] * e_now;
     }
 
   protected:
     using DrudeElectric<T>::idx_list;
-    using DrudeElectric<T>::param_list;
+    using DrudeElectric<T>::coef_list;
+    using DrudeElectric<T>::coef_idx;
     using DrudeElectric<T>::update_q;
     using DrudeElectric<T>::dps_sum;
   }; // template DrudeEz
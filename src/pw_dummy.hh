@@ -31,10 +31,14 @@ namespace gmes
       Index3 index;
       std::copy(idx, idx + idx_size, index.begin());
       const int i = position(index);
-      if (i < 0)
+      if (i >= 0)
+	return param_list[i].eps_inf;
+
+      const int r = range_position(index);
+      if (r < 0)
 	return 0;
       else
-	return param_list[i].eps_inf;
+	return range_param_list[r].eps_inf;
     }
 
     PwMaterial<T>*
@@ -52,12 +56,30 @@ namespace gmes
       return this;
     }
 
+    // Attach the box [low, high], e.g., a whole boundary plane, sharing
+    // a single parameter.
+    PwMaterial<T>*
+    attach_range(const int* const low, int low_size,
+		 const int* const high, int high_size,
+		 const PwMaterialParam* const pm_param_ptr)
+    {
+      IdxRange range;
+      std::copy(low, low + low_size, range.first.begin());
+      std::copy(high, high + high_size, range.second.begin());
+
+      push_range(range, *static_cast<const DummyElectricParam<T>*>(pm_param_ptr));
+
+      return this;
+    }
+
     PwMaterial<T>*
     merge(const PwMaterial<T>* const pm_ptr)
     {
       auto dummy_ptr = static_cast<const DummyElectric<T>*>(pm_ptr);
       std::copy(dummy_ptr->idx_list.begin(), dummy_ptr->idx_list.end(), std::back_inserter(idx_list));
       std::copy(dummy_ptr->param_list.begin(), dummy_ptr->param_list.end(), std::back_inserter(param_list));
+      for (std::size_t n = 0; n < dummy_ptr->range_list.size(); n++)
+	push_range(dummy_ptr->range_list[n], dummy_ptr->range_param_list[n]);
       return this;
     }
 
@@ -73,10 +95,49 @@ namespace gmes
       // Dummy does nothing.
     }
 
+#ifndef SWIG
+    bool
+    idle() const
+    {
+      return true;
+    }
+#endif // SWIG
+
   protected:
     using MaterialElectric<T>::position;
     using MaterialElectric<T>::idx_list;
+    using MaterialElectric<T>::range_position;
+    using MaterialElectric<T>::range_list;
     std::vector<DummyElectricParam<T> > param_list;
+    std::vector<DummyElectricParam<T> > range_param_list;
+
+    void
+    reorder(const std::vector<int>& perm)
+    {
+      permute(param_list, perm);
+    }
+
+    void
+    coalesce()
+    {
+      coalesce_ranges(range_list, range_param_list,
+		      [](const DummyElectricParam<T>& p1, const DummyElectricParam<T>& p2) {
+			return p1.eps_inf == p2.eps_inf;
+		      });
+    }
+
+    // Append range, or stack it onto the last range of the same medium.
+    void
+    push_range(const IdxRange& range, const DummyElectricParam<T>& dummy_param)
+    {
+      if (!range_list.empty() &&
+	  range_param_list.back().eps_inf == dummy_param.eps_inf &&
+	  stack(range_list.back(), range))
+	return;
+
+      range_list.push_back(range);
+      range_param_list.push_back(dummy_param);
+    }
 
   private:
     static const std::string tag; // "DrudeElectric"
@@ -113,10 +174,14 @@ namespace gmes
       Index3 index;
       std::copy(idx, idx + idx_size, index.begin());
       const int i = position(index);
-      if (i < 0)
+      if (i >= 0)
+	return param_list[i].mu_inf;
+
+      const int r = range_position(index);
+      if (r < 0)
 	return 0;
       else
-	return param_list[i].mu_inf;
+	return range_param_list[r].mu_inf;
     }
 
     PwMaterial<T>*
@@ -134,12 +199,30 @@ namespace gmes
       return this;
     }
 
+    // Attach the box [low, high], e.g., a whole boundary plane, sharing
+    // a single parameter.
+    PwMaterial<T>*
+    attach_range(const int* const low, int low_size,
+		 const int* const high, int high_size,
+		 const PwMaterialParam* const pm_param_ptr)
+    {
+      IdxRange range;
+      std::copy(low, low + low_size, range.first.begin());
+      std::copy(high, high + high_size, range.second.begin());
+
+      push_range(range, *static_cast<const DummyMagneticParam<T>*>(pm_param_ptr));
+
+      return this;
+    }
+
     PwMaterial<T>*
     merge(const PwMaterial<T>* const pm_ptr)
     {
       auto dummy_ptr = static_cast<const DummyMagnetic<T>*>(pm_ptr);
       std::copy(dummy_ptr->idx_list.begin(), dummy_ptr->idx_list.end(), std::back_inserter(idx_list));
       std::copy(dummy_ptr->param_list.begin(), dummy_ptr->param_list.end(), std::back_inserter(param_list));
+      for (std::size_t n = 0; n < dummy_ptr->range_list.size(); n++)
+	push_range(dummy_ptr->range_list[n], dummy_ptr->range_param_list[n]);
       return this;
     }
  
@@ -155,10 +238,49 @@ namespace gmes
       // Dummy does nothing.
     }
 
+#ifndef SWIG
+    bool
+    idle() const
+    {
+      return true;
+    }
+#endif // SWIG
+
   protected:
     using MaterialMagnetic<T>::position;
     using MaterialMagnetic<T>::idx_list;
+    using MaterialMagnetic<T>::range_position;
+    using MaterialMagnetic<T>::range_list;
     std::vector<DummyMagneticParam<T> > param_list;
+    std::vector<DummyMagneticParam<T> > range_param_list;
+
+    void
+    reorder(const std::vector<int>& perm)
+    {
+      permute(param_list, perm);
+    }
+
+    void
+    coalesce()
+    {
+      coalesce_ranges(range_list, range_param_list,
+		      [](const DummyMagneticParam<T>& p1, const DummyMagneticParam<T>& p2) {
+			return p1.mu_inf == p2.mu_inf;
+		      });
+    }
+
+    // Append range, or stack it onto the last range of the same medium.
+    void
+    push_range(const IdxRange& range, const DummyMagneticParam<T>& dummy_param)
+    {
+      if (!range_list.empty() &&
+	  range_param_list.back().mu_inf == dummy_param.mu_inf &&
+	  stack(range_list.back(), range))
+	return;
+
+      range_list.push_back(range);
+      range_param_list.push_back(dummy_param);
+    }
 
   private:
     static const std::string tag; // "DummyMagnetic"
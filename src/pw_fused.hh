@@ -0,0 +1,311 @@
+/* Fused update of the coefficient grids of the dielectrics.
+ *
+ * The grids of the three electric (or magnetic) components are swept
+ * in one traversal over the cells where all three are compiled. The
+ * input field values which two components of a cell share, e.g.,
+ * hz(i+1,j+1,k) of Ex and Ey, are read once, so that each input field
+ * is streamed once per half step instead of twice. The cells of a
+ * grid outside the common box are swept component by component. The
+ * updates are the same as those of pw_grid.hh.
+ *
+ * The fused object updates the grids in place of their own update_all,
+ * and it assumes that all six field components are present. Its sweep
+ * can be limited to a region of the cells, which the temporal blocking
+ * of pw_driver.hh uses.
+ */
+
+#ifndef PW_FUSED_HH_
+#define PW_FUSED_HH_
+
+#include <algorithm>
+#include "pw_grid.hh"
+
+#define ex(i,j,k) ex[((i)*ex_y_size+(j))*ex_z_size+(k)]
+#define ey(i,j,k) ey[((i)*ey_y_size+(j))*ey_z_size+(k)]
+#define ez(i,j,k) ez[((i)*ez_y_size+(j))*ez_z_size+(k)]
+#define hx(i,j,k) hx[((i)*hx_y_size+(j))*hx_z_size+(k)]
+#define hy(i,j,k) hy[((i)*hy_y_size+(j))*hy_z_size+(k)]
+#define hz(i,j,k) hz[((i)*hz_y_size+(j))*hz_z_size+(k)]
+#define cex(i,j,k) cex[((i)*ex_y_size+(j))*ex_z_size+(k)]
+#define cey(i,j,k) cey[((i)*ey_y_size+(j))*ey_z_size+(k)]
+#define cez(i,j,k) cez[((i)*ez_y_size+(j))*ez_z_size+(k)]
+#define chx(i,j,k) chx[((i)*hx_y_size+(j))*hx_z_size+(k)]
+#define chy(i,j,k) chy[((i)*hy_y_size+(j))*hy_z_size+(k)]
+#define chz(i,j,k) chz[((i)*hz_y_size+(j))*hz_z_size+(k)]
+
+namespace gmes
+{
+#ifndef SWIG
+  // The k of box in the row (i, j), which is empty if box misses it.
+  inline std::pair<int, int>
+  row_of(const IdxRange& box, int i, int j)
+  {
+    if (is_empty(box) || i < box.first[0] || i > box.second[0] ||
+	j < box.first[1] || j > box.second[1])
+      return std::make_pair(1, 0);
+    else
+      return std::make_pair(box.first[2], box.second[2]);
+  }
+
+  // Call f(i, j, k) for the cells of bound which are in neither hole1
+  // nor hole2.
+  template <typename F>
+  void
+  for_each_outside(const IdxRange& bound, const IdxRange& hole1, 
+		   const IdxRange& hole2, F f)
+  {
+#pragma omp parallel for collapse(2)
+    for (int i = bound.first[0]; i <= bound.second[0]; i++)
+      for (int j = bound.first[1]; j <= bound.second[1]; j++) {
+	std::pair<int, int> cut1 = row_of(hole1, i, j);
+	std::pair<int, int> cut2 = row_of(hole2, i, j);
+	if (cut2.first < cut1.first)
+	  std::swap(cut1, cut2);
+
+	const int end = bound.second[2] + 1;
+	int k = bound.first[2];
+	if (cut1.first <= cut1.second) {
+	  for (const int stop = std::min(cut1.first, end); k < stop; k++)
+	    f(i, j, k);
+	  k = std::max(k, cut1.second + 1);
+	}
+	if (cut2.first <= cut2.second) {
+	  for (const int stop = std::min(cut2.first, end); k < stop; k++)
+	    f(i, j, k);
+	  k = std::max(k, cut2.second + 1);
+	}
+	for (; k < end; k++)
+	  f(i, j, k);
+      }
+  }
+
+  // Call f(i, j, k) for the cells of bound which are not in box.
+  template <typename F>
+  void
+  for_each_outside(const IdxRange& bound, const IdxRange& box, F f)
+  {
+    for_each_outside(bound, box, no_cells(), f);
+  }
+#endif // SWIG
+
+  template <typename T>
+  class DielectricFusedElectric
+  {
+  public:
+    DielectricFusedElectric(DielectricGridEx<T>* const ex_grid,
+			    DielectricGridEy<T>* const ey_grid,
+			    DielectricGridEz<T>* const ez_grid):
+      ex_grid(ex_grid), ey_grid(ey_grid), ez_grid(ez_grid)
+    {
+      ex_grid->set_fused(true);
+      ey_grid->set_fused(true);
+      ez_grid->set_fused(true);
+    }
+
+    void
+    update_all(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	       T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	       T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	       const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	       const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	       const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	       double dx, double dy, double dz, double dt, double n)
+    {
+      update_region(ex, ex_x_size, ex_y_size, ex_z_size,
+		    ey, ey_x_size, ey_y_size, ey_z_size,
+		    ez, ez_x_size, ez_y_size, ez_z_size,
+		    hx, hx_x_size, hx_y_size, hx_z_size,
+		    hy, hy_x_size, hy_y_size, hy_z_size,
+		    hz, hz_x_size, hz_y_size, hz_z_size,
+		    dx, dy, dz, dt, n, all_cells(), no_cells());
+    }
+
+#ifndef SWIG
+    // The cells where all three grids are compiled, for the fields of
+    // the given shapes.
+    IdxRange
+    get_box(const Index3& ex_shape, const Index3& ey_shape,
+	    const Index3& ez_shape, double dt)
+    {
+      ex_grid->get_coef(ex_shape[0], ex_shape[1], ex_shape[2], dt);
+      ey_grid->get_coef(ey_shape[0], ey_shape[1], ey_shape[2], dt);
+      ez_grid->get_coef(ez_shape[0], ez_shape[1], ez_shape[2], dt);
+      return intersection(ex_grid->get_bound(),
+			  intersection(ey_grid->get_bound(), 
+				       ez_grid->get_bound()));
+    }
+
+    // Update the cells in clip which are not in hole.
+    void
+    update_region(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+		  T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+		  T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+		  const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+		  const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+		  const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+		  double dx, double dy, double dz, double dt, double n,
+		  const IdxRange& clip, const IdxRange& hole)
+    {
+      const double* const cex =
+	&ex_grid->get_coef(ex_x_size, ex_y_size, ex_z_size, dt)[0];
+      const double* const cey =
+	&ey_grid->get_coef(ey_x_size, ey_y_size, ey_z_size, dt)[0];
+      const double* const cez =
+	&ez_grid->get_coef(ez_x_size, ez_y_size, ez_z_size, dt)[0];
+      const IdxRange x_bound = intersection(ex_grid->get_bound(), clip);
+      const IdxRange y_bound = intersection(ey_grid->get_bound(), clip);
+      const IdxRange z_bound = intersection(ez_grid->get_bound(), clip);
+      const IdxRange box = intersection(x_bound,
+					intersection(y_bound, z_bound));
+
+      for_each_outside(box, hole, [&](int i, int j, int k) {
+	  const T hx_shared = hx(i,j+1,k+1);
+	  const T hy_shared = hy(i+1,j,k+1);
+	  const T hz_shared = hz(i+1,j+1,k);
+	  ex(i,j,k) += cex(i,j,k) * ((hz_shared - hz(i+1,j,k)) / dy -
+				    (hy_shared - hy(i+1,j,k)) / dz);
+	  ey(i,j,k) += cey(i,j,k) * ((hx_shared - hx(i,j+1,k)) / dz -
+				    (hz_shared - hz(i,j+1,k)) / dx);
+	  ez(i,j,k) += cez(i,j,k) * ((hy_shared - hy(i,j,k+1)) / dx -
+				    (hx_shared - hx(i,j,k+1)) / dy);
+	});
+
+      for_each_outside(x_bound, box, hole, [&](int i, int j, int k) {
+	  ex(i,j,k) += cex(i,j,k) * ((hz(i+1,j+1,k) - hz(i+1,j,k)) / dy -
+				    (hy(i+1,j,k+1) - hy(i+1,j,k)) / dz);
+	});
+      for_each_outside(y_bound, box, hole, [&](int i, int j, int k) {
+	  ey(i,j,k) += cey(i,j,k) * ((hx(i,j+1,k+1) - hx(i,j+1,k)) / dz -
+				    (hz(i+1,j+1,k) - hz(i,j+1,k)) / dx);
+	});
+      for_each_outside(z_bound, box, hole, [&](int i, int j, int k) {
+	  ez(i,j,k) += cez(i,j,k) * ((hy(i+1,j,k+1) - hy(i,j,k+1)) / dx -
+				    (hx(i,j+1,k+1) - hx(i,j,k+1)) / dy);
+	});
+    }
+#endif // SWIG
+
+  private:
+    DielectricGridEx<T>* ex_grid;
+    DielectricGridEy<T>* ey_grid;
+    DielectricGridEz<T>* ez_grid;
+  }; // template DielectricFusedElectric
+
+  template <typename T>
+  class DielectricFusedMagnetic
+  {
+  public:
+    DielectricFusedMagnetic(DielectricGridHx<T>* const hx_grid,
+			    DielectricGridHy<T>* const hy_grid,
+			    DielectricGridHz<T>* const hz_grid):
+      hx_grid(hx_grid), hy_grid(hy_grid), hz_grid(hz_grid)
+    {
+      hx_grid->set_fused(true);
+      hy_grid->set_fused(true);
+      hz_grid->set_fused(true);
+    }
+
+    void
+    update_all(T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	       T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	       T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	       const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	       const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	       const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	       double dx, double dy, double dz, double dt, double n)
+    {
+      update_region(hx, hx_x_size, hx_y_size, hx_z_size,
+		    hy, hy_x_size, hy_y_size, hy_z_size,
+		    hz, hz_x_size, hz_y_size, hz_z_size,
+		    ex, ex_x_size, ex_y_size, ex_z_size,
+		    ey, ey_x_size, ey_y_size, ey_z_size,
+		    ez, ez_x_size, ez_y_size, ez_z_size,
+		    dx, dy, dz, dt, n, all_cells(), no_cells());
+    }
+
+#ifndef SWIG
+    // The cells where all three grids are compiled, for the fields of
+    // the given shapes.
+    IdxRange
+    get_box(const Index3& hx_shape, const Index3& hy_shape,
+	    const Index3& hz_shape, double dt)
+    {
+      hx_grid->get_coef(hx_shape[0], hx_shape[1], hx_shape[2], dt);
+      hy_grid->get_coef(hy_shape[0], hy_shape[1], hy_shape[2], dt);
+      hz_grid->get_coef(hz_shape[0], hz_shape[1], hz_shape[2], dt);
+      return intersection(hx_grid->get_bound(),
+			  intersection(hy_grid->get_bound(), 
+				       hz_grid->get_bound()));
+    }
+
+    // Update the cells in clip which are not in hole.
+    void
+    update_region(T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+		  T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+		  T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+		  const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+		  const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+		  const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+		  double dx, double dy, double dz, double dt, double n,
+		  const IdxRange& clip, const IdxRange& hole)
+    {
+      const double* const chx =
+	&hx_grid->get_coef(hx_x_size, hx_y_size, hx_z_size, dt)[0];
+      const double* const chy =
+	&hy_grid->get_coef(hy_x_size, hy_y_size, hy_z_size, dt)[0];
+      const double* const chz =
+	&hz_grid->get_coef(hz_x_size, hz_y_size, hz_z_size, dt)[0];
+      const IdxRange x_bound = intersection(hx_grid->get_bound(), clip);
+      const IdxRange y_bound = intersection(hy_grid->get_bound(), clip);
+      const IdxRange z_bound = intersection(hz_grid->get_bound(), clip);
+      const IdxRange box = intersection(x_bound,
+					intersection(y_bound, z_bound));
+
+      for_each_outside(box, hole, [&](int i, int j, int k) {
+	  const T ex_shared = ex(i-1,j,k);
+	  const T ey_shared = ey(i,j-1,k);
+	  const T ez_shared = ez(i,j,k-1);
+	  hx(i,j,k) += chx(i,j,k) * ((ey_shared - ey(i,j-1,k-1)) / dz -
+				    (ez_shared - ez(i,j-1,k-1)) / dy);
+	  hy(i,j,k) += chy(i,j,k) * ((ez_shared - ez(i-1,j,k-1)) / dx -
+				    (ex_shared - ex(i-1,j,k-1)) / dz);
+	  hz(i,j,k) += chz(i,j,k) * ((ex_shared - ex(i-1,j-1,k)) / dy -
+				    (ey_shared - ey(i-1,j-1,k)) / dx);
+	});
+
+      for_each_outside(x_bound, box, hole, [&](int i, int j, int k) {
+	  hx(i,j,k) += chx(i,j,k) * ((ey(i,j-1,k) - ey(i,j-1,k-1)) / dz -
+				    (ez(i,j,k-1) - ez(i,j-1,k-1)) / dy);
+	});
+      for_each_outside(y_bound, box, hole, [&](int i, int j, int k) {
+	  hy(i,j,k) += chy(i,j,k) * ((ez(i,j,k-1) - ez(i-1,j,k-1)) / dx -
+				    (ex(i-1,j,k) - ex(i-1,j,k-1)) / dz);
+	});
+      for_each_outside(z_bound, box, hole, [&](int i, int j, int k) {
+	  hz(i,j,k) += chz(i,j,k) * ((ex(i-1,j,k) - ex(i-1,j-1,k)) / dy -
+				    (ey(i,j-1,k) - ey(i-1,j-1,k)) / dx);
+	});
+    }
+#endif // SWIG
+
+  private:
+    DielectricGridHx<T>* hx_grid;
+    DielectricGridHy<T>* hy_grid;
+    DielectricGridHz<T>* hz_grid;
+  }; // template DielectricFusedMagnetic
+} // namespace gmes
+
+#undef ex
+#undef ey
+#undef ez
+#undef hx
+#undef hy
+#undef hz
+#undef cex
+#undef cey
+#undef cez
+#undef chx
+#undef chy
+#undef chz
+
+#endif // PW_FUSED_HH_
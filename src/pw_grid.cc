@@ -0,0 +1 @@
+#include "pw_grid.hh"
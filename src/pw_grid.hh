@@ -0,0 +1,546 @@
+/* Coefficient-grid engine for the non-dispersive dielectrics.
+ *
+ * The attached points and ranges are compiled into a dense array of
+ * dt / eps_inf (or dt / mu_inf) which has the same layout as the 
+ * field, and the whole bounding box is updated in one sweep. Cells 
+ * in the box which are not attached have zero coefficient. The sweep
+ * can be clipped to the cells where the fields may be nonzero.
+ */
+
+#ifndef PW_GRID_HH_
+#define PW_GRID_HH_
+
+#include <limits>
+#include "pw_dielectric.hh"
+
+#define ex(i,j,k) ex[ex_present?((i)*ex_y_size+(j))*ex_z_size+(k):0]
+#define ey(i,j,k) ey[ey_present?((i)*ey_y_size+(j))*ey_z_size+(k):0]
+#define ez(i,j,k) ez[ez_present?((i)*ez_y_size+(j))*ez_z_size+(k):0]
+#define hx(i,j,k) hx[hx_present?((i)*hx_y_size+(j))*hx_z_size+(k):0]
+#define hy(i,j,k) hy[hy_present?((i)*hy_y_size+(j))*hy_z_size+(k):0]
+#define hz(i,j,k) hz[hz_present?((i)*hz_y_size+(j))*hz_z_size+(k):0]
+#define coef(i,j,k) coef[((i)*shape[1]+(j))*shape[2]+(k)]
+
+namespace gmes
+{
+  // Compile the points and ranges of a dielectric into coefficient
+  // grid. Return true if the grid has changed.
+  template <typename Param, typename GetInf>
+  bool
+  compile_grid(std::vector<double>& coef, Index3& shape, IdxRange& bound,
+	       double& coef_dt, IdxCnt::size_type& coef_size,
+	       const IdxCnt& idx_list, const std::vector<Param>& param_list,
+	       const RangeCnt& range_list, 
+	       const std::vector<Param>& range_param_list,
+	       int x_size, int y_size, int z_size, double dt, GetInf inf)
+  {
+    const Index3 new_shape = {{x_size, y_size, z_size}};
+    const IdxCnt::size_type size = idx_list.size() + range_list.size();
+    if (coef_dt == dt && coef_size == size && shape == new_shape)
+      return false;
+
+    shape = new_shape;
+    coef_dt = dt;
+    coef_size = size;
+    coef.assign(x_size * y_size * z_size, 0);
+
+    bound.first.fill(std::numeric_limits<int>::max());
+    bound.second.fill(-1);
+
+    for (auto idx = idx_list.begin(), param = param_list.begin();
+	 idx != idx_list.end(); ++idx, ++param) {
+      coef((*idx)[0],(*idx)[1],(*idx)[2]) = dt / inf(*param);
+      for (int n = 0; n < 3; n++) {
+	bound.first[n] = std::min(bound.first[n], (*idx)[n]);
+	bound.second[n] = std::max(bound.second[n], (*idx)[n]);
+      }
+    }
+
+    for (auto range = range_list.begin(), param = range_param_list.begin();
+	 range != range_list.end(); ++range, ++param) {
+      const double c = dt / inf(*param);
+      for (int i = range->first[0]; i <= range->second[0]; i++)
+	for (int j = range->first[1]; j <= range->second[1]; j++)
+	  for (int k = range->first[2]; k <= range->second[2]; k++)
+	    coef(i,j,k) = c;
+      for (int n = 0; n < 3; n++) {
+	bound.first[n] = std::min(bound.first[n], range->first[n]);
+	bound.second[n] = std::max(bound.second[n], range->second[n]);
+      }
+    }
+
+    return true;
+  }
+
+  template <typename T>
+  class DielectricGridElectric: public DielectricElectric<T>
+  {
+  public:
+    DielectricGridElectric(): 
+      clip(all_cells()), coef_dt(0), coef_size(0), fused(false)
+    {
+      shape.fill(0);
+    }
+
+    const std::string& 
+    name() const
+    {
+      return DielectricGridElectric<T>::tag;
+    }
+
+    void
+    set_clip(int i0, int j0, int k0, int i1, int j1, int k1)
+    {
+      const Index3 first = {{i0, j0, k0}}, second = {{i1, j1, k1}};
+      clip = IdxRange(first, second);
+    }
+
+    void
+    clear_clip()
+    {
+      clip = all_cells();
+    }
+
+#ifndef SWIG
+    // Compile the grid for the field of the given size and return the
+    // coefficients. Only the cells in the bounding box can be nonzero.
+    const std::vector<double>&
+    get_coef(int x_size, int y_size, int z_size, double dt)
+    {
+      compile(x_size, y_size, z_size, dt);
+      return coef;
+    }
+
+    // The cells to sweep: the bounding box of the grid within the clip.
+    IdxRange
+    get_bound() const
+    {
+      return intersection(bound, clip);
+    }
+
+    // Set whether a fused object updates this grid, in which case
+    // update_all does nothing.
+    void
+    set_fused(bool fused)
+    {
+      this->fused = fused;
+    }
+
+    bool
+    idle() const
+    {
+      return fused;
+    }
+#endif // SWIG
+
+  protected:
+    void
+    compile(int x_size, int y_size, int z_size, double dt)
+    {
+      compile_grid(coef, shape, bound, coef_dt, coef_size,
+		   idx_list, param_list, range_list, range_param_list,
+		   x_size, y_size, z_size, dt,
+		   [](const DielectricElectricParam<T>& p) { return p.eps_inf; });
+    }
+
+    using DielectricElectric<T>::idx_list;
+    using DielectricElectric<T>::param_list;
+    using DielectricElectric<T>::range_list;
+    using DielectricElectric<T>::range_param_list;
+
+    std::vector<double> coef;
+    Index3 shape;
+    IdxRange bound, clip;
+    double coef_dt;
+    IdxCnt::size_type coef_size;
+    bool fused;
+
+  private:
+    static const std::string tag; // "DielectricGridElectric"
+  }; // template DielectricGridElectric
+
+  template <typename T>
+  const std::string DielectricGridElectric<T>::tag = "DielectricGridElectric";
+
+  template <typename T>
+  class DielectricGridEx: public DielectricGridElectric<T>
+  {
+  public:
+    void
+    update_all(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	       const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	       const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	       double dy, double dz, double dt, double n)
+    {
+      if (fused)
+	return;
+
+      SWEEP_BY_LAYOUT(hz_x_size != 1, hy_z_size != 1,
+		      (ex, ex_x_size, ex_y_size, ex_z_size,
+		       hz, hz_x_size, hz_y_size, hz_z_size,
+		       hy, hy_x_size, hy_y_size, hy_z_size,
+		       dy, dz, dt, n));
+    }
+
+  private:
+    template <bool ex_present, bool hz_present, bool hy_present>
+    void
+    sweep(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	  const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  double dy, double dz, double dt, double n)
+    {
+      compile(ex_x_size, ex_y_size, ex_z_size, dt);
+
+      const IdxRange box = this->get_bound();
+
+#pragma omp parallel for
+      for (int i = box.first[0]; i <= box.second[0]; i++)
+	for (int j = box.first[1]; j <= box.second[1]; j++)
+	  for (int k = box.first[2]; k <= box.second[2]; k++)
+	    ex(i,j,k) += coef(i,j,k) * ((hz(i+1,j+1,k) - hz(i+1,j,k)) / dy - 
+					(hy(i+1,j,k+1) - hy(i+1,j,k)) / dz);
+    }
+
+  protected:
+    using DielectricGridElectric<T>::compile;
+    using DielectricGridElectric<T>::coef;
+    using DielectricGridElectric<T>::shape;
+    using DielectricGridElectric<T>::fused;
+  }; // template DielectricGridEx
+
+  template <typename T>
+  class DielectricGridEy: public DielectricGridElectric<T>
+  {
+  public:
+    void
+    update_all(T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	       const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	       const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	       double dz, double dx, double dt, double n)
+    {
+      if (fused)
+	return;
+
+      SWEEP_BY_LAYOUT(hx_y_size != 1, hz_x_size != 1,
+		      (ey, ey_x_size, ey_y_size, ey_z_size,
+		       hx, hx_x_size, hx_y_size, hx_z_size,
+		       hz, hz_x_size, hz_y_size, hz_z_size,
+		       dz, dx, dt, n));
+    }
+
+  private:
+    template <bool ey_present, bool hx_present, bool hz_present>
+    void
+    sweep(T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	  const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  double dz, double dx, double dt, double n)
+    {
+      compile(ey_x_size, ey_y_size, ey_z_size, dt);
+
+      const IdxRange box = this->get_bound();
+
+#pragma omp parallel for
+      for (int i = box.first[0]; i <= box.second[0]; i++)
+	for (int j = box.first[1]; j <= box.second[1]; j++)
+	  for (int k = box.first[2]; k <= box.second[2]; k++)
+	    ey(i,j,k) += coef(i,j,k) * ((hx(i,j+1,k+1) - hx(i,j+1,k)) / dz - 
+					(hz(i+1,j+1,k) - hz(i,j+1,k)) / dx);
+    }
+
+  protected:
+    using DielectricGridElectric<T>::compile;
+    using DielectricGridElectric<T>::coef;
+    using DielectricGridElectric<T>::shape;
+    using DielectricGridElectric<T>::fused;
+  }; // template DielectricGridEy
+
+  template <typename T>
+  class DielectricGridEz: public DielectricGridElectric<T>
+  {
+  public:
+    void
+    update_all(T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	       const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	       const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	       double dx, double dy, double dt, double n)
+    {
+      if (fused)
+	return;
+
+      SWEEP_BY_LAYOUT(hy_z_size != 1, hx_y_size != 1,
+		      (ez, ez_x_size, ez_y_size, ez_z_size,
+		       hy, hy_x_size, hy_y_size, hy_z_size,
+		       hx, hx_x_size, hx_y_size, hx_z_size,
+		       dx, dy, dt, n));
+    }
+
+  private:
+    template <bool ez_present, bool hy_present, bool hx_present>
+    void
+    sweep(T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	  const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  double dx, double dy, double dt, double n)
+    {
+      compile(ez_x_size, ez_y_size, ez_z_size, dt);
+
+      const IdxRange box = this->get_bound();
+
+#pragma omp parallel for
+      for (int i = box.first[0]; i <= box.second[0]; i++)
+	for (int j = box.first[1]; j <= box.second[1]; j++)
+	  for (int k = box.first[2]; k <= box.second[2]; k++)
+	    ez(i,j,k) += coef(i,j,k) * ((hy(i+1,j,k+1) - hy(i,j,k+1)) / dx -
+					(hx(i,j+1,k+1) - hx(i,j,k+1)) / dy);
+    }
+
+  protected:
+    using DielectricGridElectric<T>::compile;
+    using DielectricGridElectric<T>::coef;
+    using DielectricGridElectric<T>::shape;
+    using DielectricGridElectric<T>::fused;
+  }; // template DielectricGridEz
+
+  template <typename T>
+  class DielectricGridMagnetic: public DielectricMagnetic<T>
+  {
+  public:
+    DielectricGridMagnetic(): 
+      clip(all_cells()), coef_dt(0), coef_size(0), fused(false)
+    {
+      shape.fill(0);
+    }
+
+    const std::string& 
+    name() const
+    {
+      return DielectricGridMagnetic<T>::tag;
+    }
+
+    void
+    set_clip(int i0, int j0, int k0, int i1, int j1, int k1)
+    {
+      const Index3 first = {{i0, j0, k0}}, second = {{i1, j1, k1}};
+      clip = IdxRange(first, second);
+    }
+
+    void
+    clear_clip()
+    {
+      clip = all_cells();
+    }
+
+#ifndef SWIG
+    // Compile the grid for the field of the given size and return the
+    // coefficients. Only the cells in the bounding box can be nonzero.
+    const std::vector<double>&
+    get_coef(int x_size, int y_size, int z_size, double dt)
+    {
+      compile(x_size, y_size, z_size, dt);
+      return coef;
+    }
+
+    // The cells to sweep: the bounding box of the grid within the clip.
+    IdxRange
+    get_bound() const
+    {
+      return intersection(bound, clip);
+    }
+
+    // Set whether a fused object updates this grid, in which case
+    // update_all does nothing.
+    void
+    set_fused(bool fused)
+    {
+      this->fused = fused;
+    }
+
+    bool
+    idle() const
+    {
+      return fused;
+    }
+#endif // SWIG
+
+  protected:
+    void
+    compile(int x_size, int y_size, int z_size, double dt)
+    {
+      compile_grid(coef, shape, bound, coef_dt, coef_size,
+		   idx_list, param_list, range_list, range_param_list,
+		   x_size, y_size, z_size, dt,
+		   [](const DielectricMagneticParam<T>& p) { return p.mu_inf; });
+    }
+
+    using DielectricMagnetic<T>::idx_list;
+    using DielectricMagnetic<T>::param_list;
+    using DielectricMagnetic<T>::range_list;
+    using DielectricMagnetic<T>::range_param_list;
+
+    std::vector<double> coef;
+    Index3 shape;
+    IdxRange bound, clip;
+    double coef_dt;
+    IdxCnt::size_type coef_size;
+    bool fused;
+
+  private:
+    static const std::string tag; // "DielectricGridMagnetic"
+  }; // template DielectricGridMagnetic
+
+  template <typename T>
+  const std::string DielectricGridMagnetic<T>::tag = "DielectricGridMagnetic";
+
+  template <typename T>
+  class DielectricGridHx: public DielectricGridMagnetic<T>
+  {
+  public:
+    void
+    update_all(T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	       const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	       const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	       double dy, double dz, double dt, double n)
+    {
+      if (fused)
+	return;
+
+      SWEEP_BY_LAYOUT(ez_x_size != 1, ey_z_size != 1,
+		      (hx, hx_x_size, hx_y_size, hx_z_size,
+		       ez, ez_x_size, ez_y_size, ez_z_size,
+		       ey, ey_x_size, ey_y_size, ey_z_size,
+		       dy, dz, dt, n));
+    }
+
+  private:
+    template <bool hx_present, bool ez_present, bool ey_present>
+    void
+    sweep(T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	  const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	  double dy, double dz, double dt, double n)
+    {
+      compile(hx_x_size, hx_y_size, hx_z_size, dt);
+
+      const IdxRange box = this->get_bound();
+
+#pragma omp parallel for
+      for (int i = box.first[0]; i <= box.second[0]; i++)
+	for (int j = box.first[1]; j <= box.second[1]; j++)
+	  for (int k = box.first[2]; k <= box.second[2]; k++)
+	    hx(i,j,k) += coef(i,j,k) * ((ey(i,j-1,k) - ey(i,j-1,k-1)) / dz -
+					(ez(i,j,k-1) - ez(i,j-1,k-1)) / dy);
+    }
+
+  protected:
+    using DielectricGridMagnetic<T>::compile;
+    using DielectricGridMagnetic<T>::coef;
+    using DielectricGridMagnetic<T>::shape;
+    using DielectricGridMagnetic<T>::fused;
+  }; // template DielectricGridHx
+
+  template <typename T>
+  class DielectricGridHy: public DielectricGridMagnetic<T>
+  {
+  public:
+    void
+    update_all(T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	       const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	       const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	       double dz, double dx, double dt, double n)
+    {
+      if (fused)
+	return;
+
+      SWEEP_BY_LAYOUT(ex_y_size != 1, ez_x_size != 1,
+		      (hy, hy_x_size, hy_y_size, hy_z_size,
+		       ex, ex_x_size, ex_y_size, ex_z_size,
+		       ez, ez_x_size, ez_y_size, ez_z_size,
+		       dz, dx, dt, n));
+    }
+
+  private:
+    template <bool hy_present, bool ex_present, bool ez_present>
+    void
+    sweep(T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	  const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	  double dz, double dx, double dt, double n)
+    {
+      compile(hy_x_size, hy_y_size, hy_z_size, dt);
+
+      const IdxRange box = this->get_bound();
+
+#pragma omp parallel for
+      for (int i = box.first[0]; i <= box.second[0]; i++)
+	for (int j = box.first[1]; j <= box.second[1]; j++)
+	  for (int k = box.first[2]; k <= box.second[2]; k++)
+	    hy(i,j,k) += coef(i,j,k) * ((ez(i,j,k-1) - ez(i-1,j,k-1)) / dx -
+					(ex(i-1,j,k) - ex(i-1,j,k-1)) / dz);
+    }
+
+  protected:
+    using DielectricGridMagnetic<T>::compile;
+    using DielectricGridMagnetic<T>::coef;
+    using DielectricGridMagnetic<T>::shape;
+    using DielectricGridMagnetic<T>::fused;
+  }; // template DielectricGridHy
+
+  template <typename T>
+  class DielectricGridHz: public DielectricGridMagnetic<T>
+  {
+  public:
+    void
+    update_all(T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	       const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	       const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	       double dx, double dy, double dt, double n)
+    {
+      if (fused)
+	return;
+
+      SWEEP_BY_LAYOUT(ey_z_size != 1, ex_y_size != 1,
+		      (hz, hz_x_size, hz_y_size, hz_z_size,
+		       ey, ey_x_size, ey_y_size, ey_z_size,
+		       ex, ex_x_size, ex_y_size, ex_z_size,
+		       dx, dy, dt, n));
+    }
+
+  private:
+    template <bool hz_present, bool ey_present, bool ex_present>
+    void
+    sweep(T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	  const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	  double dx, double dy, double dt, double n)
+    {
+      compile(hz_x_size, hz_y_size, hz_z_size, dt);
+
+      const IdxRange box = this->get_bound();
+
+#pragma omp parallel for
+      for (int i = box.first[0]; i <= box.second[0]; i++)
+	for (int j = box.first[1]; j <= box.second[1]; j++)
+	  for (int k = box.first[2]; k <= box.second[2]; k++)
+	    hz(i,j,k) += coef(i,j,k) * ((ex(i-1,j,k) - ex(i-1,j-1,k)) / dy -
+					(ey(i,j-1,k) - ey(i-1,j-1,k)) / dx);
+    }
+
+  protected:
+    using DielectricGridMagnetic<T>::compile;
+    using DielectricGridMagnetic<T>::coef;
+    using DielectricGridMagnetic<T>::shape;
+    using DielectricGridMagnetic<T>::fused;
+  }; // template DielectricGridHz
+} // namespace gmes
+
+#undef ex
+#undef ey
+#undef ez
+#undef hx
+#undef hy
+#undef hz
+#undef coef
+
+#endif // PW_GRID_HH_
@@ -0,0 +1,184 @@
+/* 1-D FDTD of the incident plane wave of a total-field/scattered-field
+ * interface.
+ *
+ * Ex and Hy propagate along z on a line of spacing ds, hy[k] half a
+ * cell after ex[k]. The spacing is matched to the numerical dispersion
+ * of the main grid by the caller. The hard source at ex[source]
+ * follows a table of the time dependence at the half steps n0, n0 + 1,
+ * ... as PointSource does. Both ends are terminated by graded lossy
+ * layers of absorber cells, whose electric and magnetic losses are
+ * matched so that the layers keep the impedance of the medium.
+ *
+ * In a lossless background the line can instead carry the analytic
+ * plane wave (set_analytic). The samples are then half a time step of
+ * delay apart at the phase velocity, and Hy is at the same positions
+ * as Ex. The wave moves by two samples per time step, and only the
+ * first two samples of each array take the waveform, which is then
+ * tabulated at every half step.
+ *
+ * Like the driver, the engine does not own the arrays, which should
+ * outlive it.
+ */
+
+#ifndef PW_INCIDENT_HH_
+#define PW_INCIDENT_HH_
+
+#include <algorithm>
+#include <cmath>
+#include <vector>
+
+namespace gmes
+{
+  template <typename T>
+  class Incident
+  {
+  public:
+    Incident(): ex(0), hy(0), size(0), source(0), 
+		analytic(false), impedance(1), waveform_step(1), n0(0), n(0) {}
+
+    void
+    set_ex(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size)
+    {
+      this->ex = ex;
+      size = ex_x_size * ex_y_size * ex_z_size;
+    }
+
+    void
+    set_hy(T* const hy, int hy_x_size, int hy_y_size, int hy_z_size)
+    {
+      this->hy = hy;
+      size = std::min(size, hy_x_size * hy_y_size * hy_z_size);
+    }
+
+    // Set the update coefficients of the arrays. The losses grow as the
+    // cube of the depth into the absorbers, up to a reflection of about
+    // exp(-16) at normal incidence.
+    void
+    set_medium(double ds, double dt, double eps_inf, double mu_inf,
+	       int absorber)
+    {
+      const double v = 1 / std::sqrt(eps_inf * mu_inf);
+      const double loss_max = absorber > 0 ? 16 * v * dt / (absorber * ds) : 0;
+
+      ca.resize(size);
+      cb.resize(size);
+      da.resize(size);
+      db.resize(size);
+      for (int k = 0; k < size; k++) {
+	const double e_loss = loss_max * std::pow(depth(k, absorber), 3);
+	ca[k] = (1 - e_loss) / (1 + e_loss);
+	cb[k] = dt / (eps_inf * ds) / (1 + e_loss);
+
+	const double h_loss = loss_max * std::pow(depth(k + 0.5, absorber), 3);
+	da[k] = (1 - h_loss) / (1 + h_loss);
+	db[k] = dt / (mu_inf * ds) / (1 + h_loss);
+      }
+    }
+
+    // Carry the analytic plane wave of the given wave impedance.
+    void
+    set_analytic(double impedance)
+    {
+      analytic = true;
+      this->impedance = impedance;
+      waveform_step = 0.5;
+    }
+
+    void
+    set_source(int source)
+    {
+      this->source = source;
+    }
+
+    // Replace the waveform by the samples at n0, n0 + 1, ..., or at
+    // every half step from n0 for the analytic wave.
+    void
+    set_waveform(const T* const waveform, int waveform_size, double n0)
+    {
+      this->waveform.assign(waveform, waveform + waveform_size);
+      this->n0 = n0;
+    }
+
+    double
+    get_n() const
+    {
+      return n;
+    }
+
+    // Advance a time step: Ex and the source, and then Hy.
+    void
+    step()
+    {
+      if (analytic) {
+	n += 0.5;
+	shift(ex, 1);
+	n += 0.5;
+	shift(hy, impedance);
+	return;
+      }
+
+      n += 0.5;
+      for (int k = 1; k < size; k++)
+	ex[k] = static_cast<T>(ca[k]) * ex[k] - static_cast<T>(cb[k]) * (hy[k] - hy[k - 1]);
+
+      if (source >= 0 && source < size)
+	ex[source] = wave(n);
+
+      n += 0.5;
+      for (int k = 0; k < size - 1; k++)
+	hy[k] = static_cast<T>(da[k]) * hy[k] - static_cast<T>(db[k]) * (ex[k + 1] - ex[k]);
+    }
+
+    void
+    run(int steps)
+    {
+      for (int s = 0; s < steps; s++)
+	step();
+    }
+
+  private:
+    // The waveform at the half step m, zero outside the table.
+    T
+    wave(double m) const
+    {
+      const int s = static_cast<int>(std::floor((m - n0) / waveform_step + 0.5));
+      return s >= 0 && s < static_cast<int>(waveform.size()) ? waveform[s] : T(0);
+    }
+
+    // Move the analytic wave of f by a time step, and set the samples
+    // at the delays 0 and a half step from the waveform at n.
+    void
+    shift(T* const f, double scale)
+    {
+      for (int k = size - 1; k >= 2; k--)
+	f[k] = f[k - 2];
+      if (size > 0)
+	f[0] = wave(n) / static_cast<T>(scale);
+      if (size > 1)
+	f[1] = wave(n - 0.5) / static_cast<T>(scale);
+    }
+
+    // The depth of the position z into the absorbers, from 0 at their
+    // inner faces to 1 at the ends.
+    double
+    depth(double z, int absorber) const
+    {
+      if (absorber <= 0)
+	return 0;
+
+      const double outside = std::max(absorber - z, z - (size - 1 - absorber));
+      return std::min(std::max(outside, 0.0), double(absorber)) / absorber;
+    }
+
+    T* ex;
+    T* hy;
+    int size, source;
+    bool analytic;
+    double impedance, waveform_step;
+    std::vector<double> ca, cb, da, db;
+    std::vector<T> waveform;
+    double n0, n;
+  }; // template Incident
+} // namespace gmes
+
+#endif // PW_INCIDENT_HH_
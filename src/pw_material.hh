@@ -3,13 +3,71 @@
 
 #include <algorithm>
 #include <array>
+#include <complex>
+#include <cstdint>
 #include <iterator>
+#include <limits>
+#include <string>
+#include <unordered_map>
 #include <functional>
 #include <utility>
 #include <vector>
 
+#ifdef _OPENMP
+#include <omp.h>
+#endif
+
+// Call the member template sweep with the layout of the input fields
+// fixed at compile time, so that the field accesses in the kernels do
+// not branch. An absent field component is stored as a single element
+// which every index refers to. The updated field is always present.
+#define SWEEP_BY_LAYOUT(in1_present, in2_present, args)	\
+  if (in1_present) {						\
+    if (in2_present)						\
+      sweep<true, true, true> args;				\
+    else							\
+      sweep<true, true, false> args;				\
+  } else {							\
+    if (in2_present)						\
+      sweep<true, false, true> args;				\
+    else							\
+      sweep<true, false, false> args;				\
+  }
+
+// Run the statement with poles, a Poles<n> object whose n is the pole
+// count np for the counts up to four. The pole loops of the kernels
+// are then unrolled. The other counts get Poles<DYNAMIC_POLES>.
+#define BY_POLE_COUNT(np, ...)					\
+  switch (np) {							\
+  case 1: { const Poles<1> poles; __VA_ARGS__; break; }		\
+  case 2: { const Poles<2> poles; __VA_ARGS__; break; }		\
+  case 3: { const Poles<3> poles; __VA_ARGS__; break; }		\
+  case 4: { const Poles<4> poles; __VA_ARGS__; break; }		\
+  default: { const Poles<DYNAMIC_POLES> poles; __VA_ARGS__; }	\
+  }
+
 namespace gmes 
 {
+  // Set the number of threads of the update_all loops. It is a no-op
+  // if the module is built without OpenMP.
+  inline void
+  set_num_threads(int num_threads)
+  {
+#ifdef _OPENMP
+    omp_set_num_threads(num_threads);
+#endif
+  }
+
+  inline int
+  get_num_threads()
+  {
+#ifdef _OPENMP
+    return omp_get_max_threads();
+#else
+    return 1;
+#endif
+  }
+
   struct PwMaterialParam
   {
   }; // struct PwMaterialParam
@@ -29,10 +87,344 @@ namespace gmes
   typedef std::array<int, 3> Index3;
   typedef std::vector<Index3> IdxCnt;
 
+  // An axis-aligned box of indices. Both bounds are inclusive.
+  typedef std::pair<Index3, Index3> IdxRange;
+  typedef std::vector<IdxRange> RangeCnt;
+
+#ifndef SWIG
+  // Arithmetic of the single precision complex fields with the double
+  // precision coefficients. It is carried out in double precision and
+  // rounded, like that of the single precision real fields.
+  typedef std::complex<float> cfloat;
+  typedef std::complex<double> cdouble;
+
+  inline cfloat operator*(double a, const cfloat& z) { return cfloat(a * cdouble(z)); }
+  inline cfloat operator*(const cfloat& z, double a) { return cfloat(cdouble(z) * a); }
+  inline cfloat operator/(const cfloat& z, double a) { return cfloat(cdouble(z) / a); }
+  inline cfloat operator+(double a, const cfloat& z) { return cfloat(a + cdouble(z)); }
+  inline cfloat operator+(const cfloat& z, double a) { return cfloat(cdouble(z) + a); }
+  inline cfloat operator-(double a, const cfloat& z) { return cfloat(a - cdouble(z)); }
+  inline cfloat operator-(const cfloat& z, double a) { return cfloat(cdouble(z) - a); }
+  inline cdouble operator+(const cfloat& z, const cdouble& w) { return cdouble(z) + w; }
+  inline cdouble operator+(const cdouble& w, const cfloat& z) { return w + cdouble(z); }
+  inline cdouble operator-(const cfloat& z, const cdouble& w) { return cdouble(z) - w; }
+  inline cdouble operator-(const cdouble& w, const cfloat& z) { return w - cdouble(z); }
+
+  inline bool
+  contains(const IdxRange& range, const Index3& idx)
+  {
+    for (int n = 0; n < 3; n++)
+      if (idx[n] < range.first[n] || idx[n] > range.second[n])
+	return false;
+    return true;
+  }
+
+  inline IdxCnt::size_type
+  volume(const IdxRange& range)
+  {
+    IdxCnt::size_type size = 1;
+    for (int n = 0; n < 3; n++)
+      size *= range.second[n] - range.first[n] + 1;
+    return size;
+  }
+
+  inline IdxRange
+  intersection(const IdxRange& a, const IdxRange& b)
+  {
+    IdxRange box;
+    for (int n = 0; n < 3; n++) {
+      box.first[n] = std::max(a.first[n], b.first[n]);
+      box.second[n] = std::min(a.second[n], b.second[n]);
+    }
+    return box;
+  }
+
+  inline bool
+  is_empty(const IdxRange& box)
+  {
+    return (box.first[0] > box.second[0] || box.first[1] > box.second[1] ||
+	    box.first[2] > box.second[2]);
+  }
+
+  // The box without cells and the box of all cells.
+  inline IdxRange
+  no_cells()
+  {
+    const Index3 first = {{0, 0, 0}}, second = {{-1, -1, -1}};
+    return IdxRange(first, second);
+  }
+
+  inline IdxRange
+  all_cells()
+  {
+    Index3 first, second;
+    first.fill(std::numeric_limits<int>::min());
+    second.fill(std::numeric_limits<int>::max());
+    return IdxRange(first, second);
+  }
+
+  // Whether next continues range along axis across a shared face.
+  inline bool
+  adjacent(const IdxRange& range, const IdxRange& next, int axis)
+  {
+    const int a1 = (axis + 1) % 3, a2 = (axis + 2) % 3;
+    return (next.first[axis] == range.second[axis] + 1 &&
+	    next.first[a1] == range.first[a1] && 
+	    next.second[a1] == range.second[a1] &&
+	    next.first[a2] == range.first[a2] && 
+	    next.second[a2] == range.second[a2]);
+  }
+
+  // Grow range to cover next if the two boxes share a face. 
+  inline bool
+  stack(IdxRange& range, const IdxRange& next)
+  {
+    for (int axis = 0; axis < 3; axis++) {
+      if (adjacent(range, next, axis)) {
+	range.second[axis] = next.second[axis];
+	return true;
+      }
+    }
+    return false;
+  }
+
+  // Join the boxes along the z, y, and then x axis. item_list holds
+  // the data of each box, and join(range, item, next_range, next_item,
+  // axis) grows range and item to cover the next ones if they can be
+  // joined along axis. The boxes are visited in the order of their
+  // bounds on the other two axes, so that the boxes continuing each
+  // other are next to each other.
+  template <typename Item, typename Join>
+  void
+  coalesce_boxes(RangeCnt& range_list, std::vector<Item>& item_list, Join join)
+  {
+    for (int axis = 2; axis >= 0; axis--) {
+      const int a1 = (axis + 1) % 3, a2 = (axis + 2) % 3;
+      std::vector<int> perm(range_list.size());
+      for (std::size_t n = 0; n < perm.size(); n++)
+	perm[n] = n;
+
+      const RangeCnt& ranges = range_list;
+      std::stable_sort(perm.begin(), perm.end(),
+		       [&ranges, axis, a1, a2](int a, int b) {
+			 const IdxRange& ra = ranges[a];
+			 const IdxRange& rb = ranges[b];
+			 const std::array<int, 5>
+			   ka = {{ra.first[a1], ra.first[a2],
+				  ra.second[a1], ra.second[a2], ra.first[axis]}},
+			   kb = {{rb.first[a1], rb.first[a2],
+				  rb.second[a1], rb.second[a2], rb.first[axis]}};
+			 return ka < kb;
+		       });
+
+      RangeCnt new_range_list;
+      std::vector<Item> new_item_list;
+      for (auto p = perm.begin(); p != perm.end(); ++p) {
+	if (!new_range_list.empty() &&
+	    join(new_range_list.back(), new_item_list.back(),
+		 range_list[*p], item_list[*p], axis))
+	  continue;
+	new_range_list.push_back(range_list[*p]);
+	new_item_list.push_back(item_list[*p]);
+      }
+      range_list.swap(new_range_list);
+      item_list.swap(new_item_list);
+    }
+  }
+
+  // Join the boxes whose parameters are the same by same(p1, p2) into
+  // larger boxes.
+  template <typename Param, typename Same>
+  void
+  coalesce_ranges(RangeCnt& range_list, std::vector<Param>& param_list,
+		  Same same)
+  {
+    coalesce_boxes(range_list, param_list,
+		   [&same](IdxRange& range, Param& param,
+			   const IdxRange& next_range, const Param& next,
+			   int axis) {
+		     if (!(same(param, next) &&
+			   adjacent(range, next_range, axis)))
+		       return false;
+		     range.second[axis] = next_range.second[axis];
+		     return true;
+		   });
+  }
+
+  struct Index3Hash
+  {
+    std::size_t
+    operator()(const Index3& idx) const
+    {
+      std::size_t h = idx[0];
+      h = h * 1000003 ^ idx[1];
+      h = h * 1000003 ^ idx[2];
+      return h;
+    }
+  };
+
+  // Spread the lower 21 bits of v so that two zero bits follow each.
+  inline std::uint64_t
+  spread_bits(std::uint64_t v)
+  {
+    v &= 0x1fffff;
+    v = (v | v << 32) & 0x1f00000000ffffULL;
+    v = (v | v << 16) & 0x1f0000ff0000ffULL;
+    v = (v | v << 8) & 0x100f00f00f00f00fULL;
+    v = (v | v << 4) & 0x10c30c30c30c30c3ULL;
+    v = (v | v << 2) & 0x1249249249249249ULL;
+    return v;
+  }
+
+  // Z-order curve position of idx.
+  inline std::uint64_t
+  morton(const Index3& idx)
+  {
+    return (spread_bits(idx[0]) << 2 | spread_bits(idx[1]) << 1 | 
+	    spread_bits(idx[2]));
+  }
+
+  // Compare indices by the linear offset in a C-ordered array.
+  struct LinearOrder
+  {
+    bool
+    operator()(const Index3& a, const Index3& b) const
+    {
+      return a < b;
+    }
+  };
+
+  // Compare indices tile by tile, then by the linear offset in a tile.
+  struct BlockedOrder
+  {
+    static const int block = 16;
+
+    bool
+    operator()(const Index3& a, const Index3& b) const
+    {
+      const Index3 ta = {{a[0] / block, a[1] / block, a[2] / block}};
+      const Index3 tb = {{b[0] / block, b[1] / block, b[2] / block}};
+      return ta < tb || (ta == tb && a < b);
+    }
+  };
+
+  struct MortonOrder
+  {
+    bool
+    operator()(const Index3& a, const Index3& b) const
+    {
+      return morton(a) < morton(b);
+    }
+  };
+
+  // Rearrange list so that the new n-th element is the old perm[n]-th.
+  template <typename P>
+  void
+  permute(std::vector<P>& list, const std::vector<int>& perm)
+  {
+    std::vector<P> tmp;
+    tmp.reserve(list.size());
+    for (auto p = perm.begin(); p != perm.end(); ++p)
+      tmp.push_back(list[*p]);
+    list.swap(tmp);
+  }
+
+  // The number of poles of a kernel, fixed at compile time unless it is
+  // DYNAMIC_POLES.
+  const int DYNAMIC_POLES = -1;
+
+  template <int n>
+  struct Poles
+  {
+  };
+
+  template <int n>
+  inline int
+  pole_count(Poles<n>, std::size_t size)
+  {
+    return n == DYNAMIC_POLES ? static_cast<int>(size) : n;
+  }
+
+  // Position of coef in coef_list. coef is appended if no equal
+  // coefficients are found. The last entry is tried first since
+  // neighbouring points usually share their coefficients.
+  template <typename C, typename Equal>
+  int
+  intern(std::vector<C>& coef_list, const C& coef, Equal equal)
+  {
+    for (int n = static_cast<int>(coef_list.size()) - 1; n >= 0; n--)
+      if (equal(coef_list[n], coef))
+	return n;
+    coef_list.push_back(coef);
+    return coef_list.size() - 1;
+  }
+
+  // Auxiliary variables of the points, stored as one contiguous array
+  // per pole. The variables of the points with fewer poles than the
+  // others stay zero.
+  template <typename S>
+  class PoleArray
+  {
+  public:
+    PoleArray(): points(0) {}
+
+    S&
+    operator()(int pole, int point)
+    {
+      return data[pole][point];
+    }
+
+    const S&
+    operator()(int pole, int point) const
+    {
+      return data[pole][point];
+    }
+
+    // Append a point whose variables are initialized to value.
+    void
+    push_back(const std::vector<S>& value)
+    {
+      if (value.size() > data.size())
+	data.resize(value.size(), std::vector<S>(points, S(0)));
+      for (std::size_t p = 0; p < data.size(); p++)
+	data[p].push_back(p < value.size() ? value[p] : S(0));
+      points++;
+    }
+
+    void
+    append(const PoleArray<S>& other)
+    {
+      if (other.data.size() > data.size())
+	data.resize(other.data.size(), std::vector<S>(points, S(0)));
+      for (std::size_t p = 0; p < data.size(); p++) {
+	if (p < other.data.size())
+	  data[p].insert(data[p].end(), 
+			 other.data[p].begin(), other.data[p].end());
+	else
+	  data[p].resize(points + other.points, S(0));
+      }
+      points += other.points;
+    }
+
+    void
+    reorder(const std::vector<int>& perm)
+    {
+      for (std::size_t p = 0; p < data.size(); p++)
+	permute(data[p], perm);
+    }
+
+  private:
+    std::vector<std::vector<S> > data;
+    std::size_t points;
+  }; // template PoleArray
+#endif // SWIG
+
   template <typename T> 
   class PwMaterial 
   {
   public:
+    PwMaterial(): indexed_points(0), indexed_ranges(0), indexed_back(no_cells()) {}
+
     virtual
     ~PwMaterial() {}
 
@@ -55,35 +447,183 @@ namespace gmes
     IdxCnt::const_iterator
     find(const Index3& idx) const
     {
-      auto it = std::find(idx_list.begin(), idx_list.end(), idx);
-      return it;
+      const int pos = position(idx);
+      if (pos < 0)
+	return idx_list.end();
+      else
+	return idx_list.begin() + pos;
     }
 
     virtual PwMaterial<T>*
     merge(const PwMaterial<T>* const pm) = 0;
 
+    // Sort the points into the memory order of the field. order is
+    // one of "linear", "blocked", or "morton". The per-point parameters
+    // and states follow their points. The ranges are then coalesced,
+    // and the lookup tables of the points and the ranges are built.
+    void
+    finalize(const std::string& order = "linear")
+    {
+      if (order == "blocked")
+	sort_points(BlockedOrder());
+      else if (order == "morton")
+	sort_points(MortonOrder());
+      else
+	sort_points(LinearOrder());
+      coalesce();
+      build_index();
+    }
+
     IdxCnt::size_type
     idx_size() const
     {
-      return idx_list.size();
+      IdxCnt::size_type size = idx_list.size();
+      for (auto r = range_list.begin(); r != range_list.end(); ++r)
+	size += volume(*r);
+      return size;
     }
 
+    // Limit update_all to the cells from (i0, j0, k0) to (i1, j1, k1),
+    // outside which the fields are known to be zero. The materials 
+    // which visit their own points ignore it.
+    virtual void
+    set_clip(int i0, int j0, int k0, int i1, int j1, int k1)
+    {
+    }
+
+    virtual void
+    clear_clip()
+    {
+    }
+
+#ifndef SWIG
+    // Whether update_all leaves the field unchanged.
+    virtual bool
+    idle() const
+    {
+      return false;
+    }
+
+    // Call f with the box of each point and range.
+    template <typename F>
+    void
+    for_each_box(F f) const
+    {
+      for (auto idx = idx_list.begin(); idx != idx_list.end(); ++idx)
+	f(IdxRange(*idx, *idx));
+      for (auto r = range_list.begin(); r != range_list.end(); ++r)
+	f(*r);
+    }
+#endif // SWIG
+
   protected:
+    // Apply the permutation of finalize to the per-point parameters.
+    virtual void
+    reorder(const std::vector<int>& perm) = 0;
+
+    // Join the ranges into larger boxes where the material allows it.
+    // finalize calls this after sorting the points.
+    virtual void
+    coalesce()
+    {
+    }
+
+    template <typename Compare>
+    void
+    sort_points(Compare comp)
+    {
+      std::vector<int> perm(idx_list.size());
+      for (std::size_t n = 0; n < perm.size(); n++)
+	perm[n] = n;
+      
+      const IdxCnt& idx = idx_list;
+      std::stable_sort(perm.begin(), perm.end(), 
+		       [&idx, &comp](int a, int b) { 
+			 return comp(idx[a], idx[b]); 
+		       });
+      permute(idx_list, perm);
+      reorder(perm);
+    }
+
+    // Build the lookup tables of position and range_position: the
+    // positions of the points, and the ranges crossing each (i, j) row.
+    void
+    build_index()
+    {
+      idx_map.clear();
+      idx_map.reserve(idx_list.size());
+      for (std::size_t n = 0; n < idx_list.size(); n++)
+	idx_map.insert(std::make_pair(idx_list[n], n));
+      indexed_points = idx_list.size();
+
+      row_map.clear();
+      for (std::size_t r = 0; r < range_list.size(); r++)
+	for (int i = range_list[r].first[0]; i <= range_list[r].second[0]; i++)
+	  for (int j = range_list[r].first[1]; j <= range_list[r].second[1]; j++) {
+	    const Index3 row = {{i, j, 0}};
+	    row_map[row].push_back(r);
+	  }
+      indexed_ranges = range_list.size();
+      indexed_back = range_list.empty() ? no_cells() : range_list.back();
+    }
+
+    // Position of idx in idx_list, or -1. The lookups do not modify the
+    // tables, so they can run concurrently. attach and merge only append
+    // the points, thus the tables are used as long as the number of the
+    // points is the one they were built for. Otherwise, e.g., before
+    // finalize, idx_list is scanned.
     int
     position(const Index3& idx) const
     {
-      auto it = find(idx);
-      
-      size_t pos = 0;
-      if (it == idx_list.end())
-	return pos - 1;
-      else {
-	pos = std::distance(idx_list.begin(), it);
-	return pos;
+      if (indexed_points != idx_list.size()) {
+	auto it = std::find(idx_list.begin(), idx_list.end(), idx);
+	if (it == idx_list.end())
+	  return -1;
+	else
+	  return std::distance(idx_list.begin(), it);
+      }
+
+      auto it = idx_map.find(idx);
+      if (it == idx_map.end())
+	return -1;
+      else
+	return it->second;
+    }
+
+    // Position of the range containing idx in range_list, or -1. Since 
+    // attach and merge append ranges or grow the last one, the tables
+    // are used while the number of the ranges and the last range are
+    // the ones they were built for.
+    int
+    range_position(const Index3& idx) const
+    {
+      if (indexed_ranges != range_list.size() || 
+	  (!range_list.empty() && range_list.back() != indexed_back)) {
+	for (auto r = range_list.begin(); r != range_list.end(); ++r)
+	  if (contains(*r, idx))
+	    return std::distance(range_list.begin(), r);
+	return -1;
       }
+
+      const Index3 row = {{idx[0], idx[1], 0}};
+      auto it = row_map.find(row);
+      if (it == row_map.end())
+	return -1;
+      for (auto r = it->second.begin(); r != it->second.end(); ++r)
+	if (contains(range_list[*r], idx))
+	  return *r;
+      return -1;
     }
     
     IdxCnt idx_list;
+    RangeCnt range_list;
+
+  private:
+    std::unordered_map<Index3, int, Index3Hash> idx_map;
+    std::unordered_map<Index3, std::vector<int>, Index3Hash> row_map;
+    IdxCnt::size_type indexed_points;
+    RangeCnt::size_type indexed_ranges;
+    IdxRange indexed_back;
   }; // template PwMaterial
 
   template <typename T> 
@@ -93,11 +633,22 @@ namespace gmes
     virtual double 
     get_eps_inf(const int* const idx, int idx_size) const = 0;
 
+    // get_eps_inf of each row of idx_array.
+    void
+    get_eps_inf_array(const int* const idx_array, int idx_rows, int idx_cols,
+		      double* const eps, int eps_size) const
+    {
+      for (int n = 0; n < idx_rows && n < eps_size; n++)
+	eps[n] = get_eps_inf(idx_array + n * idx_cols, idx_cols);
+    }
+
     using PwMaterial<T>::find;
 
   protected:
     using PwMaterial<T>::position;
+    using PwMaterial<T>::range_position;
     using PwMaterial<T>::idx_list;
+    using PwMaterial<T>::range_list;
   }; // template MaterialElectric
 
   template <typename T> 
@@ -107,11 +658,22 @@ namespace gmes
     virtual double 
     get_mu_inf(const int* const idx, int idx_size) const = 0;
 
+    // get_mu_inf of each row of idx_array.
+    void
+    get_mu_inf_array(const int* const idx_array, int idx_rows, int idx_cols,
+		     double* const mu, int mu_size) const
+    {
+      for (int n = 0; n < idx_rows && n < mu_size; n++)
+	mu[n] = get_mu_inf(idx_array + n * idx_cols, idx_cols);
+    }
+
     using PwMaterial<T>::find;
 
   protected:
     using PwMaterial<T>::position;
+    using PwMaterial<T>::range_position;
     using PwMaterial<T>::idx_list;
+    using PwMaterial<T>::range_list;
   }; // template MaterialMagnetic
 } // namespace gmes
 
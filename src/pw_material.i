@@ -5,19 +5,27 @@
 #include "pw_material.hh"
 #include "pw_dummy.hh"
 #include "pw_const.hh"
+#include "pw_point.hh"
+#include "pw_transparent.hh"
+#include "pw_incident.hh"
 #include "pw_dielectric.hh"
+#include "pw_grid.hh"
+#include "pw_fused.hh"
 #include "pw_upml.hh"
 #include "pw_cpml.hh"
+#include "pw_cpml_slab.hh"
 #include "pw_drude.hh"
 #include "pw_lorentz.hh"
 #include "pw_dcp.hh"
 #include "pw_dm2.hh"
+#include "pw_driver.hh"
 %}
 
 %include <std_string.i>
 %include <std_complex.i>
 %include "numpy.i"
 
+%numpy_typemaps(std::complex<float>, NPY_CFLOAT, int)
 %numpy_typemaps(std::complex<double>, NPY_CDOUBLE, int)
 %apply size_t { gmes::IdxCnt::size_type }; 
 
@@ -25,6 +33,21 @@
 import_array();
 %}
 
+// The kernels do not touch Python objects. Release the GIL while they 
+// run, so that the display threads and the concurrent updates of FDTD
+// are not blocked.
+%exception update_all {
+  Py_BEGIN_ALLOW_THREADS
+  $action
+  Py_END_ALLOW_THREADS
+}
+
+%exception run {
+  Py_BEGIN_ALLOW_THREADS
+  $action
+  Py_END_ALLOW_THREADS
+}
+
 // Declare numpy typemaps.
 %define %apply_numpy_typemaps(TYPE)
 %apply (TYPE* IN_ARRAY3, int DIM1, int DIM2, int DIM3)
@@ -59,16 +82,32 @@ import_array();
       {(TYPE* const hy, int hy_x_size, int hy_y_size, int hy_z_size)};
 %apply (TYPE* INPLACE_ARRAY3, int DIM1, int DIM2, int DIM3)
       {(TYPE* const hz, int hz_x_size, int hz_y_size, int hz_z_size)};
+
+%apply (TYPE* INPLACE_ARRAY1, int DIM1)
+      {(TYPE* const record, int record_size)};
+%apply (TYPE* IN_ARRAY1, int DIM1)
+      {(const TYPE* const waveform, int waveform_size)};
+%apply (TYPE* IN_ARRAY1, int DIM1)
+      {(const TYPE* const incident, int incident_size)};
+%apply (TYPE* INPLACE_ARRAY1, int DIM1)
+      {(TYPE* const link, int link_size)};
 %enddef    /* apply_numpy_typemaps() macro */
 
 %apply_numpy_typemaps(double)
 %apply_numpy_typemaps(std::complex<double>)
+%apply_numpy_typemaps(float)
+%apply_numpy_typemaps(std::complex<float>)
 
 %apply (int* IN_ARRAY1, int DIM1) {(const int* const idx, int idx_size)};
+%apply (int* IN_ARRAY1, int DIM1) {(const int* const low, int low_size)};
+%apply (int* IN_ARRAY1, int DIM1) {(const int* const high, int high_size)};
+%apply (int* IN_ARRAY2, int DIM1, int DIM2) {(const int* const idx_array, int idx_rows, int idx_cols)};
 %apply (double* IN_ARRAY2, int DIM1, int DIM2) {(const double* const a, int a_size1, int a_size2)};
 %apply (double* IN_ARRAY2, int DIM1, int DIM2) {(const double* const b, int b_size1, int b_size2)};
 %apply (std::complex<double>* IN_ARRAY2, int DIM1, int DIM2) {(const std::complex<double>* const b, int b_size1, int b_size2)};
 %apply (double* IN_ARRAY1, int DIM1) {(const double* const c, int c_size)};
+%apply (double* IN_ARRAY2, int DIM1, int DIM2) {(const double* const profile1, int profile1_size1, int profile1_size2)};
+%apply (double* IN_ARRAY2, int DIM1, int DIM2) {(const double* const profile2, int profile2_size1, int profile2_size2)};
 
 %apply (double* IN_ARRAY1, int DIM1) {(const double* const omega, int omega_size)};
 %apply (double* IN_ARRAY1, int DIM1) {(const double* const n, int n_size)};
@@ -76,18 +115,29 @@ import_array();
 %apply (double* ARGOUT_ARRAY1, int DIM1) {(double* const u, int u_size)};
 %apply (double* ARGOUT_ARRAY1, int DIM1) {(double* const v, int v_size)};
 %apply (double* ARGOUT_ARRAY1, int DIM1) {(double* const w, int w_size)};
+%apply (double* ARGOUT_ARRAY1, int DIM1) {(double* const eps, int eps_size)};
+%apply (double* ARGOUT_ARRAY1, int DIM1) {(double* const mu, int mu_size)};
+%apply (double* ARGOUT_ARRAY1, int DIM1) {(double* const rho, int rho_size)};
+%apply (double* INPLACE_ARRAY2, int DIM1, int DIM2) {(double* const bloch, int bloch_rows, int bloch_cols)};
 
 // Include the header file to be wrapped
 %include "pw_material.hh"
 %include "pw_dummy.hh"
 %include "pw_const.hh"
+%include "pw_point.hh"
+%include "pw_transparent.hh"
+%include "pw_incident.hh"
 %include "pw_dielectric.hh"
+%include "pw_grid.hh"
+%include "pw_fused.hh"
 %include "pw_upml.hh"
 %include "pw_cpml.hh"
+%include "pw_cpml_slab.hh"
 %include "pw_drude.hh"
 %include "pw_lorentz.hh"
 %include "pw_dcp.hh"
 %include "pw_dm2.hh"
+%include "pw_driver.hh"
 
 // Instantiate template classes
 %define %linear_wrap(T, postfix)
@@ -120,6 +170,33 @@ import_array();
 %template(ConstHy ## postfix) gmes::ConstHy<T >;
 %template(ConstHz ## postfix) gmes::ConstHz<T >;
 
+// Pointwise sources
+%template(PointSourceElectricParam ## postfix) gmes::PointSourceElectricParam<T >;
+%template(PointSourceMagneticParam ## postfix) gmes::PointSourceMagneticParam<T >;
+%template(PointSourceElectric ## postfix) gmes::PointSourceElectric<T >;
+%template(PointSourceMagnetic ## postfix) gmes::PointSourceMagnetic<T >;
+%template(PointSourceEx ## postfix) gmes::PointSourceEx<T >;
+%template(PointSourceEy ## postfix) gmes::PointSourceEy<T >;
+%template(PointSourceEz ## postfix) gmes::PointSourceEz<T >;
+%template(PointSourceHx ## postfix) gmes::PointSourceHx<T >;
+%template(PointSourceHy ## postfix) gmes::PointSourceHy<T >;
+%template(PointSourceHz ## postfix) gmes::PointSourceHz<T >;
+
+// Total-field/scattered-field interfaces
+%template(TransparentElectricParam ## postfix) gmes::TransparentElectricParam<T >;
+%template(TransparentMagneticParam ## postfix) gmes::TransparentMagneticParam<T >;
+%template(TransparentElectric ## postfix) gmes::TransparentElectric<T >;
+%template(TransparentMagnetic ## postfix) gmes::TransparentMagnetic<T >;
+%template(TransparentEx ## postfix) gmes::TransparentEx<T >;
+%template(TransparentEy ## postfix) gmes::TransparentEy<T >;
+%template(TransparentEz ## postfix) gmes::TransparentEz<T >;
+%template(TransparentHx ## postfix) gmes::TransparentHx<T >;
+%template(TransparentHy ## postfix) gmes::TransparentHy<T >;
+%template(TransparentHz ## postfix) gmes::TransparentHz<T >;
+
+// 1-D FDTD of the incident plane waves
+%template(Incident ## postfix) gmes::Incident<T >;
+
 // Non-dispersive linear isotropic dielectrics
 %template(DielectricElectricParam ## postfix) gmes::DielectricElectricParam<T >;
 %template(DielectricMagneticParam ## postfix) gmes::DielectricMagneticParam<T >;
@@ -132,6 +209,20 @@ import_array();
 %template(DielectricHy ## postfix) gmes::DielectricHy<T >;
 %template(DielectricHz ## postfix) gmes::DielectricHz<T >;
 
+// Coefficient grid of the non-dispersive dielectrics
+%template(DielectricGridElectric ## postfix) gmes::DielectricGridElectric<T >;
+%template(DielectricGridMagnetic ## postfix) gmes::DielectricGridMagnetic<T >;
+%template(DielectricGridEx ## postfix) gmes::DielectricGridEx<T >;
+%template(DielectricGridEy ## postfix) gmes::DielectricGridEy<T >;
+%template(DielectricGridEz ## postfix) gmes::DielectricGridEz<T >;
+%template(DielectricGridHx ## postfix) gmes::DielectricGridHx<T >;
+%template(DielectricGridHy ## postfix) gmes::DielectricGridHy<T >;
+%template(DielectricGridHz ## postfix) gmes::DielectricGridHz<T >;
+
+// Fused update of the coefficient grids
+%template(DielectricFusedElectric ## postfix) gmes::DielectricFusedElectric<T >;
+%template(DielectricFusedMagnetic ## postfix) gmes::DielectricFusedMagnetic<T >;
+
 // UPML
 %template(UpmlElectricParam ## postfix) gmes::UpmlElectricParam<T >;
 %template(UpmlMagneticParam ## postfix) gmes::UpmlMagneticParam<T >;
@@ -156,6 +247,48 @@ import_array();
 %template(CpmlHy ## postfix) gmes::CpmlHy<T >;
 %template(CpmlHz ## postfix) gmes::CpmlHz<T >;
 
+// Slab engine of the CPML
+%template(CpmlSlabElectricParam ## postfix) gmes::CpmlSlabElectricParam<T >;
+%template(CpmlSlabMagneticParam ## postfix) gmes::CpmlSlabMagneticParam<T >;
+%template(CpmlSlabElectric ## postfix) gmes::CpmlSlabElectric<T >;
+%template(CpmlSlabMagnetic ## postfix) gmes::CpmlSlabMagnetic<T >;
+%template(CpmlSlabEx ## postfix) gmes::CpmlSlabEx<T >;
+%template(CpmlSlabEy ## postfix) gmes::CpmlSlabEy<T >;
+%template(CpmlSlabEz ## postfix) gmes::CpmlSlabEz<T >;
+%template(CpmlSlabHx ## postfix) gmes::CpmlSlabHx<T >;
+%template(CpmlSlabHy ## postfix) gmes::CpmlSlabHy<T >;
+%template(CpmlSlabHz ## postfix) gmes::CpmlSlabHz<T >;
+
+%extend gmes::CpmlSlabElectricParam<T >
+{
+  // Set the profiles from the arrays whose rows are b, c, and kappa.
+  void set(const double* const profile1, int profile1_size1, int profile1_size2,
+	   const double* const profile2, int profile2_size1, int profile2_size2)
+  {
+    $self->b1.assign(profile1, profile1 + profile1_size2);
+    $self->c1.assign(profile1 + profile1_size2, profile1 + 2 * profile1_size2);
+    $self->kappa1.assign(profile1 + 2 * profile1_size2, profile1 + 3 * profile1_size2);
+    $self->b2.assign(profile2, profile2 + profile2_size2);
+    $self->c2.assign(profile2 + profile2_size2, profile2 + 2 * profile2_size2);
+    $self->kappa2.assign(profile2 + 2 * profile2_size2, profile2 + 3 * profile2_size2);
+  }
+};
+
+%extend gmes::CpmlSlabMagneticParam<T >
+{
+  // Set the profiles from the arrays whose rows are b, c, and kappa.
+  void set(const double* const profile1, int profile1_size1, int profile1_size2,
+	   const double* const profile2, int profile2_size1, int profile2_size2)
+  {
+    $self->b1.assign(profile1, profile1 + profile1_size2);
+    $self->c1.assign(profile1 + profile1_size2, profile1 + 2 * profile1_size2);
+    $self->kappa1.assign(profile1 + 2 * profile1_size2, profile1 + 3 * profile1_size2);
+    $self->b2.assign(profile2, profile2 + profile2_size2);
+    $self->c2.assign(profile2 + profile2_size2, profile2 + 2 * profile2_size2);
+    $self->kappa2.assign(profile2 + 2 * profile2_size2, profile2 + 3 * profile2_size2);
+  }
+};
+
 // Drude model
 %template(DrudeElectricParam ## postfix) gmes::DrudeElectricParam<T >;
 %template(DrudeMagneticParam ## postfix) gmes::DrudeMagneticParam<T >;
@@ -290,6 +423,9 @@ import_array();
   }
 };
 
+// Compiled time-stepping driver
+%template(Driver ## postfix) gmes::Driver<T >;
+
 %enddef    /* linear_wrap() macro */
 
 %define %nonlinear_wrap(T, postfix)
@@ -314,7 +450,7 @@ import_array();
       $self->omega.push_back(*(omega + i));
       $self->n_atom.push_back(*(n + i));
       
-      std::array<double, 3> u_tmp;
+      std::array<T, 3> u_tmp;
       u_tmp.fill(static_cast<T>(0));
       $self->u.push_back(u_tmp);
     }
@@ -325,5 +461,25 @@ import_array();
 
 %linear_wrap(double, Real)
 %linear_wrap(std::complex<double>, Cmplx)
+%linear_wrap(float, RealSingle)
+%linear_wrap(std::complex<float>, CmplxSingle)
 
 %nonlinear_wrap(double, Real)
+%nonlinear_wrap(float, RealSingle)
+
+%pythoncode %{
+def pw_type(name, cmplx=False, single=False):
+    """Return the compiled class of the given field type.
+
+    Arguments:
+        name -- class name without the postfix, e.g. 'DielectricEx'
+        cmplx -- whether the EM field has complex value. Default is False.
+        single -- whether the EM field is in single precision. Default 
+            is False.
+
+    """
+    postfix = 'Cmplx' if cmplx else 'Real'
+    if single:
+        postfix += 'Single'
+    return globals()[name + postfix]
+%}
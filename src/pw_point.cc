@@ -0,0 +1 @@
+#include "pw_point.hh"
@@ -0,0 +1,300 @@
+#ifndef PW_POINT_HH_
+#define PW_POINT_HH_
+
+// Pointwise sources of a common time dependence. The waveform is a
+// table of the time dependence at the half steps n0, n0 + 1, ... of
+// the component, so that the update of a time step looks it up once
+// for all the points. Outside the table the waveform is zero.
+
+#include <cmath>
+#include <iostream>
+#include <utility>
+#include "pw_material.hh"
+
+#define inplace_field(i,j,k) inplace_field[inplace_present?((i)*inplace_dim2+(j))*inplace_dim3+(k):0]
+
+namespace gmes
+{
+  template <typename T>
+  struct PointSourceElectricParam: public ElectricParam<T>
+  {
+    double amp;
+    bool hard; // A hard source sets the field, otherwise it is a current.
+  }; // template PointSourceElectricParam
+
+  template <typename T>
+  struct PointSourceMagneticParam: public MagneticParam<T>
+  {
+    double amp;
+    bool hard; // A hard source sets the field, otherwise it is a current.
+  }; // template PointSourceMagneticParam
+
+  template <typename T>
+  class PointSourceElectric: public MaterialElectric<T>
+  {
+  public:
+    PointSourceElectric(): n0(0) {}
+
+    const std::string&
+    name() const
+    {
+      return PointSourceElectric<T>::tag;
+    }
+
+    double
+    get_eps_inf(const int* const idx, int idx_size) const
+    {
+      Index3 index;
+      std::copy(idx, idx + idx_size, index.begin());
+      const int i = position(index);
+      if (i < 0)
+	return 0;
+      else
+	return param_list[i].eps_inf;
+    }
+
+    PwMaterial<T>*
+    attach(const int* const idx, int idx_size,
+	   const PwMaterialParam* const pm_param_ptr)
+    {
+      Index3 index;
+      std::copy(idx, idx + idx_size, index.begin());
+
+      const auto& point_param = *static_cast<const PointSourceElectricParam<T>*>(pm_param_ptr);
+
+      idx_list.push_back(index);
+      param_list.push_back(point_param);
+
+      return this;
+    }
+
+    PwMaterial<T>*
+    merge(const PwMaterial<T>* const pm_ptr)
+    {
+      auto point_ptr = static_cast<const PointSourceElectric<T>*>(pm_ptr);
+      std::copy(point_ptr->idx_list.begin(), point_ptr->idx_list.end(), std::back_inserter(idx_list));
+      std::copy(point_ptr->param_list.begin(), point_ptr->param_list.end(), std::back_inserter(param_list));
+      return this;
+    }
+
+    // Replace the waveform by the samples at n0, n0 + 1, ...
+    void
+    set_waveform(const T* const waveform, int waveform_size, double n0)
+    {
+      this->waveform.assign(waveform, waveform + waveform_size);
+      this->n0 = n0;
+    }
+
+    void
+    update_all(T* const inplace_field,
+	       int inplace_dim1, int inplace_dim2, int inplace_dim3,
+	       const T* const in_field1,
+	       int in1_dim1, int in1_dim2, int in1_dim3,
+	       const T* const in_field2,
+	       int in2_dim1, int in2_dim2, int in2_dim3,
+	       double d1, double d2, double dt, double n)
+    {
+      SWEEP_BY_LAYOUT(in1_dim1 * in1_dim2 * in1_dim3 != 1,
+		      in2_dim1 * in2_dim2 * in2_dim3 != 1,
+		      (inplace_field, inplace_dim1, inplace_dim2, inplace_dim3,
+		       in_field1, in1_dim1, in1_dim2, in1_dim3,
+		       in_field2, in2_dim1, in2_dim2, in2_dim3,
+		       d1, d2, dt, n));
+    }
+
+  private:
+    template <bool inplace_present, bool in1_present, bool in2_present>
+    void
+    sweep(T* const inplace_field,
+	  int inplace_dim1, int inplace_dim2, int inplace_dim3,
+	  const T* const in_field1,
+	  int in1_dim1, int in1_dim2, int in1_dim3,
+	  const T* const in_field2,
+	  int in2_dim1, int in2_dim2, int in2_dim3,
+	  double d1, double d2, double dt, double n)
+    {
+      const int s = static_cast<int>(std::floor(n - n0 + 0.5));
+      const T value = s >= 0 && s < static_cast<int>(waveform.size()) ? waveform[s] : T(0);
+
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+	const int i = idx_list[idx][0], j = idx_list[idx][1], k = idx_list[idx][2];
+	const PointSourceElectricParam<T>& point_param = param_list[idx];
+	if (point_param.hard)
+	  inplace_field(i,j,k) = static_cast<T>(point_param.amp) * value;
+	else
+	  inplace_field(i,j,k) -= static_cast<T>(dt * point_param.amp / point_param.eps_inf) * value;
+      }
+    }
+
+  protected:
+    using MaterialElectric<T>::position;
+    using MaterialElectric<T>::idx_list;
+    std::vector<PointSourceElectricParam<T> > param_list;
+    std::vector<T> waveform;
+    double n0;
+
+    void
+    reorder(const std::vector<int>& perm)
+    {
+      permute(param_list, perm);
+    }
+
+  private:
+    static const std::string tag; // "PointSourceElectric"
+  }; // template PointSourceElectric
+
+  template <typename T>
+  const std::string PointSourceElectric<T>::tag = "PointSourceElectric";
+
+  template <typename T>
+  class PointSourceEx: public PointSourceElectric<T>
+  {
+  }; // template PointSourceEx
+
+  template <typename T>
+  class PointSourceEy: public PointSourceElectric<T>
+  {
+  }; // template PointSourceEy
+
+  template <typename T>
+  class PointSourceEz: public PointSourceElectric<T>
+  {
+  }; // template PointSourceEz
+
+  template <typename T>
+  class PointSourceMagnetic: public MaterialMagnetic<T>
+  {
+  public:
+    PointSourceMagnetic(): n0(0) {}
+
+    const std::string&
+    name() const
+    {
+      return PointSourceMagnetic<T>::tag;
+    }
+
+    double
+    get_mu_inf(const int* const idx, int idx_size) const
+    {
+      Index3 index;
+      std::copy(idx, idx + idx_size, index.begin());
+      const int i = position(index);
+      if (i < 0)
+	return 0;
+      else
+	return param_list[i].mu_inf;
+    }
+
+    PwMaterial<T>*
+    attach(const int* const idx, int idx_size,
+	   const PwMaterialParam* const pm_param_ptr)
+    {
+      Index3 index;
+      std::copy(idx, idx + idx_size, index.begin());
+
+      const auto& point_param = *static_cast<const PointSourceMagneticParam<T>*>(pm_param_ptr);
+
+      idx_list.push_back(index);
+      param_list.push_back(point_param);
+
+      return this;
+    }
+
+    PwMaterial<T>*
+    merge(const PwMaterial<T>* const pm_ptr)
+    {
+      auto point_ptr = static_cast<const PointSourceMagnetic<T>*>(pm_ptr);
+      std::copy(point_ptr->idx_list.begin(), point_ptr->idx_list.end(), std::back_inserter(idx_list));
+      std::copy(point_ptr->param_list.begin(), point_ptr->param_list.end(), std::back_inserter(param_list));
+      return this;
+    }
+
+    // Replace the waveform by the samples at n0, n0 + 1, ...
+    void
+    set_waveform(const T* const waveform, int waveform_size, double n0)
+    {
+      this->waveform.assign(waveform, waveform + waveform_size);
+      this->n0 = n0;
+    }
+
+    void
+    update_all(T* const inplace_field,
+	       int inplace_dim1, int inplace_dim2, int inplace_dim3,
+	       const T* const in_field1,
+	       int in1_dim1, int in1_dim2, int in1_dim3,
+	       const T* const in_field2,
+	       int in2_dim1, int in2_dim2, int in2_dim3,
+	       double d1, double d2, double dt, double n)
+    {
+      SWEEP_BY_LAYOUT(in1_dim1 * in1_dim2 * in1_dim3 != 1,
+		      in2_dim1 * in2_dim2 * in2_dim3 != 1,
+		      (inplace_field, inplace_dim1, inplace_dim2, inplace_dim3,
+		       in_field1, in1_dim1, in1_dim2, in1_dim3,
+		       in_field2, in2_dim1, in2_dim2, in2_dim3,
+		       d1, d2, dt, n));
+    }
+
+  private:
+    template <bool inplace_present, bool in1_present, bool in2_present>
+    void
+    sweep(T* const inplace_field,
+	  int inplace_dim1, int inplace_dim2, int inplace_dim3,
+	  const T* const in_field1,
+	  int in1_dim1, int in1_dim2, int in1_dim3,
+	  const T* const in_field2,
+	  int in2_dim1, int in2_dim2, int in2_dim3,
+	  double d1, double d2, double dt, double n)
+    {
+      const int s = static_cast<int>(std::floor(n - n0 + 0.5));
+      const T value = s >= 0 && s < static_cast<int>(waveform.size()) ? waveform[s] : T(0);
+
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+	const int i = idx_list[idx][0], j = idx_list[idx][1], k = idx_list[idx][2];
+	const PointSourceMagneticParam<T>& point_param = param_list[idx];
+	if (point_param.hard)
+	  inplace_field(i,j,k) = static_cast<T>(point_param.amp) * value;
+	else
+	  inplace_field(i,j,k) -= static_cast<T>(dt * point_param.amp / point_param.mu_inf) * value;
+      }
+    }
+
+  protected:
+    using MaterialMagnetic<T>::position;
+    using MaterialMagnetic<T>::idx_list;
+    std::vector<PointSourceMagneticParam<T> > param_list;
+    std::vector<T> waveform;
+    double n0;
+
+    void
+    reorder(const std::vector<int>& perm)
+    {
+      permute(param_list, perm);
+    }
+
+  private:
+    static const std::string tag; // "PointSourceMagnetic"
+  }; // template PointSourceMagnetic
+
+  template <typename T>
+  const std::string PointSourceMagnetic<T>::tag = "PointSourceMagnetic";
+
+  template <typename T> class PointSourceHx: public PointSourceMagnetic<T>
+  {
+  }; // template PointSourceHx
+
+  template <typename T> class PointSourceHy: public PointSourceMagnetic<T>
+  {
+  }; // template PointSourceHy
+
+  template <typename T> class PointSourceHz: public PointSourceMagnetic<T>
+  {
+  }; // template PointSourceHz
+} // namespace gmes
+
+#undef inplace_field
+
+#endif // PW_POINT_HH_
@@ -0,0 +1,317 @@
+#ifndef PW_TRANSPARENT_HH_
+#define PW_TRANSPARENT_HH_
+
+// Consistency conditions of the total-field/scattered-field interface.
+// Each point adds the incident field interpolated between two samples
+// of a 1-D auxiliary grid. The incident field is the flattened
+// auxiliary field, either copied by set_incident before each update or
+// linked once to the array which the auxiliary grid updates in place.
+// The coefficients coef1 and coef2 include the sign, the amplitude,
+// and the medium of the point, and are divided by d1 and d2
+// respectively at the update.
+
+#include <iostream>
+#include <utility>
+#include "pw_material.hh"
+
+#define inplace_field(i,j,k) inplace_field[inplace_present?((i)*inplace_dim2+(j))*inplace_dim3+(k):0]
+
+namespace gmes
+{
+  template <typename T>
+  struct TransparentElectricParam: public ElectricParam<T>
+  {
+    double coef1, coef2;
+    int samp0, samp1;
+    double r0, r1;
+  }; // template TransparentElectricParam
+
+  template <typename T>
+  struct TransparentMagneticParam: public MagneticParam<T>
+  {
+    double coef1, coef2;
+    int samp0, samp1;
+    double r0, r1;
+  }; // template TransparentMagneticParam
+
+  template <typename T>
+  class TransparentElectric: public MaterialElectric<T>
+  {
+  public:
+    TransparentElectric(): incident(0) {}
+
+    const std::string&
+    name() const
+    {
+      return TransparentElectric<T>::tag;
+    }
+
+    double
+    get_eps_inf(const int* const idx, int idx_size) const
+    {
+      Index3 index;
+      std::copy(idx, idx + idx_size, index.begin());
+      const int i = position(index);
+      if (i < 0)
+	return 0;
+      else
+	return param_list[i].eps_inf;
+    }
+
+    PwMaterial<T>*
+    attach(const int* const idx, int idx_size,
+	   const PwMaterialParam* const pm_param_ptr)
+    {
+      Index3 index;
+      std::copy(idx, idx + idx_size, index.begin());
+
+      const auto& transparent_param = *static_cast<const TransparentElectricParam<T>*>(pm_param_ptr);
+
+      idx_list.push_back(index);
+      param_list.push_back(transparent_param);
+
+      return this;
+    }
+
+    PwMaterial<T>*
+    merge(const PwMaterial<T>* const pm_ptr)
+    {
+      auto transparent_ptr = static_cast<const TransparentElectric<T>*>(pm_ptr);
+      std::copy(transparent_ptr->idx_list.begin(), transparent_ptr->idx_list.end(), std::back_inserter(idx_list));
+      std::copy(transparent_ptr->param_list.begin(), transparent_ptr->param_list.end(), std::back_inserter(param_list));
+      return this;
+    }
+
+    void
+    set_incident(const T* const incident, int incident_size)
+    {
+      buffer.assign(incident, incident + incident_size);
+      this->incident = &buffer[0];
+    }
+
+    // Read the incident field from link, which should outlive this.
+    void
+    link_incident(T* const link, int link_size)
+    {
+      buffer.clear();
+      incident = link;
+    }
+
+    void
+    update_all(T* const inplace_field,
+	       int inplace_dim1, int inplace_dim2, int inplace_dim3,
+	       const T* const in_field1,
+	       int in1_dim1, int in1_dim2, int in1_dim3,
+	       const T* const in_field2,
+	       int in2_dim1, int in2_dim2, int in2_dim3,
+	       double d1, double d2, double dt, double n)
+    {
+      if (!incident)
+	return;
+
+      SWEEP_BY_LAYOUT(in1_dim1 * in1_dim2 * in1_dim3 != 1,
+		      in2_dim1 * in2_dim2 * in2_dim3 != 1,
+		      (inplace_field, inplace_dim1, inplace_dim2, inplace_dim3,
+		       in_field1, in1_dim1, in1_dim2, in1_dim3,
+		       in_field2, in2_dim1, in2_dim2, in2_dim3,
+		       d1, d2, dt, n));
+    }
+
+  private:
+    template <bool inplace_present, bool in1_present, bool in2_present>
+    void
+    sweep(T* const inplace_field,
+	  int inplace_dim1, int inplace_dim2, int inplace_dim3,
+	  const T* const in_field1,
+	  int in1_dim1, int in1_dim2, int in1_dim3,
+	  const T* const in_field2,
+	  int in2_dim1, int in2_dim2, int in2_dim3,
+	  double d1, double d2, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+	const int i = idx_list[idx][0], j = idx_list[idx][1], k = idx_list[idx][2];
+	const TransparentElectricParam<T>& transparent_param = param_list[idx];
+	const T value = (static_cast<T>(transparent_param.r0) * incident[transparent_param.samp0] +
+			 static_cast<T>(transparent_param.r1) * incident[transparent_param.samp1]);
+	inplace_field(i,j,k) += static_cast<T>(dt * (transparent_param.coef1 / d1 + transparent_param.coef2 / d2)) * value;
+      }
+    }
+
+  protected:
+    using MaterialElectric<T>::position;
+    using MaterialElectric<T>::idx_list;
+    std::vector<TransparentElectricParam<T> > param_list;
+    std::vector<T> buffer;
+    const T* incident;
+
+    void
+    reorder(const std::vector<int>& perm)
+    {
+      permute(param_list, perm);
+    }
+
+  private:
+    static const std::string tag; // "TransparentElectric"
+  }; // template TransparentElectric
+
+  template <typename T>
+  const std::string TransparentElectric<T>::tag = "TransparentElectric";
+
+  template <typename T>
+  class TransparentEx: public TransparentElectric<T>
+  {
+  }; // template TransparentEx
+
+  template <typename T>
+  class TransparentEy: public TransparentElectric<T>
+  {
+  }; // template TransparentEy
+
+  template <typename T>
+  class TransparentEz: public TransparentElectric<T>
+  {
+  }; // template TransparentEz
+
+  template <typename T>
+  class TransparentMagnetic: public MaterialMagnetic<T>
+  {
+  public:
+    TransparentMagnetic(): incident(0) {}
+
+    const std::string&
+    name() const
+    {
+      return TransparentMagnetic<T>::tag;
+    }
+
+    double
+    get_mu_inf(const int* const idx, int idx_size) const
+    {
+      Index3 index;
+      std::copy(idx, idx + idx_size, index.begin());
+      const int i = position(index);
+      if (i < 0)
+	return 0;
+      else
+	return param_list[i].mu_inf;
+    }
+
+    PwMaterial<T>*
+    attach(const int* const idx, int idx_size,
+	   const PwMaterialParam* const pm_param_ptr)
+    {
+      Index3 index;
+      std::copy(idx, idx + idx_size, index.begin());
+
+      const auto& transparent_param = *static_cast<const TransparentMagneticParam<T>*>(pm_param_ptr);
+
+      idx_list.push_back(index);
+      param_list.push_back(transparent_param);
+
+      return this;
+    }
+
+    PwMaterial<T>*
+    merge(const PwMaterial<T>* const pm_ptr)
+    {
+      auto transparent_ptr = static_cast<const TransparentMagnetic<T>*>(pm_ptr);
+      std::copy(transparent_ptr->idx_list.begin(), transparent_ptr->idx_list.end(), std::back_inserter(idx_list));
+      std::copy(transparent_ptr->param_list.begin(), transparent_ptr->param_list.end(), std::back_inserter(param_list));
+      return this;
+    }
+
+    void
+    set_incident(const T* const incident, int incident_size)
+    {
+      buffer.assign(incident, incident + incident_size);
+      this->incident = &buffer[0];
+    }
+
+    // Read the incident field from link, which should outlive this.
+    void
+    link_incident(T* const link, int link_size)
+    {
+      buffer.clear();
+      incident = link;
+    }
+
+    void
+    update_all(T* const inplace_field,
+	       int inplace_dim1, int inplace_dim2, int inplace_dim3,
+	       const T* const in_field1,
+	       int in1_dim1, int in1_dim2, int in1_dim3,
+	       const T* const in_field2,
+	       int in2_dim1, int in2_dim2, int in2_dim3,
+	       double d1, double d2, double dt, double n)
+    {
+      if (!incident)
+	return;
+
+      SWEEP_BY_LAYOUT(in1_dim1 * in1_dim2 * in1_dim3 != 1,
+		      in2_dim1 * in2_dim2 * in2_dim3 != 1,
+		      (inplace_field, inplace_dim1, inplace_dim2, inplace_dim3,
+		       in_field1, in1_dim1, in1_dim2, in1_dim3,
+		       in_field2, in2_dim1, in2_dim2, in2_dim3,
+		       d1, d2, dt, n));
+    }
+
+  private:
+    template <bool inplace_present, bool in1_present, bool in2_present>
+    void
+    sweep(T* const inplace_field,
+	  int inplace_dim1, int inplace_dim2, int inplace_dim3,
+	  const T* const in_field1,
+	  int in1_dim1, int in1_dim2, int in1_dim3,
+	  const T* const in_field2,
+	  int in2_dim1, int in2_dim2, int in2_dim3,
+	  double d1, double d2, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+	const int i = idx_list[idx][0], j = idx_list[idx][1], k = idx_list[idx][2];
+	const TransparentMagneticParam<T>& transparent_param = param_list[idx];
+	const T value = (static_cast<T>(transparent_param.r0) * incident[transparent_param.samp0] +
+			 static_cast<T>(transparent_param.r1) * incident[transparent_param.samp1]);
+	inplace_field(i,j,k) += static_cast<T>(dt * (transparent_param.coef1 / d1 + transparent_param.coef2 / d2)) * value;
+      }
+    }
+
+  protected:
+    using MaterialMagnetic<T>::position;
+    using MaterialMagnetic<T>::idx_list;
+    std::vector<TransparentMagneticParam<T> > param_list;
+    std::vector<T> buffer;
+    const T* incident;
+
+    void
+    reorder(const std::vector<int>& perm)
+    {
+      permute(param_list, perm);
+    }
+
+  private:
+    static const std::string tag; // "TransparentMagnetic"
+  }; // template TransparentMagnetic
+
+  template <typename T>
+  const std::string TransparentMagnetic<T>::tag = "TransparentMagnetic";
+
+  template <typename T> class TransparentHx: public TransparentMagnetic<T>
+  {
+  }; // template TransparentHx
+
+  template <typename T> class TransparentHy: public TransparentMagnetic<T>
+  {
+  }; // template TransparentHy
+
+  template <typename T> class TransparentHz: public TransparentMagnetic<T>
+  {
+  }; // template TransparentHz
+} // namespace gmes
+
+#undef inplace_field
+
+#endif // PW_TRANSPARENT_HH_
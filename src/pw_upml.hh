@@ -10,12 +10,12 @@
 
 #include "pw_material.hh"
 
-#define ex(i,j,k) ex[ex_y_size==1?0:((i)*ex_y_size+(j))*ex_z_size+(k)]
-#define ey(i,j,k) ey[ey_z_size==1?0:((i)*ey_y_size+(j))*ey_z_size+(k)]
-#define ez(i,j,k) ez[ez_x_size==1?0:((i)*ez_y_size+(j))*ez_z_size+(k)]
-#define hx(i,j,k) hx[hx_y_size==1?0:((i)*hx_y_size+(j))*hx_z_size+(k)]
-#define hy(i,j,k) hy[hy_z_size==1?0:((i)*hy_y_size+(j))*hy_z_size+(k)]
-#define hz(i,j,k) hz[hz_x_size==1?0:((i)*hz_y_size+(j))*hz_z_size+(k)]
+#define ex(i,j,k) ex[ex_present?((i)*ex_y_size+(j))*ex_z_size+(k):0]
+#define ey(i,j,k) ey[ey_present?((i)*ey_y_size+(j))*ey_z_size+(k):0]
+#define ez(i,j,k) ez[ez_present?((i)*ez_y_size+(j))*ez_z_size+(k):0]
+#define hx(i,j,k) hx[hx_present?((i)*hx_y_size+(j))*hx_z_size+(k):0]
+#define hy(i,j,k) hy[hy_present?((i)*hy_y_size+(j))*hy_z_size+(k):0]
+#define hz(i,j,k) hz[hz_present?((i)*hz_y_size+(j))*hz_z_size+(k):0]
 
 namespace gmes
 {
@@ -84,6 +84,12 @@ namespace gmes
     using MaterialElectric<T>::idx_list;
     std::vector<UpmlElectricParam<T> > param_list;
 
+    void
+    reorder(const std::vector<int>& perm)
+    {
+      permute(param_list, perm);
+    }
+
   private:
     static const std::string tag; // "UpmlElectric"
   }; // template UpmlElectric
@@ -101,16 +107,33 @@ namespace gmes
 	       const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
 	       double dy, double dz, double dt, double n)
     {
-       for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(ex, ex_x_size, ex_y_size, ex_z_size,
-	       hz, hz_x_size, hz_y_size, hz_z_size,
-	       hy, hy_x_size, hy_y_size, hy_z_size,
-	       dy, dz, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(hz_x_size != 1, hy_z_size != 1,
+		      (ex, ex_x_size, ex_y_size, ex_z_size,
+		       hz, hz_x_size, hz_y_size, hz_z_size,
+		       hy, hy_x_size, hy_y_size, hy_z_size,
+		       dy, dz, dt, n));
     }
 
   private:
+    template <bool ex_present, bool hz_present, bool hy_present>
+    void
+    sweep(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	  const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  double dy, double dz, double dt, double n)
+    {
+       const int size = idx_list.size();
+#pragma omp parallel for
+       for (int idx = 0; idx < size; idx++) {
+    	update<ex_present, hz_present, hy_present>
+    	  (ex, ex_x_size, ex_y_size, ex_z_size,
+	   hz, hz_x_size, hz_y_size, hz_z_size,
+	   hy, hy_x_size, hy_y_size, hy_z_size,
+	   dy, dz, dt, n, idx_list[idx], param_list[idx]);
+      }
+    }
+
+    template <bool ex_present, bool hz_present, bool hy_present>
     void 
     update(T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
 	   const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
@@ -151,16 +174,33 @@ namespace gmes
 	       const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
 	       double dz, double dx, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(ey, ey_x_size, ey_y_size, ey_z_size,
-	       hx, hx_x_size, hx_y_size, hx_z_size,
-	       hz, hz_x_size, hz_y_size, hz_z_size,
-	       dz, dx, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(hx_y_size != 1, hz_x_size != 1,
+		      (ey, ey_x_size, ey_y_size, ey_z_size,
+		       hx, hx_x_size, hx_y_size, hx_z_size,
+		       hz, hz_x_size, hz_y_size, hz_z_size,
+		       dz, dx, dt, n));
     }
 
   private:
+    template <bool ey_present, bool hx_present, bool hz_present>
+    void
+    sweep(T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	  const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  const T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  double dz, double dx, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+    	update<ey_present, hx_present, hz_present>
+    	  (ey, ey_x_size, ey_y_size, ey_z_size,
+	   hx, hx_x_size, hx_y_size, hx_z_size,
+	   hz, hz_x_size, hz_y_size, hz_z_size,
+	   dz, dx, dt, n, idx_list[idx], param_list[idx]);
+      }
+    }
+
+    template <bool ey_present, bool hx_present, bool hz_present>
     void 
     update(T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
 	   const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
@@ -202,16 +242,33 @@ namespace gmes
 	       const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
 	       double dx, double dy, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(ez, ez_x_size, ez_y_size, ez_z_size,
-	       hy, hy_x_size, hy_y_size, hy_z_size,
-	       hx, hx_x_size, hx_y_size, hx_z_size,
-	       dx, dy, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(hy_z_size != 1, hx_y_size != 1,
+		      (ez, ez_x_size, ez_y_size, ez_z_size,
+		       hy, hy_x_size, hy_y_size, hy_z_size,
+		       hx, hx_x_size, hx_y_size, hx_z_size,
+		       dx, dy, dt, n));
     }
 
   private:
+    template <bool ez_present, bool hy_present, bool hx_present>
+    void
+    sweep(T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	  const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  const T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  double dx, double dy, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+    	update<ez_present, hy_present, hx_present>
+    	  (ez, ez_x_size, ez_y_size, ez_z_size,
+	   hy, hy_x_size, hy_y_size, hy_z_size,
+	   hx, hx_x_size, hx_y_size, hx_z_size,
+	   dx, dy, dt, n, idx_list[idx], param_list[idx]);
+      }
+    }
+
+    template <bool ez_present, bool hy_present, bool hx_present>
     void 
     update(T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
 	   const T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
@@ -294,6 +351,12 @@ namespace gmes
     using MaterialMagnetic<T>::idx_list;
     std::vector<UpmlMagneticParam<T> > param_list;
 
+    void
+    reorder(const std::vector<int>& perm)
+    {
+      permute(param_list, perm);
+    }
+
   private:
     static const std::string tag; // "UpmlMagnetic"
   }; // template UpmlMagnetic
@@ -310,16 +373,33 @@ namespace gmes
 	       const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
 	       double dy, double dz, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(hx, hx_x_size, hx_y_size, hx_z_size,
-	       ez, ez_x_size, ez_y_size, ez_z_size,
-	       ey, ey_x_size, ey_y_size, ey_z_size,
-	       dy, dz, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(ez_x_size != 1, ey_z_size != 1,
+		      (hx, hx_x_size, hx_y_size, hx_z_size,
+		       ez, ez_x_size, ez_y_size, ez_z_size,
+		       ey, ey_x_size, ey_y_size, ey_z_size,
+		       dy, dz, dt, n));
     }
 
   private:
+    template <bool hx_present, bool ez_present, bool ey_present>
+    void
+    sweep(T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
+	  const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	  const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	  double dy, double dz, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+    	update<hx_present, ez_present, ey_present>
+    	  (hx, hx_x_size, hx_y_size, hx_z_size,
+	   ez, ez_x_size, ez_y_size, ez_z_size,
+	   ey, ey_x_size, ey_y_size, ey_z_size,
+	   dy, dz, dt, n, idx_list[idx], param_list[idx]);
+      }
+    }
+
+    template <bool hx_present, bool ez_present, bool ey_present>
     void 
     update(T* const hx, int hx_x_size, int hx_y_size, int hx_z_size,
 	   const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
@@ -361,16 +441,33 @@ namespace gmes
 	       const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
 	       double dz, double dx, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-      	update(hy, hy_x_size, hy_y_size, hy_z_size,
-	       ex, ex_x_size, ex_y_size, ex_z_size,
-	       ez, ez_x_size, ez_y_size, ez_z_size,
-	       dz, dx, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(ex_y_size != 1, ez_x_size != 1,
+		      (hy, hy_x_size, hy_y_size, hy_z_size,
+		       ex, ex_x_size, ex_y_size, ex_z_size,
+		       ez, ez_x_size, ez_y_size, ez_z_size,
+		       dz, dx, dt, n));
     }
 
   private:
+    template <bool hy_present, bool ex_present, bool ez_present>
+    void
+    sweep(T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
+	  const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	  const T* const ez, int ez_x_size, int ez_y_size, int ez_z_size,
+	  double dz, double dx, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+      	update<hy_present, ex_present, ez_present>
+      	  (hy, hy_x_size, hy_y_size, hy_z_size,
+	   ex, ex_x_size, ex_y_size, ex_z_size,
+	   ez, ez_x_size, ez_y_size, ez_z_size,
+	   dz, dx, dt, n, idx_list[idx], param_list[idx]);
+      }
+    }
+
+    template <bool hy_present, bool ex_present, bool ez_present>
     void 
     update(T* const hy, int hy_x_size, int hy_y_size, int hy_z_size,
 	   const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
@@ -412,16 +509,33 @@ namespace gmes
 	       const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
 	       double dx, double dy, double dt, double n)
     {
-      for (auto idx = idx_list.begin(), param = param_list.begin();
-	   idx != idx_list.end(); ++idx, ++param) {
-    	update(hz, hz_x_size, hz_y_size, hz_z_size,
-	       ey, ey_x_size, ey_y_size, ey_z_size,
-	       ex, ex_x_size, ex_y_size, ex_z_size,
-	       dx, dy, dt, n, *idx, *param);
-      }
+      SWEEP_BY_LAYOUT(ey_z_size != 1, ex_y_size != 1,
+		      (hz, hz_x_size, hz_y_size, hz_z_size,
+		       ey, ey_x_size, ey_y_size, ey_z_size,
+		       ex, ex_x_size, ex_y_size, ex_z_size,
+		       dx, dy, dt, n));
     }
 
   private:
+    template <bool hz_present, bool ey_present, bool ex_present>
+    void
+    sweep(T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
+	  const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
+	  const T* const ex, int ex_x_size, int ex_y_size, int ex_z_size,
+	  double dx, double dy, double dt, double n)
+    {
+      const int size = idx_list.size();
+#pragma omp parallel for
+      for (int idx = 0; idx < size; idx++) {
+    	update<hz_present, ey_present, ex_present>
+    	  (hz, hz_x_size, hz_y_size, hz_z_size,
+	   ey, ey_x_size, ey_y_size, ey_z_size,
+	   ex, ex_x_size, ex_y_size, ex_z_size,
+	   dx, dy, dt, n, idx_list[idx], param_list[idx]);
+      }
+    }
+
+    template <bool hz_present, bool ey_present, bool ex_present>
     void 
     update(T* const hz, int hz_x_size, int hz_y_size, int hz_z_size,
 	   const T* const ey, int ey_x_size, int ey_y_size, int ey_z_size,
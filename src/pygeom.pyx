@@ -46,73 +46,91 @@ cdef class Material(object):
         """
         raise NotImplementedError
 
-    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False):
+    def get_pw_material_ex(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
         """Return an ElectricParam structure of the given point.
         
         Arguments:
             idx -- (local) array index of the target point
             coords -- (global) space coordinate of the target point
             complex -- whether the EM field has complex value. Default is False.
+            single -- whether the EM field is in single precision. Default 
+                is False.
             underneath -- underneath material object of the target point.
             
         """
         raise NotImplementedError
     
-    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False):
+    def get_pw_material_ey(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
         """Return an ElectricParam structure of the given point.
         
         Arguments:
             idx -- (local) array index of the target point
             coords -- (global) space coordinate of the target point
             complex -- whether the EM field has complex value. Default is False.
+            single -- whether the EM field is in single precision. Default 
+                is False.
             underneath -- underneath material object of the target point.
             
         """
         raise NotImplementedError
     
-    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False):
+    def get_pw_material_ez(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
         """Return an ElectricParam structure of the given point.
         
         Arguments:
             idx -- (local) array index of the target point
             coords -- (global) space coordinate of the target point
             complex -- whether the EM field has complex value. Default is False.
+            single -- whether the EM field is in single precision. Default 
+                is False.
             underneath -- underneath material object of the target point.
             
         """
         raise NotImplementedError
     
-    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False):
+    def get_pw_material_hx(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
         """Return a MagneticParam structure of the given point.
         
         Arguments:
             idx -- (local) array index of the target point
             coords -- (global) space coordinate of the target point
             complex -- whether the EM field has complex value. Default is False.
+            single -- whether the EM field is in single precision. Default 
+                is False.
             underneath -- underneath material object of the target point.
             
         """
         raise NotImplementedError
     
-    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False):
+    def get_pw_material_hy(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
         """Return a MagneticParam structure of the given point.
         
         Arguments:
             idx -- (local) array index of the target point
             coords -- (global) space coordinate of the target point
             complex -- whether the EM field has complex value. Default is False.
+            single -- whether the EM field is in single precision. Default 
+                is False.
             underneath -- underneath material object of the target point.
             
         """
         raise NotImplementedError
     
-    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False):
+    def get_pw_material_hz(self, idx, coords, underneath=None, cmplx=False,
+                           single=False):
         """Return a MagneticParam structure of the given point.
         
         Arguments:
             idx -- (local) array index of the target point
             coords -- (global) space coordinate of the target point
             complex -- whether the EM field has complex value. Default is False.
+            single -- whether the EM field is in single precision. Default 
+                is False.
             underneath -- underneath material object of the target point.
             
         """
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os, sys
+new_path = os.path.abspath('../')
+sys.path.append(new_path)
+
+import unittest
+import numpy as np
+
+from gmes.fdtd import FDTD, _PlanarField
+from gmes.geometry import Cartesian, DefaultMedium, Block
+from gmes.material import Dielectric, Dm2
+from gmes.source import PointSource, Continuous
+from gmes.constant import Ex, Ey, Ez, Hx, Hy, Hz
+
+
+class TestSequence(unittest.TestCase):
+    def setUp(self):
+        self.steps = 20
+
+    def get_fdtd(self, **kwargs):
+        """Return an initialized periodic FDTD with a dielectric block
+        and a point source.
+
+        """
+        space = Cartesian(size=(1, 1, 1), resolution=6)
+        geom_list = [DefaultMedium(material=Dielectric()),
+                     Block(material=Dielectric(2), size=(0.5, 0.5, 0.5))]
+        src_list = [PointSource(src_time=Continuous(freq=1),
+                                center=(0.25, 0, 0), component=Ez)]
+        fdtd = FDTD(space, geom_list, src_list, verbose=False, **kwargs)
+        fdtd.init()
+        return fdtd
+
+    def testZeroBloch(self):
+        real = self.get_fdtd(bloch=(0, 0, 0))
+        cmplx = self.get_fdtd(bloch=(0, 0, 0), cmplx=True)
+        self.assertFalse(real.cmplx)
+        self.assertTrue(cmplx.cmplx)
+
+        real.run(self.steps)
+        cmplx.run(self.steps)
+        for comp in (Ex, Ey, Ez, Hx, Hy, Hz):
+            self.assertEqual(real.field[comp].dtype, np.double)
+            self.assertEqual(cmplx.field[comp].dtype, complex)
+            self.assertTrue(np.allclose(real.field[comp],
+                                        cmplx.field[comp].real))
+        self.assertTrue(abs(real.ez).max() > 0)
+
+    def testPlanarField(self):
+        field = _PlanarField(np.zeros((2, 3, 4)), np.zeros((2, 3, 4)))
+        self.assertEqual(field.shape, (2, 3, 4))
+        self.assertEqual(field.dtype, complex)
+
+        field[1, :, 2] = 1 + 2j
+        field[0, 1, 3] = -3j
+        self.assertEqual(field[1, 2, 2], 1 + 2j)
+        self.assertEqual(field.real[1, 2, 2], 1)
+        self.assertEqual(field.imag[1, 2, 2], 2)
+        self.assertEqual(field[0, 1, 3], -3j)
+
+        reference = np.zeros((2, 3, 4), complex)
+        reference[1, :, 2] = 1 + 2j
+        reference[0, 1, 3] = -3j
+        self.assertTrue(np.array_equal(np.asarray(field), reference))
+        self.assertTrue(np.array_equal(field[1, :, :], reference[1, :, :]))
+        self.assertEqual(np.asarray(field, np.complex64).dtype, np.complex64)
+
+    def testPlanar(self):
+        planar = self.get_fdtd(bloch=(1, 0.5, 0), planar=True)
+        interleaved = self.get_fdtd(bloch=(1, 0.5, 0))
+        self.assertTrue(planar.planar)
+        self.assertFalse(interleaved.planar)
+
+        planar.run(self.steps)
+        interleaved.run(self.steps)
+        for comp in (Ex, Ey, Ez, Hx, Hy, Hz):
+            self.assertTrue(isinstance(planar.field[comp], _PlanarField))
+            self.assertTrue(np.allclose(np.asarray(planar.field[comp]),
+                                        interleaved.field[comp],
+                                        rtol=0, atol=1e-12))
+        self.assertTrue(abs(interleaved.ez).max() > 0)
+
+    def testPlanarDm2(self):
+        space = Cartesian(size=(1, 1, 1), resolution=6)
+        geom_list = [DefaultMedium(material=Dielectric()),
+                     Block(material=Dm2(), size=(0.5, 0.5, 0.5))]
+        src_list = [PointSource(src_time=Continuous(freq=1),
+                                center=(0.25, 0, 0), component=Ez)]
+        self.assertRaises(ValueError, FDTD, space, geom_list, src_list,
+                          bloch=(1, 0.5, 0), planar=True, verbose=False)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=('', '-v'))
@@ -269,6 +269,49 @@ class TestSequence(unittest.TestCase):
                 self.assertEqual(hz[idx], 0j)
 
 
+    def testExRangeReal(self):
+        low, high = (0,1,0), (2,1,2)
+        sample = \
+            self.const_real.get_pw_material_ex_range(low, high, cmplx=False)
+        # The next plane of the same value stacks onto the range.
+        sample.merge(self.const_real.get_pw_material_ex_range((0,2,0), (2,2,2)))
+
+        self.assertEqual(sample.idx_size(), 18)
+        for idx in np.ndindex(3, 3, 3):
+            if idx[1] > 0:
+                self.assertEqual(sample.get_eps_inf(idx), self.const_real.eps_inf)
+            else:
+                self.assertEqual(sample.get_eps_inf(idx), 0)
+
+        ex = hz = hy = np.zeros((3,3,3))
+        dy = dz = dt = 1
+        n = 0
+        sample.update_all(ex, hz, hy, dy, dz, dt, n)
+        for idx in np.ndindex(3, 3, 3):
+            if idx[1] > 0:
+                self.assertEqual(ex[idx], self.const_real.value)
+            else:
+                self.assertEqual(ex[idx], 0)
+
+    def testHzRangeCmplx(self):
+        low, high = (0,0,0), (0,2,2)
+        sample = \
+            self.const_cmplx.get_pw_material_hz_range(low, high, cmplx=True)
+
+        self.assertEqual(sample.idx_size(), 9)
+        hz = ey = ex = np.zeros((3,3,3), complex)
+        dx = dy = dt = 1
+        n = 0
+        sample.update_all(hz, ey, ex, dx, dy, dt, n)
+        for idx in np.ndindex(3, 3, 3):
+            if idx[0] == 0:
+                self.assertEqual(sample.get_mu_inf(idx), self.const_cmplx.mu_inf)
+                self.assertEqual(hz[idx], self.const_cmplx.value)
+            else:
+                self.assertEqual(sample.get_mu_inf(idx), 0)
+                self.assertEqual(hz[idx], 0j)
+
+
 if __name__ == '__main__':
     unittest.main(argv=('', '-v'))
     
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os, sys
+new_path = os.path.abspath('../')
+sys.path.append(new_path)
+
+import unittest
+import numpy as np
+
+from gmes.material import Cpml
+from gmes.geometry import Cartesian
+
+
+class TestSequence(unittest.TestCase):
+    def setUp(self):
+        self.spc = Cartesian((0, 0, 0))
+        self.spc.dt = 1
+
+        self.cpml = Cpml()
+        self.cpml.init(self.spc, ((0, 0, 0), (1, 1, 1), 0.5))
+
+    def testExReal(self):
+        coords = [(0.9, 0.7, z) for z in (-0.9, -0.8, -0.7)]
+        sample = self.cpml.get_pw_material_ex_range((1,1,0), (1,1,2), coords)
+        reference = self.cpml.get_pw_material_ex((1,1,0), coords[0])
+        for k in (1, 2):
+            reference.merge(self.cpml.get_pw_material_ex((1,1,k), coords[k]))
+
+        self.assertEqual(sample.idx_size(), 3)
+        for idx in np.ndindex(3, 3, 3):
+            self.assertEqual(sample.get_eps_inf(idx),
+                             reference.get_eps_inf(idx))
+
+        ex = np.random.random((3,3,3))
+        hz = np.random.random((4,3,3))
+        hy = np.random.random((4,3,3))
+        ex_reference = np.array(ex)
+        dy = dz = dt = 1
+        n = 0
+        for i in range(3):
+            sample.update_all(ex, hz, hy, dy, dz, dt, n)
+            reference.update_all(ex_reference, hz, hy, dy, dz, dt, n)
+        for idx in np.ndindex(3, 3, 3):
+            self.assertEqual(ex[idx], ex_reference[idx])
+
+    def testHzCmplx(self):
+        # Not graded along the x axis.
+        coords = [(0, 0.7, z) for z in (0, 0.1)]
+        sample = self.cpml.get_pw_material_hz_range((1,1,1), (1,1,2), coords,
+                                                    cmplx=True)
+        reference = self.cpml.get_pw_material_hz((1,1,1), coords[0],
+                                                 cmplx=True)
+        reference.merge(self.cpml.get_pw_material_hz((1,1,2), coords[1],
+                                                     cmplx=True))
+
+        for idx in np.ndindex(3, 3, 3):
+            self.assertEqual(sample.get_mu_inf(idx),
+                             reference.get_mu_inf(idx))
+
+        hz = np.random.random((3,3,3)) + 1j * np.random.random((3,3,3))
+        ey = np.random.random((3,3,3)) + 1j * np.random.random((3,3,3))
+        ex = np.random.random((3,3,3)) + 1j * np.random.random((3,3,3))
+        hz_reference = np.array(hz)
+        dx = dy = dt = 1
+        n = 0
+        for i in range(3):
+            sample.update_all(hz, ey, ex, dx, dy, dt, n)
+            reference.update_all(hz_reference, ey, ex, dx, dy, dt, n)
+        for idx in np.ndindex(3, 3, 3):
+            self.assertEqual(hz[idx], hz_reference[idx])
+
+
+if __name__ == '__main__':
+    unittest.main(argv=('', '-v'))
@@ -227,6 +227,175 @@ class TestSequence(unittest.TestCase):
         for idx in np.ndindex(3, 3, 3):
             self.assertEqual(hz[idx], 0j)
 
+    def testExRangeReal(self):
+        low, high = (0,0,0), (1,1,1)
+        sample = \
+            self.dielectric.get_pw_material_ex_range(low, high, cmplx=False)
+        pointwise = None
+        for idx in np.ndindex(2, 2, 2):
+            pw_obj = self.dielectric.get_pw_material_ex(idx, (0,0,0), cmplx=False)
+            if pointwise is None:
+                pointwise = pw_obj
+            else:
+                pointwise.merge(pw_obj)
+
+        self.assertEqual(sample.idx_size(), 8)
+        for idx in np.ndindex(3, 3, 3):
+            if max(idx) < 2:
+                self.assertEqual(sample.get_eps_inf(idx), self.dielectric.eps_inf)
+            else:
+                self.assertEqual(sample.get_eps_inf(idx), 0)
+
+        hz = np.random.random((3,3,3))
+        hy = np.random.random((3,3,3))
+        ex = np.random.random((3,3,3))
+        ex_pointwise = np.array(ex)
+        dy = dz = dt = 1
+        n = 0
+        sample.update_all(ex, hz, hy, dy, dz, dt, n)
+        pointwise.update_all(ex_pointwise, hz, hy, dy, dz, dt, n)
+        for idx in np.ndindex(3, 3, 3):
+            self.assertEqual(ex[idx], ex_pointwise[idx])
+
+    def testHzRangeReal(self):
+        low, high = (1,1,0), (2,2,2)
+        sample = \
+            self.dielectric.get_pw_material_hz_range(low, high, cmplx=False)
+        pointwise = None
+        for idx in np.ndindex(2, 2, 3):
+            idx = (idx[0] + 1, idx[1] + 1, idx[2])
+            pw_obj = self.dielectric.get_pw_material_hz(idx, (0,0,0), cmplx=False)
+            if pointwise is None:
+                pointwise = pw_obj
+            else:
+                pointwise.merge(pw_obj)
+
+        self.assertEqual(sample.idx_size(), 12)
+        for idx in np.ndindex(3, 3, 3):
+            if idx[0] > 0 and idx[1] > 0:
+                self.assertEqual(sample.get_mu_inf(idx), self.dielectric.mu_inf)
+            else:
+                self.assertEqual(sample.get_mu_inf(idx), 0)
+
+        ey = np.random.random((3,3,3))
+        ex = np.random.random((3,3,3))
+        hz = np.random.random((3,3,3))
+        hz_pointwise = np.array(hz)
+        dx = dy = dt = 1
+        n = 0
+        sample.update_all(hz, ey, ex, dx, dy, dt, n)
+        pointwise.update_all(hz_pointwise, ey, ex, dx, dy, dt, n)
+        for idx in np.ndindex(3, 3, 3):
+            self.assertEqual(hz[idx], hz_pointwise[idx])
+
+    def testExFinalizeReal(self):
+        eps = {}
+        sample = None
+        for idx in reversed(list(np.ndindex(3, 3, 3))):
+            dielectric = Dielectric(eps_inf=random(), mu_inf=1)
+            dielectric.init(self.spc)
+            eps[idx] = dielectric.eps_inf
+            pw_obj = dielectric.get_pw_material_ex(idx, (0,0,0), cmplx=False)
+            if sample is None:
+                sample = pw_obj
+            else:
+                sample.merge(pw_obj)
+
+        hz = np.random.random((4,4,4))
+        hy = np.random.random((4,4,4))
+        ex = np.random.random((3,3,3))
+        ex_sorted = np.array(ex)
+        dy = dz = dt = 1
+        n = 0
+
+        ex_reference = np.array(ex)
+        for i, j, k in np.ndindex(3, 3, 3):
+            ex_reference[i,j,k] += dt / eps[i,j,k] * \
+                ((hz[i+1,j+1,k] - hz[i+1,j,k]) / dy - 
+                 (hy[i+1,j,k+1] - hy[i+1,j,k]) / dz)
+
+        sample.update_all(ex, hz, hy, dy, dz, dt, n)
+        for idx in np.ndindex(3, 3, 3):
+            self.assertAlmostEqual(ex[idx], ex_reference[idx])
+
+        for order in ('linear', 'blocked', 'morton'):
+            sample.finalize(order)
+            for idx in np.ndindex(3, 3, 3):
+                self.assertEqual(sample.get_eps_inf(idx), eps[idx])
+
+        sample.update_all(ex_sorted, hz, hy, dy, dz, dt, n)
+        for idx in np.ndindex(3, 3, 3):
+            self.assertAlmostEqual(ex_sorted[idx], ex_reference[idx])
+
+    def testExCoalesceReal(self):
+        # The z-rows of two media, which finalize joins into boxes.
+        other = Dielectric(eps_inf=random(), mu_inf=1)
+        other.init(self.spc)
+        sample = None
+        for i, j in np.ndindex(3, 3):
+            if i == 1:
+                mat_obj = other
+            else:
+                mat_obj = self.dielectric
+            pw_obj = mat_obj.get_pw_material_ex_range((i,j,0), (i,j,2),
+                                                      cmplx=False)
+            if sample is None:
+                sample = pw_obj
+            else:
+                sample.merge(pw_obj)
+
+        hz = np.random.random((4,4,4))
+        hy = np.random.random((4,4,4))
+        ex = np.random.random((3,3,3))
+        ex_coalesced = np.array(ex)
+        dy = dz = dt = 1
+        n = 0
+        sample.update_all(ex, hz, hy, dy, dz, dt, n)
+
+        sample.finalize()
+        self.assertEqual(sample.idx_size(), 27)
+        for idx in np.ndindex(3, 3, 3):
+            if idx[0] == 1:
+                self.assertEqual(sample.get_eps_inf(idx), other.eps_inf)
+            else:
+                self.assertEqual(sample.get_eps_inf(idx),
+                                 self.dielectric.eps_inf)
+
+        sample.update_all(ex_coalesced, hz, hy, dy, dz, dt, n)
+        for idx in np.ndindex(3, 3, 3):
+            self.assertEqual(ex[idx], ex_coalesced[idx])
+
+    def testEpsInfArray(self):
+        sample = \
+            self.dielectric.get_pw_material_ex(self.idx, (0,0,0), cmplx=False)
+        idx_array = np.array(list(np.ndindex(3, 3, 3)), np.intc)
+        eps = sample.get_eps_inf_array(idx_array, len(idx_array))
+        for n, idx in enumerate(np.ndindex(3, 3, 3)):
+            self.assertEqual(eps[n], sample.get_eps_inf(idx))
+
+    def testExSingle(self):
+        dielectric = Dielectric(eps_inf=2, mu_inf=1)
+        dielectric.init(self.spc)
+        reference = dielectric.get_pw_material_ex(self.idx, (0,0,0), 
+                                                  cmplx=True)
+        sample = dielectric.get_pw_material_ex(self.idx, (0,0,0), 
+                                               cmplx=True, single=True)
+        self.assertEqual(sample.get_eps_inf(self.idx), 
+                         reference.get_eps_inf(self.idx))
+
+        ex = np.random.random((3,3,3)) + 1j * np.random.random((3,3,3))
+        hz = np.random.random((3,3,3)) + 1j * np.random.random((3,3,3))
+        hy = np.random.random((3,3,3)) + 1j * np.random.random((3,3,3))
+        ex_single = np.array(ex, np.complex64)
+        dy = dz = dt = 1
+        n = 0
+        reference.update_all(ex, hz, hy, dy, dz, dt, n)
+        sample.update_all(ex_single, np.array(hz, np.complex64), 
+                          np.array(hy, np.complex64), dy, dz, dt, n)
+        self.assertEqual(ex_single.dtype, np.complex64)
+        for idx in np.ndindex(3, 3, 3):
+            self.assertAlmostEqual(ex_single[idx], ex[idx], 5)
+
         
 if __name__ == '__main__':
     unittest.main(argv=('', '-v'))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os, sys
+new_path = os.path.abspath('../')
+sys.path.append(new_path)
+
+import unittest
+import numpy as np
+
+from gmes.material import Dm2, Dielectric
+from gmes.geometry import Cartesian
+
+
+class TestSequence(unittest.TestCase):
+    def setUp(self):
+        self.idx = (1, 1, 1)
+        self.spc = Cartesian((0, 0, 0))
+        self.spc.dt = 1
+
+        # Without atoms, the two-level medium is a plain dielectric.
+        self.empty = Dm2(eps_inf=2, omega=(1, 2), n_atom=(0, 0))
+        self.empty.init(self.spc)
+        self.dielectric = Dielectric(eps_inf=2)
+        self.dielectric.init(self.spc)
+
+        self.medium = Dm2(eps_inf=1, omega=(1,), n_atom=(1,), rho30=-1)
+        self.medium.init(self.spc)
+
+    def _compare(self, comp):
+        get_sample = getattr(self.empty, 'get_pw_material_' + comp)
+        get_reference = getattr(self.dielectric, 'get_pw_material_' + comp)
+        sample = get_sample(self.idx, (0,0,0))
+        reference = get_reference(self.idx, (0,0,0))
+
+        e = np.random.random((3,3,3))
+        h1 = np.random.random((3,3,3))
+        h2 = np.random.random((3,3,3))
+        e_reference = np.array(e)
+        d1, d2, dt = 1, 0.5, 0.2
+        for n in range(3):
+            sample.update_all(e, h1, h2, d1, d2, dt, n)
+            reference.update_all(e_reference, h1, h2, d1, d2, dt, n)
+
+        for idx in np.ndindex(3, 3, 3):
+            self.assertAlmostEqual(e[idx], e_reference[idx])
+
+    def testExReal(self):
+        self._compare('ex')
+
+    def testEyReal(self):
+        self._compare('ey')
+
+    def testEzReal(self):
+        self._compare('ez')
+
+    def testRho(self):
+        sample = self.medium.get_pw_material_ey(self.idx, (0,0,0))
+        self.assertEqual(sample.get_eps_inf(self.idx), 1)
+        self.assertEqual(sample.get_rho(self.idx, 0, 2, 0), -1)
+
+        ey = hx = hz = np.zeros((3,3,3))
+        sample.update_all(ey, hx, hz, 1, 1, 0.1, 0)
+        for idx in np.ndindex(3, 3, 3):
+            self.assertEqual(ey[idx], 0)
+        self.assertEqual(sample.get_rho(self.idx, 0, 0, 0), 0)
+
+    def testBlochArray(self):
+        sample = self.medium.get_pw_material_ey(self.idx, (0,0,0))
+        sample.finalize()
+        idx_array = np.array((self.idx, (0,0,0)), np.intc)
+        w = np.zeros((2, 1))
+        sample.get_w_array(idx_array, 0, w)
+        self.assertEqual(w[0,0], sample.get_w(self.idx, 0, 1)[0])
+        self.assertEqual(w[0,0], -1)
+        self.assertEqual(w[1,0], 0)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=('', '-v'))
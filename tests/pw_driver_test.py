@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os, sys
+new_path = os.path.abspath('../')
+sys.path.append(new_path)
+
+import unittest
+import numpy as np
+
+from gmes.material import Dielectric
+from gmes.geometry import Cartesian, aligned_zeros, padded_storage
+from gmes.pw_material import DriverReal
+from gmes.pw_material import DielectricFusedElectricReal
+from gmes.pw_material import DielectricFusedMagneticReal
+
+
+class TestSequence(unittest.TestCase):
+    def setUp(self):
+        self.spc = Cartesian((0, 0, 0))
+        self.spc.dt = 1
+
+        self.dielectric = Dielectric(eps_inf=2, mu_inf=1.5)
+        self.dielectric.init(self.spc)
+
+    def testExHy(self):
+        # Ex and Hy, periodic along the z axis.
+        ex_obj = self.dielectric.get_pw_material_ex((0,0,0), (0,0,0))
+        for idx in np.ndindex(3, 3, 3):
+            if idx != (0,0,0):
+                ex_obj.merge(self.dielectric.get_pw_material_ex(idx, (0,0,0)))
+
+        hy_obj = self.dielectric.get_pw_material_hy((1,0,1), (0,0,0))
+        for idx in np.ndindex(3, 3, 3):
+            idx = (idx[0] + 1, idx[1], idx[2] + 1)
+            if idx != (1,0,1):
+                hy_obj.merge(self.dielectric.get_pw_material_hy(idx, (0,0,0)))
+
+        ex = np.random.random((3,3,4))
+        hy = np.random.random((4,3,4))
+        dummy = np.zeros((1,1,1))
+        ex_reference = np.array(ex)
+        hy_reference = np.array(hy)
+        dx = dy = 1
+        dz = 0.5
+        dt = 0.3
+
+        record = np.empty(3)
+        driver = DriverReal()
+        driver.set_ex(ex)
+        driver.set_ey(dummy)
+        driver.set_ez(dummy)
+        driver.set_hx(dummy)
+        driver.set_hy(hy)
+        driver.set_hz(dummy)
+        driver.set_differential(dx, dy, dz)
+        driver.set_time_step(dt, 0)
+        driver.add_update(0, ex_obj)
+        driver.add_update(4, hy_obj)
+        driver.add_halo(0, 2, 0, -1, 1)
+        driver.add_halo(4, 2, -1, 0, 1)
+        driver.add_probe(0, 1, 1, 1, record)
+        driver.run(3)
+        self.assertEqual(driver.get_n(), 3)
+
+        n = 0
+        for i in range(3):
+            n += 0.5
+            hy_reference[:,:,0] = hy_reference[:,:,-1]
+            ex_obj.update_all(ex_reference, dummy, hy_reference, 
+                              dy, dz, dt, n)
+            self.assertEqual(record[i], ex_reference[1,1,1])
+            n += 0.5
+            ex_reference[:,:,-1] = ex_reference[:,:,0]
+            hy_obj.update_all(hy_reference, ex_reference, dummy, 
+                              dz, dx, dt, n)
+
+        for idx in np.ndindex(3, 3, 4):
+            self.assertEqual(ex[idx], ex_reference[idx])
+        for idx in np.ndindex(4, 3, 4):
+            self.assertEqual(hy[idx], hy_reference[idx])
+
+    def _fused_driver(self, field, record):
+        """Return a driver of the fused grids of the whole interior, 
+        and the objects which should outlive it.
+
+        """
+        high = (7, 3, 3)
+        bound = {'ex': ((0,0,0), high), 'ey': ((0,0,0), high), 
+                 'ez': ((0,0,0), high), 'hx': ((0,1,1), (7,4,4)), 
+                 'hy': ((1,0,1), (8,3,4)), 'hz': ((1,1,0), (8,4,3))}
+        grid = {}
+        for comp in bound:
+            get_range = getattr(self.dielectric, 
+                                'get_pw_material_%s_range' % comp)
+            grid[comp] = get_range(bound[comp][0], bound[comp][1], 
+                                   grid=True)
+
+        driver = DriverReal()
+        for comp in ('ex', 'ey', 'ez', 'hx', 'hy', 'hz'):
+            getattr(driver, 'set_' + comp)(field[comp])
+        driver.set_differential(1, 0.5, 0.5)
+        driver.set_time_step(0.2, 0)
+        fused = (DielectricFusedElectricReal(grid['ex'], grid['ey'], 
+                                             grid['ez']),
+                 DielectricFusedMagneticReal(grid['hx'], grid['hy'], 
+                                             grid['hz']))
+        for f in fused:
+            driver.add_fused(f)
+        for c, comp in enumerate(('ex', 'ey', 'ez', 'hx', 'hy', 'hz')):
+            driver.add_update(c, grid[comp])
+        driver.add_probe(1, 4, 2, 2, record)
+        return driver, (grid, fused)
+
+    def testBlocking(self):
+        shape = {'ex': (8,5,5), 'ey': (9,4,5), 'ez': (9,5,4),
+                 'hx': (8,5,5), 'hy': (9,4,5), 'hz': (9,5,4)}
+        field = {}
+        reference = {}
+        for comp in shape:
+            field[comp] = np.random.random(shape[comp])
+            reference[comp] = np.array(field[comp])
+
+        record = np.empty(7)
+        record_reference = np.empty(7)
+        driver, objects = self._fused_driver(field, record)
+        driver.set_blocking(3, 2)
+        driver.run(7)
+        driver_reference, objects_reference = \
+            self._fused_driver(reference, record_reference)
+        driver_reference.run(7)
+
+        for comp in shape:
+            for idx in np.ndindex(shape[comp]):
+                self.assertEqual(field[comp][idx], reference[comp][idx])
+        for i in range(7):
+            self.assertEqual(record[i], record_reference[i])
+
+    def testActive(self):
+        shape = {'ex': (8,5,5), 'ey': (9,4,5), 'ez': (9,5,4),
+                 'hx': (8,5,5), 'hy': (9,4,5), 'hz': (9,5,4)}
+        field = {}
+        reference = {}
+        for comp in shape:
+            field[comp] = np.zeros(shape[comp])
+            field[comp][4:6,1:3,2] = np.random.random((2,2))
+            reference[comp] = np.array(field[comp])
+
+        record = np.empty(7)
+        record_reference = np.empty(7)
+        driver, objects = self._fused_driver(field, record)
+        driver.set_active(4, 1, 2, 5, 2, 2)
+        driver.run(7)
+        driver_reference, objects_reference = \
+            self._fused_driver(reference, record_reference)
+        driver_reference.run(7)
+
+        for comp in shape:
+            for idx in np.ndindex(shape[comp]):
+                self.assertEqual(field[comp][idx], reference[comp][idx])
+        for i in range(7):
+            self.assertEqual(record[i], record_reference[i])
+
+
+    def testPadded(self):
+        shape = {'ex': (8,5,5), 'ey': (9,4,5), 'ez': (9,5,4),
+                 'hx': (8,5,5), 'hy': (9,4,5), 'hz': (9,5,4)}
+        field = {}
+        padded = {}
+        reference = {}
+        for comp in shape:
+            field[comp] = aligned_zeros(shape[comp], np.double)
+            field[comp][...] = np.random.random(shape[comp])
+            padded[comp] = padded_storage(field[comp])
+            self.assertEqual(padded[comp].shape[2], 8)
+            self.assertEqual(padded[comp].ctypes.data % 64, 0)
+            reference[comp] = np.array(field[comp])
+
+        record = np.empty(7)
+        record_reference = np.empty(7)
+        driver, objects = self._fused_driver(padded, record)
+        for c, comp in enumerate(('ex', 'ey', 'ez', 'hx', 'hy', 'hz')):
+            driver.set_extent(c, *shape[comp])
+        driver.set_blocking(3, 2)
+        driver.run(7)
+        driver_reference, objects_reference = \
+            self._fused_driver(reference, record_reference)
+        driver_reference.run(7)
+
+        for comp in shape:
+            for idx in np.ndindex(shape[comp]):
+                self.assertEqual(field[comp][idx], reference[comp][idx])
+        for i in range(7):
+            self.assertEqual(record[i], record_reference[i])
+
+
+if __name__ == '__main__':
+    unittest.main(argv=('', '-v'))
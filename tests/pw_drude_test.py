@@ -222,6 +222,33 @@ class TestSequence(unittest.TestCase):
         for idx in np.ndindex(3, 3, 3):
             self.assertEqual(hz[idx], 0j)
 
+    def testExMergeReal(self):
+        dp1 = DrudePole(omega=1, gamma=.1)
+        dp2 = DrudePole(omega=2, gamma=.2)
+        other = Drude(eps_inf=2, mu_inf=1, sigma=0, dps=(dp1, dp2))
+        other.init(self.spc)
+
+        idx1, idx2 = (1, 1, 1), (2, 1, 1)
+        sample = self.gold.get_pw_material_ex(idx1, (0,0,0))
+        sample.merge(other.get_pw_material_ex(idx2, (0,0,0)))
+        single1 = self.gold.get_pw_material_ex(idx1, (0,0,0))
+        single2 = other.get_pw_material_ex(idx2, (0,0,0))
+
+        self.assertEqual(sample.get_eps_inf(idx1), self.gold.eps_inf)
+        self.assertEqual(sample.get_eps_inf(idx2), other.eps_inf)
+
+        hz = np.random.random((4,4,4))
+        hy = np.random.random((4,4,4))
+        ex = np.random.random((4,4,4))
+        ex_single = np.array(ex)
+        dy = dz = dt = 1
+        for n in xrange(3):
+            sample.update_all(ex, hz, hy, dy, dz, dt, n)
+            single1.update_all(ex_single, hz, hy, dy, dz, dt, n)
+            single2.update_all(ex_single, hz, hy, dy, dz, dt, n)
+        for idx in np.ndindex(4, 4, 4):
+            self.assertEqual(ex[idx], ex_single[idx])
+
 
 if __name__ == '__main__':
     unittest.main(argv=('', '-v'))
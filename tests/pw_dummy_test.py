@@ -216,6 +216,28 @@ class TestSequence(unittest.TestCase):
             self.assertEqual(hz[idx], 0j)
 
 
+    def testExRangeReal(self):
+        # The last planes along y and z, as mapped by the FDTD classes.
+        sample = self.dumy.get_pw_material_ex_range((0,2,0), (2,2,2))
+        sample.merge(self.dumy.get_pw_material_ex_range((0,0,2), (2,1,2)))
+
+        self.assertEqual(sample.idx_size(), 15)
+        for idx in np.ndindex(3, 3, 3):
+            if idx[1] == 2 or idx[2] == 2:
+                self.assertEqual(sample.get_eps_inf(idx), self.dumy.eps_inf)
+            else:
+                self.assertEqual(sample.get_eps_inf(idx), 0)
+
+        ex = np.random.random((3,3,3))
+        ex_orig = np.array(ex)
+        hz = hy = np.zeros((3,3,3))
+        dy = dz = dt = 1
+        n = 0
+        sample.update_all(ex, hz, hy, dy, dz, dt, n)
+        for idx in np.ndindex(3, 3, 3):
+            self.assertEqual(ex[idx], ex_orig[idx])
+
+
 if __name__ == '__main__':
     unittest.main(argv=('', '-v'))
     
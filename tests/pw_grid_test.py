@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os, sys
+new_path = os.path.abspath('../')
+sys.path.append(new_path)
+
+import unittest
+import numpy as np
+from random import random
+
+from gmes.material import Dielectric
+from gmes.geometry import Cartesian    
+from gmes.pw_material import DielectricFusedElectricReal
+
+
+class TestSequence(unittest.TestCase):
+    def setUp(self):
+        self.spc = Cartesian((0, 0, 0))
+        self.spc.dt = 1
+        
+        self.dielectric = Dielectric(eps_inf=random(), mu_inf=random())
+        self.dielectric.init(self.spc)
+
+        self.other = Dielectric(eps_inf=random(), mu_inf=random())
+        self.other.init(self.spc)
+        
+    def testExReal(self):
+        sample = self.dielectric.get_pw_material_ex_range((0,0,0), (2,1,0), 
+                                                          grid=True)
+        sample.merge(self.other.get_pw_material_ex_range((0,0,1), (2,1,1)))
+        reference = self.dielectric.get_pw_material_ex_range((0,0,0), (2,1,0))
+        reference.merge(self.other.get_pw_material_ex_range((0,0,1), (2,1,1)))
+
+        self.assertEqual(sample.idx_size(), 12)
+        for idx in np.ndindex(3, 3, 3):
+            self.assertEqual(sample.get_eps_inf(idx), 
+                             reference.get_eps_inf(idx))
+
+        ex = np.random.random((3,3,3))
+        hz = np.random.random((4,3,3))
+        hy = np.random.random((4,3,3))
+        ex_reference = np.array(ex)
+        dy = dz = dt = 1
+        n = 0
+        for i in range(3):
+            sample.update_all(ex, hz, hy, dy, dz, dt, n)
+            reference.update_all(ex_reference, hz, hy, dy, dz, dt, n)
+        for idx in np.ndindex(3, 3, 3):
+            self.assertEqual(ex[idx], ex_reference[idx])
+
+    def testHyCmplx(self):
+        sample = self.dielectric.get_pw_material_hy_range((1,0,1), (2,2,2), 
+                                                          cmplx=True, 
+                                                          grid=True)
+        reference = \
+            self.dielectric.get_pw_material_hy_range((1,0,1), (2,2,2), 
+                                                     cmplx=True)
+
+        for idx in np.ndindex(3, 3, 3):
+            self.assertEqual(sample.get_mu_inf(idx), 
+                             reference.get_mu_inf(idx))
+
+        hy = np.random.random((3,3,3)) + 1j * np.random.random((3,3,3))
+        ex = np.random.random((3,3,3)) + 1j * np.random.random((3,3,3))
+        ez = np.random.random((3,3,3)) + 1j * np.random.random((3,3,3))
+        hy_reference = np.array(hy)
+        dz = dx = dt = 1
+        n = 0
+        sample.update_all(hy, ex, ez, dz, dx, dt, n)
+        reference.update_all(hy_reference, ex, ez, dz, dx, dt, n)
+        for idx in np.ndindex(3, 3, 3):
+            self.assertEqual(hy[idx], hy_reference[idx])
+
+
+    def testFusedElectric(self):
+        grid = {}
+        reference = {}
+        for comp, high in (('ex', (2,2,2)), ('ey', (2,2,2)), ('ez', (2,1,1))):
+            get_range = getattr(self.dielectric, 
+                                'get_pw_material_%s_range' % comp)
+            grid[comp] = get_range((0,0,0), high, grid=True)
+            reference[comp] = get_range((0,0,0), high)
+        sample = DielectricFusedElectricReal(grid['ex'], grid['ey'], 
+                                             grid['ez'])
+
+        ex = np.random.random((3,4,4))
+        ey = np.random.random((4,3,4))
+        ez = np.random.random((4,4,3))
+        hx = np.random.random((3,4,4))
+        hy = np.random.random((4,3,4))
+        hz = np.random.random((4,4,3))
+        ex_reference = np.array(ex)
+        ey_reference = np.array(ey)
+        ez_reference = np.array(ez)
+        dx, dy, dz, dt = 1, 0.5, 0.25, 1
+        n = 0
+        sample.update_all(ex, ey, ez, hx, hy, hz, dx, dy, dz, dt, n)
+        # The fused grids are not updated on their own.
+        grid['ex'].update_all(ex, hz, hy, dy, dz, dt, n)
+        reference['ex'].update_all(ex_reference, hz, hy, dy, dz, dt, n)
+        reference['ey'].update_all(ey_reference, hx, hz, dz, dx, dt, n)
+        reference['ez'].update_all(ez_reference, hy, hx, dx, dy, dt, n)
+        for idx in np.ndindex(3, 4, 4):
+            self.assertEqual(ex[idx], ex_reference[idx])
+        for idx in np.ndindex(4, 3, 4):
+            self.assertEqual(ey[idx], ey_reference[idx])
+        for idx in np.ndindex(4, 4, 3):
+            self.assertEqual(ez[idx], ez_reference[idx])
+
+        
+if __name__ == '__main__':
+    unittest.main(argv=('', '-v'))
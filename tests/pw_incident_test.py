@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os, sys
+new_path = os.path.abspath('../')
+sys.path.append(new_path)
+
+import unittest
+import numpy as np
+
+from gmes.pw_material import IncidentReal, IncidentRealSingle
+
+
+class TestSequence(unittest.TestCase):
+    def setUp(self):
+        self.size = 401
+        self.ex = np.zeros((1, 1, self.size))
+        self.hy = np.zeros((1, 1, self.size))
+        self.dt = 0.5
+
+        self.sample = IncidentReal()
+        self.sample.set_ex(self.ex)
+        self.sample.set_hy(self.hy)
+        self.sample.set_medium(1, self.dt, 1, 1, 30)
+        self.sample.set_source(100)
+
+        # A Gaussian pulse peaked at t = 30.
+        n0 = 0.5
+        t = self.dt * (n0 + np.arange(3000))
+        waveform = np.exp(-((t - 30) / 8)**2)
+        self.sample.set_waveform(waveform, n0)
+
+    def testPropagation(self):
+        self.sample.run(300)
+        self.assertEqual(self.sample.get_n(), 300)
+
+        # The pulse travels at the speed of light of the medium.
+        self.assertAlmostEqual(abs(self.ex).max(), 1, 1)
+        self.assertTrue(abs(abs(self.ex).argmax() - 220) <= 2)
+
+    def testAbsorption(self):
+        self.sample.run(1500)
+        self.assertTrue(abs(self.ex).max() < 1e-4)
+        self.assertTrue(abs(self.hy).max() < 1e-4)
+
+    def testAnalytic(self):
+        sample = IncidentReal()
+        sample.set_ex(self.ex)
+        sample.set_hy(self.hy)
+        sample.set_analytic(2)
+
+        # The waveform at every half step.
+        wave = lambda t: np.exp(-((t - 30) / 8)**2)
+        t = self.dt * 0.5 * np.arange(201)
+        sample.set_waveform(wave(t), 0)
+        sample.run(100)
+        self.assertEqual(sample.get_n(), 100)
+
+        # ex[k] at n - 0.5 and hy[k] at n are delayed by k half steps.
+        for k in xrange(0, 199, 7):
+            t = self.dt * (100 - 0.5 * k)
+            self.assertAlmostEqual(self.ex[0,0,k], wave(t - 0.5 * self.dt))
+            self.assertAlmostEqual(self.hy[0,0,k], wave(t) / 2)
+
+    def testSingle(self):
+        ex = np.zeros((1, 1, self.size), np.float32)
+        hy = np.zeros((1, 1, self.size), np.float32)
+        sample = IncidentRealSingle()
+        sample.set_ex(ex)
+        sample.set_hy(hy)
+        sample.set_medium(1, self.dt, 1, 1, 30)
+        sample.set_source(100)
+
+        n0 = 0.5
+        t = self.dt * (n0 + np.arange(3000))
+        waveform = np.exp(-((t - 30) / 8)**2).astype(np.float32)
+        sample.set_waveform(waveform, n0)
+
+        sample.run(300)
+        self.sample.run(300)
+        self.assertTrue(abs(ex - self.ex).max() < 1e-4)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=('', '-v'))
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os, sys
+new_path = os.path.abspath('../')
+sys.path.append(new_path)
+
+import unittest
+import numpy as np
+
+from gmes.constant import Ez, Jz, Hx
+from gmes.source import Continuous
+from gmes.pw_source import PointSourceParam, PointSourceEz, PointSourceHx
+
+
+class TestSequence(unittest.TestCase):
+    def setUp(self):
+        self.src_time = Continuous(freq=0.3, width=1)
+        self.src_time.init(cmplx=False)
+        self.dt = 0.2
+
+    def testEzReal(self):
+        sample = PointSourceEz()
+        sample.attach((1,1,1), PointSourceParam(self.src_time, 2, Ez))
+        sample.attach((0,1,2), PointSourceParam(self.src_time, 3, Jz,
+                                                eps_inf=2))
+
+        ez = np.random.random((3,3,3))
+        ez_reference = np.array(ez)
+        for n in (0.5, 1.5, 2.5):
+            sample.update_all(ez, ez, ez, 1, 1, self.dt, n)
+
+            value = self.src_time.oscillator(self.dt * n)
+            ez_reference[1,1,1] = 2 * value
+            ez_reference[0,1,2] -= self.dt * 3 * value / 2
+
+        for idx in np.ndindex(3, 3, 3):
+            self.assertAlmostEqual(ez[idx], ez_reference[idx])
+
+    def testHxWaveform(self):
+        sample = PointSourceHx()
+        sample.attach((2,0,1), PointSourceParam(self.src_time, 2, Hx))
+        (src_time, amp, f, kernel), = sample.kernels(np.double)
+
+        # The update looks up the table of load_waveform.
+        sample.load_waveform(np.double, self.dt, 1, 3)
+        hx = np.zeros((3,3,3))
+        for n in (1, 2, 3):
+            kernel.update_all(hx, hx, hx, 1, 1, self.dt, n)
+            value = self.src_time.oscillator(self.dt * n)
+            self.assertAlmostEqual(hx[2,0,1], 2 * value)
+
+        kernel.update_all(hx, hx, hx, 1, 1, self.dt, 4)
+        self.assertEqual(hx[2,0,1], 0)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=('', '-v'))
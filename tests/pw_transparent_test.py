@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os, sys
+new_path = os.path.abspath('../')
+sys.path.append(new_path)
+
+import unittest
+import numpy as np
+
+from gmes.constant import MinusY, PlusZ
+from gmes.pw_source import TransparentElectricParam, TransparentMagneticParam
+from gmes.pw_source import TransparentEx, TransparentHx
+
+
+class AuxSpace(object):
+    def spc_to_exact_hy_idx(self, x, y, z):
+        return (0, 0, 2 * z)
+
+    def spc_to_exact_ex_idx(self, x, y, z):
+        return (0, 0, 2 * z + 0.5)
+
+
+class AuxFDTD(object):
+    def __init__(self):
+        self.space = AuxSpace()
+        self.ex = np.random.random((1,1,10))
+        self.hy = np.random.random((1,1,10))
+
+
+class TestSequence(unittest.TestCase):
+    def setUp(self):
+        self.aux = AuxFDTD()
+        self.d1, self.d2, self.dt = 1, 0.5, 0.2
+
+    def _incident(self, field, z):
+        k0 = int(np.floor(z))
+        return (k0 + 1 - z) * field[0,0,k0] + (z - k0) * field[0,0,k0+1]
+
+    def testExReal(self):
+        sample = TransparentEx()
+        sample.attach((1,0,1), TransparentElectricParam(2, 3, self.aux,
+                                                        (0, 0, 1.2), MinusY))
+        sample.attach((1,1,2), TransparentElectricParam(1, 2, self.aux,
+                                                        (0, 0, 2.1), PlusZ))
+
+        ex = np.random.random((3,3,3))
+        ex_reference = np.array(ex)
+        sample.update_all(ex, ex, ex, self.d1, self.d2, self.dt, 0.5)
+
+        hy = self.aux.hy
+        ex_reference[1,0,1] -= self.dt / (2 * self.d1) * 3 * self._incident(hy, 2.4)
+        ex_reference[1,1,2] -= self.dt / (1 * self.d2) * 2 * self._incident(hy, 4.2)
+        for idx in np.ndindex(3, 3, 3):
+            self.assertAlmostEqual(ex[idx], ex_reference[idx])
+
+    def testHxCmplx(self):
+        sample = TransparentHx()
+        sample.attach((0,2,1), TransparentMagneticParam(2, 3, self.aux,
+                                                        (0, 0, 1.2), MinusY))
+        self.aux.ex = self.aux.ex * (1 + 1j)
+
+        hx = np.zeros((3,3,3), complex)
+        sample.update_all(hx, hx, hx, self.d1, self.d2, self.dt, 1)
+
+        value = self.dt / (2 * self.d1) * 3 * self._incident(self.aux.ex, 2.9)
+        self.assertAlmostEqual(hx[0,2,1], value)
+
+
+if __name__ == '__main__':
+    unittest.main(argv=('', '-v'))